@@ -1,16 +1,20 @@
 """
 API Principal do Bebrew
 """
-from fastapi import FastAPI, HTTPException, Depends, status
+from fastapi import FastAPI, HTTPException, Depends, Query, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from typing import Dict, List, Any
+from fastapi.responses import JSONResponse, StreamingResponse
+from typing import AsyncIterator, Dict, List, Any, Optional
 from loguru import logger
+import asyncio
+import json
+import re
 import uvicorn
 
 from ..config.settings import get_settings, get_cors_origins
-from ..services.ai_service import ai_service
-from ..services.firebase_service import firebase_service
+from ..services.ai_service import ai_service, AIServiceOverloadedError
+from ..services.firebase_service import firebase_service, InvalidCursorError
 
 
 # Configurações
@@ -38,6 +42,25 @@ app.add_middleware(
 security = HTTPBearer()
 
 
+@app.exception_handler(AIServiceOverloadedError)
+async def ai_overloaded_handler(request, exc: AIServiceOverloadedError):
+    """Rejeita rapidamente requisições de IA quando a fila está cheia"""
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Serviço de IA sobrecarregado, tente novamente em instantes"},
+        headers={"Retry-After": "5"}
+    )
+
+
+@app.exception_handler(asyncio.TimeoutError)
+async def ai_timeout_handler(request, exc: asyncio.TimeoutError):
+    """A OpenAI não respondeu dentro de openai_timeout"""
+    return JSONResponse(
+        status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+        content={"detail": "Tempo esgotado aguardando o serviço de IA"}
+    )
+
+
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> Dict[str, Any]:
     """Obtém usuário atual baseado no token"""
     try:
@@ -52,6 +75,52 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
         )
 
 
+# Paginação
+FIELD_PATH_PATTERN = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*(\.[A-Za-z_][A-Za-z0-9_]*)*$")
+
+
+def _parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Converte o parâmetro fields=a,b,c em lista de campos validados"""
+    if fields is None:
+        return None
+    parsed = [field.strip() for field in fields.split(",") if field.strip()]
+    invalid = [field for field in parsed if not FIELD_PATH_PATTERN.match(field)]
+    if invalid:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Campos inválidos: {', '.join(invalid)}"
+        )
+    return parsed
+
+
+def _check_batch_size(items: List[Any]):
+    """Rejeita lotes vazios ou acima do limite configurado"""
+    if not items or len(items) > settings.api_max_batch_size:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"O lote deve ter entre 1 e {settings.api_max_batch_size} itens"
+        )
+
+
+def _batch_response(results: List[Dict[str, Any]], message: str) -> Dict[str, Any]:
+    """Resumo de uma gravação em lote com o resultado de cada item"""
+    created = sum(1 for result in results if result["status"] == "created")
+    return {
+        "message": message,
+        "created": created,
+        "failed": len(results) - created,
+        "results": results
+    }
+
+
+def _invalid_cursor() -> HTTPException:
+    """Erro retornado para cursores malformados"""
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Cursor de paginação inválido"
+    )
+
+
 # Rotas de Saúde
 @app.get("/")
 async def root():
@@ -75,6 +144,16 @@ async def health_check():
     }
 
 
+@app.get("/metrics")
+async def get_metrics():
+    """Métricas de saturação dos serviços"""
+    return {
+        "firestore_executor": firebase_service.get_metrics(),
+        "auth": firebase_service.get_auth_metrics(),
+        "openai": ai_service.get_metrics()
+    }
+
+
 # Rotas de Autenticação
 @app.post("/auth/register")
 async def register_user(email: str, password: str, display_name: str = None):
@@ -123,15 +202,47 @@ async def create_recipe(
         )
 
 
+@app.post("/recipes:batch")
+async def create_recipes_batch(
+    recipes: List[Any],
+    current_user: Dict[str, Any] = Depends(get_current_user)
+):
+    """Cria várias receitas em uma única requisição"""
+    try:
+        _check_batch_size(recipes)
+        results = await firebase_service.save_recipes_bulk(current_user["uid"], recipes)
+        return _batch_response(results, "Lote de receitas processado")
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Erro ao criar receitas em lote: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Erro ao criar receitas em lote"
+        )
+
+
 @app.get("/recipes")
-async def get_recipes(current_user: Dict[str, Any] = Depends(get_current_user)):
-    """Obtém todas as receitas do usuário"""
+async def get_recipes(
+    limit: Optional[int] = Query(None, ge=1, le=settings.api_max_page_size),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    current_user: Dict[str, Any] = Depends(get_current_user)
+):
+    """Obtém as receitas do usuário, opcionalmente paginadas e projetadas"""
     try:
-        recipes = await firebase_service.get_user_recipes(current_user["uid"])
+        recipes, next_cursor = await firebase_service.get_user_recipes(
+            current_user["uid"], limit=limit, cursor=cursor, fields=_parse_fields(fields)
+        )
         return {
             "recipes": recipes,
-            "count": len(recipes)
+            "count": len(recipes),
+            "next_cursor": next_cursor
         }
+    except HTTPException:
+        raise
+    except InvalidCursorError:
+        raise _invalid_cursor()
     except Exception as e:
         logger.error(f"Erro ao obter receitas: {e}")
         raise HTTPException(
@@ -227,6 +338,8 @@ async def analyze_recipe(
     try:
         analysis = await ai_service.analyze_recipe(recipe_data)
         return {"analysis": analysis}
+    except (AIServiceOverloadedError, asyncio.TimeoutError):
+        raise
     except Exception as e:
         logger.error(f"Erro ao analisar receita: {e}")
         raise HTTPException(
@@ -245,6 +358,8 @@ async def optimize_recipe(
     try:
         optimization = await ai_service.optimize_recipe(recipe_data, target_style)
         return {"optimization": optimization}
+    except (AIServiceOverloadedError, asyncio.TimeoutError):
+        raise
     except Exception as e:
         logger.error(f"Erro ao otimizar receita: {e}")
         raise HTTPException(
@@ -266,6 +381,8 @@ async def predict_fermentation(
             recipe_data, initial_gravity, temperature
         )
         return {"prediction": prediction}
+    except (AIServiceOverloadedError, asyncio.TimeoutError):
+        raise
     except Exception as e:
         logger.error(f"Erro ao prever fermentação: {e}")
         raise HTTPException(
@@ -283,6 +400,116 @@ async def suggest_improvements(
     try:
         suggestions = await ai_service.suggest_improvements(production_data)
         return {"suggestions": suggestions}
+    except (AIServiceOverloadedError, asyncio.TimeoutError):
+        raise
+    except Exception as e:
+        logger.error(f"Erro ao gerar sugestões: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Erro ao gerar sugestões"
+        )
+
+
+# Rotas de IA em streaming (text/event-stream)
+def _format_sse(event: str, data: Any) -> str:
+    """Formata um evento Server-Sent Events"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+
+async def _event_stream(events: AsyncIterator) -> StreamingResponse:
+    """
+    Converte eventos do AIService em uma resposta SSE
+    
+    O primeiro evento é aguardado antes de responder para que a sobrecarga
+    ainda possa ser sinalizada com 503.
+    """
+    first = await events.__anext__()
+    
+    async def body():
+        yield _format_sse(*first)
+        try:
+            async for event, data in events:
+                yield _format_sse(event, data)
+        except Exception as e:
+            logger.error(f"Erro durante streaming da IA: {e}")
+            yield _format_sse("error", {"detail": "Erro ao gerar resposta da IA"})
+    
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.post("/ai/analyze-recipe/stream")
+async def analyze_recipe_stream(
+    recipe_data: Dict[str, Any],
+    current_user: Dict[str, Any] = Depends(get_current_user)
+):
+    """Analisa uma receita usando IA, enviando tokens conforme são gerados"""
+    try:
+        return await _event_stream(ai_service.stream_analyze_recipe(recipe_data))
+    except (AIServiceOverloadedError, asyncio.TimeoutError):
+        raise
+    except Exception as e:
+        logger.error(f"Erro ao analisar receita: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Erro ao analisar receita"
+        )
+
+
+@app.post("/ai/optimize-recipe/stream")
+async def optimize_recipe_stream(
+    recipe_data: Dict[str, Any],
+    target_style: str,
+    current_user: Dict[str, Any] = Depends(get_current_user)
+):
+    """Otimiza uma receita para um estilo específico em streaming"""
+    try:
+        return await _event_stream(ai_service.stream_optimize_recipe(recipe_data, target_style))
+    except (AIServiceOverloadedError, asyncio.TimeoutError):
+        raise
+    except Exception as e:
+        logger.error(f"Erro ao otimizar receita: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Erro ao otimizar receita"
+        )
+
+
+@app.post("/ai/predict-fermentation/stream")
+async def predict_fermentation_stream(
+    recipe_data: Dict[str, Any],
+    initial_gravity: float,
+    temperature: float,
+    current_user: Dict[str, Any] = Depends(get_current_user)
+):
+    """Prediz comportamento da fermentação em streaming"""
+    try:
+        return await _event_stream(
+            ai_service.stream_predict_fermentation(recipe_data, initial_gravity, temperature)
+        )
+    except (AIServiceOverloadedError, asyncio.TimeoutError):
+        raise
+    except Exception as e:
+        logger.error(f"Erro ao prever fermentação: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Erro ao prever fermentação"
+        )
+
+
+@app.post("/ai/suggest-improvements/stream")
+async def suggest_improvements_stream(
+    production_data: Dict[str, Any],
+    current_user: Dict[str, Any] = Depends(get_current_user)
+):
+    """Sugere melhorias baseadas em dados de produção em streaming"""
+    try:
+        return await _event_stream(ai_service.stream_suggest_improvements(production_data))
+    except (AIServiceOverloadedError, asyncio.TimeoutError):
+        raise
     except Exception as e:
         logger.error(f"Erro ao gerar sugestões: {e}")
         raise HTTPException(
@@ -315,14 +542,26 @@ async def create_production(
 
 
 @app.get("/productions")
-async def get_productions(current_user: Dict[str, Any] = Depends(get_current_user)):
-    """Obtém todas as produções do usuário"""
+async def get_productions(
+    limit: Optional[int] = Query(None, ge=1, le=settings.api_max_page_size),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    current_user: Dict[str, Any] = Depends(get_current_user)
+):
+    """Obtém as produções do usuário, opcionalmente paginadas e projetadas"""
     try:
-        productions = await firebase_service.get_user_productions(current_user["uid"])
+        productions, next_cursor = await firebase_service.get_user_productions(
+            current_user["uid"], limit=limit, cursor=cursor, fields=_parse_fields(fields)
+        )
         return {
             "productions": productions,
-            "count": len(productions)
+            "count": len(productions),
+            "next_cursor": next_cursor
         }
+    except HTTPException:
+        raise
+    except InvalidCursorError:
+        raise _invalid_cursor()
     except Exception as e:
         logger.error(f"Erro ao obter produções: {e}")
         raise HTTPException(
@@ -354,15 +593,47 @@ async def create_ingredient(
         )
 
 
+@app.post("/ingredients:batch")
+async def create_ingredients_batch(
+    ingredients: List[Any],
+    current_user: Dict[str, Any] = Depends(get_current_user)
+):
+    """Adiciona vários ingredientes ao inventário em uma única requisição"""
+    try:
+        _check_batch_size(ingredients)
+        results = await firebase_service.save_ingredients_bulk(current_user["uid"], ingredients)
+        return _batch_response(results, "Lote de ingredientes processado")
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Erro ao adicionar ingredientes em lote: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Erro ao adicionar ingredientes em lote"
+        )
+
+
 @app.get("/ingredients")
-async def get_ingredients(current_user: Dict[str, Any] = Depends(get_current_user)):
-    """Obtém todos os ingredientes do usuário"""
+async def get_ingredients(
+    limit: Optional[int] = Query(None, ge=1, le=settings.api_max_page_size),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    current_user: Dict[str, Any] = Depends(get_current_user)
+):
+    """Obtém os ingredientes do usuário, opcionalmente paginados e projetados"""
     try:
-        ingredients = await firebase_service.get_user_ingredients(current_user["uid"])
+        ingredients, next_cursor = await firebase_service.get_user_ingredients(
+            current_user["uid"], limit=limit, cursor=cursor, fields=_parse_fields(fields)
+        )
         return {
             "ingredients": ingredients,
-            "count": len(ingredients)
+            "count": len(ingredients),
+            "next_cursor": next_cursor
         }
+    except HTTPException:
+        raise
+    except InvalidCursorError:
+        raise _invalid_cursor()
     except Exception as e:
         logger.error(f"Erro ao obter ingredientes: {e}")
         raise HTTPException(
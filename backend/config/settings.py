@@ -10,21 +10,41 @@ class Settings(BaseSettings):
     """Configurações da aplicação usando variáveis de ambiente"""
     
     # Configurações da OpenAI
-    openai_api_key: str
+    openai_api_key: Optional[str] = None  # obrigatória com OPENAI_BACKEND=openai
     openai_model: str = "gpt-4"
     openai_max_tokens: int = 2000
     openai_temperature: float = 0.7
+    openai_max_concurrency: int = 8  # completions simultâneas por worker
+    openai_max_queue: int = 32  # requisições aguardando vaga antes de responder 503
+    openai_timeout: float = 60.0  # segundos por chamada
+    openai_backend: str = "openai"  # "openai" ou "fake" (modelo local para testes offline)
+    openai_fake_latency: float = 0.0  # segundos até o primeiro token no modelo fake
+    openai_fake_token_delay: float = 0.0  # segundos entre tokens no modelo fake
     
-    # Configurações do Firebase
-    firebase_project_id: str
-    firebase_private_key_id: str
-    firebase_private_key: str
-    firebase_client_email: str
-    firebase_client_id: str
+    # Cache de respostas da IA
+    ai_cache_enabled: bool = True
+    ai_cache_max_entries: int = 512
+    ai_cache_ttl_seconds: int = 86400
+    ai_cache_path: Optional[str] = None  # ex: "cache/ai_cache.sqlite3" para persistir entre reinícios
+    
+    # Configurações do Firebase (obrigatórias com STORAGE_BACKEND=firestore)
+    firebase_project_id: Optional[str] = None
+    firebase_private_key_id: Optional[str] = None
+    firebase_private_key: Optional[str] = None
+    firebase_client_email: Optional[str] = None
+    firebase_client_id: Optional[str] = None
     firebase_auth_uri: str = "https://accounts.google.com/o/oauth2/auth"
     firebase_token_uri: str = "https://oauth2.googleapis.com/token"
     firebase_auth_provider_x509_cert_url: str = "https://www.googleapis.com/oauth2/v1/certs"
-    firebase_client_x509_cert_url: str
+    firebase_client_x509_cert_url: Optional[str] = None
+    firestore_max_workers: int = 16  # threads para chamadas bloqueantes do Firestore
+    firebase_token_certs_url: str = "https://www.googleapis.com/robot/v1/metadata/x509/securetoken@system.gserviceaccount.com"
+    auth_token_cache_size: int = 10000  # tokens verificados mantidos em memória
+    
+    # Armazenamento
+    storage_backend: str = "firestore"  # "firestore", "memory" ou "sqlite" (local, sem credenciais)
+    local_storage_path: str = "database/local_store.sqlite3"  # arquivo usado com STORAGE_BACKEND=sqlite
+    local_storage_latency: float = 0.0  # segundos artificiais por chamada ao armazenamento local
     
     # Configurações do Sistema
     debug: bool = True
@@ -41,6 +61,8 @@ class Settings(BaseSettings):
     api_host: str = "localhost"
     api_port: int = 8000
     cors_origins: str = "http://localhost:3000,http://127.0.0.1:3000"
+    api_max_page_size: int = 500  # limite máximo de itens por página nas listagens
+    api_max_batch_size: int = 5000  # limite de itens por requisição nas rotas :batch
     
     # Configurações de Banco de Dados
     database_url: Optional[str] = None
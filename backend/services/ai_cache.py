@@ -0,0 +1,197 @@
+"""
+Cache de respostas da IA endereçado por conteúdo
+"""
+import copy
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+from loguru import logger
+from .executor import BoundedExecutor
+
+
+# Metadados que não alteram o conteúdo analisado da receita
+_VOLATILE_KEYS = {"id", "user_id", "created_at", "updated_at"}
+
+
+def _normalize(value: Any) -> Any:
+    """Normaliza o payload para que receitas equivalentes gerem a mesma chave"""
+    if isinstance(value, dict):
+        return {
+            str(k): _normalize(v)
+            for k, v in value.items()
+            if k not in _VOLATILE_KEYS
+        }
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    if isinstance(value, str):
+        return value.strip()
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+class AIResponseCache:
+    """
+    Cache LRU com TTL em memória e camada opcional em SQLite
+
+    A camada em memória é consultada direto no event loop; leituras e escritas
+    no SQLite rodam em uma thread dedicada, que também serializa o acesso à conexão.
+    """
+
+    def __init__(self, max_entries: int = 512, ttl_seconds: float = 86400, path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.path = path
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        self._executor: Optional[BoundedExecutor] = None
+
+        # Métricas
+        self.hits_memory = 0
+        self.hits_disk = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if path:
+            self._open_disk_tier(path)
+
+    def _open_disk_tier(self, path: str):
+        """Abre (ou cria) o arquivo SQLite da camada persistente"""
+        try:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS ai_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._db.execute("DELETE FROM ai_cache WHERE expires_at < ?", (time.time(),))
+            self._db.commit()
+            self._executor = BoundedExecutor(1, name="ai-cache")
+        except sqlite3.Error as e:
+            logger.error(f"Erro ao abrir cache em disco {path}: {e}")
+            self._db = None
+
+    @staticmethod
+    def make_key(endpoint: str, model: str, temperature: float, payload: Any, **extra: Any) -> str:
+        """
+        Gera a chave canônica do cache
+
+        Args:
+            endpoint: Nome da operação (analyze_recipe, optimize_recipe, ...)
+            model: Modelo da OpenAI
+            temperature: Temperatura usada na completion
+            payload: Dados da receita
+            **extra: Argumentos adicionais da operação
+
+        Returns:
+            Hash SHA-256 em hexadecimal
+        """
+        canonical = json.dumps(
+            [endpoint, model, temperature, _normalize(payload), _normalize(extra)],
+            sort_keys=True,
+            separators=(",", ":"),
+            ensure_ascii=False,
+            default=str
+        )
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Busca uma resposta no cache, da memória para o disco"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits_memory += 1
+                    return copy.deepcopy(value)
+                del self._entries[key]
+
+        if self._executor is not None:
+            row = await self._executor.run(self._read_disk, key)
+            if row and row[1] > now:
+                value = json.loads(row[0])
+                with self._lock:
+                    self._store_memory(key, value, row[1])
+                    self.hits_disk += 1
+                return copy.deepcopy(value)
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    async def set(self, key: str, value: Dict[str, Any]):
+        """Armazena uma resposta nas duas camadas"""
+        expires_at = time.time() + self.ttl_seconds
+        with self._lock:
+            self._store_memory(key, copy.deepcopy(value), expires_at)
+        if self._executor is not None:
+            await self._executor.run(
+                self._write_disk, key, json.dumps(value, ensure_ascii=False, default=str), expires_at
+            )
+
+    def _read_disk(self, key: str) -> Optional[tuple]:
+        """Lê uma entrada do SQLite (roda na thread do cache)"""
+        with self._db_lock:
+            try:
+                return self._db.execute(
+                    "SELECT value, expires_at FROM ai_cache WHERE key = ?", (key,)
+                ).fetchone()
+            except sqlite3.Error as e:
+                logger.error(f"Erro ao ler cache em disco: {e}")
+                return None
+
+    def _write_disk(self, key: str, value: str, expires_at: float):
+        """Grava uma entrada no SQLite (roda na thread do cache)"""
+        with self._db_lock:
+            try:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO ai_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                    (key, value, expires_at)
+                )
+                self._db.commit()
+            except sqlite3.Error as e:
+                logger.error(f"Erro ao gravar cache em disco: {e}")
+
+    def _store_memory(self, key: str, value: Dict[str, Any], expires_at: float):
+        """Insere na camada LRU respeitando o limite de entradas"""
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        """Remove todas as entradas"""
+        with self._lock:
+            self._entries.clear()
+        if self._db is not None:
+            with self._db_lock:
+                self._db.execute("DELETE FROM ai_cache")
+                self._db.commit()
+
+    def metrics(self) -> Dict[str, Any]:
+        """Retorna contadores de acerto/erro do cache"""
+        hits = self.hits_memory + self.hits_disk
+        total = hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "disk_tier": self._db is not None,
+            "disk_executor": self._executor.metrics() if self._executor else None,
+            "hits_memory": self.hits_memory,
+            "hits_disk": self.hits_disk,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": hits / total if total else 0.0
+        }
@@ -1,10 +1,26 @@
 """
 Serviço de IA para Bebrew usando OpenAI
 """
+import asyncio
+import hashlib
+import math
 import openai
-from typing import Dict, List, Optional, Any
+from typing import AsyncIterator, Callable, Dict, List, Optional, Any, Tuple
 from loguru import logger
 from ..config.settings import get_settings
+from .ai_cache import AIResponseCache
+from .fake_openai import FakeAsyncOpenAI
+from util.curva_fermentacao import prever_fermentacao
+
+
+SYSTEM_PROMPT = "Você é um especialista em brassagem artesanal com vasto conhecimento em cerveja, hidromel e vinho."
+
+# Evento de streaming: ("token", texto) durante a geração, ("result", dict) ao final
+StreamEvent = Tuple[str, Any]
+
+
+class AIServiceOverloadedError(Exception):
+    """Fila de completions cheia; a requisição deve ser rejeitada com 503"""
 
 
 class AIService:
@@ -12,9 +28,77 @@ class AIService:
     
     def __init__(self):
         self.settings = get_settings()
-        self.client = openai.OpenAI(api_key=self.settings.openai_api_key)
+        self.client = self._create_client()
         self.model = self.settings.openai_model
         
+        # Controle de concorrência
+        self._semaphore = asyncio.Semaphore(self.settings.openai_max_concurrency)
+        self._in_flight = 0
+        self._waiting = 0
+        self._shed = 0
+        self._timeouts = 0
+        
+        # Requisições idênticas em andamento (single-flight)
+        self._pending: Dict[str, asyncio.Task] = {}
+        self._pending_streams: Dict[str, asyncio.Task] = {}
+        self._coalesced = 0
+        
+        # Cache de respostas
+        self.cache: Optional[AIResponseCache] = None
+        if self.settings.ai_cache_enabled:
+            self.cache = AIResponseCache(
+                max_entries=self.settings.ai_cache_max_entries,
+                ttl_seconds=self.settings.ai_cache_ttl_seconds,
+                path=self.settings.ai_cache_path
+            )
+        
+    def _create_client(self):
+        """Cria o cliente da OpenAI ou o modelo local de testes"""
+        if self.settings.openai_backend == "fake":
+            logger.info("Usando modelo de IA local (fake)")
+            return FakeAsyncOpenAI(
+                latency=self.settings.openai_fake_latency,
+                token_delay=self.settings.openai_fake_token_delay
+            )
+        return openai.AsyncOpenAI(
+            api_key=self.settings.openai_api_key,
+            timeout=self.settings.openai_timeout
+        )
+        
+    def get_metrics(self) -> Dict[str, Any]:
+        """Retorna métricas de concorrência das completions"""
+        return {
+            "max_concurrency": self.settings.openai_max_concurrency,
+            "max_queue": self.settings.openai_max_queue,
+            "in_flight": self._in_flight,
+            "waiting": self._waiting,
+            "shed": self._shed,
+            "timeouts": self._timeouts,
+            "pending_prompts": len(self._pending),
+            "pending_streams": len(self._pending_streams),
+            "coalesced": self._coalesced,
+            "cache": self.cache.metrics() if self.cache else None
+        }
+    
+    def _cache_key(self, endpoint: str, recipe_data: Dict[str, Any], **extra: Any) -> Optional[str]:
+        """Gera a chave de cache da operação, ou None se o cache estiver desativado"""
+        if self.cache is None:
+            return None
+        return self.cache.make_key(
+            endpoint, self.model, self.settings.openai_temperature, recipe_data, **extra
+        )
+    
+    async def _cache_get(self, key: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Busca uma resposta em cache"""
+        if key is None:
+            return None
+        return await self.cache.get(key)
+    
+    async def _cache_set(self, key: Optional[str], result: Dict[str, Any]):
+        """Armazena uma resposta em cache"""
+        if key is not None:
+            await self.cache.set(key, result)
+        
     async def analyze_recipe(self, recipe_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Analisa uma receita e fornece insights e sugestões
@@ -26,17 +110,21 @@ class AIService:
             Análise da receita com insights e sugestões
         """
         try:
+            cache_key = self._cache_key("analyze_recipe", recipe_data)
+            cached = await self._cache_get(cache_key)
+            if cached is not None:
+                return cached
+            
             prompt = self._create_recipe_analysis_prompt(recipe_data)
             
             response = await self._get_completion(prompt)
             
-            return {
-                "analysis": response,
-                "suggestions": self._extract_suggestions(response),
-                "quality_score": self._calculate_quality_score(recipe_data),
-                "potential_issues": self._identify_potential_issues(recipe_data)
-            }
+            result = self._build_analysis_result(recipe_data, response)
+            await self._cache_set(cache_key, result)
+            return result
             
+        except (AIServiceOverloadedError, asyncio.TimeoutError):
+            raise
         except Exception as e:
             logger.error(f"Erro ao analisar receita: {e}")
             return {"error": "Erro ao analisar receita"}
@@ -53,16 +141,21 @@ class AIService:
             Receita otimizada
         """
         try:
+            cache_key = self._cache_key("optimize_recipe", recipe_data, target_style=target_style)
+            cached = await self._cache_get(cache_key)
+            if cached is not None:
+                return cached
+            
             prompt = self._create_optimization_prompt(recipe_data, target_style)
             
             response = await self._get_completion(prompt)
             
-            return {
-                "optimized_recipe": response,
-                "changes_made": self._extract_changes(recipe_data, response),
-                "expected_improvements": self._predict_improvements(response)
-            }
+            result = self._build_optimization_result(recipe_data, response)
+            await self._cache_set(cache_key, result)
+            return result
             
+        except (AIServiceOverloadedError, asyncio.TimeoutError):
+            raise
         except Exception as e:
             logger.error(f"Erro ao otimizar receita: {e}")
             return {"error": "Erro ao otimizar receita"}
@@ -72,8 +165,14 @@ class AIService:
         """
         Prediz o comportamento da fermentação
         
+        Os números (FG, tempo e ABV, com intervalos de 95%) vêm do ajuste local
+        da curva de atenuação. Com leituras suficientes em
+        recipe_data["leituras_densidade"] o resultado local é devolvido sem
+        chamar o LLM; caso contrário o LLM comenta a estimativa.
+        
         Args:
-            recipe_data: Dados da receita
+            recipe_data: Dados da receita (opcionalmente com "leituras_densidade":
+                lista de {"dias", "densidade"} desde o início da fermentação)
             initial_gravity: Densidade inicial
             temperature: Temperatura de fermentação
             
@@ -81,19 +180,30 @@ class AIService:
             Previsões de fermentação
         """
         try:
+            forecast = self._forecast_fermentation(recipe_data, initial_gravity, temperature)
+            if forecast["confiavel"]:
+                return self._build_fermentation_result(forecast)
+            
+            cache_key = self._cache_key(
+                "predict_fermentation", recipe_data,
+                initial_gravity=initial_gravity, fermentation_temperature=temperature
+            )
+            cached = await self._cache_get(cache_key)
+            if cached is not None:
+                return cached
+            
             prompt = self._create_fermentation_prediction_prompt(
-                recipe_data, initial_gravity, temperature
+                recipe_data, initial_gravity, temperature, forecast
             )
             
             response = await self._get_completion(prompt)
             
-            return {
-                "prediction": response,
-                "estimated_final_gravity": self._extract_final_gravity(response),
-                "fermentation_time": self._extract_fermentation_time(response),
-                "abv_estimate": self._calculate_abv_estimate(initial_gravity, response)
-            }
+            result = self._build_fermentation_result(forecast, response)
+            await self._cache_set(cache_key, result)
+            return result
             
+        except (AIServiceOverloadedError, asyncio.TimeoutError):
+            raise
         except Exception as e:
             logger.error(f"Erro ao prever fermentação: {e}")
             return {"error": "Erro ao prever fermentação"}
@@ -115,28 +225,284 @@ class AIService:
             
             return self._extract_suggestions(response)
             
+        except (AIServiceOverloadedError, asyncio.TimeoutError):
+            raise
         except Exception as e:
             logger.error(f"Erro ao gerar sugestões: {e}")
             return ["Erro ao gerar sugestões"]
     
+    # Variantes em streaming
+    def stream_analyze_recipe(self, recipe_data: Dict[str, Any]) -> AsyncIterator[StreamEvent]:
+        """Versão em streaming de analyze_recipe"""
+        return self._stream_operation(
+            self._cache_key("analyze_recipe", recipe_data),
+            self._create_recipe_analysis_prompt(recipe_data),
+            lambda response: self._build_analysis_result(recipe_data, response)
+        )
+    
+    def stream_optimize_recipe(self, recipe_data: Dict[str, Any], target_style: str) -> AsyncIterator[StreamEvent]:
+        """Versão em streaming de optimize_recipe"""
+        return self._stream_operation(
+            self._cache_key("optimize_recipe", recipe_data, target_style=target_style),
+            self._create_optimization_prompt(recipe_data, target_style),
+            lambda response: self._build_optimization_result(recipe_data, response)
+        )
+    
+    def stream_predict_fermentation(self, recipe_data: Dict[str, Any],
+                                    initial_gravity: float, temperature: float) -> AsyncIterator[StreamEvent]:
+        """Versão em streaming de predict_fermentation"""
+        forecast = self._forecast_fermentation(recipe_data, initial_gravity, temperature)
+        if forecast["confiavel"]:
+            return self._single_result(self._build_fermentation_result(forecast))
+        return self._stream_operation(
+            self._cache_key(
+                "predict_fermentation", recipe_data,
+                initial_gravity=initial_gravity, fermentation_temperature=temperature
+            ),
+            self._create_fermentation_prediction_prompt(recipe_data, initial_gravity, temperature, forecast),
+            lambda response: self._build_fermentation_result(forecast, response)
+        )
+    
+    def stream_suggest_improvements(self, production_data: Dict[str, Any]) -> AsyncIterator[StreamEvent]:
+        """Versão em streaming de suggest_improvements"""
+        return self._stream_operation(
+            None,
+            self._create_improvement_prompt(production_data),
+            lambda response: {"suggestions": self._extract_suggestions(response)}
+        )
+    
+    async def _single_result(self, result: Dict[str, Any]) -> AsyncIterator[StreamEvent]:
+        """Stream de um resultado já pronto, sem tokens"""
+        yield ("result", result)
+    
+    async def _stream_operation(self, cache_key: Optional[str], prompt: str,
+                                build_result: Callable[[str], Dict[str, Any]]) -> AsyncIterator[StreamEvent]:
+        """
+        Emite os tokens da completion conforme chegam e o resultado estruturado no final
+        
+        Respostas em cache são entregues direto no evento final. Requisições
+        idênticas a um stream em andamento não abrem outra completion: aguardam
+        o resultado do primeiro e o recebem como evento final, sem tokens.
+        """
+        cached = await self._cache_get(cache_key)
+        if cached is not None:
+            yield ("result", cached)
+            return
+        
+        key = cache_key if cache_key is not None else self._prompt_key(prompt)
+        task = self._pending_streams.get(key)
+        if task is not None:
+            self._coalesced += 1
+            yield ("result", await asyncio.shield(task))
+            return
+        
+        tokens: asyncio.Queue = asyncio.Queue()
+        task = asyncio.ensure_future(self._produce_stream(prompt, build_result, cache_key, tokens))
+        self._pending_streams[key] = task
+        task.add_done_callback(lambda t: self._release_pending(self._pending_streams, key, t))
+        
+        while True:
+            token = await tokens.get()
+            if token is None:
+                break
+            yield ("token", token)
+        # shield: se este cliente desconectar, a completion continua para os demais
+        yield ("result", await asyncio.shield(task))
+    
+    async def _produce_stream(self, prompt: str, build_result: Callable[[str], Dict[str, Any]],
+                              cache_key: Optional[str], tokens: asyncio.Queue) -> Dict[str, Any]:
+        """Consome a completion em streaming, repassando os tokens; None marca o fim"""
+        parts = []
+        try:
+            async for token in self._stream_completion(prompt):
+                parts.append(token)
+                tokens.put_nowait(token)
+        finally:
+            tokens.put_nowait(None)
+        
+        result = build_result("".join(parts))
+        await self._cache_set(cache_key, result)
+        return result
+    
+    def _build_analysis_result(self, recipe_data: Dict[str, Any], response: str) -> Dict[str, Any]:
+        """Monta o resultado estruturado da análise"""
+        return {
+            "analysis": response,
+            "suggestions": self._extract_suggestions(response),
+            "quality_score": self._calculate_quality_score(recipe_data),
+            "potential_issues": self._identify_potential_issues(recipe_data)
+        }
+    
+    def _build_optimization_result(self, recipe_data: Dict[str, Any], response: str) -> Dict[str, Any]:
+        """Monta o resultado estruturado da otimização"""
+        return {
+            "optimized_recipe": response,
+            "changes_made": self._extract_changes(recipe_data, response),
+            "expected_improvements": self._predict_improvements(response)
+        }
+    
+    def _forecast_fermentation(self, recipe_data: Dict[str, Any],
+                               initial_gravity: float, temperature: float) -> Dict[str, Any]:
+        """Previsão numérica local (util/curva_fermentacao.py), em milissegundos"""
+        readings = sorted(
+            (float(leitura["dias"]), float(leitura["densidade"]))
+            for leitura in recipe_data.get("leituras_densidade") or []
+        )
+        return prever_fermentacao(
+            [dias * 86400 for dias, _ in readings], [densidade for _, densidade in readings],
+            og=initial_gravity,
+            # Temperatura constante: o tempo térmico é o do relógio escalado pelo fator de temperatura
+            tempos_temperatura=[0.0], temperaturas=[temperature],
+            fg_esperado=recipe_data.get("fg"),
+            dias_esperados=recipe_data.get("tempo_fermentacao")
+        )
+    
+    def _build_fermentation_result(self, forecast: Dict[str, Any],
+                                   response: Optional[str] = None) -> Dict[str, Any]:
+        """Monta o resultado estruturado da previsão de fermentação"""
+        return {
+            "prediction": response if response is not None else self._describe_forecast(forecast),
+            "estimated_final_gravity": round(forecast["fg"], 4),
+            "fermentation_time": math.ceil(forecast["dias_ate_terminal"]),
+            "abv_estimate": round(forecast["abv"], 2),
+            "confidence_intervals": {
+                "final_gravity": [round(valor, 4) for valor in forecast["fg_intervalo"]],
+                "fermentation_time": [round(valor, 1) for valor in forecast["dias_ate_terminal_intervalo"]],
+                "abv": [round(valor, 2) for valor in forecast["abv_intervalo"]]
+            },
+            "model": forecast["metodo"],
+            "source": "ai" if response is not None else "local"
+        }
+    
+    def _describe_forecast(self, forecast: Dict[str, Any]) -> str:
+        """Resumo em texto da previsão local"""
+        fg_min, fg_max = forecast["fg_intervalo"]
+        dias_min, dias_max = forecast["dias_ate_terminal_intervalo"]
+        return (
+            f"Curva {forecast['metodo']} ajustada a {forecast['leituras']} leituras: "
+            f"FG {forecast['fg']:.3f} ({fg_min:.3f}–{fg_max:.3f}), densidade terminal em "
+            f"{forecast['dias_ate_terminal']:.1f} dias ({dias_min:.1f}–{dias_max:.1f}), "
+            f"ABV {forecast['abv']:.1f}%."
+        )
+    
+    def _prompt_key(self, prompt: str) -> str:
+        """Hash que identifica uma completion idêntica"""
+        raw = f"{self.model}|{self.settings.openai_temperature}|{self.settings.openai_max_tokens}|{prompt}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+    
+    def _build_messages(self, prompt: str) -> List[Dict[str, str]]:
+        """Monta as mensagens enviadas ao modelo"""
+        return [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ]
+    
     async def _get_completion(self, prompt: str) -> str:
-        """Obtém resposta da OpenAI"""
+        """
+        Obtém resposta da OpenAI
+        
+        Chamadas concorrentes com o mesmo prompt aguardam uma única
+        requisição compartilhada em vez de disparar completions duplicadas.
+        """
+        key = self._prompt_key(prompt)
+        
+        task = self._pending.get(key)
+        if task is not None:
+            self._coalesced += 1
+        else:
+            task = asyncio.ensure_future(self._request_completion(prompt))
+            self._pending[key] = task
+            task.add_done_callback(lambda t: self._release_pending(self._pending, key, t))
+        
+        # shield: o cancelamento de um cliente não cancela os demais
+        return await asyncio.shield(task)
+    
+    def _release_pending(self, pending: Dict[str, asyncio.Task], key: str, task: asyncio.Task):
+        """Remove a requisição compartilhada ao terminar"""
+        if pending.get(key) is task:
+            del pending[key]
+        if not task.cancelled():
+            task.exception()  # evita aviso de exceção não recuperada
+    
+    async def _acquire_slot(self):
+        """Aguarda uma vaga de completion ou rejeita se a fila estiver cheia"""
+        if self._semaphore.locked() and self._waiting >= self.settings.openai_max_queue:
+            self._shed += 1
+            logger.warning("Fila de completions cheia, rejeitando requisição")
+            raise AIServiceOverloadedError("Serviço de IA sobrecarregado")
+        
+        self._waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self._waiting -= 1
+        self._in_flight += 1
+    
+    def _release_slot(self):
+        """Libera a vaga de completion"""
+        self._in_flight -= 1
+        self._semaphore.release()
+    
+    async def _request_completion(self, prompt: str) -> str:
+        """Obtém resposta da OpenAI respeitando o limite de concorrência"""
+        await self._acquire_slot()
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "Você é um especialista em brassagem artesanal com vasto conhecimento em cerveja, hidromel e vinho."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=self.settings.openai_max_tokens,
-                temperature=self.settings.openai_temperature
+            response = await asyncio.wait_for(
+                self.client.chat.completions.create(
+                    model=self.model,
+                    messages=self._build_messages(prompt),
+                    max_tokens=self.settings.openai_max_tokens,
+                    temperature=self.settings.openai_temperature
+                ),
+                timeout=self.settings.openai_timeout
             )
             
             return response.choices[0].message.content
             
+        except asyncio.TimeoutError:
+            self._timeouts += 1
+            logger.error(f"Timeout de {self.settings.openai_timeout}s na chamada à OpenAI")
+            raise
         except Exception as e:
             logger.error(f"Erro na comunicação com OpenAI: {e}")
             raise
+        finally:
+            self._release_slot()
+    
+    async def _stream_completion(self, prompt: str) -> AsyncIterator[str]:
+        """Emite os tokens da OpenAI conforme são gerados"""
+        await self._acquire_slot()
+        try:
+            stream = await asyncio.wait_for(
+                self.client.chat.completions.create(
+                    model=self.model,
+                    messages=self._build_messages(prompt),
+                    max_tokens=self.settings.openai_max_tokens,
+                    temperature=self.settings.openai_temperature,
+                    stream=True
+                ),
+                timeout=self.settings.openai_timeout
+            )
+            
+            # O timeout vale para cada chunk: um stream que para no meio não prende a vaga
+            chunks = stream.__aiter__()
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(chunks.__anext__(), timeout=self.settings.openai_timeout)
+                except StopAsyncIteration:
+                    break
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+                    
+        except asyncio.TimeoutError:
+            self._timeouts += 1
+            logger.error(f"Timeout de {self.settings.openai_timeout}s no streaming da OpenAI")
+            raise
+        except Exception as e:
+            logger.error(f"Erro no streaming da OpenAI: {e}")
+            raise
+        finally:
+            self._release_slot()
     
     def _create_recipe_analysis_prompt(self, recipe_data: Dict[str, Any]) -> str:
         """Cria prompt para análise de receita"""
@@ -172,7 +538,8 @@ class AIService:
         """
     
     def _create_fermentation_prediction_prompt(self, recipe_data: Dict[str, Any], 
-                                             initial_gravity: float, temperature: float) -> str:
+                                             initial_gravity: float, temperature: float,
+                                             forecast: Dict[str, Any]) -> str:
         """Cria prompt para previsão de fermentação"""
         return f"""
         Prediga o comportamento da fermentação:
@@ -180,6 +547,7 @@ class AIService:
         Receita: {recipe_data}
         Densidade inicial: {initial_gravity}
         Temperatura: {temperature}°C
+        Estimativa numérica: FG {forecast['fg']:.3f}, {forecast['dias_ate_terminal']:.0f} dias, ABV {forecast['abv']:.1f}%
         
         Forneça:
         1. Densidade final esperada
@@ -252,23 +620,6 @@ class AIService:
     def _predict_improvements(self, optimized_recipe: str) -> List[str]:
         """Prediz melhorias esperadas"""
         return ["Melhorias esperadas na receita otimizada"]
-    
-    def _extract_final_gravity(self, response: str) -> float:
-        """Extrai densidade final da resposta"""
-        # Implementação básica
-        return 1.010  # Valor padrão
-    
-    def _extract_fermentation_time(self, response: str) -> int:
-        """Extrai tempo de fermentação da resposta"""
-        # Implementação básica
-        return 14  # Dias padrão
-    
-    def _calculate_abv_estimate(self, initial_gravity: float, response: str) -> float:
-        """Calcula estimativa de ABV"""
-        # Fórmula básica de ABV
-        final_gravity = self._extract_final_gravity(response)
-        abv = (initial_gravity - final_gravity) * 131.25
-        return round(abv, 2)
 
 
 # Instância global do serviço
@@ -0,0 +1,157 @@
+"""
+Caches de autenticação: chaves públicas do Firebase e tokens já verificados
+"""
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Dict, Optional
+import requests
+from loguru import logger
+
+
+class PublicKeyCache:
+    """Conjunto de certificados públicos do Firebase Auth mantido em memória"""
+
+    def __init__(self, url: str, refresh_margin: float = 300, default_max_age: float = 3600,
+                 min_refresh_interval: float = 60):
+        self.url = url
+        self.refresh_margin = refresh_margin  # renova antes de expirar
+        self.default_max_age = default_max_age
+        self.min_refresh_interval = min_refresh_interval  # evita rajadas de downloads por kid desconhecido
+        self._certs: Dict[str, str] = {}
+        self._expires_at = 0.0
+        self._fetched_at = 0.0
+        self._lock = threading.Lock()
+        self._refreshing = False
+        self.refreshes = 0
+
+    def get(self) -> Dict[str, str]:
+        """
+        Retorna os certificados atuais
+
+        Só bloqueia quando não há nenhum certificado válido; perto do
+        vencimento a renovação ocorre em segundo plano.
+        """
+        now = time.time()
+        if not self._certs or now >= self._expires_at:
+            return self.refresh()
+        if now >= self._expires_at - self.refresh_margin:
+            self.prefetch()
+        return self._certs
+
+    def get_for_kid(self, kid: str) -> Dict[str, str]:
+        """Retorna os certificados, renovando se a chave foi rotacionada"""
+        certs = self.get()
+        if kid not in certs and time.time() - self._fetched_at >= self.min_refresh_interval:
+            certs = self.refresh()
+        return certs
+
+    def refresh(self) -> Dict[str, str]:
+        """Baixa os certificados respeitando o Cache-Control da resposta"""
+        with self._lock:
+            response = requests.get(self.url, timeout=10)
+            response.raise_for_status()
+            self._certs = response.json()
+            self._fetched_at = time.time()
+            self._expires_at = self._fetched_at + self._parse_max_age(response.headers.get("Cache-Control", ""))
+            self.refreshes += 1
+            return self._certs
+
+    def prefetch(self):
+        """Renova os certificados em uma thread de segundo plano"""
+        if self._refreshing:
+            return
+        self._refreshing = True
+
+        def _run():
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.warning(f"Falha ao pré-carregar chaves públicas do Firebase: {e}")
+            finally:
+                self._refreshing = False
+
+        threading.Thread(target=_run, name="firebase-certs", daemon=True).start()
+
+    def _parse_max_age(self, cache_control: str) -> float:
+        """Extrai o max-age do header Cache-Control"""
+        match = re.search(r"max-age=(\d+)", cache_control)
+        return float(match.group(1)) if match else self.default_max_age
+
+
+class VerifiedTokenCache:
+    """Cache LRU de tokens decodificados, válido até o claim exp de cada token"""
+
+    def __init__(self, max_entries: int = 10000, latency_window: int = 1000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._latencies: deque = deque(maxlen=latency_window)
+
+        # Métricas
+        self.hits = 0
+        self.misses = 0
+        self.failures = 0
+
+    @staticmethod
+    def _key(token: str) -> str:
+        """O token bruto nunca fica em memória como chave"""
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        """Retorna os dados do usuário se o token já foi verificado e não expirou"""
+        key = self._key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, user_data = entry
+                if expires_at > time.time():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return dict(user_data)
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, token: str, user_data: Dict[str, Any], expires_at: float):
+        """Armazena um token verificado até seu vencimento"""
+        if expires_at <= time.time():
+            return
+        key = self._key(token)
+        with self._lock:
+            self._entries[key] = (expires_at, dict(user_data))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def record_latency(self, seconds: float, failed: bool = False):
+        """Registra a latência de uma autenticação"""
+        self._latencies.append(seconds)
+        if failed:
+            self.failures += 1
+
+    def metrics(self) -> Dict[str, Any]:
+        """Retorna acertos do cache e percentis de latência da autenticação"""
+        samples = sorted(self._latencies)
+
+        def percentile(p: float) -> float:
+            if not samples:
+                return 0.0
+            index = min(len(samples) - 1, int(p * len(samples)))
+            return samples[index] * 1000
+
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "failures": self.failures,
+            "hit_ratio": self.hits / total if total else 0.0,
+            "latency_p50_ms": percentile(0.50),
+            "latency_p95_ms": percentile(0.95),
+            "latency_p99_ms": percentile(0.99),
+            "latency_max_ms": samples[-1] * 1000 if samples else 0.0
+        }
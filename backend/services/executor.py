@@ -0,0 +1,100 @@
+"""
+Executor limitado para chamadas bloqueantes do Bebrew
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, TypeVar
+
+T = TypeVar("T")
+
+
+class BoundedExecutor:
+    """Pool de threads com métricas de fila para tirar I/O bloqueante do event loop"""
+
+    def __init__(self, max_workers: int, name: str = "bebrew"):
+        self.name = name
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+
+        # Métricas
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+        self._failed = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self._total_exec = 0.0
+
+    async def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        Executa uma função bloqueante no pool sem travar o event loop
+
+        Args:
+            func: Função bloqueante
+            *args, **kwargs: Argumentos repassados para a função
+
+        Returns:
+            Resultado da função
+        """
+        submitted = time.perf_counter()
+
+        def _call() -> T:
+            started = time.perf_counter()
+            wait = started - submitted
+            with self._lock:
+                self._queued -= 1
+                self._running += 1
+                self._total_wait += wait
+                self._max_wait = max(self._max_wait, wait)
+
+            failed = False
+            try:
+                return func(*args, **kwargs)
+            except BaseException:
+                failed = True
+                raise
+            finally:
+                elapsed = time.perf_counter() - started
+                with self._lock:
+                    self._running -= 1
+                    self._completed += 1
+                    self._total_exec += elapsed
+                    if failed:
+                        self._failed += 1
+
+        with self._lock:
+            self._queued += 1
+
+        future = self._executor.submit(_call)
+        future.add_done_callback(self._on_done)
+        return await asyncio.wrap_future(future)
+
+    def _on_done(self, future: Future):
+        """Corrige a fila quando uma tarefa é cancelada antes de rodar"""
+        if future.cancelled():
+            with self._lock:
+                self._queued -= 1
+
+    def metrics(self) -> Dict[str, Any]:
+        """Retorna profundidade da fila e tempos de espera/execução"""
+        with self._lock:
+            completed = self._completed
+            return {
+                "name": self.name,
+                "max_workers": self.max_workers,
+                "queue_depth": self._queued,
+                "running": self._running,
+                "completed": completed,
+                "failed": self._failed,
+                "saturation": self._running / self.max_workers,
+                "wait_time_avg_ms": (self._total_wait / completed * 1000) if completed else 0.0,
+                "wait_time_max_ms": self._max_wait * 1000,
+                "exec_time_avg_ms": (self._total_exec / completed * 1000) if completed else 0.0
+            }
+
+    def shutdown(self, wait: bool = True):
+        """Encerra o pool de threads"""
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,74 @@
+"""
+Modelo local que imita o cliente assíncrono da OpenAI
+
+Usado em testes e benchmarks para exercitar as rotas de IA sem rede e sem
+custo de tokens. Selecionado com OPENAI_BACKEND=fake.
+"""
+import asyncio
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Dict, List
+
+
+FAKE_RESPONSE = (
+    "Análise da receita: os ingredientes estão bem balanceados para o estilo proposto.\n"
+    "1. Recomendo ajustar a temperatura de mostura para 66°C para um corpo médio.\n"
+    "2. Considere adicionar lúpulo de aroma no whirlpool para realçar o perfil frutado.\n"
+    "3. Sugestão: controle a fermentação entre 18°C e 20°C para evitar ésteres indesejados.\n"
+    "Densidade final esperada em torno de 1.010 após 14 dias de fermentação."
+)
+
+
+def _tokenize(text: str) -> List[str]:
+    """Divide o texto em tokens preservando os espaços"""
+    words = text.split(" ")
+    return [word if i == 0 else f" {word}" for i, word in enumerate(words)]
+
+
+class _FakeStream:
+    """Iterador assíncrono de chunks no formato de streaming da OpenAI"""
+
+    def __init__(self, tokens: List[str], token_delay: float):
+        self._tokens = tokens
+        self._token_delay = token_delay
+
+    def __aiter__(self) -> AsyncIterator[Any]:
+        return self._iterate()
+
+    async def _iterate(self) -> AsyncIterator[Any]:
+        for token in self._tokens:
+            if self._token_delay:
+                await asyncio.sleep(self._token_delay)
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=token))])
+
+
+class _FakeCompletions:
+    """Equivalente a client.chat.completions"""
+
+    def __init__(self, owner: "FakeAsyncOpenAI"):
+        self._owner = owner
+
+    async def create(self, model: str, messages: List[Dict[str, str]], stream: bool = False, **kwargs: Any):
+        owner = self._owner
+        owner.calls += 1
+        if owner.latency:
+            await asyncio.sleep(owner.latency)
+
+        if stream:
+            return _FakeStream(_tokenize(owner.response), owner.token_delay)
+
+        if owner.token_delay:
+            await asyncio.sleep(owner.token_delay * len(_tokenize(owner.response)))
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=owner.response))]
+        )
+
+
+class FakeAsyncOpenAI:
+    """Cliente falso com latência artificial configurável"""
+
+    def __init__(self, latency: float = 0.0, token_delay: float = 0.0, response: str = FAKE_RESPONSE):
+        self.latency = latency  # espera antes do primeiro token
+        self.token_delay = token_delay  # espera entre tokens
+        self.response = response
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=_FakeCompletions(self))
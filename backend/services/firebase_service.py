@@ -1,11 +1,41 @@
 """
 Serviço do Firebase para Bebrew
 """
+import base64
+import json
+import os
+import time
+from datetime import datetime
 import firebase_admin
 from firebase_admin import credentials, firestore, auth
-from typing import Dict, List, Optional, Any
+from google.auth import jwt
+from typing import Dict, List, Optional, Any, Tuple
 from loguru import logger
 from ..config.settings import get_settings
+from .executor import BoundedExecutor
+from .auth_cache import PublicKeyCache, VerifiedTokenCache
+from .local_firestore import LocalAuth, LocalFirestoreClient
+
+
+ID_TOKEN_ISSUER_PREFIX = "https://securetoken.google.com/"
+
+# Máximo de operações por WriteBatch no Firestore
+FIRESTORE_BATCH_LIMIT = 500
+
+STORAGE_BACKENDS = ("firestore", "memory", "sqlite")
+
+REQUIRED_FIREBASE_SETTINGS = (
+    "firebase_project_id",
+    "firebase_private_key_id",
+    "firebase_private_key",
+    "firebase_client_email",
+    "firebase_client_id",
+    "firebase_client_x509_cert_url",
+)
+
+
+class InvalidCursorError(ValueError):
+    """Cursor de paginação malformado ou incompatível com a listagem"""
 
 
 class FirebaseService:
@@ -13,12 +43,34 @@ class FirebaseService:
     
     def __init__(self):
         self.settings = get_settings()
-        self._initialize_firebase()
-        self.db = firestore.client()
+        self.executor = BoundedExecutor(self.settings.firestore_max_workers, name="firestore")
+        self.token_cache = VerifiedTokenCache(self.settings.auth_token_cache_size)
+        self.public_keys = PublicKeyCache(self.settings.firebase_token_certs_url)
+        self.backend = self.settings.storage_backend
+        
+        if self.backend == "firestore":
+            self._initialize_firebase()
+            self.db = firestore.client()
+            self.auth = auth
+            self.public_keys.prefetch()
+        elif self.backend in STORAGE_BACKENDS:
+            if self.settings.environment == "production":
+                # LocalAuth aceita o uid como token, sem assinatura: nunca em produção
+                raise ValueError(f"STORAGE_BACKEND={self.backend} não é permitido com ENVIRONMENT=production")
+            path = self.settings.local_storage_path if self.backend == "sqlite" else None
+            self.db = LocalFirestoreClient(path, latency=self.settings.local_storage_latency)
+            self.auth = LocalAuth(self.db)
+            logger.warning(f"Usando armazenamento local ({self.backend}); autenticação sem verificação de assinatura")
+        else:
+            raise ValueError(f"STORAGE_BACKEND inválido: {self.backend} (use {', '.join(STORAGE_BACKENDS)})")
         
     def _initialize_firebase(self):
         """Inicializa o Firebase Admin SDK"""
         try:
+            missing = [name.upper() for name in REQUIRED_FIREBASE_SETTINGS if not getattr(self.settings, name)]
+            if missing:
+                raise ValueError(f"Configurações do Firebase ausentes: {', '.join(missing)}")
+            
             # Configuração das credenciais
             cred = credentials.Certificate({
                 "type": "service_account",
@@ -43,6 +95,100 @@ class FirebaseService:
             logger.error(f"Erro ao inicializar Firebase: {e}")
             raise
     
+    async def _run(self, func, *args, **kwargs):
+        """Executa uma chamada bloqueante do Firebase no pool de threads"""
+        return await self.executor.run(func, *args, **kwargs)
+    
+    @staticmethod
+    def _encode_cursor(values: List[Any]) -> str:
+        """Serializa os valores de ordenação do último documento de uma página"""
+        encoded = [{'$dt': v.isoformat()} if isinstance(v, datetime) else v for v in values]
+        raw = json.dumps(encoded, separators=(',', ':'), default=str)
+        return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+    
+    @staticmethod
+    def _decode_cursor(cursor: str, size: int) -> List[Any]:
+        """Reconstrói os valores de ordenação a partir de um cursor"""
+        try:
+            raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            values = json.loads(raw)
+            if not isinstance(values, list) or len(values) != size:
+                raise ValueError("tamanho incompatível")
+            return [
+                datetime.fromisoformat(v['$dt']) if isinstance(v, dict) and '$dt' in v else v
+                for v in values
+            ]
+        except (ValueError, TypeError) as e:
+            raise InvalidCursorError(f"Cursor inválido: {e}")
+    
+    def _fetch_page(self, collection_ref, order_field: Optional[str] = None,
+                    limit: Optional[int] = None, cursor: Optional[str] = None,
+                    fields: Optional[List[str]] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Executa uma listagem paginada e projetada no Firestore
+        
+        Args:
+            collection_ref: Coleção consultada
+            order_field: Campo de ordenação decrescente (None ordena pelo ID do documento)
+            limit: Máximo de documentos na página (None traz todos)
+            cursor: Cursor retornado pela página anterior
+            fields: Campos a retornar (None retorna o documento inteiro)
+            
+        Returns:
+            Documentos da página e cursor da próxima página (None se for a última)
+        """
+        direction = firestore.Query.DESCENDING if order_field else firestore.Query.ASCENDING
+        order_keys = [order_field] if order_field else []
+        
+        query = collection_ref
+        if order_field:
+            query = query.order_by(order_field, direction=direction)
+        query = query.order_by('__name__', direction=direction)
+        
+        requested = None
+        if fields is not None:
+            requested = [field for field in dict.fromkeys(fields) if field != 'id']
+            # Os campos de ordenação são necessários para montar o próximo cursor
+            projection = list(dict.fromkeys(requested + order_keys)) or ['__name__']
+            query = query.select(projection)
+        
+        if cursor:
+            values = self._decode_cursor(cursor, len(order_keys) + 1)
+            query = query.start_after(dict(zip(order_keys + ['__name__'], values)))
+        
+        if limit:
+            # Um documento extra indica se existe próxima página
+            query = query.limit(limit + 1)
+        
+        documents = []
+        last_values = None
+        has_more = False
+        for doc in query.stream():
+            if limit and len(documents) == limit:
+                has_more = True
+                break
+            data = doc.to_dict() or {}
+            last_values = [data.get(key) for key in order_keys] + [doc.id]
+            if requested is not None:
+                for key in order_keys:
+                    if key not in requested:
+                        data.pop(key, None)
+            data['id'] = doc.id
+            documents.append(data)
+        
+        next_cursor = self._encode_cursor(last_values) if has_more else None
+        return documents, next_cursor
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """Retorna métricas de saturação do pool do Firestore"""
+        return self.executor.metrics()
+    
+    def get_auth_metrics(self) -> Dict[str, Any]:
+        """Retorna métricas de latência e cache da autenticação"""
+        metrics = self.token_cache.metrics()
+        metrics["public_key_refreshes"] = self.public_keys.refreshes
+        return metrics
+    
     # Métodos de Autenticação
     async def create_user(self, email: str, password: str, display_name: str = None) -> Dict[str, Any]:
         """
@@ -66,7 +212,7 @@ class FirebaseService:
             if display_name:
                 user_properties['display_name'] = display_name
             
-            user = auth.create_user(**user_properties)
+            user = await self._run(self.auth.create_user, **user_properties)
             
             # Cria documento do usuário no Firestore
             await self._create_user_document(user.uid, {
@@ -101,18 +247,56 @@ class FirebaseService:
         Returns:
             Dados do usuário autenticado
         """
+        started = time.perf_counter()
+        
+        cached = self.token_cache.get(id_token)
+        if cached is not None:
+            self.token_cache.record_latency(time.perf_counter() - started)
+            return cached
+        
         try:
-            decoded_token = auth.verify_id_token(id_token)
-            return {
+            decoded_token = await self._run(self._decode_id_token, id_token)
+            user_data = {
                 'uid': decoded_token['uid'],
                 'email': decoded_token.get('email'),
                 'email_verified': decoded_token.get('email_verified', False)
             }
+            self.token_cache.put(id_token, user_data, decoded_token['exp'])
+            self.token_cache.record_latency(time.perf_counter() - started)
+            return user_data
             
         except Exception as e:
+            self.token_cache.record_latency(time.perf_counter() - started, failed=True)
             logger.error(f"Erro ao verificar token: {e}")
             raise
     
+    def _decode_id_token(self, id_token: str) -> Dict[str, Any]:
+        """
+        Verifica a assinatura e os claims de um ID token do Firebase
+        
+        Usa o conjunto de chaves públicas em cache, aplicando as mesmas
+        validações de auth.verify_id_token sem buscar certificados a cada chamada.
+        """
+        if self.backend != "firestore" or os.environ.get('FIREBASE_AUTH_EMULATOR_HOST'):
+            return self.auth.verify_id_token(id_token)
+        
+        header = jwt.decode_header(id_token)
+        if header.get('alg') != 'RS256' or not header.get('kid'):
+            raise ValueError("Token com cabeçalho inválido")
+        
+        certs = self.public_keys.get_for_kid(header['kid'])
+        claims = jwt.decode(id_token, certs=certs, audience=self.settings.firebase_project_id)
+        
+        if claims.get('iss') != ID_TOKEN_ISSUER_PREFIX + self.settings.firebase_project_id:
+            raise ValueError("Token com emissor inválido")
+        
+        subject = claims.get('sub')
+        if not isinstance(subject, str) or not subject or len(subject) > 128:
+            raise ValueError("Token com subject inválido")
+        
+        claims['uid'] = subject
+        return claims
+    
     # Métodos de Receitas
     async def save_recipe(self, user_id: str, recipe_data: Dict[str, Any]) -> str:
         """
@@ -133,7 +317,7 @@ class FirebaseService:
             recipe_data['updated_at'] = firestore.SERVER_TIMESTAMP
             recipe_data['user_id'] = user_id
             
-            doc_ref = recipe_ref.add(recipe_data)[1]
+            doc_ref = (await self._run(recipe_ref.add, recipe_data))[1]
             
             logger.info(f"Receita salva com ID: {doc_ref.id}")
             return doc_ref.id
@@ -142,32 +326,55 @@ class FirebaseService:
             logger.error(f"Erro ao salvar receita: {e}")
             raise
     
-    async def get_user_recipes(self, user_id: str) -> List[Dict[str, Any]]:
+    async def get_user_recipes(self, user_id: str, limit: Optional[int] = None,
+                               cursor: Optional[str] = None,
+                               fields: Optional[List[str]] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
         """
-        Obtém todas as receitas de um usuário
+        Obtém as receitas de um usuário, da mais recente para a mais antiga
         
         Args:
             user_id: ID do usuário
+            limit: Tamanho máximo da página (None traz todos)
+            cursor: Cursor retornado pela página anterior
+            fields: Campos a retornar (None retorna o documento inteiro)
             
         Returns:
-            Lista de receitas
+            Lista de receitas e cursor da próxima página
         """
         try:
             recipes_ref = self.db.collection('users').document(user_id).collection('recipes')
-            docs = recipes_ref.order_by('created_at', direction=firestore.Query.DESCENDING).stream()
-            
-            recipes = []
-            for doc in docs:
-                recipe_data = doc.to_dict()
-                recipe_data['id'] = doc.id
-                recipes.append(recipe_data)
             
-            return recipes
+            return await self._run(self._fetch_page, recipes_ref, 'created_at', limit, cursor, fields)
             
+        except InvalidCursorError:
+            raise
         except Exception as e:
             logger.error(f"Erro ao obter receitas: {e}")
             raise
     
+    async def save_recipes_bulk(self, user_id: str, recipes: List[Any]) -> List[Dict[str, Any]]:
+        """
+        Salva várias receitas usando escritas em lote
+        
+        Args:
+            user_id: ID do usuário
+            recipes: Lista de dados de receitas
+            
+        Returns:
+            Resultado por item (índice, status e ID criado ou erro)
+        """
+        try:
+            recipes_ref = self.db.collection('users').document(user_id).collection('recipes')
+            results = await self._run(self._commit_bulk, recipes_ref, user_id, recipes)
+            
+            created = sum(1 for result in results if result['status'] == 'created')
+            logger.info(f"{created}/{len(recipes)} receitas salvas em lote")
+            return results
+            
+        except Exception as e:
+            logger.error(f"Erro ao salvar receitas em lote: {e}")
+            raise
+    
     async def get_recipe(self, user_id: str, recipe_id: str) -> Optional[Dict[str, Any]]:
         """
         Obtém uma receita específica
@@ -181,7 +388,7 @@ class FirebaseService:
         """
         try:
             doc_ref = self.db.collection('users').document(user_id).collection('recipes').document(recipe_id)
-            doc = doc_ref.get()
+            doc = await self._run(doc_ref.get)
             
             if doc.exists:
                 recipe_data = doc.to_dict()
@@ -210,7 +417,7 @@ class FirebaseService:
             recipe_data['updated_at'] = firestore.SERVER_TIMESTAMP
             
             doc_ref = self.db.collection('users').document(user_id).collection('recipes').document(recipe_id)
-            doc_ref.update(recipe_data)
+            await self._run(doc_ref.update, recipe_data)
             
             logger.info(f"Receita {recipe_id} atualizada com sucesso")
             return True
@@ -232,7 +439,7 @@ class FirebaseService:
         """
         try:
             doc_ref = self.db.collection('users').document(user_id).collection('recipes').document(recipe_id)
-            doc_ref.delete()
+            await self._run(doc_ref.delete)
             
             logger.info(f"Receita {recipe_id} deletada com sucesso")
             return True
@@ -261,7 +468,7 @@ class FirebaseService:
             production_data['updated_at'] = firestore.SERVER_TIMESTAMP
             production_data['user_id'] = user_id
             
-            doc_ref = production_ref.add(production_data)[1]
+            doc_ref = (await self._run(production_ref.add, production_data))[1]
             
             logger.info(f"Produção salva com ID: {doc_ref.id}")
             return doc_ref.id
@@ -270,28 +477,28 @@ class FirebaseService:
             logger.error(f"Erro ao salvar produção: {e}")
             raise
     
-    async def get_user_productions(self, user_id: str) -> List[Dict[str, Any]]:
+    async def get_user_productions(self, user_id: str, limit: Optional[int] = None,
+                                   cursor: Optional[str] = None,
+                                   fields: Optional[List[str]] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
         """
-        Obtém todas as produções de um usuário
+        Obtém as produções de um usuário, da mais recente para a mais antiga
         
         Args:
             user_id: ID do usuário
+            limit: Tamanho máximo da página (None traz todos)
+            cursor: Cursor retornado pela página anterior
+            fields: Campos a retornar (None retorna o documento inteiro)
             
         Returns:
-            Lista de produções
+            Lista de produções e cursor da próxima página
         """
         try:
             productions_ref = self.db.collection('users').document(user_id).collection('productions')
-            docs = productions_ref.order_by('created_at', direction=firestore.Query.DESCENDING).stream()
-            
-            productions = []
-            for doc in docs:
-                production_data = doc.to_dict()
-                production_data['id'] = doc.id
-                productions.append(production_data)
             
-            return productions
+            return await self._run(self._fetch_page, productions_ref, 'created_at', limit, cursor, fields)
             
+        except InvalidCursorError:
+            raise
         except Exception as e:
             logger.error(f"Erro ao obter produções: {e}")
             raise
@@ -315,7 +522,7 @@ class FirebaseService:
             ingredient_data['updated_at'] = firestore.SERVER_TIMESTAMP
             ingredient_data['user_id'] = user_id
             
-            doc_ref = ingredient_ref.add(ingredient_data)[1]
+            doc_ref = (await self._run(ingredient_ref.add, ingredient_data))[1]
             
             logger.info(f"Ingrediente salvo com ID: {doc_ref.id}")
             return doc_ref.id
@@ -324,37 +531,102 @@ class FirebaseService:
             logger.error(f"Erro ao salvar ingrediente: {e}")
             raise
     
-    async def get_user_ingredients(self, user_id: str) -> List[Dict[str, Any]]:
+    async def get_user_ingredients(self, user_id: str, limit: Optional[int] = None,
+                                   cursor: Optional[str] = None,
+                                   fields: Optional[List[str]] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
         """
-        Obtém todos os ingredientes de um usuário
+        Obtém os ingredientes de um usuário
         
         Args:
             user_id: ID do usuário
+            limit: Tamanho máximo da página (None traz todos)
+            cursor: Cursor retornado pela página anterior
+            fields: Campos a retornar (None retorna o documento inteiro)
             
         Returns:
-            Lista de ingredientes
+            Lista de ingredientes e cursor da próxima página
         """
         try:
             ingredients_ref = self.db.collection('users').document(user_id).collection('ingredients')
-            docs = ingredients_ref.stream()
-            
-            ingredients = []
-            for doc in docs:
-                ingredient_data = doc.to_dict()
-                ingredient_data['id'] = doc.id
-                ingredients.append(ingredient_data)
             
-            return ingredients
+            return await self._run(self._fetch_page, ingredients_ref, None, limit, cursor, fields)
             
+        except InvalidCursorError:
+            raise
         except Exception as e:
             logger.error(f"Erro ao obter ingredientes: {e}")
             raise
     
+    async def save_ingredients_bulk(self, user_id: str, ingredients: List[Any]) -> List[Dict[str, Any]]:
+        """
+        Salva vários ingredientes usando escritas em lote
+        
+        Args:
+            user_id: ID do usuário
+            ingredients: Lista de dados de ingredientes
+            
+        Returns:
+            Resultado por item (índice, status e ID criado ou erro)
+        """
+        try:
+            ingredients_ref = self.db.collection('users').document(user_id).collection('ingredients')
+            results = await self._run(self._commit_bulk, ingredients_ref, user_id, ingredients)
+            
+            created = sum(1 for result in results if result['status'] == 'created')
+            logger.info(f"{created}/{len(ingredients)} ingredientes salvos em lote")
+            return results
+            
+        except Exception as e:
+            logger.error(f"Erro ao salvar ingredientes em lote: {e}")
+            raise
+    
     # Métodos auxiliares
+    def _commit_bulk(self, collection_ref, user_id: str, items: List[Any]) -> List[Dict[str, Any]]:
+        """
+        Grava documentos em WriteBatch de até FIRESTORE_BATCH_LIMIT operações
+        
+        Cada lote é atômico: se o commit falhar, todos os itens do lote são
+        reportados com erro e os lotes seguintes continuam sendo gravados.
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(items)
+        pending = []
+        
+        for index, item in enumerate(items):
+            if not isinstance(item, dict):
+                results[index] = {'index': index, 'status': 'error', 'error': 'Item deve ser um objeto JSON'}
+            else:
+                pending.append(index)
+        
+        for start in range(0, len(pending), FIRESTORE_BATCH_LIMIT):
+            chunk = pending[start:start + FIRESTORE_BATCH_LIMIT]
+            batch = self.db.batch()
+            doc_refs = []
+            
+            for index in chunk:
+                data = dict(items[index])
+                data['created_at'] = firestore.SERVER_TIMESTAMP
+                data['updated_at'] = firestore.SERVER_TIMESTAMP
+                data['user_id'] = user_id
+                
+                doc_ref = collection_ref.document()
+                batch.set(doc_ref, data)
+                doc_refs.append(doc_ref)
+            
+            try:
+                batch.commit()
+                for index, doc_ref in zip(chunk, doc_refs):
+                    results[index] = {'index': index, 'status': 'created', 'id': doc_ref.id}
+            except Exception as e:
+                logger.error(f"Erro ao gravar lote de {len(chunk)} documentos: {e}")
+                for index in chunk:
+                    results[index] = {'index': index, 'status': 'error', 'error': str(e)}
+        
+        return results
+    
     async def _create_user_document(self, user_id: str, user_data: Dict[str, Any]):
         """Cria documento do usuário no Firestore"""
         try:
-            self.db.collection('users').document(user_id).set(user_data)
+            await self._run(self.db.collection('users').document(user_id).set, user_data)
             logger.info(f"Documento do usuário criado: {user_id}")
             
         except Exception as e:
@@ -376,7 +648,7 @@ class FirebaseService:
             profile_data['updated_at'] = firestore.SERVER_TIMESTAMP
             
             doc_ref = self.db.collection('users').document(user_id)
-            doc_ref.update({'profile': profile_data})
+            await self._run(doc_ref.update, {'profile': profile_data})
             
             logger.info(f"Perfil do usuário {user_id} atualizado")
             return True
@@ -0,0 +1,526 @@
+"""
+Backend de armazenamento local para o FirebaseService
+
+Implementa o subconjunto da API do cliente do Firestore e do Firebase Auth
+usado pelo FirebaseService (subcoleções, add/set/update/delete, order_by,
+select, start_after, limit, WriteBatch e SERVER_TIMESTAMP), em memória ou
+persistido em SQLite. Permite rodar testes e testes de carga sem credenciais
+do Google. Selecionado com STORAGE_BACKEND=memory ou STORAGE_BACKEND=sqlite.
+"""
+import json
+import os
+import secrets
+import sqlite3
+import string
+import threading
+import time
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from firebase_admin import firestore
+from google.api_core.exceptions import NotFound
+
+
+_AUTO_ID_ALPHABET = string.ascii_letters + string.digits
+_NAME_FIELD = "__name__"
+
+
+def _auto_id() -> str:
+    """Gera um ID de documento no mesmo formato do Firestore"""
+    return "".join(secrets.choice(_AUTO_ID_ALPHABET) for _ in range(20))
+
+
+def _resolve_transforms(value: Any, now: datetime) -> Any:
+    """Substitui SERVER_TIMESTAMP pelo horário da gravação"""
+    if value is firestore.SERVER_TIMESTAMP:
+        return now
+    if isinstance(value, dict):
+        return {
+            k: _resolve_transforms(v, now)
+            for k, v in value.items()
+            if v is not firestore.DELETE_FIELD
+        }
+    if isinstance(value, list):
+        return [_resolve_transforms(v, now) for v in value]
+    return value
+
+
+def _get_path(data: Dict[str, Any], field_path: str) -> Tuple[bool, Any]:
+    """Lê um campo (com suporte a caminhos 'a.b'); retorna (existe, valor)"""
+    current: Any = data
+    for part in field_path.split("."):
+        if not isinstance(current, dict) or part not in current:
+            return False, None
+        current = current[part]
+    return True, current
+
+
+def _set_path(data: Dict[str, Any], field_path: str, value: Any):
+    """Grava um campo aninhado, removendo-o se o valor for DELETE_FIELD"""
+    parts = field_path.split(".")
+    current = data
+    for part in parts[:-1]:
+        if not isinstance(current.get(part), dict):
+            current[part] = {}
+        current = current[part]
+    if value is firestore.DELETE_FIELD:
+        current.pop(parts[-1], None)
+    else:
+        current[parts[-1]] = value
+
+
+def _type_rank(value: Any) -> int:
+    """Ordem entre tipos diferentes, como no Firestore"""
+    if value is None:
+        return 0
+    if isinstance(value, bool):
+        return 1
+    if isinstance(value, (int, float)):
+        return 2
+    if isinstance(value, datetime):
+        return 3
+    if isinstance(value, str):
+        return 4
+    if isinstance(value, bytes):
+        return 5
+    if isinstance(value, list):
+        return 8
+    return 9
+
+
+def _sort_key(value: Any) -> Tuple[Any, ...]:
+    """Chave de ordenação de um valor seguindo a ordenação do Firestore"""
+    rank = _type_rank(value)
+    if rank in (0, 9):
+        return (rank,)
+    if rank == 8:
+        return (rank, tuple(_sort_key(item) for item in value))
+    return (rank, value)
+
+
+def _copy(value: Any) -> Any:
+    """Cópia profunda de dicts e listas; os demais valores são imutáveis"""
+    if isinstance(value, dict):
+        return {k: _copy(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_copy(v) for v in value]
+    return value
+
+
+# Serialização para a camada SQLite
+def _encode(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"$dt": value.isoformat()}
+    if isinstance(value, bytes):
+        return {"$bytes": value.hex()}
+    if isinstance(value, dict):
+        return {k: _encode(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_encode(v) for v in value]
+    return value
+
+
+def _decode(value: Any) -> Any:
+    if isinstance(value, dict):
+        if len(value) == 1 and "$dt" in value:
+            return datetime.fromisoformat(value["$dt"])
+        if len(value) == 1 and "$bytes" in value:
+            return bytes.fromhex(value["$bytes"])
+        return {k: _decode(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_decode(v) for v in value]
+    return value
+
+
+class _DocumentStore:
+    """Documentos agrupados por caminho de coleção, com gravação opcional em SQLite"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.lock = threading.RLock()
+        self.collections: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._db: Optional[sqlite3.Connection] = None
+        if path:
+            self._open(path)
+
+    def _open(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS documents ("
+            "collection TEXT NOT NULL, id TEXT NOT NULL, data TEXT NOT NULL, "
+            "PRIMARY KEY (collection, id))"
+        )
+        self._db.commit()
+        for collection, doc_id, data in self._db.execute("SELECT collection, id, data FROM documents"):
+            self.collections.setdefault(collection, {})[doc_id] = _decode(json.loads(data))
+
+    def get(self, collection: str, doc_id: str) -> Optional[Dict[str, Any]]:
+        return self.collections.get(collection, {}).get(doc_id)
+
+    def list(self, collection: str) -> List[Tuple[str, Dict[str, Any]]]:
+        return list(self.collections.get(collection, {}).items())
+
+    def apply(self, writes: List[Tuple[str, str, str, Optional[Dict[str, Any]]]]):
+        """Aplica escritas (op, coleção, id, dados) de forma atômica"""
+        with self.lock:
+            for op, collection, doc_id, data in writes:
+                if op == "delete":
+                    self.collections.get(collection, {}).pop(doc_id, None)
+                else:
+                    self.collections.setdefault(collection, {})[doc_id] = data
+
+            if self._db is not None:
+                with self._db:
+                    for op, collection, doc_id, data in writes:
+                        if op == "delete":
+                            self._db.execute(
+                                "DELETE FROM documents WHERE collection = ? AND id = ?",
+                                (collection, doc_id)
+                            )
+                        else:
+                            self._db.execute(
+                                "INSERT OR REPLACE INTO documents (collection, id, data) VALUES (?, ?, ?)",
+                                (collection, doc_id, json.dumps(_encode(data), ensure_ascii=False))
+                            )
+
+
+class LocalDocumentSnapshot:
+    """
+    Equivalente a DocumentSnapshot
+
+    Compartilha o dict armazenado (as escritas substituem documentos em vez de
+    alterá-los) e só copia os dados em to_dict/get.
+    """
+
+    def __init__(self, reference: "LocalDocumentReference", data: Optional[Dict[str, Any]]):
+        self.reference = reference
+        self.id = reference.id
+        self._data = data
+
+    @property
+    def exists(self) -> bool:
+        return self._data is not None
+
+    def to_dict(self) -> Optional[Dict[str, Any]]:
+        return _copy(self._data) if self._data is not None else None
+
+    def get(self, field_path: str) -> Any:
+        found, value = _get_path(self._data or {}, field_path)
+        if not found:
+            raise KeyError(field_path)
+        return _copy(value)
+
+
+class LocalDocumentReference:
+    """Equivalente a DocumentReference"""
+
+    def __init__(self, client: "LocalFirestoreClient", collection_path: str, doc_id: str):
+        self._client = client
+        self._collection_path = collection_path
+        self.id = doc_id
+        self.path = f"{collection_path}/{doc_id}"
+
+    def collection(self, name: str) -> "LocalCollectionReference":
+        return LocalCollectionReference(self._client, f"{self.path}/{name}")
+
+    def get(self) -> LocalDocumentSnapshot:
+        self._client.simulate_latency()
+        with self._client.store.lock:
+            return LocalDocumentSnapshot(self, self._client.store.get(self._collection_path, self.id))
+
+    def set(self, document_data: Dict[str, Any], merge: bool = False):
+        batch = self._client.batch()
+        batch.set(self, document_data, merge=merge)
+        batch.commit()
+
+    def update(self, field_updates: Dict[str, Any]):
+        batch = self._client.batch()
+        batch.update(self, field_updates)
+        batch.commit()
+
+    def delete(self):
+        batch = self._client.batch()
+        batch.delete(self)
+        batch.commit()
+
+
+class LocalQuery:
+    """Equivalente a Query: order_by, select, start_after e limit"""
+
+    ASCENDING = firestore.Query.ASCENDING
+    DESCENDING = firestore.Query.DESCENDING
+
+    def __init__(self, client: "LocalFirestoreClient", collection_path: str,
+                 orders: Tuple[Tuple[str, str], ...] = (), projection: Optional[List[str]] = None,
+                 cursor: Optional[Any] = None, limit_count: Optional[int] = None):
+        self._client = client
+        self._collection_path = collection_path
+        self._orders = orders
+        self._projection = projection
+        self._cursor = cursor
+        self._limit = limit_count
+
+    def _with(self, **changes: Any) -> "LocalQuery":
+        params = {
+            "orders": self._orders,
+            "projection": self._projection,
+            "cursor": self._cursor,
+            "limit_count": self._limit,
+        }
+        params.update(changes)
+        return LocalQuery(self._client, self._collection_path, **params)
+
+    def order_by(self, field_path: str, direction: str = firestore.Query.ASCENDING) -> "LocalQuery":
+        return self._with(orders=self._orders + ((field_path, direction),))
+
+    def select(self, field_paths: List[str]) -> "LocalQuery":
+        return self._with(projection=list(field_paths))
+
+    def start_after(self, document_fields: Any) -> "LocalQuery":
+        return self._with(cursor=document_fields)
+
+    def limit(self, count: int) -> "LocalQuery":
+        return self._with(limit_count=count)
+
+    def _order_value(self, doc_id: str, data: Dict[str, Any], field_path: str) -> Tuple[bool, Any]:
+        if field_path == _NAME_FIELD:
+            return True, doc_id
+        return _get_path(data, field_path)
+
+    def _cursor_values(self) -> List[Any]:
+        """Converte o cursor (dict, lista ou snapshot) em valores na ordem do order_by"""
+        cursor = self._cursor
+        if isinstance(cursor, LocalDocumentSnapshot):
+            data = dict(cursor.to_dict() or {})
+            data[_NAME_FIELD] = cursor.id
+            cursor = data
+        if isinstance(cursor, dict):
+            values = []
+            for field_path, _ in self._orders:
+                if field_path in cursor:
+                    values.append(cursor[field_path])
+                else:
+                    found, value = _get_path(cursor, field_path)
+                    if not found:
+                        raise ValueError(f"Cursor sem o campo de ordenação {field_path}")
+                    values.append(value)
+            cursor = values
+        return [
+            value.id if isinstance(value, LocalDocumentReference) else value
+            for value in cursor
+        ]
+
+    def stream(self) -> Iterator[LocalDocumentSnapshot]:
+        self._client.simulate_latency()
+        store = self._client.store
+        with store.lock:
+            documents = store.list(self._collection_path)
+
+            orders = self._orders or ((_NAME_FIELD, self.ASCENDING),)
+
+            # Firestore omite documentos sem os campos de ordenação
+            rows = []
+            for doc_id, data in documents:
+                keys = []
+                for field_path, _ in orders:
+                    found, value = self._order_value(doc_id, data, field_path)
+                    if not found:
+                        break
+                    keys.append(_sort_key(value))
+                else:
+                    rows.append((keys, doc_id, data))
+
+            # Ordenações estáveis do último critério para o primeiro
+            rows.sort(key=lambda row: row[1])
+            for position in reversed(range(len(orders))):
+                rows.sort(key=lambda row: row[0][position], reverse=orders[position][1] == self.DESCENDING)
+
+            if self._cursor is not None:
+                cursor_keys = [_sort_key(value) for value in self._cursor_values()]
+
+                def after_cursor(keys: List[Tuple[Any, ...]]) -> bool:
+                    for (_, direction), key, cursor_key in zip(orders, keys, cursor_keys):
+                        if key != cursor_key:
+                            return (key < cursor_key) if direction == self.DESCENDING else (key > cursor_key)
+                    return False
+
+                rows = [row for row in rows if after_cursor(row[0])]
+
+            if self._limit is not None:
+                rows = rows[:self._limit]
+
+            snapshots = []
+            for _, doc_id, data in rows:
+                if self._projection is not None:
+                    projected: Dict[str, Any] = {}
+                    for field_path in self._projection:
+                        if field_path == _NAME_FIELD:
+                            continue
+                        found, value = _get_path(data, field_path)
+                        if found:
+                            _set_path(projected, field_path, value)
+                    data = projected
+                reference = LocalDocumentReference(self._client, self._collection_path, doc_id)
+                snapshots.append(LocalDocumentSnapshot(reference, data))
+
+        return iter(snapshots)
+
+    def get(self) -> List[LocalDocumentSnapshot]:
+        return list(self.stream())
+
+
+class LocalCollectionReference(LocalQuery):
+    """Equivalente a CollectionReference"""
+
+    def __init__(self, client: "LocalFirestoreClient", path: str):
+        super().__init__(client, path)
+        self.id = path.rsplit("/", 1)[-1]
+        self.path = path
+
+    def document(self, document_id: Optional[str] = None) -> LocalDocumentReference:
+        return LocalDocumentReference(self._client, self.path, document_id or _auto_id())
+
+    def add(self, document_data: Dict[str, Any], document_id: Optional[str] = None):
+        reference = self.document(document_id)
+        reference.set(document_data)
+        return datetime.now(timezone.utc), reference
+
+
+class LocalWriteBatch:
+    """Equivalente a WriteBatch: acumula escritas e aplica todas no commit"""
+
+    def __init__(self, client: "LocalFirestoreClient"):
+        self._client = client
+        self._operations: List[Tuple[str, LocalDocumentReference, Any, bool]] = []
+
+    def set(self, reference: LocalDocumentReference, document_data: Dict[str, Any], merge: bool = False):
+        self._operations.append(("set", reference, _copy(document_data), merge))
+
+    def update(self, reference: LocalDocumentReference, field_updates: Dict[str, Any]):
+        self._operations.append(("update", reference, _copy(field_updates), False))
+
+    def delete(self, reference: LocalDocumentReference):
+        self._operations.append(("delete", reference, None, False))
+
+    def commit(self) -> List[Any]:
+        self._client.simulate_latency()
+        store = self._client.store
+        now = datetime.now(timezone.utc)
+        with store.lock:
+            # Estado visto por este commit, incluindo escritas anteriores do mesmo lote
+            staged: Dict[Tuple[str, str], Optional[Dict[str, Any]]] = {}
+            writes = []
+
+            for op, reference, payload, merge in self._operations:
+                key = (reference._collection_path, reference.id)
+                current = staged[key] if key in staged else store.get(*key)
+
+                if op == "delete":
+                    data = None
+                elif op == "update":
+                    if current is None:
+                        raise NotFound(f"Documento não encontrado: {reference.path}")
+                    data = _copy(current)
+                    for field_path, value in payload.items():
+                        _set_path(data, field_path, _resolve_transforms(value, now))
+                elif merge and current is not None:
+                    data = _copy(current)
+                    for field, value in _resolve_transforms(payload, now).items():
+                        data[field] = value
+                else:
+                    data = _resolve_transforms(payload, now)
+
+                staged[key] = data
+                writes.append(("delete" if data is None else "set", key[0], key[1], data))
+
+            store.apply(writes)
+            self._operations = []
+        return [SimpleNamespace(update_time=now) for _ in writes]
+
+
+class LocalFirestoreClient:
+    """Substituto local do cliente do Firestore"""
+
+    def __init__(self, path: Optional[str] = None, latency: float = 0.0):
+        self.store = _DocumentStore(path)
+        self.latency = latency  # segundos por chamada, imitando a ida e volta ao Firestore
+
+    def simulate_latency(self):
+        """Bloqueia a thread como uma chamada de rede ao Firestore"""
+        if self.latency:
+            time.sleep(self.latency)
+
+    def collection(self, name: str) -> LocalCollectionReference:
+        return LocalCollectionReference(self, name)
+
+    def document(self, path: str) -> LocalDocumentReference:
+        collection_path, doc_id = path.rsplit("/", 1)
+        return LocalDocumentReference(self, collection_path, doc_id)
+
+    def batch(self) -> LocalWriteBatch:
+        return LocalWriteBatch(self)
+
+
+class LocalAuth:
+    """
+    Substituto local do Firebase Auth
+
+    Apenas para desenvolvimento: o token de acesso é o próprio uid do
+    usuário, sem assinatura. Só uids criados por create_user são aceitos;
+    com um cliente local os usuários ficam gravados na coleção
+    LOCAL_AUTH_COLLECTION e continuam válidos depois de reiniciar (SQLite).
+    """
+
+    TOKEN_LIFETIME = 3600
+    LOCAL_AUTH_COLLECTION = "_local_auth_users"
+
+    def __init__(self, client: Optional[LocalFirestoreClient] = None):
+        self._users: Dict[str, SimpleNamespace] = {}
+        self._lock = threading.Lock()
+        self._client = client
+        if client is not None:
+            for doc_id, data in client.store.list(self.LOCAL_AUTH_COLLECTION):
+                self._users[doc_id] = self._user_from_dict(doc_id, data)
+
+    @staticmethod
+    def _user_from_dict(uid: str, data: Dict[str, Any]) -> SimpleNamespace:
+        return SimpleNamespace(
+            uid=uid,
+            email=data.get("email"),
+            display_name=data.get("display_name"),
+            email_verified=data.get("email_verified", False),
+            user_metadata=SimpleNamespace(creation_timestamp=data.get("creation_timestamp"))
+        )
+
+    def create_user(self, email: str, password: str, display_name: Optional[str] = None,
+                    email_verified: bool = False, **kwargs: Any) -> SimpleNamespace:
+        with self._lock:
+            if any(user.email == email for user in self._users.values()):
+                raise ValueError(f"Email já cadastrado: {email}")
+            data = {
+                "email": email,
+                "display_name": display_name,
+                "email_verified": email_verified,
+                "creation_timestamp": int(time.time() * 1000)
+            }
+            user = self._user_from_dict(_auto_id(), data)
+            if self._client is not None:
+                self._client.store.apply([("set", self.LOCAL_AUTH_COLLECTION, user.uid, data)])
+            self._users[user.uid] = user
+            return user
+
+    def verify_id_token(self, id_token: str) -> Dict[str, Any]:
+        if not id_token:
+            raise ValueError("Token vazio")
+        user = self._users.get(id_token)
+        if user is None:
+            raise ValueError("Token inválido: usuário desconhecido")
+        return {
+            "uid": user.uid,
+            "sub": user.uid,
+            "email": user.email,
+            "email_verified": user.email_verified,
+            "exp": time.time() + self.TOKEN_LIFETIME
+        }
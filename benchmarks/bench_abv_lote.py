@@ -0,0 +1,88 @@
+"""
+Benchmark do cálculo de ABV em lote (NumPy) x o laço sobre as funções escalares
+
+Gera leituras sintéticas de OG/FG (com uma parte fora das faixas válidas) e
+mede ABVCalculator.calcular chamado leitura a leitura contra
+ABVCalculator.calcular_lote sobre os arrays, conferindo que os resultados
+batem.
+
+Uso:
+    python -m benchmarks.bench_abv_lote
+    python -m benchmarks.bench_abv_lote --tamanhos 1000 100000 1000000 --output resultado.json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Any, Callable, Dict
+
+import numpy as np
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark do cálculo de ABV em lote")
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=[1000, 100000],
+                        help="Quantidade de leituras de OG/FG em cada rodada")
+    parser.add_argument("--repeticoes", type=int, default=5,
+                        help="Repetições de cada medição (vale a mediana)")
+    parser.add_argument("--output", default=None,
+                        help="Arquivo JSON de saída")
+    return parser.parse_args()
+
+
+def gerar_leituras(tamanho: int):
+    aleatorio = np.random.default_rng(tamanho)
+    og = np.round(aleatorio.uniform(1.010, 1.160, tamanho), 3)
+    fg = np.round(og - (og - 1) * aleatorio.uniform(0.2, 0.95, tamanho), 3)
+    return og, fg
+
+
+def mediana_ms(funcao: Callable[[], Any], repeticoes: int) -> float:
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    tempos.sort()
+    return tempos[len(tempos) // 2] * 1000
+
+
+def main():
+    args = parse_args()
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from util.abv_calculator import ABVCalculator, descrever_validacao
+
+    calculadora = ABVCalculator()
+    resultados: Dict[int, Dict[str, float]] = {}
+    for tamanho in args.tamanhos:
+        og, fg = gerar_leituras(tamanho)
+        og_lista, fg_lista = og.tolist(), fg.tolist()
+
+        escalar = [calculadora.calcular(o, f) for o, f in zip(og_lista, fg_lista)]
+        lote = calculadora.calcular_lote(og, fg)
+        assert np.allclose(lote['abv'], [r['abv'] for r in escalar])
+        assert np.allclose(lote['atenuacao'], [r['atenuacao'] for r in escalar])
+        assert [descrever_validacao(m) for m in lote['validacao']] == [r['validacao'] for r in escalar]
+
+        tempo_escalar = mediana_ms(
+            lambda: [calculadora.calcular(o, f) for o, f in zip(og_lista, fg_lista)], args.repeticoes
+        )
+        tempo_lote = mediana_ms(lambda: calculadora.calcular_lote(og, fg), args.repeticoes)
+        resultados[tamanho] = {
+            "escalar_ms": tempo_escalar,
+            "lote_ms": tempo_lote,
+            "invalidas": int(np.count_nonzero(lote['validacao']))
+        }
+        print(f"{tamanho} leituras ({resultados[tamanho]['invalidas']} com problemas de validação)")
+        print(f"  escalar {tempo_escalar:>10.2f} ms   lote {tempo_lote:>8.2f} ms   "
+              f"({tempo_escalar / tempo_lote:.0f}x)")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(resultados, f, indent=2, ensure_ascii=False)
+        print(f"\nResultados salvos em {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+"""
+Benchmark de carga da API do Bebrew
+
+Executa o app FastAPI no próprio processo (httpx + ASGITransport) com o
+armazenamento local e o modelo de IA fake, ambos com latência artificial
+configurável. Para cada rota e nível de concorrência mede p50/p95/p99 e
+requisições por segundo, salvando o resultado em JSON para comparar commits.
+
+Uso:
+    python -m benchmarks.bench_api
+    python -m benchmarks.bench_api --concurrency 1,16,64 --requests 500 \\
+        --storage-latency 0.005 --ai-latency 0.2 --output benchmarks/results/api.json
+    python -m benchmarks.bench_api --compare benchmarks/results/api-anterior.json
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+
+ROUTES = ("/health", "/recipes", "/productions", "/ai/analyze-recipe")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark de carga da API do Bebrew")
+    parser.add_argument("--routes", default=",".join(ROUTES),
+                        help="Rotas medidas, separadas por vírgula")
+    parser.add_argument("--concurrency", default="1,8,32,128",
+                        help="Níveis de concorrência, separados por vírgula")
+    parser.add_argument("--requests", type=int, default=400,
+                        help="Requisições por rota e nível de concorrência")
+    parser.add_argument("--seed", type=int, default=100,
+                        help="Receitas e produções criadas para o usuário do benchmark")
+    parser.add_argument("--storage-latency", type=float, default=0.002,
+                        help="Segundos por chamada ao armazenamento local")
+    parser.add_argument("--ai-latency", type=float, default=0.05,
+                        help="Segundos até a resposta do modelo de IA fake")
+    parser.add_argument("--ai-cache", action="store_true",
+                        help="Mantém o cache de respostas da IA (desligado por padrão)")
+    parser.add_argument("--output", default=None,
+                        help="Arquivo JSON de saída (padrão: benchmarks/results/api-<commit>.json)")
+    parser.add_argument("--compare", default=None,
+                        help="JSON de uma execução anterior para comparar")
+    return parser.parse_args()
+
+
+def configure_environment(args: argparse.Namespace):
+    """Define as variáveis lidas pelas Settings antes de importar o app"""
+    os.environ["STORAGE_BACKEND"] = "memory"
+    os.environ["LOCAL_STORAGE_LATENCY"] = str(args.storage_latency)
+    os.environ["OPENAI_BACKEND"] = "fake"
+    os.environ["OPENAI_FAKE_LATENCY"] = str(args.ai_latency)
+    os.environ["AI_CACHE_ENABLED"] = "true" if args.ai_cache else "false"
+    os.environ.setdefault("SECRET_KEY", "benchmark")
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+
+def configure_logging():
+    """LOG_LEVEL só vale para o arquivo de log; o handler padrão do loguru (stderr) fica em DEBUG"""
+    from loguru import logger
+    logger.remove()
+    logger.add(sys.stderr, level=os.environ["LOG_LEVEL"])
+
+
+def git_commit() -> Optional[str]:
+    """Commit atual do repositório, se disponível"""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def percentile(samples: List[float], p: float) -> float:
+    """Percentil de uma lista já ordenada, em milissegundos"""
+    if not samples:
+        return 0.0
+    index = min(len(samples) - 1, int(p * len(samples)))
+    return samples[index] * 1000
+
+
+async def seed_user(client, count: int) -> Dict[str, str]:
+    """Cria o usuário do benchmark e popula receitas e produções"""
+    response = await client.post("/auth/register", params={
+        "email": "benchmark@bebrew.local",
+        "password": "benchmark123"
+    })
+    response.raise_for_status()
+    headers = {"Authorization": f"Bearer {response.json()['user']['uid']}"}
+
+    recipes = [
+        {"name": f"Receita {i}", "style": "IPA", "og": 1.060, "fg": 1.012, "ingredients": ["malte", "lúpulo"]}
+        for i in range(count)
+    ]
+    (await client.post("/recipes:batch", json=recipes, headers=headers)).raise_for_status()
+    for i in range(count):
+        production = {"recipe_id": f"r{i}", "status": "fermentando", "lote": f"L{i:04d}"}
+        (await client.post("/productions", json=production, headers=headers)).raise_for_status()
+    return headers
+
+
+def request_factory(route: str, headers: Dict[str, str]) -> Callable:
+    """Monta a chamada de cada rota"""
+    counter = itertools.count()
+
+    if route == "/ai/analyze-recipe":
+        # Receitas distintas evitam que o cache e a deduplicação escondam a latência do modelo
+        async def call(client):
+            recipe = {"name": f"Receita {next(counter)}", "style": "IPA", "ingredients": ["malte"]}
+            return await client.post(route, json=recipe, headers=headers)
+        return call
+
+    if route == "/health":
+        async def call(client):
+            return await client.get(route)
+        return call
+
+    async def call(client):
+        return await client.get(route, headers=headers)
+    return call
+
+
+async def run_level(client, call: Callable, concurrency: int, total: int) -> Dict[str, Any]:
+    """Dispara `total` requisições com `concurrency` clientes simultâneos"""
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    remaining = itertools.count()
+
+    async def worker():
+        while next(remaining) < total:
+            started = time.perf_counter()
+            try:
+                response = await call(client)
+                code = str(response.status_code)
+            except Exception as e:
+                code = type(e).__name__
+            latencies.append(time.perf_counter() - started)
+            statuses[code] = statuses.get(code, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    errors = sum(count for code, count in statuses.items() if not code.startswith("2"))
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors,
+        "status_codes": statuses,
+        "elapsed_s": elapsed,
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 0.50),
+        "p95_ms": percentile(latencies, 0.95),
+        "p99_ms": percentile(latencies, 0.99),
+        "max_ms": latencies[-1] * 1000 if latencies else 0.0
+    }
+
+
+async def run_benchmark(args: argparse.Namespace) -> Dict[str, Any]:
+    import httpx
+    from backend.api.main import app
+
+    routes = [route.strip() for route in args.routes.split(",") if route.strip()]
+    levels = [int(level) for level in args.concurrency.split(",")]
+
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", limits=limits,
+                                 timeout=None) as client:
+        headers = await seed_user(client, args.seed)
+
+        results: Dict[str, List[Dict[str, Any]]] = {}
+        for route in routes:
+            call = request_factory(route, headers)
+            await run_level(client, call, 1, min(10, args.requests))  # aquecimento
+            results[route] = []
+            for level in levels:
+                result = await run_level(client, call, level, args.requests)
+                results[route].append(result)
+                print(
+                    f"{route:<22} c={level:<4} rps={result['rps']:>9.1f} "
+                    f"p50={result['p50_ms']:>8.2f}ms p95={result['p95_ms']:>8.2f}ms "
+                    f"p99={result['p99_ms']:>8.2f}ms erros={result['errors']}"
+                )
+
+    return {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {
+            "requests": args.requests,
+            "seed": args.seed,
+            "storage_latency_s": args.storage_latency,
+            "ai_latency_s": args.ai_latency,
+            "ai_cache": args.ai_cache
+        },
+        "routes": results
+    }
+
+
+def compare(current: Dict[str, Any], baseline_path: str):
+    """Imprime a variação de p95 e rps em relação a uma execução anterior"""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+
+    print(f"\nComparação com {baseline.get('commit') or baseline_path}:")
+    for route, levels in current["routes"].items():
+        previous = {level["concurrency"]: level for level in baseline.get("routes", {}).get(route, [])}
+        for level in levels:
+            old = previous.get(level["concurrency"])
+            if not old:
+                continue
+            p95_delta = (level["p95_ms"] - old["p95_ms"]) / old["p95_ms"] * 100 if old["p95_ms"] else 0.0
+            rps_delta = (level["rps"] - old["rps"]) / old["rps"] * 100 if old["rps"] else 0.0
+            print(f"{route:<22} c={level['concurrency']:<4} p95 {p95_delta:+7.1f}%  rps {rps_delta:+7.1f}%")
+
+
+def main():
+    args = parse_args()
+    configure_environment(args)
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    configure_logging()
+
+    result = asyncio.run(run_benchmark(args))
+
+    output = args.output or os.path.join("benchmarks", "results", f"api-{result['commit'] or 'local'}.json")
+    directory = os.path.dirname(output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2, ensure_ascii=False)
+    print(f"\nResultados salvos em {output}")
+
+    if args.compare:
+        compare(result, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Benchmark do armazenamento local: SQLite (util/banco_local.py) x JSON em memória
+
+Gera um conjunto sintético com muitas produções no histórico e mede as
+consultas que as views fazem ao abrir (dashboard, histórico, monitoramento).
+
+Uso:
+    python -m benchmarks.bench_banco_local
+    python -m benchmarks.bench_banco_local --historico 100000 --receitas 2000 --output resultado.json
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict
+
+TIPOS = ["Cerveja", "Hidromel", "Vinho", "Sidra", "Kombucha"]
+STATUS_HISTORICO = ["Concluída"] * 9 + ["Cancelada"]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark do armazenamento local do Bebrew")
+    parser.add_argument("--historico", type=int, default=100000,
+                        help="Produções no histórico")
+    parser.add_argument("--receitas", type=int, default=2000,
+                        help="Receitas cadastradas")
+    parser.add_argument("--ativas", type=int, default=5,
+                        help="Produções em andamento (com telemetria)")
+    parser.add_argument("--repeticoes", type=int, default=20,
+                        help="Repetições de cada consulta (vale a mediana)")
+    parser.add_argument("--output", default=None,
+                        help="Arquivo JSON de saída")
+    return parser.parse_args()
+
+
+def gerar_dados(args: argparse.Namespace) -> Dict[str, Any]:
+    aleatorio = random.Random(42)
+    inicio = datetime(2020, 1, 1)
+    receitas = [
+        {
+            "id": f"r{i}", "nome": f"Receita {i}", "tipo": TIPOS[i % len(TIPOS)], "volume": 20.0,
+            "abv": round(aleatorio.uniform(3, 14), 1),
+            "ingredientes": [{"nome": f"Ingrediente {j}", "tipo": "malte", "quantidade": 1.0} for j in range(5)],
+            "etapas": [{"nome": f"Etapa {j}", "duracao": 60} for j in range(4)],
+        }
+        for i in range(args.receitas)
+    ]
+    producoes = [
+        {
+            "id": f"p{i}", "lote": f"LA{i:05d}", "receita_id": "r0", "receita_nome": "Receita 0",
+            "status": "Em Andamento", "progresso": 50,
+            "temperaturas": [
+                {"timestamp": (inicio + timedelta(minutes=m)).isoformat(), "valor": 20.0 + m % 10 * 0.1}
+                for m in range(2000)
+            ],
+        }
+        for i in range(args.ativas)
+    ]
+    historico = []
+    for i in range(args.historico):
+        fim = inicio + timedelta(minutes=i * 30)
+        receita = receitas[i % len(receitas)]
+        historico.append({
+            "id": f"h{i}", "lote": f"L{i:06d}", "receita_id": receita["id"], "receita_nome": receita["nome"],
+            "tipo": receita["tipo"], "status": aleatorio.choice(STATUS_HISTORICO),
+            "data_inicio": (fim - timedelta(days=14)).isoformat(), "data_fim": fim.isoformat(),
+            "abv": round(aleatorio.uniform(3, 14), 1), "volume_final": 19.0,
+            "avaliacao": aleatorio.randint(1, 5), "notas": "Produção sintética",
+        })
+    return {"receitas": receitas, "producoes": producoes, "historico": historico, "configuracoes": {}}
+
+
+def mediana_ms(funcao: Callable[[], Any], repeticoes: int) -> float:
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    tempos.sort()
+    return tempos[len(tempos) // 2] * 1000
+
+
+def main():
+    args = parse_args()
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    # A instância global do mock_data_loader não deve abrir o banco do repositório
+    os.environ["BEBREW_ARMAZENAMENTO"] = "json"
+    from util.banco_local import BancoLocal
+    from util.mock_data_loader import MockDataLoader
+
+    dados = gerar_dados(args)
+    desde = datetime(2020, 1, 1) + timedelta(minutes=(args.historico - 1000) * 30)
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminho_json = os.path.join(diretorio, "mock_data.json")
+        with open(caminho_json, "w", encoding="utf-8") as f:
+            json.dump(dados, f, ensure_ascii=False)
+
+        inicio = time.perf_counter()
+        banco = BancoLocal(os.path.join(diretorio, "bebrew.sqlite3"), importar_json=False)
+        banco.importar(dados)
+        importacao_ms = (time.perf_counter() - inicio) * 1000
+        banco.fechar()
+
+        # Abertura a frio de cada armazenamento
+        inicio = time.perf_counter()
+        banco = BancoLocal(os.path.join(diretorio, "bebrew.sqlite3"), importar_json=False)
+        abertura_sqlite = (time.perf_counter() - inicio) * 1000
+
+        mock = MockDataLoader.__new__(MockDataLoader)
+        mock.data_path = caminho_json
+        inicio = time.perf_counter()
+        mock.data = mock._load_data()
+        abertura_json = (time.perf_counter() - inicio) * 1000
+
+        consultas = {
+            "get_estatisticas": lambda fonte: fonte.get_estatisticas(),
+            "get_resumo_historico": lambda fonte: fonte.get_resumo_historico(),
+            "get_historico(tipo, limite=200)": lambda fonte: fonte.get_historico(tipo="Hidromel", limite=200),
+            "get_historico(termo)": lambda fonte: fonte.get_historico(termo="L09999", limite=200),
+            "get_historico(desde)": lambda fonte: fonte.get_historico(desde=desde, limite=200),
+            "get_producoes_ativas": lambda fonte: fonte.get_producoes_ativas(),
+            "get_producao_by_id": lambda fonte: fonte.get_producao_by_id("p0"),
+            "get_receitas(limite=5)": lambda fonte: fonte.get_receitas(limite=5),
+            "get_tipos_bebida": lambda fonte: fonte.get_tipos_bebida(),
+        }
+
+        resultados = {
+            "historico": args.historico,
+            "receitas": args.receitas,
+            "importacao_ms": importacao_ms,
+            "abertura_ms": {"sqlite": abertura_sqlite, "json": abertura_json},
+            "consultas_ms": {}
+        }
+        print(f"Histórico: {args.historico} produções, {args.receitas} receitas")
+        print(f"  Importação SQLite: {importacao_ms:.0f} ms")
+        print(f"  Abertura: SQLite {abertura_sqlite:.1f} ms, JSON {abertura_json:.1f} ms")
+        print(f"  {'consulta':<34} {'sqlite':>10} {'json':>10}")
+        for nome, consulta in consultas.items():
+            tempos = {
+                "sqlite": mediana_ms(lambda: consulta(banco), args.repeticoes),
+                "json": mediana_ms(lambda: consulta(mock), args.repeticoes)
+            }
+            resultados["consultas_ms"][nome] = tempos
+            print(f"  {nome:<34} {tempos['sqlite']:>8.2f}ms {tempos['json']:>8.2f}ms")
+        banco.fechar()
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(resultados, f, indent=2, ensure_ascii=False)
+        print(f"\nResultados salvos em {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Benchmark da busca de receitas: índice invertido x varredura por substring
+
+Cria receitas sintéticas no RecipeController (nomes e descrições montados de
+um vocabulário cervejeiro com acentos) e mede buscar_receitas para termos
+completos, prefixos, trechos e erros de digitação, contra o laço antigo que
+passava por todas as receitas a cada tecla.
+
+Uso:
+    python -m benchmarks.bench_busca_receitas
+    python -m benchmarks.bench_busca_receitas --receitas 1000 100000 --output resultado.json
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from typing import Any, Callable, Dict
+
+PALAVRAS = [
+    "lúpulo", "malte", "cítrico", "tostado", "caramelo", "café", "chocolate", "mel",
+    "laranjeira", "frutado", "seco", "doce", "amargo", "trigo", "centeio", "aveia",
+    "baunilha", "canela", "gengibre", "framboesa", "maracujá", "defumado", "herbal",
+    "floral", "resinoso", "pinho", "cravo", "banana", "especiarias", "carvalho"
+]
+ESTILOS = ["IPA", "APA", "Stout", "Porter", "Weiss", "Pilsen", "Saison", "Tripel",
+           "Dubbel", "Hidromel", "Melomel", "Sidra", "Bock", "Lager", "Sour"]
+TIPOS = ["Cerveja", "Hidromel", "Vinho", "Sidra"]
+TERMOS = ["lupulo", "tostad", "defumado pinho", "aracuj", "lupolo", "stout 4711"]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark da busca de receitas")
+    parser.add_argument("--receitas", type=int, nargs="+", default=[1000, 100000],
+                        help="Quantidade de receitas em cada rodada")
+    parser.add_argument("--limite", type=int, default=50,
+                        help="Resultados pedidos pela busca indexada (como numa lista da tela)")
+    parser.add_argument("--repeticoes", type=int, default=7,
+                        help="Repetições de cada medição (vale a mediana)")
+    parser.add_argument("--output", default=None,
+                        help="Arquivo JSON de saída")
+    return parser.parse_args()
+
+
+def mediana_ms(funcao: Callable[[], Any], repeticoes: int) -> float:
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    tempos.sort()
+    return tempos[len(tempos) // 2] * 1000
+
+
+def busca_por_varredura(receitas, termo: str):
+    """Implementação anterior de buscar_receitas"""
+    termo = termo.lower()
+    return [r for r in receitas.values()
+            if termo in r.nome.lower() or (r.descricao and termo in r.descricao.lower())]
+
+
+def main():
+    args = parse_args()
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from controls.recipe_controller import RecipeController
+
+    resultados: Dict[int, Dict[str, Any]] = {}
+    for quantidade in args.receitas:
+        aleatorio = random.Random(quantidade)
+        controller = RecipeController()
+        inicio = time.perf_counter()
+        for i in range(quantidade):
+            nome = f"{aleatorio.choice(ESTILOS)} {aleatorio.choice(PALAVRAS).capitalize()} {i}"
+            descricao = " ".join(aleatorio.sample(PALAVRAS, 6))
+            controller.criar_nova_receita(nome, aleatorio.choice(TIPOS), 20.0, descricao)
+        indexacao_ms = (time.perf_counter() - inicio) * 1000
+
+        resultados[quantidade] = {"indexacao_ms": indexacao_ms, "termos": {}}
+        print(f"{quantidade} receitas (criação + indexação {indexacao_ms:.0f} ms)")
+        for termo in TERMOS:
+            encontrados = len(controller.buscar_receitas(termo))
+            tempo_indice = mediana_ms(lambda: controller.buscar_receitas(termo, args.limite), args.repeticoes)
+            tempo_varredura = mediana_ms(lambda: busca_por_varredura(controller.receitas, termo), args.repeticoes)
+            resultados[quantidade]["termos"][termo] = {
+                "encontrados": encontrados,
+                "indice_ms": tempo_indice,
+                "varredura_ms": tempo_varredura
+            }
+            print(f"  {termo!r:>18} {encontrados:>7} achadas   índice {tempo_indice:>7.2f} ms   "
+                  f"varredura {tempo_varredura:>8.2f} ms")
+        tempo_tipo = mediana_ms(lambda: controller.obter_receitas_por_tipo("hidromel"), args.repeticoes)
+        resultados[quantidade]["por_tipo_ms"] = tempo_tipo
+        print(f"  obter_receitas_por_tipo {tempo_tipo:.2f} ms")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(resultados, f, indent=2, ensure_ascii=False)
+        print(f"\nResultados salvos em {args.output}")
+
+
+if __name__ == "__main__":
+    main()
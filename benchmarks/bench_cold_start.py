@@ -0,0 +1,131 @@
+"""
+Benchmark de inicialização a frio do carregamento de dados
+
+Cada cenário roda em um processo novo, com um mock_data.json sintético
+grande, e mede desde a importação de util.mock_data_loader até a primeira
+resposta. A referência é o comportamento anterior: json.load do arquivo
+inteiro na importação do módulo.
+
+Uso:
+    python -m benchmarks.bench_cold_start
+    python -m benchmarks.bench_cold_start --historico 200000 --repeticoes 3 --output resultado.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from typing import Dict
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Código executado no processo filho; imprime o tempo em ms
+CENARIOS: Dict[str, str] = {
+    "json.load inteiro (referência)": (
+        "import json\n"
+        "with open(os.environ['BEBREW_MOCK_DATA'], encoding='utf-8') as f: json.load(f)"
+    ),
+    "importar util.mock_data_loader": "import util.mock_data_loader",
+    "receitas (5 primeiras)": (
+        "from util.mock_data_loader import mock_loader\n"
+        "mock_loader.get_receitas(limite=5)"
+    ),
+    "configurações": (
+        "from util.mock_data_loader import mock_loader\n"
+        "mock_loader.get_configuracoes()"
+    ),
+    "dashboard completo": (
+        "from util.mock_data_loader import mock_loader\n"
+        "mock_loader.get_estatisticas(); mock_loader.get_producoes_ativas(); mock_loader.get_receitas(limite=5)"
+    ),
+}
+
+MODELO = """
+import os, sys, time
+{desativar}
+inicio = time.perf_counter()
+{codigo}
+print((time.perf_counter() - inicio) * 1000)
+"""
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark de inicialização a frio do Bebrew")
+    parser.add_argument("--historico", type=int, default=100000,
+                        help="Produções no histórico do arquivo sintético")
+    parser.add_argument("--receitas", type=int, default=2000,
+                        help="Receitas no arquivo sintético")
+    parser.add_argument("--repeticoes", type=int, default=3,
+                        help="Processos por cenário (vale a mediana)")
+    parser.add_argument("--output", default=None,
+                        help="Arquivo JSON de saída")
+    return parser.parse_args()
+
+
+def gerar_arquivo(caminho: str, args: argparse.Namespace):
+    receitas = [
+        {"id": f"r{i}", "nome": f"Receita {i}", "tipo": "Cerveja", "abv": 5.0,
+         "ingredientes": [{"nome": "Malte", "tipo": "malte", "quantidade": 1.0}] * 5,
+         "etapas": [{"nome": "Fervura", "duracao": 60}] * 4}
+        for i in range(args.receitas)
+    ]
+    producoes = [{"id": f"p{i}", "lote": f"LA{i}", "status": "Em Andamento", "progresso": 50} for i in range(5)]
+    historico = [
+        {"id": f"h{i}", "lote": f"L{i:06d}", "receita_nome": f"Receita {i % args.receitas}", "tipo": "Cerveja",
+         "status": "Concluída", "data_fim": "2024-01-01T00:00:00", "abv": 5.5, "avaliacao": 4,
+         "volume_final": 19.0, "notas": "Produção sintética"}
+        for i in range(args.historico)
+    ]
+    with open(caminho, "w", encoding="utf-8") as f:
+        json.dump({"receitas": receitas, "producoes": producoes, "historico": historico,
+                   "configuracoes": {"unidade": "celsius"}}, f, ensure_ascii=False)
+
+
+def medir(codigo: str, caminho: str, repeticoes: int, sem_ijson: bool = False) -> float:
+    script = MODELO.format(
+        desativar="sys.modules['ijson'] = None" if sem_ijson else "",
+        codigo=codigo
+    )
+    ambiente = dict(os.environ, BEBREW_MOCK_DATA=caminho, BEBREW_ARMAZENAMENTO="json", PYTHONPATH=RAIZ)
+    tempos = []
+    for _ in range(repeticoes):
+        saida = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True,
+                               check=True, cwd=RAIZ, env=ambiente).stdout
+        tempos.append(float(saida.strip().splitlines()[-1]))
+    tempos.sort()
+    return tempos[len(tempos) // 2]
+
+
+def main():
+    args = parse_args()
+    try:
+        import ijson  # noqa: F401
+        variantes = {"ijson": False, "sem ijson": True}
+    except ImportError:
+        variantes = {"sem ijson": True}
+
+    resultados = {"historico": args.historico, "receitas": args.receitas, "cenarios_ms": {}}
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminho = os.path.join(diretorio, "mock_data.json")
+        gerar_arquivo(caminho, args)
+        tamanho_mb = os.path.getsize(caminho) / 2 ** 20
+        resultados["arquivo_mb"] = tamanho_mb
+
+        print(f"Arquivo sintético: {tamanho_mb:.1f} MB "
+              f"({args.receitas} receitas, {args.historico} produções no histórico)")
+        print(f"  {'cenário':<34}" + "".join(f"{nome:>12}" for nome in variantes))
+        for nome, codigo in CENARIOS.items():
+            tempos = {variante: medir(codigo, caminho, args.repeticoes, sem_ijson)
+                      for variante, sem_ijson in variantes.items()}
+            resultados["cenarios_ms"][nome] = tempos
+            print(f"  {nome:<34}" + "".join(f"{tempo:>10.1f}ms" for tempo in tempos.values()))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(resultados, f, indent=2, ensure_ascii=False)
+        print(f"\nResultados salvos em {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Benchmark de listar_receitas: ordenações mantidas x ordenar tudo a cada chamada
+
+Cria receitas sintéticas no RecipeController e mede, para cada ordenação, a
+primeira página (20 receitas), uma página no meio da lista e a faixa de ABV
+entre 5% e 6%, contra copiar e ordenar todas as receitas como a versão
+anterior fazia. Também mede o custo de manter as ordenações ao alterar uma
+receita.
+
+Uso:
+    python -m benchmarks.bench_listar_receitas
+    python -m benchmarks.bench_listar_receitas --receitas 1000 100000 --output resultado.json
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict
+
+CHAVES_ANTIGAS = {
+    "nome": (lambda r: r.nome, False),
+    "tipo": (lambda r: r.tipo, False),
+    "data": (lambda r: r.data_criacao, True),
+    "abv": (lambda r: r.abv or 0, True),
+}
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark da listagem ordenada de receitas")
+    parser.add_argument("--receitas", type=int, nargs="+", default=[1000, 100000],
+                        help="Quantidade de receitas em cada rodada")
+    parser.add_argument("--pagina", type=int, default=20,
+                        help="Receitas por página")
+    parser.add_argument("--repeticoes", type=int, default=7,
+                        help="Repetições de cada medição (vale a mediana)")
+    parser.add_argument("--output", default=None,
+                        help="Arquivo JSON de saída")
+    return parser.parse_args()
+
+
+def mediana_ms(funcao: Callable[[], Any], repeticoes: int) -> float:
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    tempos.sort()
+    return tempos[len(tempos) // 2] * 1000
+
+
+def main():
+    args = parse_args()
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from controls.recipe_controller import RecipeController
+
+    resultados: Dict[int, Dict[str, Any]] = {}
+    for quantidade in args.receitas:
+        aleatorio = random.Random(quantidade)
+        controller = RecipeController()
+        base = datetime(2024, 1, 1)
+        inicio = time.perf_counter()
+        for i in range(quantidade):
+            receita = controller.criar_nova_receita(f"Receita {aleatorio.randrange(quantidade)}",
+                                                    aleatorio.choice(["Cerveja", "Hidromel", "Sidra"]), 20.0)
+            receita.data_criacao = base + timedelta(minutes=aleatorio.randrange(500000))
+            receita.abv = round(aleatorio.uniform(3, 12), 2)
+            controller.salvar_receita(receita)
+        criacao_ms = (time.perf_counter() - inicio) * 1000
+
+        ids = list(controller.receitas)
+        alvo = controller.receitas[ids[len(ids) // 2]]
+
+        def alterar():
+            alvo.abv = round(aleatorio.uniform(3, 12), 2)
+            controller.salvar_receita(alvo)
+
+        resultados[quantidade] = {"criacao_ms": criacao_ms,
+                                  "alteracao_ms": mediana_ms(alterar, args.repeticoes),
+                                  "ordenacoes": {}}
+        print(f"{quantidade} receitas (criação {criacao_ms:.0f} ms, "
+              f"alterar uma receita {resultados[quantidade]['alteracao_ms']:.3f} ms)")
+        meio = quantidade // 2
+        for ordem, (chave, decrescente) in CHAVES_ANTIGAS.items():
+            def antiga():
+                receitas = list(controller.receitas.values())
+                receitas.sort(key=chave, reverse=decrescente)
+                return receitas[:args.pagina]
+
+            assert antiga() == controller.listar_receitas(ordem, limite=args.pagina)
+            medidas = {
+                "ordenar_tudo_ms": mediana_ms(antiga, args.repeticoes),
+                "primeira_pagina_ms": mediana_ms(
+                    lambda: controller.listar_receitas(ordem, limite=args.pagina), args.repeticoes),
+                "pagina_do_meio_ms": mediana_ms(
+                    lambda: controller.listar_receitas(ordem, inicio=meio, limite=args.pagina), args.repeticoes),
+            }
+            resultados[quantidade]["ordenacoes"][ordem] = medidas
+            print(f"  {ordem:>5}  ordenar tudo {medidas['ordenar_tudo_ms']:>8.2f} ms   "
+                  f"1ª página {medidas['primeira_pagina_ms']:.3f} ms   "
+                  f"página do meio {medidas['pagina_do_meio_ms']:.3f} ms")
+        faixa_ms = mediana_ms(lambda: controller.listar_receitas("abv", minimo=5, maximo=6, limite=args.pagina),
+                              args.repeticoes)
+        resultados[quantidade]["faixa_abv_ms"] = faixa_ms
+        print(f"  ABV entre 5 e 6, primeira página {faixa_ms:.3f} ms")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(resultados, f, indent=2, ensure_ascii=False)
+        print(f"\nResultados salvos em {args.output}")
+
+
+if __name__ == "__main__":
+    main()
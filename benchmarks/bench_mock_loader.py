@@ -0,0 +1,179 @@
+"""
+Benchmark das consultas do MockDataLoader com os índices em memória
+
+Compara as buscas indexadas (id -> registro, status -> registros) e as
+estatísticas mantidas incrementalmente com a varredura linear anterior, em
+conjuntos sintéticos de 10k e 100k registros. As estatísticas do BancoLocal
+(agregados mantidos por gatilhos) são comparadas com as agregações SQL que
+varriam as tabelas a cada chamada.
+
+Uso:
+    python -m benchmarks.bench_mock_loader
+    python -m benchmarks.bench_mock_loader --tamanhos 10000 100000 1000000 --output resultado.json
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from typing import Any, Callable, Dict, List
+
+STATUS = ["Planejada"] * 2 + ["Em Andamento", "Fermentando"] + ["Concluída"] * 16
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark dos índices do MockDataLoader")
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=[10000, 100000],
+                        help="Quantidade de receitas e de produções em cada rodada")
+    parser.add_argument("--consultas", type=int, default=200,
+                        help="Consultas por id em cada medição")
+    parser.add_argument("--output", default=None,
+                        help="Arquivo JSON de saída")
+    return parser.parse_args()
+
+
+def gerar_dados(tamanho: int) -> Dict[str, Any]:
+    aleatorio = random.Random(tamanho)
+    return {
+        "receitas": [{"id": f"r{i}", "nome": f"Receita {i}", "tipo": "Cerveja", "abv": 5.0} for i in range(tamanho)],
+        "producoes": [
+            {"id": f"p{i}", "lote": f"L{i:07d}", "status": aleatorio.choice(STATUS)} for i in range(tamanho)
+        ],
+        "historico": [
+            {"id": f"h{i}", "tipo": "Cerveja", "status": "Concluída", "abv": round(aleatorio.uniform(3, 14), 1)}
+            for i in range(tamanho)
+        ],
+        "configuracoes": {},
+    }
+
+
+# Implementação anterior (varredura linear), como referência
+def receita_linear(data: Dict[str, Any], receita_id: str):
+    for receita in data["receitas"]:
+        if receita.get("id") == receita_id:
+            return receita
+    return None
+
+
+def producao_linear(data: Dict[str, Any], producao_id: str):
+    for producao in data["producoes"]:
+        if producao.get("id") == producao_id:
+            return producao
+    return None
+
+
+def ativas_linear(data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [p for p in data["producoes"] if p.get("status") in ["Em Andamento", "Fermentando"]]
+
+
+def estatisticas_linear(data: Dict[str, Any]) -> Dict[str, Any]:
+    abvs = [r["abv"] for r in data["receitas"] if r.get("abv")] + [h["abv"] for h in data["historico"] if h.get("abv")]
+    return {
+        "total_receitas": len(data["receitas"]),
+        "producoes_ativas": len(ativas_linear(data)),
+        "abv_medio": sum(abvs) / len(abvs) if abvs else 0,
+        "ultima_producao": data["producoes"][-1].get("lote", "Nenhuma") if data["producoes"] else "Nenhuma",
+        "total_historico": len(data["historico"])
+    }
+
+
+# Agregações que o BancoLocal fazia a cada chamada, como referência
+SQL_ESTATISTICAS_VARREDURA = [
+    """SELECT
+        (SELECT COUNT(*) FROM receitas),
+        (SELECT COUNT(*) FROM producoes WHERE historico = 0 AND status IN ('Em Andamento', 'Fermentando')),
+        (SELECT COUNT(*) FROM producoes WHERE historico = 1),
+        (SELECT COALESCE(SUM(abv), 0) FROM receitas WHERE abv != 0),
+        (SELECT COUNT(*) FROM receitas WHERE abv != 0),
+        (SELECT COALESCE(SUM(abv), 0) FROM producoes WHERE historico = 1 AND abv != 0),
+        (SELECT COUNT(*) FROM producoes WHERE historico = 1 AND abv != 0),
+        (SELECT lote FROM producoes WHERE historico = 0 ORDER BY rowid DESC LIMIT 1),
+        (SELECT MIN(abv) FROM receitas WHERE abv != 0),
+        (SELECT MAX(abv) FROM receitas WHERE abv != 0),
+        (SELECT MIN(abv) FROM producoes WHERE historico = 1 AND abv != 0),
+        (SELECT MAX(abv) FROM producoes WHERE historico = 1 AND abv != 0)""",
+    "SELECT status, COUNT(*) FROM producoes WHERE historico = 0 GROUP BY status",
+    "SELECT tipo, COUNT(*) FROM receitas GROUP BY tipo",
+]
+
+
+def estatisticas_varredura_sql(banco) -> None:
+    for sql in SQL_ESTATISTICAS_VARREDURA:
+        banco.conexao.execute(sql).fetchall()
+
+
+def us_por_chamada(funcao: Callable[[], Any], chamadas: int) -> float:
+    inicio = time.perf_counter()
+    for _ in range(chamadas):
+        funcao()
+    return (time.perf_counter() - inicio) / chamadas * 1e6
+
+
+def main():
+    args = parse_args()
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    os.environ["BEBREW_ARMAZENAMENTO"] = "json"
+    from util.banco_local import BancoLocal
+    from util.mock_data_loader import MockDataLoader
+
+    resultados = {}
+    for tamanho in args.tamanhos:
+        data = gerar_dados(tamanho)
+        carregador = MockDataLoader.__new__(MockDataLoader)
+        inicio = time.perf_counter()
+        carregador.data = data
+        indexacao_ms = (time.perf_counter() - inicio) * 1000
+
+        aleatorio = random.Random(0)
+        ids = [aleatorio.randrange(tamanho) for _ in range(args.consultas)]
+        receitas = iter([f"r{i}" for i in ids] * 2)
+        producoes = iter([f"p{i}" for i in ids] * 2)
+        chamadas_varredura = max(1, min(args.consultas, 2000000 // tamanho))
+
+        medidas = {
+            "get_receita_by_id": (
+                us_por_chamada(lambda: carregador.get_receita_by_id(next(receitas)), args.consultas),
+                us_por_chamada(lambda: receita_linear(data, next(receitas)), args.consultas)
+            ),
+            "get_producao_by_id": (
+                us_por_chamada(lambda: carregador.get_producao_by_id(next(producoes)), args.consultas),
+                us_por_chamada(lambda: producao_linear(data, next(producoes)), args.consultas)
+            ),
+            "get_producoes_ativas": (
+                us_por_chamada(carregador.get_producoes_ativas, chamadas_varredura),
+                us_por_chamada(lambda: ativas_linear(data), chamadas_varredura)
+            ),
+            "get_estatisticas": (
+                us_por_chamada(carregador.get_estatisticas, args.consultas),
+                us_por_chamada(lambda: estatisticas_linear(data), chamadas_varredura)
+            ),
+        }
+        assert carregador.get_producoes_ativas() == ativas_linear(data)
+
+        banco = BancoLocal(':memory:', importar_json=False)
+        banco.importar(data)
+        medidas["get_estatisticas (sqlite)"] = (
+            us_por_chamada(banco.get_estatisticas, args.consultas),
+            us_por_chamada(lambda: estatisticas_varredura_sql(banco), chamadas_varredura)
+        )
+        banco.fechar()
+
+        resultados[tamanho] = {
+            "indexacao_ms": indexacao_ms,
+            "consultas_us": {nome: {"indexado": indexado, "linear": linear}
+                             for nome, (indexado, linear) in medidas.items()}
+        }
+        print(f"{tamanho} receitas e {tamanho} produções (índices construídos em {indexacao_ms:.0f} ms)")
+        for nome, (indexado, linear) in medidas.items():
+            print(f"  {nome:<26} indexado {indexado:>10.2f} µs   linear {linear:>10.2f} µs   "
+                  f"({linear / indexado:.0f}x)")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(resultados, f, indent=2, ensure_ascii=False)
+        print(f"\nResultados salvos em {args.output}")
+
+
+if __name__ == "__main__":
+    main()
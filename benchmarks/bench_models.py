@@ -0,0 +1,147 @@
+"""
+Benchmark de memória e alocação dos modelos de domínio
+
+Mede bytes por objeto de cada modelo e o custo de montar um catálogo de
+receitas (com ingredientes e etapas) usando tracemalloc. Com --compare-ref
+executa a mesma medição nos modelos de outro commit, para comparar o antes
+e o depois.
+
+Uso:
+    python -m benchmarks.bench_models
+    python -m benchmarks.bench_models --receitas 50000 --compare-ref HEAD~1
+"""
+import argparse
+import gc
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark de memória dos modelos do Bebrew")
+    parser.add_argument("--objetos", type=int, default=10000,
+                        help="Instâncias criadas por modelo na medição individual")
+    parser.add_argument("--receitas", type=int, default=50000,
+                        help="Receitas no catálogo sintético")
+    parser.add_argument("--compare-ref", default=None,
+                        help="Commit/branch cujos modelos servem de comparação (ex: HEAD~1)")
+    parser.add_argument("--models-path", default=None,
+                        help=argparse.SUPPRESS)  # diretório com o pacote models/ a medir
+    parser.add_argument("--json", action="store_true",
+                        help="Imprime somente o resultado em JSON")
+    parser.add_argument("--output", default=None,
+                        help="Arquivo JSON de saída")
+    return parser.parse_args()
+
+
+def medir(criar: Callable[[int], Any], quantidade: int) -> Dict[str, float]:
+    """Bytes alocados e tempo por item ao criar `quantidade` itens"""
+    # Tempo medido sem o tracemalloc, que deixa as alocações mais lentas
+    gc.collect()
+    inicio = time.perf_counter()
+    itens = [criar(i) for i in range(quantidade)]
+    duracao = time.perf_counter() - inicio
+    del itens
+    
+    gc.collect()
+    tracemalloc.start()
+    itens = [criar(i) for i in range(quantidade)]
+    memoria, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # Desconta a própria lista que guarda os itens
+    memoria -= sys.getsizeof(itens)
+    del itens
+    return {
+        "bytes_por_item": memoria / quantidade,
+        "us_por_item": duracao / quantidade * 1e6
+    }
+
+
+def executar(args: argparse.Namespace) -> Dict[str, Any]:
+    from models import Ingrediente, Etapa, EtapaExecucao, Receita, Producao
+
+    def criar_receita(i: int):
+        receita = Receita(f"Receita {i}", "cerveja", 20.0, "Receita sintética")
+        receita.og, receita.fg = 1.050, 1.010
+        for j in range(5):
+            receita.adicionar_ingrediente(Ingrediente(f"Malte {j}", "malte", "kg", 1.5))
+        for j in range(4):
+            receita.adicionar_etapa(Etapa(f"Etapa {j}", "Descrição", 60, 65.0))
+        return receita
+
+    receita_base = criar_receita(0)
+    modelos = {
+        "Ingrediente": lambda i: Ingrediente(f"Malte {i}", "malte", "kg", 1.5),
+        "Etapa": lambda i: Etapa(f"Etapa {i}", "Descrição", 60, 65.0),
+        "EtapaExecucao": lambda i: EtapaExecucao("etapa"),
+        "Receita (vazia)": lambda i: Receita(f"Receita {i}", "cerveja", 20.0),
+        "Producao": lambda i: Producao(receita_base, f"L{i}"),
+    }
+
+    resultado = {
+        "modelos": {nome: medir(criar, args.objetos) for nome, criar in modelos.items()},
+        "catalogo": medir(criar_receita, args.receitas)
+    }
+    resultado["catalogo"]["receitas"] = args.receitas
+    resultado["catalogo"]["mb_total"] = resultado["catalogo"]["bytes_por_item"] * args.receitas / 2 ** 20
+    return resultado
+
+
+def executar_em_ref(ref: str, args: argparse.Namespace) -> Dict[str, Any]:
+    """Roda o benchmark em um subprocesso com os modelos exportados de outro commit"""
+    with tempfile.TemporaryDirectory() as destino:
+        arquivo = subprocess.run(["git", "archive", ref, "models"], capture_output=True, check=True).stdout
+        subprocess.run(["tar", "-x", "-C", destino], input=arquivo, check=True)
+        saida = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_models", "--json", "--models-path", destino,
+             "--objetos", str(args.objetos), "--receitas", str(args.receitas)],
+            capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        ).stdout
+    return json.loads(saida)
+
+
+def imprimir(titulo: str, resultado: Dict[str, Any], referencia: Dict[str, Any] = None):
+    print(titulo)
+    linhas = dict(resultado["modelos"], **{"Catálogo (por receita)": resultado["catalogo"]})
+    anteriores = dict(referencia["modelos"], **{"Catálogo (por receita)": referencia["catalogo"]}) if referencia else {}
+    for nome, medida in linhas.items():
+        linha = f"  {nome:<24} {medida['bytes_por_item']:>10.0f} B  {medida['us_por_item']:>8.2f} µs"
+        if nome in anteriores:
+            antes = anteriores[nome]
+            linha += (f"   (antes: {antes['bytes_por_item']:.0f} B, {antes['us_por_item']:.2f} µs; "
+                      f"memória {(medida['bytes_por_item'] / antes['bytes_por_item'] - 1) * 100:+.0f}%)")
+        print(linha)
+    print(f"  Catálogo de {resultado['catalogo']['receitas']} receitas: {resultado['catalogo']['mb_total']:.1f} MB")
+
+
+def main():
+    args = parse_args()
+    raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    sys.path.insert(0, args.models_path or raiz)
+
+    resultado = executar(args)
+    if args.json:
+        print(json.dumps(resultado))
+        return
+
+    referencia = None
+    if args.compare_ref:
+        referencia = executar_em_ref(args.compare_ref, args)
+        resultado["referencia"] = {"ref": args.compare_ref, **referencia}
+
+    imprimir("Modelos atuais:", resultado, referencia)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(resultado, f, indent=2, ensure_ascii=False)
+        print(f"\nResultados salvos em {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Benchmark dos codecs de serialização (util/serializacao.py)
+
+Monta uma produção com um histórico longo de temperaturas e mede tamanho
+e tempo de ida e volta nos codecs JSON e binário (pickle como referência).
+
+Uso:
+    python -m benchmarks.bench_serializacao
+    python -m benchmarks.bench_serializacao --pontos 500000 --etapas 4 --output resultado.json
+"""
+import argparse
+import json
+import os
+import pickle
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark de serialização do Bebrew")
+    parser.add_argument("--pontos", type=int, default=120000,
+                        help="Leituras de temperatura no total da produção")
+    parser.add_argument("--etapas", type=int, default=4,
+                        help="Etapas entre as quais as leituras são divididas")
+    parser.add_argument("--repeticoes", type=int, default=5,
+                        help="Repetições de cada medição (vale a mediana)")
+    parser.add_argument("--output", default=None,
+                        help="Arquivo JSON de saída")
+    return parser.parse_args()
+
+
+def criar_producao(pontos: int, etapas: int):
+    """Produção concluída com todas as leituras brutas retidas"""
+    from models import Receita, Ingrediente, Etapa, Producao, Telemetria
+
+    receita = Receita("Hidromel Tradicional", "hidromel", 20.0, "Benchmark")
+    receita.og, receita.fg = 1.100, 1.010
+    receita.adicionar_ingrediente(Ingrediente("Mel", "açúcar", "kg", 6.0))
+    for i in range(etapas):
+        receita.adicionar_etapa(Etapa(f"Etapa {i}", "Descrição", 20160, 18.0))
+
+    producao = Producao(receita, "L-BENCH")
+    producao.iniciar_producao()
+    inicio = datetime(2024, 1, 1)
+    por_etapa = pontos // etapas
+    for i, etapa in enumerate(producao.etapas_execucao):
+        etapa.temperaturas = Telemetria(janela=None, capacidade_maxima=None)
+        base = inicio + timedelta(seconds=i * por_etapa * 10)
+        for j in range(por_etapa):
+            etapa.adicionar_temperatura(18.0 + (j % 100) * 0.01, base + timedelta(seconds=j * 10))
+            if j % 1000 == 0:
+                etapa.adicionar_anotacao(f"Leitura {j}", base + timedelta(seconds=j * 10))
+        etapa.finalizar_etapa()
+    return producao
+
+
+def mediana_ms(funcao: Callable[[], Any], repeticoes: int) -> float:
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    tempos.sort()
+    return tempos[len(tempos) // 2] * 1000
+
+
+def main():
+    args = parse_args()
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from util.serializacao import para_json, de_json, para_binario, de_binario
+
+    producao = criar_producao(args.pontos, args.etapas)
+    pontos = sum(len(etapa.temperaturas) for etapa in producao.etapas_execucao)
+
+    codecs: Dict[str, Any] = {
+        "json": (para_json, de_json),
+        "binario": (para_binario, de_binario),
+        "pickle (referência)": (
+            lambda obj: pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL),
+            pickle.loads
+        ),
+    }
+
+    resultados = {}
+    print(f"Produção com {pontos} leituras em {len(producao.etapas_execucao)} etapas")
+    for nome, (codificar, decodificar) in codecs.items():
+        dados = codificar(producao)
+        resultado = {
+            "bytes": len(dados),
+            "bytes_por_ponto": len(dados) / pontos,
+            "codificar_ms": mediana_ms(lambda: codificar(producao), args.repeticoes),
+            "decodificar_ms": mediana_ms(lambda: decodificar(dados), args.repeticoes)
+        }
+        resultados[nome] = resultado
+        print(
+            f"  {nome:<20} {resultado['bytes'] / 1024:>10.1f} KiB  "
+            f"{resultado['bytes_por_ponto']:>6.1f} B/ponto  "
+            f"codificar {resultado['codificar_ms']:>8.2f} ms  decodificar {resultado['decodificar_ms']:>8.2f} ms"
+        )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"pontos": pontos, "etapas": args.etapas, "codecs": resultados}, f, indent=2)
+        print(f"\nResultados salvos em {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,162 @@
+import os
+import numpy as np
 from typing import List, Optional, Dict, Any
 from datetime import datetime
-from models import Producao, Receita, EtapaExecucao
+from models import Producao, Receita, EtapaExecucao, SerieTemporal
 from util.abv_calculator import ABVCalculator
+from util.curva_fermentacao import prever_fermentacao
+from util.registro_eventos import RegistroEventos
+
+# Pontos por gráfico antes de trocar as leituras brutas por médias agregadas
+MAX_PONTOS_GRAFICO = 2000
+
+# Eventos no log de uma produção antes de gravar um novo snapshot
+EVENTOS_POR_SNAPSHOT = 5000
+
+# Resultados de ABV memorizados por (og, fg, metodo)
+TAMANHO_CACHE_ABV = 256
+
+# Produções nesses status não são recuperadas na inicialização
+STATUS_ENCERRADOS = ("Concluída", "Cancelada")
+
+# Subdiretório de diretorio_dados para onde vão os logs das produções encerradas
+DIRETORIO_ENCERRADAS = "encerradas"
 
 class BrewController:
     """Controlador para operações de produção de bebidas"""
     
-    def __init__(self):
+    def __init__(self, diretorio_dados: Optional[str] = None):
+        """
+        Args:
+            diretorio_dados: Diretório dos logs de eventos das produções. Se
+                informado, as produções em andamento são recuperadas dele e
+                toda alteração é registrada antes de retornar.
+        """
         self.producoes_ativas: Dict[str, Producao] = {}
         self.producao_atual: Optional[Producao] = None
-        self.abv_calculator = ABVCalculator()
+        self.abv_calculator = ABVCalculator(tamanho_cache=TAMANHO_CACHE_ABV)
+        self.diretorio_dados = diretorio_dados
+        self._registros: Dict[str, RegistroEventos] = {}
+        
+        if diretorio_dados:
+            self.recuperar_producoes()
+            
+    # Persistência
+    def _registro(self, producao_id: str) -> Optional[RegistroEventos]:
+        if not self.diretorio_dados:
+            return None
+        if producao_id not in self._registros:
+            self._registros[producao_id] = RegistroEventos(os.path.join(self.diretorio_dados, producao_id))
+        return self._registros[producao_id]
+        
+    def _registrar(self, producao: Producao, tipo: str, dados: Dict[str, Any],
+                   timestamp: Optional[datetime] = None, duravel: bool = True):
+        """Acrescenta um evento ao log da produção, com snapshot periódico"""
+        registro = self._registro(producao.id)
+        if registro is None:
+            return
+        registro.registrar(tipo, dados, timestamp, duravel)
+        if registro.eventos_desde_snapshot >= EVENTOS_POR_SNAPSHOT:
+            registro.gravar_snapshot(producao)
+            
+    def _gravar_snapshot(self, producao: Producao):
+        registro = self._registro(producao.id)
+        if registro is not None:
+            registro.gravar_snapshot(producao)
+            
+    def _aplicar_evento(self, producao: Producao, tipo: str, dados: Dict[str, Any], timestamp: datetime):
+        """Reaplica um evento do log, com o horário em que foi registrado"""
+        etapa_atual = producao.obter_etapa_atual()
+        if tipo == "temperatura" and etapa_atual:
+            etapa_atual.adicionar_temperatura(dados["valor"], timestamp)
+        elif tipo == "anotacao" and etapa_atual:
+            etapa_atual.adicionar_anotacao(dados["texto"], timestamp)
+        elif tipo == "densidade":
+            self._aplicar_densidade(producao, dados["valor"], dados["tipo"], timestamp)
+        elif tipo == "iniciar_etapa":
+            producao.iniciar_etapa_atual()
+            etapa_atual.inicio = timestamp
+        elif tipo == "finalizar_etapa":
+            producao.finalizar_etapa_atual()
+            etapa_atual.fim = timestamp
+        elif tipo == "problema":
+            producao.problemas_encontrados.append(dados["texto"])
+        elif tipo == "modificacao":
+            producao.modificacoes_receita.append(dados["texto"])
+            
+    def recuperar_producoes(self) -> int:
+        """
+        Reconstrói as produções em andamento a partir dos logs de eventos
+        
+        Returns:
+            Número de produções recuperadas
+        """
+        if not os.path.isdir(self.diretorio_dados):
+            return 0
+            
+        for nome in sorted(os.listdir(self.diretorio_dados)):
+            caminho = os.path.join(self.diretorio_dados, nome)
+            if nome == DIRETORIO_ENCERRADAS or not os.path.isdir(caminho):
+                continue
+                
+            registro = RegistroEventos(caminho)
+            try:
+                producao, eventos = registro.carregar()
+            except (OSError, ValueError) as e:
+                print(f"Erro ao recuperar produção {nome}: {e}")
+                continue
+            if producao is None:
+                continue
+            if producao.status in STATUS_ENCERRADOS:
+                # Log anterior ao arquivamento: não é lido de novo na próxima vez
+                self._arquivar(nome)
+                continue
+                
+            for _, timestamp, tipo, dados in eventos:
+                try:
+                    self._aplicar_evento(producao, tipo, dados, timestamp)
+                except (KeyError, ValueError) as e:
+                    print(f"Evento {tipo} ignorado na produção {nome}: {e}")
+                    
+            self._registros[producao.id] = registro
+            self.producoes_ativas[producao.id] = producao
+            # Compacta o log já reaplicado, para a próxima inicialização
+            if eventos:
+                registro.gravar_snapshot(producao)
+                
+        return len(self.producoes_ativas)
+        
+    def _encerrar_registro(self, producao: Producao):
+        """Grava o estado final da produção e fecha o seu log"""
+        if not self.diretorio_dados:
+            return
+        registro = self._registro(producao.id)
+        registro.gravar_snapshot(producao)
+        registro.fechar()
+        del self._registros[producao.id]
+        self._arquivar(producao.id)
+        
+    def _arquivar(self, producao_id: str):
+        """Move o log de uma produção encerrada para fora da recuperação"""
+        destino = os.path.join(self.diretorio_dados, DIRETORIO_ENCERRADAS)
+        os.makedirs(destino, exist_ok=True)
+        try:
+            os.replace(os.path.join(self.diretorio_dados, producao_id),
+                       os.path.join(destino, producao_id))
+        except OSError as e:
+            print(f"Erro ao arquivar produção {producao_id}: {e}")
+            
+    def fechar(self):
+        """Confirma os eventos pendentes e fecha os logs"""
+        for registro in self._registros.values():
+            registro.fechar()
+        self._registros.clear()
         
     def criar_nova_producao(self, receita: Receita, lote: Optional[str] = None) -> Producao:
         """Cria uma nova produção baseada em uma receita"""
         producao = Producao(receita, lote)
         self.producoes_ativas[producao.id] = producao
+        self._gravar_snapshot(producao)
         return producao
         
     def iniciar_producao(self, producao_id: str) -> bool:
@@ -25,6 +167,7 @@ class BrewController:
         producao = self.producoes_ativas[producao_id]
         try:
             producao.iniciar_producao()
+            self._gravar_snapshot(producao)
             self.producao_atual = producao
             return True
         except ValueError:
@@ -38,6 +181,7 @@ class BrewController:
         producao = self.producoes_ativas[producao_id]
         if producao.status == "Em Andamento":
             producao.adicionar_problema(f"Pausada: {motivo}")
+            self._registrar(producao, "problema", {"texto": producao.problemas_encontrados[-1]})
             return True
         return False
         
@@ -48,6 +192,7 @@ class BrewController:
             
         producao = self.producoes_ativas[producao_id]
         producao.adicionar_problema("Produção retomada")
+        self._registrar(producao, "problema", {"texto": producao.problemas_encontrados[-1]})
         self.producao_atual = producao
         return True
         
@@ -59,6 +204,7 @@ class BrewController:
         producao = self.producoes_ativas[producao_id]
         try:
             producao.iniciar_etapa_atual()
+            self._registrar(producao, "iniciar_etapa", {}, producao.obter_etapa_atual().inicio)
             return True
         except ValueError:
             return False
@@ -70,7 +216,9 @@ class BrewController:
             
         producao = self.producoes_ativas[producao_id]
         try:
+            etapa_atual = producao.obter_etapa_atual()
             producao.finalizar_etapa_atual()
+            self._registrar(producao, "finalizar_etapa", {}, etapa_atual.fim)
             return True
         except ValueError:
             return False
@@ -84,7 +232,10 @@ class BrewController:
         etapa_atual = producao.obter_etapa_atual()
         
         if etapa_atual:
-            etapa_atual.adicionar_temperatura(temperatura)
+            timestamp = datetime.now()
+            etapa_atual.adicionar_temperatura(temperatura, timestamp)
+            # Leituras de sensor são confirmadas em lote pelo group commit
+            self._registrar(producao, "temperatura", {"valor": float(temperatura)}, timestamp, duravel=False)
             return True
         return False
         
@@ -97,7 +248,9 @@ class BrewController:
         etapa_atual = producao.obter_etapa_atual()
         
         if etapa_atual:
-            etapa_atual.adicionar_anotacao(anotacao)
+            timestamp = datetime.now()
+            etapa_atual.adicionar_anotacao(anotacao, timestamp)
+            self._registrar(producao, "anotacao", {"texto": anotacao}, timestamp)
             return True
         return False
         
@@ -107,7 +260,17 @@ class BrewController:
             return False
             
         producao = self.producoes_ativas[producao_id]
+        timestamp = datetime.now()
+        self._aplicar_densidade(producao, densidade, tipo, timestamp)
+        self._registrar(producao, "densidade", {"valor": float(densidade), "tipo": tipo}, timestamp)
+        return True
         
+    def _aplicar_densidade(self, producao: Producao, densidade: float, tipo: str,
+                           timestamp: Optional[datetime] = None):
+        producao.densidades.adicionar(densidade, timestamp)
+        # O resultado memorizado das densidades anteriores não será mais consultado
+        if producao.og_medido and producao.fg_medido:
+            self.abv_calculator.invalidar(producao.og_medido, producao.fg_medido)
         if tipo.lower() == "og":
             producao.og_medido = densidade
         elif tipo.lower() == "fg":
@@ -118,8 +281,6 @@ class BrewController:
                     producao.og_medido, producao.fg_medido
                 )['abv']
         
-        return True
-        
     def finalizar_producao(self, producao_id: str, volume_final: Optional[float] = None) -> bool:
         """Finaliza uma produção"""
         if producao_id not in self.producoes_ativas:
@@ -131,8 +292,11 @@ class BrewController:
             producao.volume_final = volume_final
             
         producao.finalizar_producao()
+        self._encerrar_registro(producao)
         
         # Remove da lista de produções ativas
+        del self.producoes_ativas[producao_id]
+        
         if self.producao_atual and self.producao_atual.id == producao_id:
             self.producao_atual = None
             
@@ -145,6 +309,7 @@ class BrewController:
             
         producao = self.producoes_ativas[producao_id]
         producao.cancelar_producao(motivo)
+        self._encerrar_registro(producao)
         
         # Remove da lista de produções ativas
         del self.producoes_ativas[producao_id]
@@ -162,20 +327,29 @@ class BrewController:
         producao = self.producoes_ativas[producao_id]
         return producao.obter_estatisticas()
         
-    def obter_temperaturas_etapa_atual(self, producao_id: str) -> List[tuple]:
-        """Obtém as temperaturas registradas na etapa atual"""
+    def obter_temperaturas_etapa_atual(self, producao_id: str, inicio: Optional[datetime] = None,
+                                       fim: Optional[datetime] = None,
+                                       max_pontos: Optional[int] = None) -> SerieTemporal:
+        """
+        Obtém as temperaturas registradas na etapa atual
+        
+        Períodos fora da janela de leituras brutas (ou com mais de
+        `max_pontos` leituras) retornam as médias por 1 ou 15 minutos.
+        """
         if producao_id not in self.producoes_ativas:
-            return []
+            return SerieTemporal()
             
         producao = self.producoes_ativas[producao_id]
         etapa_atual = producao.obter_etapa_atual()
         
         if etapa_atual:
-            return etapa_atual.temperaturas
-        return []
+            return etapa_atual.temperaturas.consultar(inicio, fim, max_pontos)['serie']
+        return SerieTemporal()
         
-    def obter_dados_grafico(self, producao_id: str) -> Dict[str, Any]:
-        """Obtém dados formatados para gráficos"""
+    def obter_dados_grafico(self, producao_id: str, inicio: Optional[datetime] = None,
+                            fim: Optional[datetime] = None,
+                            max_pontos: int = MAX_PONTOS_GRAFICO) -> Dict[str, Any]:
+        """Obtém dados formatados para gráficos, no nível de detalhe adequado ao período"""
         if producao_id not in self.producoes_ativas:
             return {}
             
@@ -189,6 +363,9 @@ class BrewController:
             'receita_nome': producao.receita.nome,
             'etapa_atual': None,
             'temperaturas': [],
+            'nivel_temperaturas': None,
+            'temperaturas_min': None,
+            'temperaturas_max': None,
             'temperatura_alvo': None,
             'tempo_decorrido': str(producao.duracao_total()) if producao.duracao_total() else "N/A"
         }
@@ -204,7 +381,11 @@ class BrewController:
                 dados['etapa_atual'] = etapa_receita.nome
                 dados['temperatura_alvo'] = etapa_receita.temperatura_alvo
                 
-            dados['temperaturas'] = etapa_atual.temperaturas
+            consulta = etapa_atual.temperaturas.consultar(inicio, fim, max_pontos)
+            dados['temperaturas'] = consulta['serie']
+            dados['nivel_temperaturas'] = consulta['nivel']
+            dados['temperaturas_min'] = consulta['minimos']
+            dados['temperaturas_max'] = consulta['maximos']
             
         # Adicionar dados de ABV se disponíveis
         if producao.og_medido and producao.fg_medido:
@@ -221,6 +402,50 @@ class BrewController:
             
         return dados
         
+    def prever_fermentacao(self, producao_id: str,
+                           temperatura_futura: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Prevê FG, dias até a densidade terminal e ABV a partir das leituras da produção
+        
+        Ajusta a curva de atenuação às densidades registradas, com as
+        temperaturas de todas as etapas (ver util/curva_fermentacao.py).
+        Sem leituras suficientes, estima pelo FG e tempo da receita.
+        
+        Args:
+            producao_id: ID da produção
+            temperatura_futura: Temperatura prevista daqui em diante (padrão: a última lida)
+            
+        Returns:
+            Previsão com intervalos de 95%, ou None se a produção não existir
+            ou não houver OG (medido, lido ou da receita)
+        """
+        if producao_id not in self.producoes_ativas:
+            return None
+            
+        producao = self.producoes_ativas[producao_id]
+        og = producao.og_medido or producao.receita.og
+        if not og and not len(producao.densidades):
+            return None
+        
+        tempos, temperaturas = [], []
+        for etapa in producao.etapas_execucao:
+            if etapa.possui_temperaturas:
+                serie = etapa.temperaturas.consultar(max_pontos=MAX_PONTOS_GRAFICO)['serie']
+                tempos.append(serie.tempos)
+                temperaturas.append(serie.valores)
+        if tempos:
+            tempos, temperaturas = np.concatenate(tempos), np.concatenate(temperaturas)
+            ordem = np.argsort(tempos, kind='stable')
+            tempos, temperaturas = tempos[ordem], temperaturas[ordem]
+        
+        return prever_fermentacao(
+            producao.densidades.tempos, producao.densidades.valores, og,
+            tempos if len(tempos) else None, temperaturas if len(temperaturas) else None,
+            temperatura_futura,
+            fg_esperado=producao.receita.fg,
+            dias_esperados=producao.receita.tempo_fermentacao
+        )
+        
     def listar_producoes_ativas(self) -> List[Dict]:
         """Lista todas as produções ativas"""
         return [producao.obter_estatisticas() for producao in self.producoes_ativas.values()]
@@ -240,6 +465,7 @@ class BrewController:
             
         producao = self.producoes_ativas[producao_id]
         producao.adicionar_problema(problema)
+        self._registrar(producao, "problema", {"texto": producao.problemas_encontrados[-1]})
         return True
         
     def adicionar_modificacao(self, producao_id: str, modificacao: str) -> bool:
@@ -249,4 +475,5 @@ class BrewController:
             
         producao = self.producoes_ativas[producao_id]
         producao.adicionar_modificacao(modificacao)
+        self._registrar(producao, "modificacao", {"texto": producao.modificacoes_receita[-1]})
         return True
@@ -1,6 +1,21 @@
-from typing import List, Optional, Dict
+from datetime import datetime
+from typing import Any, Callable, List, Optional, Dict, Tuple
 from models import Receita, Ingrediente, Etapa
 from util.abv_calculator import ABVCalculator
+from util.indice_receitas import IndiceReceitas
+from util.lista_ordenada import ListaOrdenada
+from util.serializacao import para_documento
+
+# Resultados de ABV memorizados por (og, fg, metodo)
+TAMANHO_CACHE_ABV = 256
+
+# Ordenações de listar_receitas: valor de cada receita e se é decrescente
+ORDENACOES: Dict[str, Tuple[Callable[[Receita], Any], bool]] = {
+    'nome': (lambda r: r.nome, False),
+    'tipo': (lambda r: r.tipo, False),
+    'data': (lambda r: r.data_criacao, True),
+    'abv': (lambda r: r.abv or 0, True),
+}
 
 class RecipeController:
     """Controlador para gerenciamento de receitas"""
@@ -8,12 +23,78 @@ class RecipeController:
     def __init__(self):
         self.receitas: Dict[str, Receita] = {}
         self.receita_atual: Optional[Receita] = None
-        self.abv_calculator = ABVCalculator()
+        self.abv_calculator = ABVCalculator(tamanho_cache=TAMANHO_CACHE_ABV)
+        # Índice de busca por nome/descrição e por tipo, mantido a cada alteração
+        self.indice = IndiceReceitas()
+        # Uma lista ordenada de (chave, sequência, id) por ordenação; a
+        # sequência desempata na ordem em que as receitas entraram
+        self.ordenacoes: Dict[str, ListaOrdenada] = {ordem: ListaOrdenada() for ordem in ORDENACOES}
+        self._entradas_ordenacao: Dict[str, Dict[str, tuple]] = {}
+        self._sequencia: Dict[str, int] = {}
+        self._proxima_sequencia = 0
+        
+    def _registrar(self, receita: Receita):
+        """Guarda a receita e atualiza o índice de busca e as ordenações"""
+        self.receitas[receita.id] = receita
+        self.indice.adicionar(receita.id, receita.nome, receita.descricao, receita.tipo)
+        self._reordenar(receita)
+        
+    @staticmethod
+    def _chave(ordem: str, valor: Any) -> Any:
+        """Chave crescente da ordenação para um valor (datas e decrescentes convertidas)
+        
+        Valores ausentes (None) ficam sempre no fim da lista e nunca são
+        comparados com os demais.
+        """
+        if valor is None:
+            return (True, 0)
+        if isinstance(valor, datetime):
+            valor = valor.timestamp()
+        return (False, -valor if ORDENACOES[ordem][1] else valor)
+        
+    def _reordenar(self, receita: Receita):
+        """Atualiza a posição da receita em cada ordenação (O(log n) por lista)
+        
+        As entradas novas entram antes de as antigas saírem; se alguma não
+        puder ser ordenada (TypeError), as já inseridas são desfeitas e as
+        listas ficam como estavam.
+        """
+        receita_id = receita.id
+        sequencia = self._sequencia.get(receita_id, self._proxima_sequencia)
+        antigas = self._entradas_ordenacao.get(receita_id, {})
+        novas = {
+            ordem: (self._chave(ordem, valor(receita)), sequencia, receita_id)
+            for ordem, (valor, _) in ORDENACOES.items()
+        }
+        
+        inseridas = []
+        try:
+            for ordem, entrada in novas.items():
+                if antigas.get(ordem) != entrada:
+                    self.ordenacoes[ordem].adicionar(entrada)
+                    inseridas.append(ordem)
+        except TypeError:
+            for ordem in inseridas:
+                self.ordenacoes[ordem].remover(novas[ordem])
+            raise
+        for ordem in inseridas:
+            if ordem in antigas:
+                self.ordenacoes[ordem].remover(antigas[ordem])
+                
+        if receita_id not in self._sequencia:
+            self._sequencia[receita_id] = sequencia
+            self._proxima_sequencia += 1
+        self._entradas_ordenacao[receita_id] = novas
+        
+    def _desordenar(self, receita_id: str):
+        for ordem, entrada in self._entradas_ordenacao.pop(receita_id, {}).items():
+            self.ordenacoes[ordem].remover(entrada)
+        self._sequencia.pop(receita_id, None)
         
     def criar_nova_receita(self, nome: str, tipo: str, volume: float, descricao: Optional[str] = None) -> Receita:
         """Cria uma nova receita"""
         receita = Receita(nome, tipo, volume, descricao)
-        self.receitas[receita.id] = receita
+        self._registrar(receita)
         return receita
         
     def carregar_receita(self, receita_id: str) -> Optional[Receita]:
@@ -24,14 +105,28 @@ class RecipeController:
         return None
         
     def salvar_receita(self, receita: Receita) -> bool:
-        """Salva uma receita"""
-        self.receitas[receita.id] = receita
+        """Salva uma receita (reindexando nome, descrição e tipo)"""
+        self._registrar(receita)
+        return True
+        
+    def editar_receita(self, receita_id: str, **kwargs) -> bool:
+        """Edita campos de uma receita existente"""
+        if receita_id not in self.receitas:
+            return False
+            
+        receita = self.receitas[receita_id]
+        for key, value in kwargs.items():
+            if hasattr(receita, key):
+                setattr(receita, key, value)
+        self._registrar(receita)
         return True
         
     def deletar_receita(self, receita_id: str) -> bool:
         """Deleta uma receita"""
         if receita_id in self.receitas:
             del self.receitas[receita_id]
+            self.indice.remover(receita_id)
+            self._desordenar(receita_id)
             if self.receita_atual and self.receita_atual.id == receita_id:
                 self.receita_atual = None
             return True
@@ -79,7 +174,7 @@ class RecipeController:
             nova_etapa.parametros = etapa.parametros.copy()
             nova_receita.adicionar_etapa(nova_etapa)
             
-        self.receitas[nova_receita.id] = nova_receita
+        self._registrar(nova_receita)
         return nova_receita
         
     def adicionar_ingrediente(self, receita_id: str, nome: str, tipo: str, unidade: str, quantidade: float, observacoes: Optional[str] = None) -> bool:
@@ -161,6 +256,7 @@ class RecipeController:
         if receita.og and receita.fg:
             resultado = self.abv_calculator.calcular(receita.og, receita.fg)
             receita.abv = resultado['abv']
+            self._reordenar(receita)
             return resultado
         return None
         
@@ -193,20 +289,20 @@ class RecipeController:
         return receita_escalada
         
     def obter_receitas_por_tipo(self, tipo: str) -> List[Receita]:
-        """Obtém todas as receitas de um tipo específico"""
-        return [receita for receita in self.receitas.values() if receita.tipo.lower() == tipo.lower()]
+        """Obtém todas as receitas de um tipo específico (sem diferenciar acentos)"""
+        return [self.receitas[receita_id] for receita_id in self.indice.por_tipo(tipo)]
         
-    def buscar_receitas(self, termo: str) -> List[Receita]:
-        """Busca receitas por nome ou descrição"""
-        termo = termo.lower()
-        resultados = []
+    def buscar_receitas(self, termo: str, limite: Optional[int] = None) -> List[Receita]:
+        """Busca receitas por nome ou descrição, das mais relevantes para as menos
         
-        for receita in self.receitas.values():
-            if (termo in receita.nome.lower() or 
-                (receita.descricao and termo in receita.descricao.lower())):
-                resultados.append(receita)
-                
-        return resultados
+        Ignora maiúsculas e acentos ("lupulo" acha "lúpulo") e casa cada
+        palavra por inteiro, pelo prefixo, por um trecho ou, se nada disso
+        casar, por aproximação. Termo vazio devolve todas as receitas.
+        """
+        if not termo.strip():
+            receitas = list(self.receitas.values())
+            return receitas[:limite] if limite is not None else receitas
+        return [self.receitas[receita_id] for receita_id in self.indice.buscar(termo, limite)]
         
     def obter_estatisticas_receitas(self) -> Dict:
         """Obtém estatísticas das receitas"""
@@ -248,63 +344,35 @@ class RecipeController:
             
         return stats
         
-    def listar_receitas(self, ordenar_por: str = "nome") -> List[Receita]:
-        """Lista todas as receitas ordenadas"""
-        receitas = list(self.receitas.values())
-        
-        if ordenar_por == "nome":
-            receitas.sort(key=lambda r: r.nome)
-        elif ordenar_por == "tipo":
-            receitas.sort(key=lambda r: r.tipo)
-        elif ordenar_por == "data":
-            receitas.sort(key=lambda r: r.data_criacao, reverse=True)
-        elif ordenar_por == "abv":
-            receitas.sort(key=lambda r: r.abv or 0, reverse=True)
+    def listar_receitas(self, ordenar_por: str = "nome", inicio: int = 0, limite: Optional[int] = None,
+                        minimo: Any = None, maximo: Any = None) -> List[Receita]:
+        """Lista as receitas ordenadas, opcionalmente paginadas e limitadas a uma faixa
+        
+        As ordenações são mantidas a cada alteração, então a listagem só
+        recorta a lista já ordenada: `listar_receitas("abv", limite=20)` traz
+        as 20 de maior ABV sem ordenar todas. `minimo`/`maximo` limitam o
+        valor ordenado (inclusive), por exemplo ABV entre 5 e 7 ou datas de
+        criação num período; `inicio` e `limite` paginam dentro da faixa.
+        """
+        if ordenar_por not in ORDENACOES:
+            receitas = list(self.receitas.values())
+            return receitas[inicio:inicio + limite if limite is not None else None]
             
-        return receitas
+        lista = self.ordenacoes[ordenar_por]
+        decrescente = ORDENACOES[ordenar_por][1]
+        # Nas ordenações decrescentes o maior valor vem primeiro
+        primeiro, ultimo = (maximo, minimo) if decrescente else (minimo, maximo)
+        
+        comeco = lista.posicao((self._chave(ordenar_por, primeiro),)) if primeiro is not None else 0
+        fim = lista.posicao((self._chave(ordenar_por, ultimo), float('inf'))) if ultimo is not None else len(lista)
+        comeco += inicio
+        if limite is not None:
+            fim = min(fim, comeco + limite)
+            
+        return [self.receitas[receita_id] for _, _, receita_id in lista.fatia(comeco, fim)]
         
     def exportar_receita(self, receita_id: str) -> Optional[Dict]:
-        """Exporta uma receita para formato JSON"""
+        """Exporta uma receita no envelope versionado de util.serializacao (lido por de_json)"""
         if receita_id not in self.receitas:
             return None
-            
-        receita = self.receitas[receita_id]
-        
-        dados = {
-            'nome': receita.nome,
-            'tipo': receita.tipo,
-            'volume': receita.volume,
-            'descricao': receita.descricao,
-            'og': receita.og,
-            'fg': receita.fg,
-            'abv': receita.abv,
-            'ibu': receita.ibu,
-            'srm': receita.srm,
-            'ph': receita.ph,
-            'temperatura_fermentacao': receita.temperatura_fermentacao,
-            'tempo_fermentacao': receita.tempo_fermentacao,
-            'dificuldade': receita.dificuldade,
-            'ingredientes': [
-                {
-                    'nome': ing.nome,
-                    'tipo': ing.tipo,
-                    'unidade': ing.unidade,
-                    'quantidade': ing.quantidade,
-                    'observacoes': ing.observacoes
-                }
-                for ing in receita.ingredientes
-            ],
-            'etapas': [
-                {
-                    'nome': etapa.nome,
-                    'descricao': etapa.descricao,
-                    'duracao_estimada': etapa.duracao_estimada,
-                    'temperatura_alvo': etapa.temperatura_alvo,
-                    'observacoes': etapa.observacoes,
-                    'parametros': etapa.parametros
-                }
-                for etapa in receita.etapas
-            ]
-        }
-        
-        return dados
+        return para_documento(self.receitas[receita_id])
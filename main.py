@@ -13,6 +13,8 @@ from dataclasses import dataclass
 # Importar controladores
 from controls.brew_controller import BrewController
 from controls.recipe_controller import RecipeController
+from util.mock_data_loader import mock_loader
+from util.observador_dados import ObservadorDados
 
 # Importar views
 from view.dashboard_view import DashboardView
@@ -221,6 +223,12 @@ class BebrewNavigator:
         self.app.update_sidebar_active(next_view)
         self.app.update_navigation_buttons()
         
+    def on_dados_alterados(self, alteracoes: Dict[str, Dict[str, List[Any]]]):
+        """Repassa à view atual as alterações no arquivo de dados (as outras recarregam ao serem exibidas)"""
+        view = self.views.get(self.current_view)
+        if hasattr(view, 'on_dados_alterados'):
+            view.on_dados_alterados(alteracoes)
+            
     def can_go_back(self) -> bool:
         """Verifica se é possível voltar"""
         return len(self.view_history) > 0
@@ -297,12 +305,19 @@ class BebrewApp:
         self.create_main_layout()
         
         # Inicializar controladores
-        self.brew_controller = BrewController()
+        # Produções em andamento sobrevivem a quedas via log de eventos
+        self.brew_controller = BrewController(
+            os.path.join(os.path.dirname(os.path.abspath(__file__)), 'database', 'producoes')
+        )
         self.recipe_controller = RecipeController()
         
         # Inicializar sistema de navegação
         self.navigator = BebrewNavigator(self)
         
+        # Mudanças externas no arquivo de dados atualizam a view atual
+        self.observador_dados = ObservadorDados(mock_loader)
+        self.observador_dados.inscrever(self.navigator.on_dados_alterados)
+        
         # Criar sidebar
         self.create_sidebar()
         
@@ -645,6 +660,7 @@ class BebrewApp:
     def on_closing(self):
         """Callback para fechamento da aplicação"""
         # Aqui você pode salvar dados antes de fechar
+        self.observador_dados.parar(self.root)
         self.save_data()
         self.root.quit()
         self.root.destroy()
@@ -652,12 +668,13 @@ class BebrewApp:
     def save_data(self):
         """Salva dados da aplicação"""
         # Implementar salvamento de receitas, configurações, etc.
-        pass
+        self.brew_controller.fechar()
         
     def run(self):
         """Inicia a aplicação"""
         # Navegar para o dashboard inicial
         self.navigator.navigate_to('dashboard')
+        self.observador_dados.iniciar(self.root)
         
         # Iniciar loop principal
         self.root.mainloop()
@@ -1,7 +1,8 @@
 from .bebida import Bebida
 from .ingredient import Ingrediente
+from .serie_temporal import SerieTemporal, SerieAgregada, Telemetria
 from .etapa import Etapa, EtapaExecucao
 from .receita import Receita
 from .producao import Producao
 
-__all__ = ['Bebida', 'Ingrediente', 'Etapa', 'EtapaExecucao', 'Receita', 'Producao'] 
\ No newline at end of file
+__all__ = ['Bebida', 'Ingrediente', 'SerieTemporal', 'SerieAgregada', 'Telemetria', 'Etapa', 'EtapaExecucao', 'Receita', 'Producao'] 
\ No newline at end of file
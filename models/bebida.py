@@ -1,17 +1,20 @@
 from datetime import datetime
 from typing import List, Optional
-import uuid
+from .identificavel import Identificavel
 
-class Bebida:
+class Bebida(Identificavel):
     """Classe base para bebidas fermentadas"""
     
-    def __init__(self, nome: str, tipo: str, volume: float, descricao: Optional[str] = None):
-        self.id = str(uuid.uuid4())
+    __slots__ = ('nome', 'tipo', 'volume', 'descricao', 'data_criacao')
+    
+    def __init__(self, nome: str, tipo: str, volume: float, descricao: Optional[str] = None,
+                 id: Optional[str] = None, data_criacao: Optional[datetime] = None):
+        self.id = id
         self.nome = nome
         self.tipo = tipo  # cerveja, hidromel, vinho, etc
         self.volume = volume  # em litros
         self.descricao = descricao
-        self.data_criacao = datetime.now()
+        self.data_criacao = data_criacao or datetime.now()
         
     def __str__(self):
         return f"{self.nome} ({self.tipo}) - {self.volume}L"
@@ -1,12 +1,16 @@
 from datetime import datetime, timedelta
 from typing import List, Optional, Dict, Any
-import uuid
+from .identificavel import Identificavel
+from .serie_temporal import Telemetria
 
-class Etapa:
+class Etapa(Identificavel):
     """Representa uma fase da produção (mostura, fervura, fermentação, etc)"""
     
-    def __init__(self, nome: str, descricao: str, duracao_estimada: int, temperatura_alvo: Optional[float] = None, observacoes: Optional[str] = None):
-        self.id = str(uuid.uuid4())
+    __slots__ = ('nome', 'descricao', 'duracao_estimada', 'temperatura_alvo', 'observacoes', 'parametros')
+    
+    def __init__(self, nome: str, descricao: str, duracao_estimada: int, temperatura_alvo: Optional[float] = None, observacoes: Optional[str] = None,
+                 id: Optional[str] = None):
+        self.id = id
         self.nome = nome
         self.descricao = descricao
         self.duracao_estimada = duracao_estimada  # em minutos
@@ -26,23 +30,40 @@ class Etapa:
         return f"Etapa(nome='{self.nome}', duracao={self.duracao_estimada}min)"
 
 
-class EtapaExecucao:
+class EtapaExecucao(Identificavel):
     """Dados medidos durante a execução de uma etapa"""
     
-    def __init__(self, etapa_id: str, inicio: Optional[datetime] = None):
-        self.id = str(uuid.uuid4())
+    __slots__ = ('etapa_id', 'inicio', 'fim', '_temperaturas', 'anotacoes', 'parametros_medidos', 'concluida')
+    
+    def __init__(self, etapa_id: str, inicio: Optional[datetime] = None, id: Optional[str] = None):
+        self.id = id
         self.etapa_id = etapa_id
         self.inicio = inicio or datetime.now()
         self.fim = None
-        self.temperaturas = []  # lista de (timestamp, temperatura)
+        self._temperaturas: Optional[Telemetria] = None  # criada na primeira leitura
         self.anotacoes = []  # lista de (timestamp, anotação)
         self.parametros_medidos = {}
         self.concluida = False
         
+    @property
+    def temperaturas(self) -> Telemetria:
+        """Leituras recentes + resumos de 1 e 15 min"""
+        if self._temperaturas is None:
+            self._temperaturas = Telemetria()
+        return self._temperaturas
+        
+    @temperaturas.setter
+    def temperaturas(self, telemetria: Telemetria):
+        self._temperaturas = telemetria
+        
+    @property
+    def possui_temperaturas(self) -> bool:
+        """Indica se alguma leitura já criou a telemetria"""
+        return self._temperaturas is not None
+        
     def adicionar_temperatura(self, temperatura: float, timestamp: Optional[datetime] = None):
         """Registra uma medição de temperatura"""
-        timestamp = timestamp or datetime.now()
-        self.temperaturas.append((timestamp, temperatura))
+        self.temperaturas.adicionar(temperatura, timestamp or datetime.now())
         
     def adicionar_anotacao(self, anotacao: str, timestamp: Optional[datetime] = None):
         """Adiciona uma anotação com timestamp"""
@@ -0,0 +1,17 @@
+from typing import Optional
+import uuid
+
+class Identificavel:
+    """Base para modelos com ID gerado só quando é lido pela primeira vez"""
+    
+    __slots__ = ('_id',)
+    
+    @property
+    def id(self) -> str:
+        if self._id is None:
+            self._id = str(uuid.uuid4())
+        return self._id
+        
+    @id.setter
+    def id(self, valor: Optional[str]):
+        self._id = valor
@@ -1,11 +1,14 @@
 from typing import Optional
-import uuid
+from .identificavel import Identificavel
 
-class Ingrediente:
+class Ingrediente(Identificavel):
     """Modelo para ingredientes utilizados nas receitas"""
     
-    def __init__(self, nome: str, tipo: str, unidade: str, quantidade: float = 0.0, observacoes: Optional[str] = None):
-        self.id = str(uuid.uuid4())
+    __slots__ = ('nome', 'tipo', 'unidade', 'quantidade', 'observacoes')
+    
+    def __init__(self, nome: str, tipo: str, unidade: str, quantidade: float = 0.0, observacoes: Optional[str] = None,
+                 id: Optional[str] = None):
+        self.id = id
         self.nome = nome
         self.tipo = tipo  # malte, lúpulo, fermento, açúcar, especiaria, etc
         self.unidade = unidade  # kg, g, L, mL, un, etc
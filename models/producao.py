@@ -2,13 +2,21 @@ from datetime import datetime, timedelta
 from typing import List, Optional, Dict
 from .receita import Receita
 from .etapa import EtapaExecucao
-import uuid
+from .serie_temporal import SerieTemporal
+from .identificavel import Identificavel
 
-class Producao:
+class Producao(Identificavel):
     """Execução prática de uma receita com dados registrados"""
     
-    def __init__(self, receita: Receita, lote: Optional[str] = None):
-        self.id = str(uuid.uuid4())
+    __slots__ = (
+        'receita', 'lote', 'data_inicio', 'data_fim', 'status', 'etapas_execucao',
+        'etapa_atual_index', 'og_medido', 'fg_medido', 'densidades', 'abv_final', 'volume_final',
+        'rendimento_real', 'notas_gerais', 'problemas_encontrados', 'modificacoes_receita',
+        'avaliacao_visual', 'avaliacao_aroma', 'avaliacao_sabor', 'nota_final'
+    )
+    
+    def __init__(self, receita: Receita, lote: Optional[str] = None, id: Optional[str] = None):
+        self.id = id
         self.receita = receita
         self.lote = lote or f"L{datetime.now().strftime('%Y%m%d%H%M')}"
         
@@ -22,6 +30,7 @@ class Producao:
         # Dados medidos
         self.og_medido = None
         self.fg_medido = None
+        self.densidades = SerieTemporal()  # todas as leituras, para a curva de atenuação
         self.abv_final = None
         self.volume_final = None
         self.rendimento_real = None
@@ -1,3 +1,4 @@
+from datetime import datetime
 from typing import List, Optional
 from .bebida import Bebida
 from .ingredient import Ingrediente
@@ -6,8 +7,15 @@ from .etapa import Etapa
 class Receita(Bebida):
     """Receita de bebida fermentada com ingredientes, etapas e dados técnicos"""
     
-    def __init__(self, nome: str, tipo: str, volume: float, descricao: Optional[str] = None):
-        super().__init__(nome, tipo, volume, descricao)
+    __slots__ = (
+        'ingredientes', 'etapas', 'og', 'fg', 'abv', 'ibu', 'srm', 'ph',
+        'temperatura_fermentacao', 'tempo_fermentacao', 'dificuldade',
+        'rendimento_esperado', 'tempo_total_estimado'
+    )
+    
+    def __init__(self, nome: str, tipo: str, volume: float, descricao: Optional[str] = None,
+                 id: Optional[str] = None, data_criacao: Optional[datetime] = None):
+        super().__init__(nome, tipo, volume, descricao, id, data_criacao)
         self.ingredientes: List[Ingrediente] = []
         self.etapas: List[Etapa] = []
         
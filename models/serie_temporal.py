@@ -0,0 +1,530 @@
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+import numpy as np
+
+# Referência para converter datetimes sem fuso em segundos (horário de parede)
+_EPOCA = datetime(1970, 1, 1)
+
+Instante = Union[datetime, float]
+
+
+def para_segundos(timestamp: Instante) -> float:
+    """Converte um datetime (ou segundos já convertidos) em segundos desde 1970-01-01"""
+    if isinstance(timestamp, datetime):
+        if timestamp.tzinfo is not None:
+            timestamp = timestamp.astimezone().replace(tzinfo=None)
+        return (timestamp - _EPOCA).total_seconds()
+    return float(timestamp)
+
+
+def para_datetime(segundos: float) -> datetime:
+    """Converte segundos desde 1970-01-01 de volta em datetime sem fuso"""
+    return _EPOCA + timedelta(seconds=float(segundos))
+
+
+class _BufferColunar:
+    """
+    Colunas NumPy com crescimento por duplicação e limite opcional de linhas
+
+    Com capacidade_maxima funciona como buffer circular: a linha mais antiga
+    é descartada avançando o início da janela, e os dados são compactados
+    para o começo do array quando o fim é atingido. Assim as colunas são
+    sempre contíguas e podem ser expostas como views sem cópia.
+    """
+
+    def __init__(self, tipos: Dict[str, Any], capacidade: int, capacidade_maxima: Optional[int] = None):
+        capacidade = max(1, capacidade)
+        if capacidade_maxima:
+            capacidade = min(capacidade, 2 * capacidade_maxima)
+        self.tipos = tipos
+        self.capacidade_maxima = capacidade_maxima
+        self.colunas = {nome: np.empty(capacidade, dtype=tipo) for nome, tipo in tipos.items()}
+        self.inicio = 0
+        self.fim = 0
+        self.descartadas = 0  # linhas removidas pela retenção
+
+    def __len__(self) -> int:
+        return self.fim - self.inicio
+
+    def reservar(self) -> int:
+        """Retorna a posição da próxima linha, abrindo espaço se necessário"""
+        if self.capacidade_maxima and len(self) >= self.capacidade_maxima:
+            self.inicio += 1
+            self.descartadas += 1
+        if self.fim == len(next(iter(self.colunas.values()))):
+            self._abrir_espaco()
+        self.fim += 1
+        return self.fim - 1
+
+    def _abrir_espaco(self):
+        tamanho = len(self)
+        capacidade = len(next(iter(self.colunas.values())))
+        if self.inicio and tamanho <= capacidade // 2:
+            # Compacta: custo amortizado O(1), pois ocorre a cada `tamanho` inserções
+            for coluna in self.colunas.values():
+                coluna[:tamanho] = coluna[self.inicio:self.fim]
+        else:
+            nova = capacidade * 2
+            if self.capacidade_maxima:
+                nova = min(nova, 2 * self.capacidade_maxima)
+            for nome, coluna in self.colunas.items():
+                expandida = np.empty(nova, dtype=coluna.dtype)
+                expandida[:tamanho] = coluna[self.inicio:self.fim]
+                self.colunas[nome] = expandida
+        self.inicio, self.fim = 0, tamanho
+
+    def descartar(self, quantidade: int):
+        """Remove as `quantidade` linhas mais antigas"""
+        quantidade = min(quantidade, len(self))
+        self.inicio += quantidade
+        self.descartadas += quantidade
+
+    def view(self, nome: str) -> np.ndarray:
+        """View somente leitura das linhas válidas de uma coluna"""
+        view = self.colunas[nome][self.inicio:self.fim]
+        view.flags.writeable = False
+        return view
+
+    def nbytes(self) -> int:
+        return sum(coluna.nbytes for coluna in self.colunas.values())
+
+    def carregar(self, colunas: Dict[str, np.ndarray], descartadas: int = 0):
+        """Substitui o conteúdo pelas colunas informadas"""
+        tamanho = len(colunas[next(iter(self.tipos))])
+        capacidade = max(tamanho, SerieTemporal.CAPACIDADE_INICIAL)
+        if self.capacidade_maxima:
+            capacidade = min(capacidade, 2 * self.capacidade_maxima)
+        if tamanho > capacidade:
+            raise ValueError("Mais linhas que a capacidade máxima")
+        for nome, tipo in self.tipos.items():
+            coluna = np.empty(capacidade, dtype=tipo)
+            coluna[:tamanho] = colunas[nome]
+            self.colunas[nome] = coluna
+        self.inicio, self.fim = 0, tamanho
+        self.descartadas = descartadas
+
+
+class SerieTemporal:
+    """
+    Série de medições em colunas: segundos (float64) e valores (float32)
+
+    Ocupa 12 bytes por leitura, contra ~150 bytes de uma tupla
+    (datetime, float) em lista. Os buffers crescem dobrando de tamanho.
+    Iterar continua produzindo tuplas (datetime, valor).
+
+    Opcionalmente retém só as últimas `capacidade_maxima` leituras e/ou as
+    leituras dos últimos `janela` segundos. As medições devem ser
+    adicionadas em ordem cronológica.
+    """
+
+    CAPACIDADE_INICIAL = 64
+
+    def __init__(self, capacidade: int = CAPACIDADE_INICIAL, capacidade_maxima: Optional[int] = None,
+                 janela: Optional[float] = None):
+        self._buffer = _BufferColunar(
+            {'tempos': np.float64, 'valores': np.float32}, capacidade, capacidade_maxima
+        )
+        self.janela = janela  # em segundos
+
+    @classmethod
+    def de_pares(cls, pares: List[Tuple[Instante, float]]) -> "SerieTemporal":
+        """Cria uma série a partir de tuplas (timestamp, valor)"""
+        serie = cls(len(pares) or cls.CAPACIDADE_INICIAL)
+        for timestamp, valor in pares:
+            serie.adicionar(valor, timestamp)
+        return serie
+
+    @classmethod
+    def de_arrays(cls, tempos: np.ndarray, valores: np.ndarray) -> "SerieTemporal":
+        """Cria uma série a partir de colunas já convertidas (segundos, valores)"""
+        if len(tempos) != len(valores):
+            raise ValueError("Colunas de tempos e valores com tamanhos diferentes")
+        serie = cls(len(tempos) or cls.CAPACIDADE_INICIAL)
+        buffer = serie._buffer
+        buffer.colunas['tempos'][:len(tempos)] = tempos
+        buffer.colunas['valores'][:len(valores)] = valores
+        buffer.fim = len(tempos)
+        return serie
+
+    @property
+    def descartadas(self) -> int:
+        """Quantidade de leituras removidas pela retenção"""
+        return self._buffer.descartadas
+
+    def adicionar(self, valor: float, timestamp: Optional[Instante] = None):
+        """Registra uma medição (timestamp padrão: agora)"""
+        segundos = para_segundos(datetime.now() if timestamp is None else timestamp)
+        buffer = self._buffer
+        indice = buffer.reservar()
+        buffer.colunas['tempos'][indice] = segundos
+        buffer.colunas['valores'][indice] = valor
+
+        if self.janela is not None:
+            tempos = buffer.colunas['tempos']
+            corte = segundos - self.janela
+            if tempos[buffer.inicio] < corte:
+                buffer.descartar(int(np.searchsorted(tempos[buffer.inicio:buffer.fim], corte)))
+
+    def append(self, item: Tuple[Instante, float]):
+        """Compatibilidade com o antigo formato de lista de tuplas"""
+        timestamp, valor = item
+        self.adicionar(valor, timestamp)
+
+    @property
+    def tempos(self) -> np.ndarray:
+        """Segundos desde 1970-01-01 (view sem cópia, somente leitura)"""
+        return self._buffer.view('tempos')
+
+    @property
+    def valores(self) -> np.ndarray:
+        """Valores medidos (view sem cópia, somente leitura)"""
+        return self._buffer.view('valores')
+
+    def tempos_datetime64(self) -> np.ndarray:
+        """Tempos como datetime64[ms], no formato aceito pelo matplotlib"""
+        return (self.tempos * 1000).astype("datetime64[ms]")
+
+    def intervalo(self, inicio: Optional[float] = None, fim: Optional[float] = None) -> "SerieTemporal":
+        """Cópia das leituras entre `inicio` e `fim` (em segundos, inclusive)"""
+        tempos = self.tempos
+        a = int(np.searchsorted(tempos, inicio, 'left')) if inicio is not None else 0
+        b = int(np.searchsorted(tempos, fim, 'right')) if fim is not None else len(tempos)
+        return SerieTemporal.de_arrays(tempos[a:b], self.valores[a:b])
+
+    def estatisticas(self) -> dict:
+        """Mínimo, média e máximo dos valores"""
+        if not len(self):
+            return {'minimo': None, 'media': None, 'maximo': None, 'total': 0}
+        valores = self.valores
+        return {
+            'minimo': float(valores.min()),
+            'media': float(valores.mean()),
+            'maximo': float(valores.max()),
+            'total': len(self)
+        }
+
+    def nbytes(self) -> int:
+        """Memória ocupada pelos buffers (incluindo capacidade reservada)"""
+        return self._buffer.nbytes()
+
+    def para_estado(self) -> Dict[str, Any]:
+        """Estado completo para serialização (colunas como views NumPy)"""
+        return {
+            'capacidade_maxima': self._buffer.capacidade_maxima,
+            'janela': self.janela,
+            'descartadas': self.descartadas,
+            'tempos': self.tempos,
+            'valores': self.valores
+        }
+
+    @classmethod
+    def de_estado(cls, estado: Dict[str, Any]) -> "SerieTemporal":
+        """Reconstrói a série a partir de para_estado()"""
+        serie = cls(capacidade_maxima=estado.get('capacidade_maxima'), janela=estado.get('janela'))
+        serie._buffer.carregar(
+            {'tempos': estado['tempos'], 'valores': estado['valores']}, estado.get('descartadas', 0)
+        )
+        return serie
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    def __iter__(self) -> Iterator[Tuple[datetime, float]]:
+        for segundos, valor in zip(self.tempos.tolist(), self.valores.tolist()):
+            yield para_datetime(segundos), valor
+
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            return [
+                (para_datetime(segundos), valor)
+                for segundos, valor in zip(self.tempos[indice].tolist(), self.valores[indice].tolist())
+            ]
+        tamanho = len(self)
+        if indice < 0:
+            indice += tamanho
+        if not 0 <= indice < tamanho:
+            raise IndexError("Índice fora da série")
+        return para_datetime(self.tempos[indice]), float(self.valores[indice])
+
+    def __repr__(self):
+        return f"SerieTemporal({len(self)} medições)"
+
+
+class SerieAgregada:
+    """Resumo mínimo/média/máximo de uma série em intervalos fixos (ex: 60 s)"""
+
+    def __init__(self, intervalo: float, capacidade_maxima: Optional[int] = None):
+        self.intervalo = intervalo  # em segundos
+        self._buffer = _BufferColunar(
+            {
+                'inicios': np.float64,
+                'minimos': np.float32,
+                'medias': np.float32,
+                'maximos': np.float32,
+                'contagens': np.uint32
+            },
+            SerieTemporal.CAPACIDADE_INICIAL,
+            capacidade_maxima
+        )
+
+        # Intervalo ainda aberto
+        self._aberto: Optional[float] = None
+        self._minimo = 0.0
+        self._maximo = 0.0
+        self._soma = 0.0
+        self._contagem = 0
+
+    @property
+    def nome(self) -> str:
+        if self.intervalo % 60 == 0:
+            return f"{int(self.intervalo // 60)}min"
+        return f"{self.intervalo:g}s"
+
+    @property
+    def descartadas(self) -> int:
+        return self._buffer.descartadas
+
+    def adicionar(self, valor: float, segundos: float):
+        """Acumula uma leitura no intervalo correspondente"""
+        inicio = segundos - segundos % self.intervalo
+        if self._aberto is None or inicio > self._aberto:
+            self._fechar()
+            self._aberto = inicio
+            self._minimo = self._maximo = valor
+            self._soma = 0.0
+            self._contagem = 0
+        # Leituras fora de ordem entram no intervalo aberto
+        self._minimo = min(self._minimo, valor)
+        self._maximo = max(self._maximo, valor)
+        self._soma += valor
+        self._contagem += 1
+
+    def _fechar(self):
+        if not self._contagem:
+            return
+        buffer = self._buffer
+        indice = buffer.reservar()
+        buffer.colunas['inicios'][indice] = self._aberto
+        buffer.colunas['minimos'][indice] = self._minimo
+        buffer.colunas['medias'][indice] = self._soma / self._contagem
+        buffer.colunas['maximos'][indice] = self._maximo
+        buffer.colunas['contagens'][indice] = self._contagem
+
+    def primeiro_inicio(self) -> Optional[float]:
+        """Início do intervalo mais antigo retido"""
+        if len(self._buffer):
+            return float(self._buffer.colunas['inicios'][self._buffer.inicio])
+        return self._aberto
+
+    def colunas(self, inicio: Optional[float] = None, fim: Optional[float] = None) -> Dict[str, np.ndarray]:
+        """Colunas dos intervalos entre `inicio` e `fim`, incluindo o intervalo aberto"""
+        colunas = {nome: self._buffer.view(nome) for nome in self._buffer.tipos}
+        if self._contagem:
+            aberto = {
+                'inicios': self._aberto,
+                'minimos': self._minimo,
+                'medias': self._soma / self._contagem,
+                'maximos': self._maximo,
+                'contagens': self._contagem
+            }
+            colunas = {
+                nome: np.append(coluna, np.array([aberto[nome]], dtype=coluna.dtype))
+                for nome, coluna in colunas.items()
+            }
+
+        inicios = colunas['inicios']
+        a = int(np.searchsorted(inicios, inicio - inicio % self.intervalo, 'left')) if inicio is not None else 0
+        b = int(np.searchsorted(inicios, fim, 'right')) if fim is not None else len(inicios)
+        return {nome: coluna[a:b] for nome, coluna in colunas.items()}
+
+    def contar(self, inicio: Optional[float] = None, fim: Optional[float] = None) -> int:
+        """Quantidade de intervalos entre `inicio` e `fim`"""
+        return len(self.colunas(inicio, fim)['inicios'])
+
+    def nbytes(self) -> int:
+        return self._buffer.nbytes()
+
+    def para_estado(self) -> Dict[str, Any]:
+        """Estado completo para serialização (colunas como views NumPy)"""
+        estado = {
+            'intervalo': self.intervalo,
+            'capacidade_maxima': self._buffer.capacidade_maxima,
+            'descartadas': self.descartadas,
+            'aberto': None
+        }
+        estado.update({nome: self._buffer.view(nome) for nome in self._buffer.tipos})
+        if self._contagem:
+            estado['aberto'] = [self._aberto, self._minimo, self._maximo, self._soma, self._contagem]
+        return estado
+
+    @classmethod
+    def de_estado(cls, estado: Dict[str, Any]) -> "SerieAgregada":
+        """Reconstrói os resumos a partir de para_estado()"""
+        serie = cls(estado['intervalo'], estado.get('capacidade_maxima'))
+        serie._buffer.carregar({nome: estado[nome] for nome in serie._buffer.tipos}, estado.get('descartadas', 0))
+        if estado.get('aberto'):
+            serie._aberto, serie._minimo, serie._maximo, serie._soma, serie._contagem = estado['aberto']
+        return serie
+
+    def __len__(self) -> int:
+        return len(self._buffer) + (1 if self._contagem else 0)
+
+
+class Telemetria:
+    """
+    Telemetria com retenção: leituras brutas recentes e resumos por minuto
+
+    As leituras brutas ficam em um buffer circular limitado à janela recente
+    (padrão: 6 h). Cada leitura também alimenta os níveis agregados de 1 e
+    15 minutos, que guardam mínimo/média/máximo do histórico antigo.
+    Iterar, indexar e as views `tempos`/`valores` usam as leituras brutas.
+    """
+
+    JANELA_BRUTA = 6 * 3600  # segundos
+    CAPACIDADE_BRUTA = 6 * 3600  # uma leitura por segundo durante a janela
+    NIVEIS = (
+        (60, 7 * 24 * 60),  # 1 min, retido por 7 dias
+        (15 * 60, None),  # 15 min, sem limite
+    )
+
+    def __init__(self, janela: Optional[float] = JANELA_BRUTA, capacidade_maxima: Optional[int] = CAPACIDADE_BRUTA,
+                 niveis: Tuple[Tuple[float, Optional[int]], ...] = NIVEIS):
+        self.bruto = SerieTemporal(capacidade_maxima=capacidade_maxima, janela=janela)
+        self.niveis = [SerieAgregada(intervalo, capacidade) for intervalo, capacidade in niveis]
+
+        # Acumuladores de todo o histórico
+        self.total = 0
+        self._primeiro: Optional[float] = None
+        self._soma = 0.0
+        self._minimo: Optional[float] = None
+        self._maximo: Optional[float] = None
+
+    def adicionar(self, valor: float, timestamp: Optional[Instante] = None):
+        """Registra uma leitura em todos os níveis"""
+        valor = float(valor)
+        segundos = para_segundos(datetime.now() if timestamp is None else timestamp)
+        self.bruto.adicionar(valor, segundos)
+        for nivel in self.niveis:
+            nivel.adicionar(valor, segundos)
+
+        if self._primeiro is None:
+            self._primeiro = segundos
+            self._minimo = self._maximo = valor
+        self.total += 1
+        self._soma += valor
+        self._minimo = min(self._minimo, valor)
+        self._maximo = max(self._maximo, valor)
+
+    def append(self, item: Tuple[Instante, float]):
+        """Compatibilidade com o antigo formato de lista de tuplas"""
+        timestamp, valor = item
+        self.adicionar(valor, timestamp)
+
+    def consultar(self, inicio: Optional[Instante] = None, fim: Optional[Instante] = None,
+                  max_pontos: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Retorna as leituras do período no nível mais detalhado disponível
+
+        Usa as leituras brutas se a janela retida cobre o período e cabe em
+        `max_pontos`; caso contrário, o primeiro nível agregado que atenda.
+
+        Returns:
+            Dict com 'nivel' ('bruto', '1min', '15min'), 'serie' (SerieTemporal
+            com as leituras ou as médias) e 'minimos'/'maximos' (arrays nos
+            níveis agregados, None nas leituras brutas)
+        """
+        inicio_s = para_segundos(inicio) if inicio is not None else None
+        fim_s = para_segundos(fim) if fim is not None else None
+        desde = inicio_s if inicio_s is not None else self._primeiro
+
+        bruto = self.bruto
+        cobre_bruto = not bruto.descartadas or (
+            len(bruto) and desde is not None and desde >= bruto.tempos[0]
+        )
+        if cobre_bruto:
+            serie = bruto.intervalo(inicio_s, fim_s)
+            if max_pontos is None or len(serie) <= max_pontos:
+                return {'nivel': 'bruto', 'serie': serie, 'minimos': None, 'maximos': None}
+
+        escolhido = None
+        for nivel in self.niveis:
+            primeiro = nivel.primeiro_inicio()
+            cobre = not nivel.descartadas or (
+                primeiro is not None and desde is not None and desde >= primeiro
+            )
+            if cobre:
+                escolhido = nivel
+                if max_pontos is None or nivel.contar(inicio_s, fim_s) <= max_pontos:
+                    break
+        if escolhido is None:
+            escolhido = self.niveis[-1]
+
+        colunas = escolhido.colunas(inicio_s, fim_s)
+        return {
+            'nivel': escolhido.nome,
+            'serie': SerieTemporal.de_arrays(colunas['inicios'], colunas['medias']),
+            'minimos': colunas['minimos'],
+            'maximos': colunas['maximos']
+        }
+
+    @property
+    def tempos(self) -> np.ndarray:
+        return self.bruto.tempos
+
+    @property
+    def valores(self) -> np.ndarray:
+        return self.bruto.valores
+
+    def tempos_datetime64(self) -> np.ndarray:
+        return self.bruto.tempos_datetime64()
+
+    def estatisticas(self) -> dict:
+        """Mínimo, média e máximo de todo o histórico"""
+        if not self.total:
+            return {'minimo': None, 'media': None, 'maximo': None, 'total': 0}
+        return {
+            'minimo': float(self._minimo),
+            'media': self._soma / self.total,
+            'maximo': float(self._maximo),
+            'total': self.total
+        }
+
+    def nbytes(self) -> int:
+        return self.bruto.nbytes() + sum(nivel.nbytes() for nivel in self.niveis)
+
+    def para_estado(self) -> Dict[str, Any]:
+        """Estado completo para serialização"""
+        return {
+            'bruto': self.bruto.para_estado(),
+            'niveis': [nivel.para_estado() for nivel in self.niveis],
+            'total': self.total,
+            'primeiro': self._primeiro,
+            'soma': self._soma,
+            'minimo': self._minimo,
+            'maximo': self._maximo
+        }
+
+    @classmethod
+    def de_estado(cls, estado: Dict[str, Any]) -> "Telemetria":
+        """Reconstrói a telemetria a partir de para_estado()"""
+        telemetria = cls(niveis=())
+        telemetria.bruto = SerieTemporal.de_estado(estado['bruto'])
+        telemetria.niveis = [SerieAgregada.de_estado(nivel) for nivel in estado['niveis']]
+        telemetria.total = estado['total']
+        telemetria._primeiro = estado['primeiro']
+        telemetria._soma = estado['soma']
+        telemetria._minimo = estado['minimo']
+        telemetria._maximo = estado['maximo']
+        return telemetria
+
+    def __len__(self) -> int:
+        return len(self.bruto)
+
+    def __iter__(self) -> Iterator[Tuple[datetime, float]]:
+        return iter(self.bruto)
+
+    def __getitem__(self, indice):
+        return self.bruto[indice]
+
+    def __repr__(self):
+        return f"Telemetria({self.total} medições, {len(self.bruto)} brutas retidas)"
@@ -0,0 +1,10 @@
+"""
+Configuração dos testes: backends locais, sem credenciais do Google ou da OpenAI
+"""
+import os
+
+os.environ.setdefault("STORAGE_BACKEND", "memory")
+os.environ.setdefault("OPENAI_BACKEND", "fake")
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+# A instância global do util.mock_data_loader não cria o banco SQLite do repositório
+os.environ.setdefault("BEBREW_ARMAZENAMENTO", "json")
@@ -0,0 +1,49 @@
+"""
+Testes do cálculo de ABV em lote
+"""
+import numpy as np
+import pytest
+from util.abv_calculator import (
+    ABVCalculator, FG_NAO_MENOR_QUE_OG, OG_BAIXO, converter_sg_para_brix,
+    converter_sg_para_brix_lote, descrever_validacao, validar_densidades_lote
+)
+
+
+@pytest.mark.parametrize("metodo", ["simples", "preciso", "alternativo"])
+def test_lote_igual_ao_escalar(metodo):
+    aleatorio = np.random.default_rng(3)
+    og = np.round(aleatorio.uniform(1.010, 1.160, 500), 3)
+    fg = np.round(og - (og - 1) * aleatorio.uniform(-0.1, 1.0, 500), 3)
+    calculadora = ABVCalculator()
+
+    lote = calculadora.calcular_lote(og, fg, metodo)
+    for linha, o, f in zip(lote, og.tolist(), fg.tolist()):
+        escalar = calculadora.calcular(o, f, metodo)
+        assert linha['abv'] == pytest.approx(escalar['abv'])
+        assert linha['atenuacao'] == pytest.approx(escalar['atenuacao'])
+        assert linha['calorias_100ml'] == pytest.approx(escalar['calorias_100ml'])
+        assert descrever_validacao(linha['validacao']) == escalar['validacao']
+    assert converter_sg_para_brix_lote(og) == pytest.approx([converter_sg_para_brix(o) for o in og.tolist()])
+
+
+def test_validacao_em_bits():
+    mascara = validar_densidades_lote([1.050, 1.010, 1.000], [1.010, 1.012, 1.000])
+    assert mascara.dtype == np.uint8
+    assert mascara[0] == 0
+    assert mascara[1] & OG_BAIXO and mascara[1] & FG_NAO_MENOR_QUE_OG
+    # OG = 1.000 não tem atenuação definida (o escalar levantaria ZeroDivisionError)
+    assert mascara[2] == OG_BAIXO | FG_NAO_MENOR_QUE_OG
+
+
+def test_cache_limitado_e_invalidado():
+    calculadora = ABVCalculator(tamanho_cache=2)
+    primeiro = calculadora.calcular(1.050, 1.010)
+    primeiro['validacao'].append("alterado fora")
+    assert calculadora.calcular(1.050, 1.010)['validacao'] == []
+    calculadora.calcular(1.060, 1.012)
+    calculadora.calcular(1.050, 1.010)
+    calculadora.calcular(1.070, 1.015)
+    # O par menos usado recentemente saiu
+    assert list(calculadora._cache) == [(1.050, 1.010, 'simples'), (1.070, 1.015, 'simples')]
+    calculadora.invalidar(1.050, 1.010)
+    assert list(calculadora._cache) == [(1.070, 1.015, 'simples')]
@@ -1,13 +1,66 @@
 """
 Testes básicos para a API do Bebrew
 """
+import asyncio
+import importlib
+import json
+import threading
+import time
 import pytest
 from fastapi.testclient import TestClient
-from backend.api.main import app
+from backend.api.main import app, get_current_user, firebase_service
+from backend.services.ai_cache import AIResponseCache
+from backend.services.ai_service import ai_service, AIServiceOverloadedError
+from backend.services.executor import BoundedExecutor
+from backend.services.fake_openai import FakeAsyncOpenAI
 
 client = TestClient(app)
 
 
+@pytest.fixture
+def authenticated():
+    """Substitui a autenticação do Firebase por um usuário de teste"""
+    app.dependency_overrides[get_current_user] = lambda: {"uid": "test-user"}
+    yield {"Authorization": "Bearer test-token"}
+    app.dependency_overrides.pop(get_current_user, None)
+
+
+@pytest.fixture
+def fake_ai(monkeypatch):
+    """Usa o modelo de IA local no lugar da OpenAI"""
+    fake = FakeAsyncOpenAI()
+    monkeypatch.setattr(ai_service, "client", fake)
+    if ai_service.cache:
+        ai_service.cache.clear()
+    return fake
+
+
+@pytest.fixture
+def isolated_ai(monkeypatch):
+    """Cria um AIService próprio, sem cache, com uma vaga de completion e sem fila"""
+    module = importlib.import_module("backend.services.ai_service")
+    base = module.get_settings()
+
+    def create(**overrides):
+        settings = base.model_copy(update={
+            "openai_backend": "fake", "openai_max_concurrency": 1, "openai_max_queue": 0,
+            "openai_fake_latency": 0.2, "ai_cache_enabled": False, **overrides
+        })
+        monkeypatch.setattr(module, "get_settings", lambda: settings)
+        return module.AIService()
+
+    return create
+
+
+def _parse_sse(text):
+    """Converte o corpo SSE em lista de (evento, dados)"""
+    events = []
+    for block in text.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
 def test_root_endpoint():
     """Testa o endpoint raiz"""
     response = client.get("/")
@@ -57,5 +110,296 @@ def test_ai_endpoint_without_token():
     assert response.status_code == 401  # Unauthorized
 
 
+
+def test_analyze_recipe_stream(authenticated, fake_ai):
+    """Testa streaming da análise: tokens seguidos do resultado estruturado"""
+    recipe = {"name": "IPA", "ingredients": ["malte", "lúpulo"]}
+    response = client.post("/ai/analyze-recipe/stream", json=recipe, headers=authenticated)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    
+    events = _parse_sse(response.text)
+    tokens = [data for event, data in events if event == "token"]
+    assert len(tokens) > 1
+    
+    event, result = events[-1]
+    assert event == "result"
+    assert result["analysis"] == "".join(tokens)
+    assert {"suggestions", "quality_score", "potential_issues"} <= result.keys()
+
+
+def test_analyze_recipe_cached(authenticated, fake_ai):
+    """Testa que a mesma receita não gera uma nova completion"""
+    recipe = {"name": "Stout", "ingredients": ["malte"]}
+    first = client.post("/ai/analyze-recipe", json=recipe, headers=authenticated)
+    second = client.post("/ai/analyze-recipe", json=recipe, headers=authenticated)
+    assert first.status_code == second.status_code == 200
+    assert first.json() == second.json()
+    assert fake_ai.calls == 1
+
+
+def test_ai_cache_disk_tier_runs_off_the_event_loop(tmp_path):
+    """Leituras e escritas no SQLite passam pela thread do cache"""
+    path = str(tmp_path / "ai_cache.db")
+    key = AIResponseCache.make_key("analyze_recipe", "modelo", 0.7, {"name": "Porter"})
+
+    asyncio.run(AIResponseCache(path=path).set(key, {"analysis": "ok"}))
+    cache = AIResponseCache(path=path)
+    assert asyncio.run(cache.get(key)) == {"analysis": "ok"}
+    assert asyncio.run(cache.get(key)) == {"analysis": "ok"}
+
+    metrics = cache.metrics()
+    assert metrics["hits_disk"] == 1 and metrics["hits_memory"] == 1
+    assert metrics["disk_executor"]["completed"] == 1
+
+
+def test_predict_fermentation_local_sem_llm(authenticated, fake_ai):
+    """Com leituras suficientes a previsão vem da curva ajustada, sem completion"""
+    leituras = [
+        {"dias": dias, "densidade": round(1.012 + 0.048 / (1 + 2.718281828 ** (0.9 * (dias - 3))), 4)}
+        for dias in range(8)
+    ]
+    recipe = {"name": "Pale Ale", "leituras_densidade": leituras}
+    response = client.post("/ai/predict-fermentation", params={"initial_gravity": 1.060, "temperature": 20},
+                           json=recipe, headers=authenticated)
+    assert response.status_code == 200
+    prediction = response.json()["prediction"]
+    assert prediction["source"] == "local" and prediction["model"] == "logistico"
+    assert prediction["estimated_final_gravity"] == pytest.approx(1.012, abs=0.001)
+    low, high = prediction["confidence_intervals"]["final_gravity"]
+    assert low <= prediction["estimated_final_gravity"] <= high
+    assert fake_ai.calls == 0
+
+    # Sem leituras: estimativa pela atenuação, comentada pelo LLM
+    response = client.post("/ai/predict-fermentation", params={"initial_gravity": 1.060, "temperature": 20},
+                           json={"name": "Pale Ale"}, headers=authenticated)
+    prediction = response.json()["prediction"]
+    assert prediction["source"] == "ai" and prediction["model"] == "estimativa"
+    assert prediction["estimated_final_gravity"] == pytest.approx(1.015)
+    assert fake_ai.calls == 1
+
+
+def test_ai_queue_full_returns_503(authenticated, fake_ai, monkeypatch):
+    """Com a única vaga ocupada e fila zero a rota responde 503 com Retry-After"""
+    busy = asyncio.Semaphore(1)
+    asyncio.run(busy.acquire())
+    monkeypatch.setattr(ai_service, "_semaphore", busy)
+    monkeypatch.setattr(ai_service, "settings", ai_service.settings.model_copy(update={"openai_max_queue": 0}))
+
+    for path in ("/ai/analyze-recipe", "/ai/analyze-recipe/stream"):
+        response = client.post(path, json={"name": "Saison"}, headers=authenticated)
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "5"
+    assert fake_ai.calls == 0
+
+
+def test_ai_sheds_concurrent_request_when_queue_full(isolated_ai):
+    """A segunda completion simultânea é rejeitada sem chegar ao modelo"""
+    service = isolated_ai()
+
+    async def scenario():
+        first = asyncio.ensure_future(service._get_completion("primeira"))
+        await asyncio.sleep(0.05)  # a primeira ocupa a vaga
+        with pytest.raises(AIServiceOverloadedError):
+            await service._get_completion("segunda")
+        return await first
+
+    assert asyncio.run(scenario())
+    assert service.client.calls == 1
+    metrics = service.get_metrics()
+    assert metrics["shed"] == 1 and metrics["in_flight"] == 0
+
+
+def test_ai_timeout_releases_slot(isolated_ai):
+    """Uma completion que estoura o timeout é contada e devolve a vaga"""
+    service = isolated_ai(openai_timeout=0.05)
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(service._get_completion("lenta"))
+    metrics = service.get_metrics()
+    assert metrics["timeouts"] == 1 and metrics["in_flight"] == 0
+    assert not service._semaphore.locked()
+
+
+def test_identical_prompts_share_one_completion(isolated_ai):
+    """Duas chamadas simultâneas com o mesmo prompt fazem uma única completion"""
+    service = isolated_ai()
+
+    async def scenario():
+        return await asyncio.gather(service._get_completion("mesmo prompt"), service._get_completion("mesmo prompt"))
+
+    first, second = asyncio.run(scenario())
+    assert first == second
+    assert service.client.calls == 1
+    assert service.get_metrics()["coalesced"] == 1
+
+
+def test_cancelled_caller_does_not_cancel_shared_completion(isolated_ai):
+    """Cancelar quem disparou a completion não cancela quem aguarda o mesmo resultado"""
+    service = isolated_ai()
+
+    async def scenario():
+        first = asyncio.ensure_future(service._get_completion("mesmo prompt"))
+        second = asyncio.ensure_future(service._get_completion("mesmo prompt"))
+        await asyncio.sleep(0.05)
+        first.cancel()
+        result = await second
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return result
+
+    assert asyncio.run(scenario()) == service.client.response
+    assert service.client.calls == 1
+    assert service.get_metrics()["pending_prompts"] == 0
+
+
+def test_identical_streams_share_one_completion(isolated_ai):
+    """O segundo stream idêntico recebe o resultado do primeiro, mesmo se este desconectar"""
+    service = isolated_ai()
+    recipe = {"name": "Weizen"}
+
+    async def leader():
+        events = service.stream_analyze_recipe(recipe)
+        first = await events.__anext__()
+        await events.aclose()  # cliente desconecta após o primeiro token
+        return first
+
+    async def follower():
+        return [event async for event in service.stream_analyze_recipe(recipe)]
+
+    async def scenario():
+        first = asyncio.ensure_future(leader())
+        await asyncio.sleep(0.05)  # o primeiro ocupa a única vaga
+        return await asyncio.gather(first, follower())
+
+    first, events = asyncio.run(scenario())
+    assert first[0] == "token"
+    assert events == [("result", {**events[0][1], "analysis": service.client.response})]
+    assert service.client.calls == 1
+    metrics = service.get_metrics()
+    assert metrics["coalesced"] == 1 and metrics["shed"] == 0 and metrics["pending_streams"] == 0
+
+
+def test_stalled_stream_times_out_per_chunk(isolated_ai):
+    """Um stream que para de enviar chunks estoura o timeout e devolve a vaga"""
+    service = isolated_ai(openai_timeout=0.1, openai_fake_latency=0, openai_fake_token_delay=0.5)
+
+    async def scenario():
+        async for _ in service.stream_analyze_recipe({"name": "Lager"}):
+            pass
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(scenario())
+    metrics = service.get_metrics()
+    assert metrics["timeouts"] == 1 and metrics["in_flight"] == 0
+    assert not service._semaphore.locked()
+
+
+def test_ai_timeout_returns_504(authenticated, fake_ai, monkeypatch):
+    """Timeout da OpenAI vira 504 em vez de um 200 com "error" no corpo"""
+    fake_ai.latency = 0.2
+    monkeypatch.setattr(ai_service, "settings", ai_service.settings.model_copy(update={"openai_timeout": 0.05}))
+
+    for path in ("/ai/analyze-recipe", "/ai/analyze-recipe/stream"):
+        response = client.post(path, json={"name": "Bock"}, headers=authenticated)
+        assert response.status_code == 504
+
+
+def test_metrics_report_executor_saturation(monkeypatch):
+    """Com os workers bloqueados, /metrics mostra a fila e depois o tempo de espera"""
+    executor = BoundedExecutor(2, name="test-firestore")
+    monkeypatch.setattr(firebase_service, "executor", executor)
+    gate = threading.Event()
+
+    async def submit():
+        await asyncio.gather(*(executor.run(gate.wait) for _ in range(5)))
+
+    worker = threading.Thread(target=asyncio.run, args=(submit(),))
+    worker.start()
+    try:
+        deadline = time.monotonic() + 2
+        while executor.metrics()["running"] < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        time.sleep(0.1)
+
+        saturated = client.get("/metrics").json()["firestore_executor"]
+        assert saturated["queue_depth"] == 3 and saturated["running"] == 2
+        assert saturated["saturation"] == 1.0
+    finally:
+        gate.set()
+        worker.join()
+
+    drained = client.get("/metrics").json()["firestore_executor"]
+    assert drained["queue_depth"] == 0 and drained["running"] == 0
+    assert drained["completed"] == 5 and drained["failed"] == 0
+    # Três chamadas esperaram na fila enquanto os workers estavam bloqueados
+    assert drained["wait_time_max_ms"] >= 100
+    assert 0 < drained["wait_time_avg_ms"] < drained["wait_time_max_ms"]
+    executor.shutdown()
+
+
+def test_recipe_crud_local_backend():
+    """Testa o ciclo completo de uma receita no armazenamento local"""
+    user = client.post("/auth/register", params={
+        "email": "crud@example.com",
+        "password": "testpassword123"
+    }).json()["user"]
+    headers = {"Authorization": f"Bearer {user['uid']}"}
+    
+    recipe_id = client.post("/recipes", json={"name": "IPA"}, headers=headers).json()["recipe_id"]
+    recipe = client.get(f"/recipes/{recipe_id}", headers=headers).json()["recipe"]
+    assert recipe["name"] == "IPA"
+    assert recipe["created_at"]
+    
+    assert client.put(f"/recipes/{recipe_id}", json={"name": "Double IPA"}, headers=headers).status_code == 200
+    assert client.get(f"/recipes/{recipe_id}", headers=headers).json()["recipe"]["name"] == "Double IPA"
+    
+    assert client.delete(f"/recipes/{recipe_id}", headers=headers).status_code == 200
+    assert client.get(f"/recipes/{recipe_id}", headers=headers).status_code == 404
+
+
+def test_local_auth_only_accepts_created_users(tmp_path, monkeypatch):
+    """No backend local o token é o uid, mas só de usuários criados por create_user"""
+    from backend.services.local_firestore import LocalAuth, LocalFirestoreClient
+
+    assert client.get("/recipes", headers={"Authorization": "Bearer qualquer-uid"}).status_code == 401
+
+    path = str(tmp_path / "local.sqlite3")
+    user = LocalAuth(LocalFirestoreClient(path)).create_user("persistido@example.com", "testpassword123")
+    reaberto = LocalAuth(LocalFirestoreClient(path))
+    assert reaberto.verify_id_token(user.uid)["email"] == "persistido@example.com"
+    with pytest.raises(ValueError):
+        reaberto.verify_id_token("desconhecido")
+
+    modulo = importlib.import_module("backend.services.firebase_service")
+    producao = modulo.get_settings().model_copy(update={"environment": "production"})
+    monkeypatch.setattr(modulo, "get_settings", lambda: producao)
+    with pytest.raises(ValueError, match="production"):
+        modulo.FirebaseService()
+
+
+def test_recipes_batch_and_pagination(authenticated):
+    """Testa a criação em lote seguida da listagem paginada"""
+    recipes = [{"name": f"Receita {i}", "style": "Lager"} for i in range(7)] + ["inválida"]
+    data = client.post("/recipes:batch", json=recipes, headers=authenticated).json()
+    assert data["created"] == 7
+    assert data["failed"] == 1
+    
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 3, "fields": "name"}
+        if cursor:
+            params["cursor"] = cursor
+        page = client.get("/recipes", params=params, headers=authenticated).json()
+        assert all(set(recipe) == {"id", "name"} for recipe in page["recipes"])
+        seen.extend(recipe["id"] for recipe in page["recipes"])
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+    
+    assert len(seen) == len(set(seen)) >= 7
+
+
 if __name__ == "__main__":
     pytest.main([__file__]) 
\ No newline at end of file
@@ -0,0 +1,114 @@
+"""
+Testes da verificação de ID tokens do Firebase com as chaves públicas em cache
+"""
+import asyncio
+import datetime
+import time
+from types import SimpleNamespace
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from google.auth import crypt, jwt
+from backend.config.settings import get_settings
+from backend.services import auth_cache
+from backend.services.auth_cache import PublicKeyCache, VerifiedTokenCache
+from backend.services.executor import BoundedExecutor
+from backend.services.firebase_service import FirebaseService, ID_TOKEN_ISSUER_PREFIX
+
+PROJETO = "bebrew-teste"
+
+
+def _chave():
+    privada = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    pem_privada = privada.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    )
+    pem_publica = privada.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    )
+    return pem_privada, pem_publica.decode()
+
+
+CHAVES = {"kid-1": _chave(), "kid-2": _chave()}
+
+
+def _token(kid="kid-1", **claims):
+    agora = int(time.time())
+    payload = {
+        "aud": PROJETO, "iss": ID_TOKEN_ISSUER_PREFIX + PROJETO, "sub": "usuario-1",
+        "iat": agora, "exp": agora + 3600, "email": "teste@bebrew.com"
+    }
+    payload.update(claims)
+    signer = crypt.RSASigner.from_string(CHAVES[kid][0], key_id=kid)
+    return jwt.encode(signer, payload).decode()
+
+
+@pytest.fixture
+def certificados(monkeypatch):
+    """Endpoint de certificados falso; o teste define quais kids ele publica"""
+    publicados = {"kid-1": CHAVES["kid-1"][1]}
+
+    def get(url, timeout):
+        return SimpleNamespace(
+            raise_for_status=lambda: None,
+            json=lambda: dict(publicados),
+            headers={"Cache-Control": "public, max-age=3600"}
+        )
+
+    monkeypatch.setattr(auth_cache.requests, "get", get)
+    return publicados
+
+
+@pytest.fixture
+def servico(certificados, monkeypatch):
+    """FirebaseService no modo firestore sem inicializar o SDK"""
+    monkeypatch.delenv("FIREBASE_AUTH_EMULATOR_HOST", raising=False)
+    servico = object.__new__(FirebaseService)
+    servico.settings = get_settings().model_copy(update={"firebase_project_id": PROJETO})
+    servico.backend = "firestore"
+    servico.executor = BoundedExecutor(1, name="test-auth")
+    servico.token_cache = VerifiedTokenCache()
+    servico.public_keys = PublicKeyCache("https://certs.test", min_refresh_interval=0)
+    return servico
+
+
+def test_token_valido(servico):
+    usuario = asyncio.run(servico.verify_token(_token()))
+    assert usuario == {"uid": "usuario-1", "email": "teste@bebrew.com", "email_verified": False}
+
+
+@pytest.mark.parametrize("claims", [
+    {"aud": "outro-projeto"},
+    {"iss": ID_TOKEN_ISSUER_PREFIX + "outro-projeto"},
+    {"sub": ""},
+    {"sub": "u" * 129},
+])
+def test_claims_invalidos_sao_recusados(servico, claims):
+    with pytest.raises(ValueError):
+        asyncio.run(servico.verify_token(_token(**claims)))
+    assert servico.token_cache.metrics()["entries"] == 0
+
+
+def test_kid_desconhecido_renova_as_chaves(servico, certificados):
+    assert asyncio.run(servico.verify_token(_token()))["uid"] == "usuario-1"
+    assert servico.public_keys.refreshes == 1
+
+    # Chave rotacionada: o kid novo só aparece no endpoint depois do primeiro download
+    certificados["kid-2"] = CHAVES["kid-2"][1]
+    assert asyncio.run(servico.verify_token(_token(kid="kid-2")))["uid"] == "usuario-1"
+    assert servico.public_keys.refreshes == 2
+
+
+def test_token_expirado_e_recusado_mesmo_em_cache(servico, monkeypatch):
+    token = _token()
+    asyncio.run(servico.verify_token(token))
+    assert servico.token_cache.metrics()["entries"] == 1
+
+    # Duas horas depois: o token venceu, embora continue no cache
+    depois = time.time() + 7200
+    monkeypatch.setattr(auth_cache, "time", SimpleNamespace(time=lambda: depois))
+    monkeypatch.setattr(jwt._helpers, "utcnow",
+                        lambda: datetime.datetime.fromtimestamp(depois, datetime.timezone.utc).replace(tzinfo=None))
+    with pytest.raises(ValueError):
+        asyncio.run(servico.verify_token(token))
+    assert servico.token_cache.hits == 0
@@ -0,0 +1,182 @@
+"""
+Testes do armazenamento local em SQLite
+"""
+import copy
+import json
+import os
+from datetime import datetime
+import pytest
+from util.banco_local import BancoLocal, _SQL_RECONSTRUIR_AGREGADOS
+from util.mock_data_loader import MockDataLoader
+
+DADOS = {
+    "receitas": [
+        {
+            "id": "r1", "nome": "Hidromel Tradicional", "tipo": "Hidromel", "volume": 20.0, "abv": 12.5,
+            "ingredientes": [
+                {"nome": "Mel", "tipo": "açúcar", "quantidade": 6.0},
+                {"nome": "Fermento EC-1118", "tipo": "levedura", "quantidade": 1},
+            ],
+            "etapas": [{"nome": "Diluição"}, {"nome": "Fermentação"}],
+        },
+        {
+            "id": "r2", "nome": "Pale Ale", "tipo": "Cerveja", "volume": 25.0, "abv": 5.0,
+            "ingredientes": [{"nome": "Malte Pale", "tipo": "malte", "quantidade": 5.0}],
+            "etapas": [],
+        },
+    ],
+    "producoes": [
+        {
+            "id": "p1", "lote": "L001", "receita_id": "r1", "receita_nome": "Hidromel Tradicional",
+            "status": "Em Andamento", "progresso": 40,
+            "temperaturas": [
+                {"timestamp": "2024-05-01T10:00:00", "valor": 24.5},
+                {"timestamp": "2024-05-01T11:00:00", "valor": 24.1},
+            ],
+            "anotacoes": [{"timestamp": "2024-05-01T10:30:00", "texto": "Mel dissolvido"}],
+        },
+        {"id": "p2", "lote": "L002", "receita_nome": "Pale Ale", "status": "Planejada"},
+    ],
+    "historico": [
+        {"id": "h1", "lote": "L000", "receita_nome": "Pale Ale", "tipo": "Cerveja", "status": "Concluída",
+         "abv": 5.2, "avaliacao": 4, "data_fim": "2024-03-01T00:00:00"},
+        {"id": "h2", "lote": "L_99", "receita_nome": "Melomel", "tipo": "Hidromel", "status": "Cancelada",
+         "data_fim": "2024-04-01T00:00:00"},
+    ],
+    "configuracoes": {"unidade_temperatura": "celsius", "alertas": {"ativo": True}},
+}
+
+
+@pytest.fixture
+def fontes():
+    """O mesmo conjunto de dados no banco SQLite e no carregador JSON"""
+    banco = BancoLocal(':memory:', importar_json=False)
+    banco.importar(DADOS)
+    mock = MockDataLoader()
+    mock.data = DADOS
+    yield banco, mock
+    banco.fechar()
+
+
+def test_mesma_interface_do_mock(fontes):
+    banco, mock = fontes
+    assert banco.get_receitas() == mock.get_receitas()
+    assert banco.get_receita_by_id("r1") == mock.get_receita_by_id("r1")
+    assert banco.get_receita_by_id("inexistente") is None
+    assert banco.get_producoes_ativas() == mock.get_producoes_ativas()
+    assert banco.get_producao_by_id("p2")["lote"] == "L002"
+    assert banco.get_configuracoes() == mock.get_configuracoes()
+    assert banco.get_estatisticas() == mock.get_estatisticas()
+    assert banco.get_resumo_historico() == mock.get_resumo_historico()
+    assert banco.get_tipos_bebida() == mock.get_tipos_bebida()
+    assert banco.get_ingredientes_unicos() == mock.get_ingredientes_unicos()
+
+
+def test_filtros_do_historico(fontes):
+    banco, _ = fontes
+    assert [h["id"] for h in banco.get_historico()] == ["h2", "h1"]
+    assert [h["id"] for h in banco.get_historico(tipo="Cerveja")] == ["h1"]
+    assert [h["id"] for h in banco.get_historico(termo="pale")] == ["h1"]
+    # Curingas do LIKE são tratados como texto
+    assert [h["id"] for h in banco.get_historico(termo="_9")] == ["h2"]
+    assert [h["id"] for h in banco.get_historico(desde=datetime(2024, 3, 15))] == ["h2"]
+    assert [h["id"] for h in banco.get_historico(limite=1, offset=1)] == ["h1"]
+
+
+def test_atualizacao_e_telemetria(fontes):
+    banco, _ = fontes
+    producao = banco.get_producao_by_id("p2")
+    producao["status"] = "Fermentando"
+    banco.salvar_producao(producao)
+    banco.adicionar_temperaturas("p2", [{"timestamp": "2024-05-02T08:00:00", "valor": 18.0}])
+
+    consultas = []
+    banco.conexao.set_trace_callback(consultas.append)
+    ativas = banco.get_producoes_ativas()
+    banco.conexao.set_trace_callback(None)
+    # Telemetria de todas as produções ativas em uma única consulta
+    assert len([sql for sql in consultas if "FROM telemetria" in sql]) == 1
+    assert [p["id"] for p in ativas] == ["p1", "p2"]
+    assert len(ativas[0]["temperaturas"]) == 2
+    assert ativas[1]["temperaturas"] == [{"timestamp": "2024-05-02T08:00:00", "valor": 18.0}]
+    assert banco.get_estatisticas()["ultima_producao"] == "L002"
+
+    assert banco.remover_receita("r2")
+    assert banco.get_ingredientes_unicos() == {"açúcar": ["Mel"], "levedura": ["Fermento EC-1118"]}
+
+
+def test_agregados_acompanham_as_escritas(fontes):
+    """Os agregados dos gatilhos batem com uma recontagem completa das tabelas"""
+    banco, _ = fontes
+    receita = banco.get_receita_by_id("r1")
+    banco.salvar_receita(dict(receita, abv=0, tipo="Melomel"))
+    banco.salvar_receita({"id": "r3", "nome": "Sidra", "tipo": "Sidra", "abv": 6.5})
+    banco.remover_receita("r2")
+    # Produção encerrada: passa para o histórico mantendo o id
+    banco.salvar_producao(dict(banco.get_producao_by_id("p1"), status="Concluída", abv=13.1, avaliacao=5),
+                          historico=True)
+    banco.salvar_producao(dict(DADOS["historico"][0], avaliacao=2), historico=True)
+
+    estatisticas, resumo = banco.get_estatisticas(), banco.get_resumo_historico()
+    assert estatisticas["receitas_por_tipo"] == {"Melomel": 1, "Sidra": 1}
+    assert estatisticas["producoes_por_status"] == {"Planejada": 1}
+    assert (estatisticas["abv_minimo"], estatisticas["abv_maximo"]) == (5.2, 13.1)
+    assert resumo["taxa_sucesso"] == pytest.approx(200 / 3)
+
+    banco.conexao.executescript(_SQL_RECONSTRUIR_AGREGADOS)
+    assert banco.get_estatisticas() == estatisticas
+    assert banco.get_resumo_historico() == pytest.approx(resumo)
+
+
+def test_recarrega_registros_alterados_no_json(tmp_path, monkeypatch):
+    arquivo = tmp_path / "mock_data.json"
+    arquivo.write_text(json.dumps(DADOS), encoding="utf-8")
+    monkeypatch.setenv("BEBREW_MOCK_DATA", str(arquivo))
+    banco = BancoLocal(':memory:')
+    assert banco.recarregar_se_alterado() == {}
+
+    # Edição feita pelo aplicativo em um registro que o arquivo não muda
+    banco.salvar_receita(dict(banco.get_receita_by_id("r2"), nome="Pale Ale Editada"))
+
+    dados = copy.deepcopy(DADOS)
+    dados["receitas"][0]["nome"] = "Hidromel Seco"
+    dados["receitas"].append({"id": "r3", "nome": "Sidra", "tipo": "Sidra", "ingredientes": [], "etapas": []})
+    dados["historico"].pop()
+    dados["configuracoes"]["unidade_temperatura"] = "fahrenheit"
+    arquivo.write_text(json.dumps(dados), encoding="utf-8")
+    estado = os.stat(arquivo)
+    os.utime(arquivo, ns=(estado.st_atime_ns, estado.st_mtime_ns + 1_000_000))
+
+    assert banco.recarregar_se_alterado() == {
+        "receitas": {"adicionados": ["r3"], "alterados": ["r1"], "removidos": []},
+        "historico": {"adicionados": [], "alterados": [], "removidos": ["h2"]},
+        "configuracoes": {"adicionados": [], "alterados": ["unidade_temperatura"], "removidos": []},
+    }
+    assert banco.get_receita_by_id("r1")["nome"] == "Hidromel Seco"
+    assert banco.get_receita_by_id("r3")["nome"] == "Sidra"
+    assert banco.get_receita_by_id("r2")["nome"] == "Pale Ale Editada"
+    assert [h["id"] for h in banco.get_historico()] == ["h1"]
+    assert banco.get_configuracoes()["unidade_temperatura"] == "fahrenheit"
+    assert banco.recarregar_se_alterado() == {}
+    banco.fechar()
+
+
+def test_banco_preenchido_nao_le_o_json_na_abertura(tmp_path, monkeypatch):
+    from util import mock_data_loader
+    arquivo = tmp_path / "mock_data.json"
+    arquivo.write_text(json.dumps(DADOS), encoding="utf-8")
+    monkeypatch.setenv("BEBREW_MOCK_DATA", str(arquivo))
+    caminho = str(tmp_path / "bebrew.sqlite3")
+    BancoLocal(caminho).fechar()
+
+    def proibido(*args, **kwargs):
+        raise AssertionError("o arquivo JSON não deveria ser lido")
+
+    monkeypatch.setattr(mock_data_loader.MockDataLoader, "ler_secoes", proibido)
+    monkeypatch.setattr(mock_data_loader.MockDataLoader, "_ler_arquivo", proibido)
+    monkeypatch.setattr(json, "load", proibido)
+    banco = BancoLocal(caminho)
+    assert [r["id"] for r in banco.get_receitas()] == ["r1", "r2"]
+    assert banco.recarregar_se_alterado() == {}
+    banco.fechar()
+
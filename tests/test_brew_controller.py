@@ -0,0 +1,141 @@
+"""
+Testes do BrewController com log de eventos
+"""
+import os
+import threading
+from controls.brew_controller import BrewController, DIRETORIO_ENCERRADAS
+from models import Etapa, Receita
+from util.registro_eventos import RegistroEventos
+
+
+def _receita() -> Receita:
+    receita = Receita("Hidromel Tradicional", "hidromel", 20.0)
+    receita.adicionar_etapa(Etapa("Mostura", "Diluir o mel", 60, 25.0))
+    receita.adicionar_etapa(Etapa("Fermentação", "Fermentar", 20160, 18.0))
+    return receita
+
+
+def test_recupera_producao_apos_queda(tmp_path):
+    """Estado reconstruído de snapshot + eventos, ignorando registro incompleto"""
+    controller = BrewController(str(tmp_path))
+    producao = controller.criar_nova_producao(_receita(), "L-001")
+    controller.iniciar_producao(producao.id)
+    controller.iniciar_etapa_atual(producao.id)
+    for i in range(50):
+        controller.adicionar_temperatura(producao.id, 24.0 + i * 0.1)
+    controller.adicionar_anotacao(producao.id, "Mel dissolvido")
+    controller.finalizar_etapa_atual(producao.id)
+    controller.registrar_densidade(producao.id, 1.100, "og")
+    controller.adicionar_temperatura(producao.id, 18.5)
+    controller.fechar()
+
+    # Simula uma escrita interrompida no fim do log
+    diretorio = tmp_path / producao.id
+    segmento = sorted(nome for nome in os.listdir(diretorio) if nome.endswith('.log'))[-1]
+    with open(diretorio / segmento, 'ab') as arquivo:
+        arquivo.write(b'\x40\x00\x00\x00\x00')
+
+    recuperado = BrewController(str(tmp_path)).producoes_ativas[producao.id]
+    assert recuperado.lote == "L-001"
+    assert recuperado.etapa_atual_index == 1
+    assert recuperado.og_medido == 1.100
+    primeira, segunda = recuperado.etapas_execucao
+    assert primeira.concluida and primeira.fim == producao.etapas_execucao[0].fim
+    assert len(primeira.temperaturas) == 50
+    assert primeira.anotacoes[0][1] == "Mel dissolvido"
+    assert len(segunda.temperaturas) == 1
+
+
+def test_producao_encerrada_nao_e_recuperada(tmp_path, monkeypatch):
+    """O log encerrado é arquivado e a inicialização nem chega a decodificá-lo"""
+    controller = BrewController(str(tmp_path))
+    producao = controller.criar_nova_producao(_receita())
+    controller.iniciar_producao(producao.id)
+    controller.cancelar_producao(producao.id, "Contaminação")
+    controller.fechar()
+
+    assert os.listdir(tmp_path) == [DIRETORIO_ENCERRADAS]
+    arquivada, _ = RegistroEventos(str(tmp_path / DIRETORIO_ENCERRADAS / producao.id)).carregar()
+    assert arquivada.status == "Cancelada"
+
+    carregados = []
+    carregar = RegistroEventos.carregar
+    monkeypatch.setattr(RegistroEventos, "carregar",
+                        lambda registro: carregados.append(registro.diretorio) or carregar(registro))
+    assert BrewController(str(tmp_path)).producoes_ativas == {}
+    assert carregados == []
+
+
+def test_producao_finalizada_deixa_de_ser_ativa(tmp_path):
+    """Leituras após a finalização não reabrem o log da produção"""
+    controller = BrewController(str(tmp_path))
+    producao = controller.criar_nova_producao(_receita(), "L-002")
+    controller.iniciar_producao(producao.id)
+    controller.iniciar_etapa_atual(producao.id)
+    controller.adicionar_temperatura(producao.id, 24.0)
+    assert controller.finalizar_producao(producao.id, 19.0)
+
+    assert producao.id not in controller.producoes_ativas
+    assert not controller.adicionar_temperatura(producao.id, 25.0)
+    assert controller._registros == {}
+    assert not (tmp_path / producao.id).exists()
+    controller.fechar()
+
+
+def test_group_commit(tmp_path):
+    """Escritas concorrentes duráveis compartilham fsyncs"""
+    registro = RegistroEventos(str(tmp_path), intervalo_commit=0)
+
+    def escrever(n):
+        for i in range(100):
+            registro.registrar("temperatura", {"valor": float(i)}, duravel=True)
+
+    threads = [threading.Thread(target=escrever, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    registro.fechar()
+
+    assert registro.eventos == 800
+    assert registro.fsyncs < registro.eventos
+    _, eventos = RegistroEventos(str(tmp_path)).carregar()
+    assert [evento[0] for evento in eventos] == list(range(1, 801))
+
+
+def test_sincronizar_apos_snapshot(tmp_path):
+    """Evento gravado entre o sincronizar() do snapshot e o lock não deixa o registro sem arquivo"""
+    controller = BrewController()
+    producao = controller.criar_nova_producao(_receita(), "L-003")
+    registro = RegistroEventos(str(tmp_path), intervalo_commit=0)
+    registro.carregar()
+    registro.registrar("temperatura", {"valor": 20.0})
+
+    sincronizar = registro.sincronizar
+
+    def sincronizar_e_registrar(ate=None):
+        sincronizar(ate)
+        registro.sincronizar = sincronizar
+        registro.registrar("temperatura", {"valor": 21.0})
+
+    registro.sincronizar = sincronizar_e_registrar
+    registro.gravar_snapshot(producao)
+    registro.sincronizar()
+    registro.fechar()
+
+    recuperada, eventos = RegistroEventos(str(tmp_path)).carregar()
+    assert recuperada.lote == "L-003" and eventos == []
+
+
+def test_abv_memorizado_e_invalidado_pela_densidade():
+    controller = BrewController()
+    producao = controller.criar_nova_producao(_receita(), "L-004")
+    controller.registrar_densidade(producao.id, 1.100, "og")
+    controller.registrar_densidade(producao.id, 1.010, "fg")
+    chave = (1.100, 1.010, 'simples')
+    assert controller.obter_dados_grafico(producao.id)['abv'] == producao.abv_final
+    assert chave in controller.abv_calculator._cache
+
+    controller.registrar_densidade(producao.id, 1.000, "fg")
+    assert chave not in controller.abv_calculator._cache
+    assert controller.obter_dados_grafico(producao.id)['abv'] == producao.abv_final
@@ -0,0 +1,60 @@
+"""
+Testes do ajuste de curvas de fermentação
+"""
+import numpy as np
+import pytest
+from util.curva_fermentacao import TOLERANCIA_TERMINAL, prever_fermentacao
+
+DIA = 86400.0
+
+
+def _logistica(dias, og=1.060, fg=1.012, k=0.9, meio=3.0):
+    return fg + (og - fg) / (1 + np.exp(k * (dias - meio)))
+
+
+def test_ajuste_logistico_com_ruido():
+    dias = np.arange(0, 7, 0.5)
+    densidades = _logistica(dias) + np.random.default_rng(1).normal(0, 0.0005, len(dias))
+    previsao = prever_fermentacao(dias * DIA, densidades, og=1.060)
+    terminal = 3.0 + np.log(0.048 / TOLERANCIA_TERMINAL - 1) / 0.9
+
+    assert previsao["metodo"] == "logistico" and previsao["confiavel"]
+    assert previsao["fg_intervalo"][0] <= 1.012 <= previsao["fg_intervalo"][1]
+    assert previsao["dias_ate_terminal"] == pytest.approx(terminal, abs=0.5)
+    assert previsao["abv_intervalo"][0] <= previsao["abv"] <= previsao["abv_intervalo"][1]
+
+
+def test_temperatura_escala_o_tempo():
+    """A 10 °C (Q10 = 2) a mesma curva leva o dobro do tempo no relógio"""
+    dias = np.arange(0, 14, 1.0)
+    densidades = _logistica(dias / 2)
+    frio = prever_fermentacao(dias * DIA, densidades, og=1.060,
+                              tempos_temperatura=[0.0], temperaturas=[10.0])
+    normal = prever_fermentacao(dias[::2] / 2 * DIA, densidades[::2], og=1.060)
+    assert frio["dias_ate_terminal"] == pytest.approx(2 * normal["dias_ate_terminal"], rel=0.05)
+    # Aquecendo para 20 °C o que falta anda duas vezes mais rápido
+    aquecido = prever_fermentacao(dias * DIA, densidades, og=1.060, tempos_temperatura=[0.0],
+                                  temperaturas=[10.0], temperatura_futura=20.0)
+    assert aquecido["dias_restantes"] == pytest.approx(frio["dias_restantes"] / 2)
+
+
+def test_estimativa_sem_leituras():
+    previsao = prever_fermentacao([], [], og=1.100, fg_esperado=1.010, dias_esperados=30)
+    assert previsao["metodo"] == "estimativa" and not previsao["confiavel"]
+    assert previsao["fg"] == 1.010 and previsao["dias_ate_terminal"] == 30
+    with pytest.raises(ValueError):
+        prever_fermentacao([], [])
+
+
+@pytest.mark.parametrize("densidades", [
+    [1.050] * 8,                                          # fase lag: leituras planas no OG
+    [1.050, 1.050, 1.050, 1.049, 1.049, 1.048, 1.048],    # começo da queda, ainda sem curva
+])
+def test_leituras_planas_usam_estimativa(densidades):
+    dias = np.arange(len(densidades), dtype=np.float64)
+    previsao = prever_fermentacao(dias * DIA, densidades, og=1.050)
+
+    assert previsao["metodo"] == "estimativa" and not previsao["confiavel"]
+    assert np.isfinite(previsao["dias_restantes"]) and previsao["dias_restantes"] <= 14
+    assert all(np.isfinite(previsao["dias_restantes_intervalo"]))
+    assert 1.0 < previsao["fg"] < 1.050
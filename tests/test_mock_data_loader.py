@@ -0,0 +1,222 @@
+"""
+Testes dos índices do MockDataLoader
+"""
+import json
+import os
+import random
+import sys
+from collections import Counter
+import pytest
+from util.mock_data_loader import MockDataLoader
+
+
+def _carregador(data) -> MockDataLoader:
+    carregador = MockDataLoader.__new__(MockDataLoader)
+    carregador.data = data
+    return carregador
+
+
+def test_indices_consistentes_apos_mutacoes():
+    carregador = _carregador({
+        "receitas": [{"id": "r1", "nome": "Pale Ale"}, {"id": "r1", "nome": "Duplicada"}],
+        "producoes": [
+            {"id": "p1", "lote": "L1", "status": "Em Andamento"},
+            {"id": "p2", "lote": "L2", "status": "Planejada"},
+            {"id": "p3", "lote": "L3", "status": "Fermentando"},
+        ],
+        "historico": [],
+    })
+    # Id repetido: vale o primeiro, como na busca linear
+    assert carregador.get_receita_by_id("r1")["nome"] == "Pale Ale"
+    assert [p["id"] for p in carregador.get_producoes_ativas()] == ["p1", "p3"]
+
+    # Mudança de status mantém a posição original da produção
+    carregador.salvar_producao({"id": "p2", "lote": "L2", "status": "Fermentando"})
+    assert [p["id"] for p in carregador.get_producoes_ativas()] == ["p1", "p2", "p3"]
+    assert carregador.get_producoes_por_status("Planejada") == []
+
+    carregador.salvar_producao({"id": "p4", "lote": "L4", "status": "Em Andamento"})
+    assert carregador.remover_producao("p1")
+    assert not carregador.remover_producao("p1")
+    assert carregador.get_producao_by_id("p1") is None
+    assert [p["id"] for p in carregador.get_producoes_ativas()] == ["p2", "p3", "p4"]
+    assert [p["id"] for p in carregador.data["producoes"]] == ["p2", "p3", "p4"]
+
+    carregador.salvar_receita({"id": "r2", "nome": "Hidromel"})
+    carregador.salvar_receita({"id": "r2", "nome": "Hidromel Tradicional"})
+    assert [r["nome"] for r in carregador.get_receitas()] == ["Pale Ale", "Duplicada", "Hidromel Tradicional"]
+    assert carregador.remover_receita("r1")
+    assert carregador.get_receita_by_id("r1")["nome"] == "Duplicada"
+
+
+def test_agregados_acompanham_mutacoes():
+    """Estatísticas mantidas incrementalmente batem com o recálculo completo"""
+    aleatorio = random.Random(7)
+    carregador = _carregador({"receitas": [], "producoes": [], "historico": []})
+    status = ["Planejada", "Em Andamento", "Fermentando"]
+    for passo in range(300):
+        i = aleatorio.randrange(40)
+        operacao = aleatorio.random()
+        if operacao < 0.3:
+            carregador.salvar_receita({"id": f"r{i}", "tipo": aleatorio.choice(["Cerveja", "Hidromel"]),
+                                       "abv": aleatorio.choice([0, 4.5, 5.0, 12.0])})
+        elif operacao < 0.45:
+            carregador.remover_receita(f"r{i}")
+        elif operacao < 0.7:
+            carregador.salvar_producao({"id": f"p{i}", "lote": f"L{passo}", "status": aleatorio.choice(status)})
+        elif operacao < 0.8:
+            carregador.remover_producao(f"p{i}")
+        elif operacao < 0.95:
+            carregador.salvar_producao({"id": f"h{i}", "status": aleatorio.choice(["Concluída", "Cancelada"]),
+                                        "abv": aleatorio.choice([None, 6.0, 13.5]),
+                                        "avaliacao": aleatorio.randint(0, 5)}, historico=True)
+        else:
+            carregador.remover_producao(f"h{i}", historico=True)
+
+        estatisticas = carregador.get_estatisticas()
+        dados = carregador.data
+        abvs = [r["abv"] for r in dados["receitas"] if r.get("abv")] + \
+               [h["abv"] for h in dados["historico"] if h.get("abv")]
+        assert estatisticas["total_receitas"] == len(dados["receitas"])
+        assert estatisticas["producoes_ativas"] == len(
+            [p for p in dados["producoes"] if p["status"] in ("Em Andamento", "Fermentando")])
+        assert estatisticas["abv_medio"] == pytest.approx(sum(abvs) / len(abvs) if abvs else 0)
+        assert estatisticas["abv_minimo"] == (min(abvs) if abvs else 0)
+        assert estatisticas["abv_maximo"] == (max(abvs) if abvs else 0)
+        assert estatisticas["receitas_por_tipo"] == dict(Counter(r["tipo"] for r in dados["receitas"]))
+
+    concluidas = len([h for h in carregador.data["historico"] if h["status"] == "Concluída"])
+    resumo = carregador.get_resumo_historico()
+    assert resumo["total"] == len(carregador.data["historico"])
+    assert resumo["taxa_sucesso"] == pytest.approx(concluidas / resumo["total"] * 100)
+
+
+def test_salvar_de_novo_o_registro_alterado():
+    """Fluxo de edição: pegar o dicionário, alterá-lo e salvar o mesmo objeto"""
+    carregador = _carregador({
+        "receitas": [{"id": "r1", "nome": "Pale Ale", "tipo": "Cerveja", "abv": 5.0}],
+        "producoes": [{"id": "p1", "lote": "L1", "status": "Fermentando"}],
+        "historico": [{"id": "h1", "tipo": "Cerveja", "status": "Concluída", "abv": 6.0, "avaliacao": 4}],
+    })
+    receita = carregador.get_receita_by_id("r1")
+    receita.update(nome="Pale Ale Forte", abv=6.0, tipo="Cerveja Forte")
+    carregador.salvar_receita(receita)
+    assert carregador.get_receitas() == [{"id": "r1", "nome": "Pale Ale Forte", "tipo": "Cerveja Forte", "abv": 6.0}]
+    estatisticas = carregador.get_estatisticas()
+    assert estatisticas["abv_medio"] == pytest.approx(6.0)
+    assert estatisticas["abv_minimo"] == estatisticas["abv_maximo"] == 6.0
+    assert estatisticas["receitas_por_tipo"] == {"Cerveja Forte": 1}
+
+    producao = carregador.get_producao_by_id("p1")
+    producao["status"] = "Concluída"
+    carregador.salvar_producao(producao)
+    assert carregador.get_producoes_ativas() == []
+    assert carregador.get_producoes_por_status("Concluída") == [{"id": "p1", "lote": "L1", "status": "Concluída"}]
+    assert carregador.get_estatisticas()["producoes_ativas"] == 0
+
+    historico = carregador.get_historico()[0]
+    historico.update(abv=7.0, avaliacao=5)
+    carregador.salvar_producao(historico, historico=True)
+    assert carregador.get_resumo_historico()["total"] == 1
+    assert carregador.get_estatisticas()["abv_maximo"] == 7.0
+
+
+def test_extremos_apos_remover_minimo_e_maximo():
+    from util.mock_data_loader import _Acumulador
+    acumulador = _Acumulador()
+    for valor in (5.0, 7.0, 5.0, 3.0):
+        acumulador.adicionar(valor)
+    acumulador.remover(7.0)
+    acumulador.remover(3.0)
+    assert (acumulador.minimo, acumulador.maximo, acumulador.contagem) == (5.0, 5.0, 2)
+    acumulador.remover(5.0)
+    assert (acumulador.minimo, acumulador.maximo) == (5.0, 5.0)
+    acumulador.remover(5.0)
+    assert (acumulador.minimo, acumulador.maximo, acumulador.soma) == (None, None, 0.0)
+
+
+@pytest.mark.parametrize("com_ijson", [True, False])
+def test_carregamento_por_secao(tmp_path, monkeypatch, com_ijson):
+    """Cada seção é lida e indexada só quando usada"""
+    if com_ijson:
+        pytest.importorskip("ijson")
+    else:
+        monkeypatch.setitem(sys.modules, "ijson", None)
+    dados = {
+        "configuracoes": {"unidade": "celsius"},
+        "receitas": [{"id": "r1", "tipo": "Hidromel", "abv": 12.5}],
+        "producoes": [{"id": "p1", "lote": "L1", "status": "Fermentando"}],
+        "historico": [{"id": "h1", "status": "Concluída", "abv": 5.5}],
+    }
+    caminho = tmp_path / "mock_data.json"
+    caminho.write_text(json.dumps(dados), encoding="utf-8")
+
+    carregador = MockDataLoader(str(caminho))
+    assert carregador._carregadas == set()
+    assert carregador.get_receita_by_id("r1")["abv"] == 12.5
+    if com_ijson:
+        assert carregador._carregadas == {"receitas"}
+    assert carregador.get_estatisticas()["abv_medio"] == 9.0
+    assert carregador.get_producoes_ativas()[0]["id"] == "p1"
+    assert carregador.data == dados
+
+    # Arquivo ausente: seções vazias
+    vazio = MockDataLoader(str(tmp_path / "inexistente.json"))
+    assert vazio.get_receitas() == [] and vazio.get_configuracoes() == {}
+
+
+def test_recarrega_so_o_que_mudou(tmp_path):
+    """O observador relê o arquivo só quando mtime/tamanho mudam e avisa com o diff por id"""
+    from util.observador_dados import ObservadorDados
+    caminho = tmp_path / "mock_data.json"
+    dados = {
+        "receitas": [{"id": "r1", "nome": "Pale Ale", "abv": 5.0}, {"id": "r2", "nome": "Stout", "abv": 7.0}],
+        "producoes": [{"id": "p1", "lote": "L1", "status": "Fermentando"}],
+        "historico": [],
+        "configuracoes": {"unidade": "celsius"},
+    }
+
+    def gravar(mtime_ns):
+        caminho.write_text(json.dumps(dados), encoding="utf-8")
+        os.utime(caminho, ns=(mtime_ns, mtime_ns))
+
+    gravar(10 ** 18)
+    carregador = MockDataLoader(str(caminho))
+    notificacoes = []
+    observador = ObservadorDados(carregador)
+    observador.inscrever(notificacoes.append)
+
+    # Nada lido ainda: não há o que comparar
+    assert observador.verificar() == {}
+    stout = carregador.get_receita_by_id("r2")
+    assert carregador.get_producoes_ativas()[0]["id"] == "p1"
+
+    dados["receitas"] = [{"id": "r0", "nome": "Hidromel", "abv": 12.0}, {"id": "r2", "nome": "Stout", "abv": 8.0}]
+    dados["producoes"][0]["status"] = "Concluída"
+    dados["configuracoes"]["unidade"] = "fahrenheit"
+    gravar(2 * 10 ** 18)
+    alteracoes = observador.verificar()
+    assert alteracoes == {
+        "receitas": {"adicionados": ["r0"], "alterados": ["r2"], "removidos": ["r1"]},
+        "producoes": {"adicionados": [], "alterados": ["p1"], "removidos": []},
+    }
+    assert notificacoes == [alteracoes]
+    # Registros alterados são atualizados no lugar, na ordem do arquivo
+    assert carregador.get_receita_by_id("r2") is stout and stout["abv"] == 8.0
+    assert [r["id"] for r in carregador.get_receitas()] == ["r0", "r2"]
+    assert carregador.get_estatisticas()["abv_medio"] == 10.0
+    assert carregador.get_producoes_ativas() == []
+    # Seção ainda não usada vem do arquivo novo
+    assert carregador.get_configuracoes() == {"unidade": "fahrenheit"}
+
+    # Sem mudança de mtime/tamanho o arquivo nem é aberto
+    caminho.write_text("{quebrado", encoding="utf-8")
+    os.utime(caminho, ns=(2 * 10 ** 18, 2 * 10 ** 18))
+    assert carregador.recarregar_se_alterado() == {}
+    # Arquivo inválido (gravação pela metade): mantém os dados e tenta de novo depois
+    os.utime(caminho, ns=(3 * 10 ** 18, 3 * 10 ** 18))
+    assert carregador.recarregar_se_alterado() == {}
+    assert len(carregador.get_receitas()) == 2
+    gravar(4 * 10 ** 18)
+    assert carregador.recarregar_se_alterado() == {}
+    assert len(notificacoes) == 1
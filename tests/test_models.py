@@ -0,0 +1,100 @@
+"""
+Testes dos modelos de domínio do Bebrew
+"""
+from datetime import datetime, timedelta
+import numpy as np
+import pytest
+from models import Etapa, EtapaExecucao, Producao, Receita, SerieTemporal, Telemetria
+
+
+def test_serie_temporal_compativel_com_tuplas():
+    """A série continua iterável como (timestamp, valor)"""
+    inicio = datetime(2024, 5, 1, 12, 0, 0)
+    etapa = EtapaExecucao("etapa-1", inicio)
+    for i in range(200):
+        etapa.adicionar_temperatura(20.0 + i * 0.01, inicio + timedelta(seconds=10 * i))
+    
+    assert len(etapa.temperaturas) == 200
+    timestamp, valor = etapa.temperaturas[-1]
+    assert timestamp == inicio + timedelta(seconds=1990)
+    assert abs(valor - 21.99) < 1e-4
+    
+    tempos, valores = zip(*etapa.temperaturas)
+    assert tempos[0] == inicio
+    assert len(valores) == 200
+
+
+def test_serie_temporal_views_numpy():
+    """As colunas são expostas como views NumPy somente leitura"""
+    serie = SerieTemporal(capacidade=2)
+    for i in range(100):
+        serie.adicionar(float(i), 1000.0 + i)
+    
+    assert serie.valores.dtype == np.float32
+    assert serie.valores.base is not None
+    assert not serie.valores.flags.writeable
+    assert serie.estatisticas()['maximo'] == 99.0
+    assert serie.tempos_datetime64()[0] == np.datetime64(1000, 's')
+
+
+def test_telemetria_retencao_e_niveis():
+    """Leituras antigas saem da janela bruta e continuam nos resumos"""
+    inicio = datetime(2024, 5, 1)
+    telemetria = Telemetria(janela=3600, capacidade_maxima=1000)
+    for i in range(24 * 360):  # 24 h a cada 10 s
+        telemetria.adicionar(18.0 + (i % 2), inicio + timedelta(seconds=10 * i))
+    
+    assert len(telemetria) <= 361
+    assert telemetria.total == 24 * 360
+    assert telemetria.estatisticas()['media'] == 18.5
+    
+    recente = telemetria.consultar(inicio + timedelta(hours=23, minutes=30))
+    assert recente['nivel'] == 'bruto'
+    
+    dia = telemetria.consultar(inicio)
+    assert dia['nivel'] == '1min'
+    assert len(dia['serie']) == 24 * 60
+    assert dia['minimos'][0] == 18.0 and dia['maximos'][0] == 19.0
+    
+    resumo = telemetria.consultar(inicio, max_pontos=200)
+    assert resumo['nivel'] == '15min'
+    assert len(resumo['serie']) == 96
+
+
+def test_modelos_com_slots():
+    """Modelos não aceitam atributos fora dos declarados e geram ID sob demanda"""
+    receita = Receita("IPA", "cerveja", 20.0)
+    assert not hasattr(receita, "__dict__")
+    with pytest.raises(AttributeError):
+        receita.atributo_inexistente = 1
+    
+    assert receita.id == receita.id
+    assert Receita("IPA", "cerveja", 20.0, id="receita-1").id == "receita-1"
+
+
+@pytest.mark.parametrize("codec", ["json", "binario"])
+def test_serializacao_producao(codec):
+    """Produção com telemetria sobrevive à ida e volta nos dois codecs"""
+    from util.serializacao import para_json, de_json, para_binario, de_binario
+    codificar, decodificar = {"json": (para_json, de_json), "binario": (para_binario, de_binario)}[codec]
+    
+    receita = Receita("Stout", "cerveja", 20.0)
+    receita.adicionar_etapa(Etapa("Fermentação", "Primária", 10080, 18.0))
+    producao = Producao(receita, "L42")
+    producao.iniciar_producao()
+    inicio = datetime(2024, 5, 1)
+    for i in range(5000):
+        producao.etapas_execucao[0].adicionar_temperatura(18.0 + (i % 10) * 0.1, inicio + timedelta(seconds=10 * i))
+    producao.densidades.adicionar(1.062, inicio)
+    producao.densidades.adicionar(1.030, inicio + timedelta(days=3))
+    
+    copia = decodificar(codificar(producao))
+    
+    assert copia.id == producao.id and copia.lote == "L42"
+    assert copia.data_inicio == producao.data_inicio
+    assert copia.receita.etapas[0].id == receita.etapas[0].id
+    original, restaurada = producao.etapas_execucao[0].temperaturas, copia.etapas_execucao[0].temperaturas
+    assert np.array_equal(original.valores, restaurada.valores)
+    assert restaurada.estatisticas() == original.estatisticas()
+    assert restaurada.consultar(inicio)['nivel'] == original.consultar(inicio)['nivel']
+    assert list(copia.densidades) == list(producao.densidades)
@@ -0,0 +1,125 @@
+"""
+Testes da busca indexada do RecipeController
+"""
+import json
+import pytest
+from controls.recipe_controller import RecipeController
+from util.serializacao import FORMATO, VERSAO, de_json
+
+
+def _controller() -> RecipeController:
+    controller = RecipeController()
+    controller.criar_nova_receita("IPA de Lúpulo Cítrico", "Cerveja", 20.0, "Bastante lúpulo no dry hop")
+    controller.criar_nova_receita("Pale Ale", "cerveja", 20.0, "Maltada, com um toque de lúpulo")
+    controller.criar_nova_receita("Hidromel Tradicional", "Hidromel", 10.0, "Mel de laranjeira")
+    return controller
+
+
+def test_busca_sem_acentos_prefixo_e_ranking():
+    controller = _controller()
+    nomes = [r.nome for r in controller.buscar_receitas("lupulo")]
+    # Nome pesa mais que descrição
+    assert nomes == ["IPA de Lúpulo Cítrico", "Pale Ale"]
+    assert [r.nome for r in controller.buscar_receitas("hidro")] == ["Hidromel Tradicional"]
+    # Trecho no meio da palavra, como a busca antiga por substring
+    assert [r.nome for r in controller.buscar_receitas("ranjei")] == ["Hidromel Tradicional"]
+    # Erro de digitação cai na busca aproximada
+    assert [r.nome for r in controller.buscar_receitas("tradicinal")] == ["Hidromel Tradicional"]
+    # Todas as palavras precisam casar
+    assert [r.nome for r in controller.buscar_receitas("pale lupulo")] == ["Pale Ale"]
+    assert controller.buscar_receitas("lupulo", limite=1)[0].nome == "IPA de Lúpulo Cítrico"
+    assert len(controller.buscar_receitas("")) == 3
+
+
+def test_indice_acompanha_edicoes_e_remocoes():
+    controller = _controller()
+    ipa = controller.buscar_receitas("ipa")[0]
+    assert [r.nome for r in controller.obter_receitas_por_tipo("CERVEJA")] == ["IPA de Lúpulo Cítrico", "Pale Ale"]
+
+    controller.editar_receita(ipa.id, nome="Session IPA", tipo="Cerveja Session")
+    assert controller.buscar_receitas("citrico") == []
+    assert controller.buscar_receitas("session") == [ipa]
+    assert [r.nome for r in controller.obter_receitas_por_tipo("cerveja")] == ["Pale Ale"]
+
+    copia = controller.duplicar_receita(ipa.id, "Session IPA 2")
+    controller.deletar_receita(ipa.id)
+    assert controller.buscar_receitas("session") == [copia]
+    controller.deletar_receita(copia.id)
+    assert controller.buscar_receitas("session") == []
+    assert "session" not in controller.indice._vocabulario
+
+
+def test_listagens_ordenadas_acompanham_alteracoes(monkeypatch):
+    """As ordenações mantidas dão o mesmo resultado que ordenar tudo a cada chamada"""
+    import random
+    from datetime import datetime, timedelta
+    import util.lista_ordenada
+    monkeypatch.setattr(util.lista_ordenada, "CARGA", 4)  # força divisão de blocos
+
+    aleatorio = random.Random(7)
+    controller = RecipeController()
+    inicio = datetime(2025, 1, 1)
+    for i in range(200):
+        receita = controller.criar_nova_receita(f"Receita {aleatorio.randint(0, 50)}", aleatorio.choice(["Cerveja", "Hidromel"]), 20.0)
+        receita.data_criacao = inicio + timedelta(days=aleatorio.randint(0, 30))
+        receita.og, receita.fg = 1.050 + aleatorio.randint(0, 40) / 1000, 1.010
+        controller.salvar_receita(receita)
+    for receita_id in list(controller.receitas)[::3]:
+        controller.calcular_abv_receita(receita_id)
+    for receita_id in list(controller.receitas)[::7]:
+        controller.editar_receita(receita_id, nome=f"Editada {aleatorio.randint(0, 9)}")
+    for receita_id in list(controller.receitas)[::5]:
+        controller.deletar_receita(receita_id)
+
+    receitas = list(controller.receitas.values())
+    esperado = {
+        "nome": sorted(receitas, key=lambda r: r.nome),
+        "tipo": sorted(receitas, key=lambda r: r.tipo),
+        "data": sorted(receitas, key=lambda r: r.data_criacao, reverse=True),
+        "abv": sorted(receitas, key=lambda r: r.abv or 0, reverse=True),
+    }
+    for ordem, lista in esperado.items():
+        assert controller.listar_receitas(ordem) == lista
+        assert controller.listar_receitas(ordem, inicio=20, limite=20) == lista[20:40]
+
+    assert controller.listar_receitas("abv", limite=20) == esperado["abv"][:20]
+    faixa = [r for r in esperado["abv"] if 5 <= (r.abv or 0) <= 7]
+    assert faixa and controller.listar_receitas("abv", minimo=5, maximo=7) == faixa
+    periodo = [r for r in esperado["data"] if r.data_criacao >= inicio + timedelta(days=20)]
+    assert controller.listar_receitas("data", minimo=inicio + timedelta(days=20), limite=5) == periodo[:5]
+
+
+def test_edicao_com_valor_ausente_ou_invalido_nao_corrompe_ordenacoes():
+    controller = _controller()
+    hidromel, ipa, pale = controller.listar_receitas("nome")
+
+    # Sem tipo: a receita vai para o fim da ordenação por tipo
+    assert controller.editar_receita(ipa.id, tipo=None)
+    assert controller.listar_receitas("tipo")[-1] is ipa
+
+    # Valor que não pode ser ordenado: a edição falha e as listas ficam intactas
+    antes = {ordem: controller.listar_receitas(ordem) for ordem in ("nome", "tipo", "data", "abv")}
+    with pytest.raises(TypeError):
+        controller.editar_receita(pale.id, abv="alto")
+    pale.abv = None
+    assert {ordem: controller.listar_receitas(ordem) for ordem in antes} == antes
+
+    for receita in (ipa, pale, hidromel):
+        assert controller.deletar_receita(receita.id)
+    assert all(len(lista) == 0 for lista in controller.ordenacoes.values())
+
+
+def test_exportar_receita_usa_o_envelope_da_serializacao():
+    controller = _controller()
+    ipa = controller.buscar_receitas("ipa")[0]
+    controller.adicionar_ingrediente(ipa.id, "Citra", "lupulo", "g", 50.0)
+    controller.adicionar_etapa(ipa.id, "Dry hop", "Lúpulo na fermentação", 4320, 18.0)
+
+    documento = controller.exportar_receita(ipa.id)
+    assert (documento["formato"], documento["versao"], documento["tipo"]) == (FORMATO, VERSAO, "Receita")
+
+    copia = de_json(json.dumps(documento))
+    assert (copia.id, copia.nome, copia.data_criacao) == (ipa.id, ipa.nome, ipa.data_criacao)
+    assert [i.nome for i in copia.ingredientes] == ["Citra"]
+    assert [e.nome for e in copia.etapas] == ["Dry hop"]
+    assert controller.exportar_receita("inexistente") is None
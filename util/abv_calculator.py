@@ -1,3 +1,37 @@
+from collections import OrderedDict
+from typing import Optional
+
+import numpy as np
+
+# Problemas de validação em lote, um bit cada (ver validar_densidades_lote)
+OG_BAIXO = 1 << 0
+OG_ALTO = 1 << 1
+FG_BAIXO = 1 << 2
+FG_ALTO = 1 << 3
+FG_NAO_MENOR_QUE_OG = 1 << 4
+ATENUACAO_ALTA = 1 << 5
+ATENUACAO_BAIXA = 1 << 6
+
+MENSAGENS_VALIDACAO = {
+    OG_BAIXO: "OG muito baixo (< 1.020)",
+    OG_ALTO: "OG muito alto (> 1.150)",
+    FG_BAIXO: "FG muito baixo (< 0.990)",
+    FG_ALTO: "FG muito alto (> 1.030)",
+    FG_NAO_MENOR_QUE_OG: "FG deve ser menor que OG",
+    ATENUACAO_ALTA: "Atenuação muito alta (> 90%)",
+    ATENUACAO_BAIXA: "Atenuação muito baixa (< 30%)"
+}
+
+# Registro de cada linha de ABVCalculator.calcular_lote
+DTYPE_RESULTADO = np.dtype([
+    ('og', np.float64),
+    ('fg', np.float64),
+    ('abv', np.float64),
+    ('atenuacao', np.float64),
+    ('calorias_100ml', np.float64),
+    ('validacao', np.uint8)
+])
+
 def calcular_abv_simples(og: float, fg: float) -> float:
     """
     Calcula ABV usando a fórmula simples
@@ -92,15 +126,88 @@ def calcular_pontos_gravity(og: float, volume_litros: float) -> float:
     """
     return (og - 1) * 1000 * volume_litros
 
+METODOS_ABV = {
+    'simples': calcular_abv_simples,
+    'preciso': calcular_abv_preciso,
+    'alternativo': calcular_abv_alternativo
+}
+
+def _densidades_lote(og, fg):
+    """OG e FG como arrays float64 do mesmo formato"""
+    return np.broadcast_arrays(np.asarray(og, dtype=np.float64), np.asarray(fg, dtype=np.float64))
+
+def calcular_atenuacao_lote(og, fg) -> np.ndarray:
+    """
+    Atenuação aparente de arrays de OG/FG
+    OG = 1.000 resulta em NaN (ou ±inf) em vez de ZeroDivisionError
+    """
+    og, fg = _densidades_lote(og, fg)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return calcular_atenuacao(og, fg)
+
+def calcular_abv_lote(og, fg, metodo: str = 'simples') -> np.ndarray:
+    """
+    ABV de arrays de OG/FG com uma das fórmulas de ABVCalculator
+    """
+    og, fg = _densidades_lote(og, fg)
+    formula = METODOS_ABV.get(metodo, calcular_abv_simples)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return formula(og, fg)
+
+def calcular_calorias_lote(og, fg) -> np.ndarray:
+    """
+    Calorias aproximadas por 100ml de arrays de OG/FG
+    """
+    og, fg = _densidades_lote(og, fg)
+    return calcular_calorias(og, fg, 100)
+
+def converter_sg_para_brix_lote(sg) -> np.ndarray:
+    """
+    Converte um array de Specific Gravity para Brix
+    """
+    return converter_sg_para_brix(np.asarray(sg, dtype=np.float64))
+
+def validar_densidades_lote(og, fg) -> np.ndarray:
+    """
+    Valida arrays de OG/FG nas mesmas faixas de validar_densidades
+    Retorna uma máscara de bits (uint8) por leitura; 0 = sem problemas
+    """
+    og, fg = _densidades_lote(og, fg)
+    return _mascara_validacao(og, fg, calcular_atenuacao_lote(og, fg))
+
+def _mascara_validacao(og: np.ndarray, fg: np.ndarray, atenuacao: np.ndarray) -> np.ndarray:
+    condicoes = (
+        (OG_BAIXO, og < 1.020),
+        (OG_ALTO, og > 1.150),
+        (FG_BAIXO, fg < 0.990),
+        (FG_ALTO, fg > 1.030),
+        (FG_NAO_MENOR_QUE_OG, fg >= og),
+        (ATENUACAO_ALTA, atenuacao > 90),
+        (ATENUACAO_BAIXA, atenuacao < 30)
+    )
+    mascara = np.zeros(og.shape, dtype=np.uint8)
+    for bit, condicao in condicoes:
+        mascara |= np.multiply(condicao, bit, dtype=np.uint8)
+    return mascara
+
+def descrever_validacao(mascara: int) -> list:
+    """
+    Converte a máscara de validar_densidades_lote na lista de problemas de validar_densidades
+    """
+    return [mensagem for bit, mensagem in MENSAGENS_VALIDACAO.items() if int(mascara) & bit]
+
 class ABVCalculator:
     """Classe para cálculos relacionados ao ABV e densidades"""
     
-    def __init__(self):
-        self.metodos_abv = {
-            'simples': calcular_abv_simples,
-            'preciso': calcular_abv_preciso,
-            'alternativo': calcular_abv_alternativo
-        }
+    def __init__(self, tamanho_cache: int = 0):
+        """
+        Args:
+            tamanho_cache: Resultados de calcular guardados por (og, fg, metodo),
+                descartando o menos usado recentemente; 0 desativa o cache
+        """
+        self.metodos_abv = dict(METODOS_ABV)
+        self.tamanho_cache = tamanho_cache
+        self._cache: OrderedDict = OrderedDict()
     
     def calcular(self, og: float, fg: float, metodo: str = 'simples') -> dict:
         """
@@ -108,7 +215,32 @@ class ABVCalculator:
         """
         if metodo not in self.metodos_abv:
             metodo = 'simples'
-            
+        if not self.tamanho_cache:
+            return self._calcular(og, fg, metodo)
+        
+        chave = (og, fg, metodo)
+        resultado = self._cache.get(chave)
+        if resultado is None:
+            resultado = self._cache[chave] = self._calcular(og, fg, metodo)
+            if len(self._cache) > self.tamanho_cache:
+                self._cache.popitem(last=False)
+        else:
+            self._cache.move_to_end(chave)
+        # Cópia: quem recebe pode alterar o dicionário sem afetar o cache
+        return {**resultado, 'validacao': list(resultado['validacao'])}
+    
+    def invalidar(self, og: Optional[float] = None, fg: Optional[float] = None):
+        """
+        Descarta do cache os resultados de um par OG/FG (todos os métodos),
+        ou o cache inteiro se nenhum for informado
+        """
+        if og is None and fg is None:
+            self._cache.clear()
+            return
+        for metodo in self.metodos_abv:
+            self._cache.pop((og, fg, metodo), None)
+    
+    def _calcular(self, og: float, fg: float, metodo: str) -> dict:
         resultado = {
             'og': og,
             'fg': fg,
@@ -119,3 +251,21 @@ class ABVCalculator:
         }
         
         return resultado
+    
+    def calcular_lote(self, og, fg, metodo: str = 'simples') -> np.ndarray:
+        """
+        Versão vetorizada de calcular para arrays de OG/FG
+        
+        Retorna um array estruturado (DTYPE_RESULTADO) com os mesmos campos do
+        dicionário de calcular; 'validacao' é a máscara de bits de
+        validar_densidades_lote (ver descrever_validacao).
+        """
+        og, fg = _densidades_lote(og, fg)
+        resultado = np.empty(og.shape, dtype=DTYPE_RESULTADO)
+        resultado['og'] = og
+        resultado['fg'] = fg
+        resultado['abv'] = calcular_abv_lote(og, fg, metodo)
+        resultado['atenuacao'] = calcular_atenuacao_lote(og, fg)
+        resultado['calorias_100ml'] = calcular_calorias_lote(og, fg)
+        resultado['validacao'] = _mascara_validacao(og, fg, resultado['atenuacao'])
+        return resultado
@@ -0,0 +1,682 @@
+"""
+Armazenamento local em SQLite
+
+Mesma interface de leitura do MockDataLoader (as views recebem os mesmos
+dicionários), mas com receitas, ingredientes, etapas, produções e
+telemetria em tabelas indexadas. As consultas usam SQL parametrizado fixo,
+que o sqlite3 mantém preparado no cache de statements da conexão.
+
+Cada registro guarda as colunas consultadas (tipo, status, lote, datas...)
+e o restante do dicionário original em JSON na coluna `dados`.
+
+O mock_data.json de origem continua observado: recarregar_se_alterado
+compara o arquivo (mtime/tamanho) e o resumo de cada registro com os da
+última importação e aplica no banco só os registros que mudaram nele.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+CAMINHO_PADRAO = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'database', 'bebrew.sqlite3')
+
+STATUS_ATIVOS = ("Em Andamento", "Fermentando")
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS receitas (
+    id TEXT PRIMARY KEY,
+    nome TEXT,
+    tipo TEXT,
+    abv REAL,
+    data_criacao TEXT,
+    dados TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_receitas_tipo ON receitas(tipo, abv);
+CREATE INDEX IF NOT EXISTS idx_receitas_data ON receitas(data_criacao);
+CREATE INDEX IF NOT EXISTS idx_receitas_abv ON receitas(abv);
+
+CREATE TABLE IF NOT EXISTS ingredientes (
+    receita_id TEXT NOT NULL REFERENCES receitas(id) ON DELETE CASCADE,
+    ordem INTEGER NOT NULL,
+    nome TEXT,
+    tipo TEXT,
+    dados TEXT NOT NULL,
+    PRIMARY KEY (receita_id, ordem)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_ingredientes_tipo ON ingredientes(tipo, nome);
+
+CREATE TABLE IF NOT EXISTS etapas (
+    receita_id TEXT NOT NULL REFERENCES receitas(id) ON DELETE CASCADE,
+    ordem INTEGER NOT NULL,
+    dados TEXT NOT NULL,
+    PRIMARY KEY (receita_id, ordem)
+) WITHOUT ROWID;
+
+-- Produções em andamento e histórico (historico = 1)
+CREATE TABLE IF NOT EXISTS producoes (
+    id TEXT PRIMARY KEY,
+    historico INTEGER NOT NULL DEFAULT 0,
+    receita_id TEXT,
+    receita_nome TEXT,
+    lote TEXT,
+    tipo TEXT,
+    status TEXT,
+    data_inicio TEXT,
+    data_fim TEXT,
+    abv REAL,
+    avaliacao REAL,
+    dados TEXT NOT NULL
+);
+-- Cobre as agregações do dashboard e do histórico sem ler a coluna dados
+CREATE INDEX IF NOT EXISTS idx_producoes_status ON producoes(historico, status, abv, avaliacao);
+CREATE INDEX IF NOT EXISTS idx_producoes_tipo ON producoes(historico, tipo, data_fim);
+CREATE INDEX IF NOT EXISTS idx_producoes_lote ON producoes(lote);
+CREATE INDEX IF NOT EXISTS idx_producoes_inicio ON producoes(data_inicio);
+CREATE INDEX IF NOT EXISTS idx_producoes_fim ON producoes(historico, data_fim);
+CREATE INDEX IF NOT EXISTS idx_producoes_busca ON producoes(historico, receita_nome, lote);
+-- Extremos de ABV e última produção por busca no índice, sem varrer a tabela
+CREATE INDEX IF NOT EXISTS idx_producoes_abv ON producoes(historico, abv);
+CREATE INDEX IF NOT EXISTS idx_producoes_historico ON producoes(historico);
+
+CREATE TABLE IF NOT EXISTS telemetria (
+    producao_id TEXT NOT NULL REFERENCES producoes(id) ON DELETE CASCADE,
+    timestamp TEXT NOT NULL,
+    valor REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_telemetria_producao ON telemetria(producao_id, timestamp);
+
+CREATE TABLE IF NOT EXISTS configuracoes (
+    chave TEXT PRIMARY KEY,
+    valor TEXT NOT NULL
+);
+
+-- Totais e somas do dashboard, mantidos pelos gatilhos de receitas e producoes
+CREATE TABLE IF NOT EXISTS agregados (
+    chave TEXT PRIMARY KEY,
+    valor REAL NOT NULL
+);
+-- Contagens por grupo ('receitas_tipo', 'producoes_status', 'historico_status'); a chave é o valor em JSON
+CREATE TABLE IF NOT EXISTS contagens (
+    grupo TEXT NOT NULL,
+    chave TEXT NOT NULL,
+    quantidade INTEGER NOT NULL,
+    PRIMARY KEY (grupo, chave)
+) WITHOUT ROWID;
+
+-- Arquivo JSON de origem na última importação: assinatura (mtime/tamanho) e
+-- resumo de cada registro, por seção e id (a chave, nas configurações)
+CREATE TABLE IF NOT EXISTS origem_assinatura (
+    arquivo TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    tamanho INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS origem_registros (
+    secao TEXT NOT NULL,
+    id TEXT NOT NULL,
+    resumo TEXT NOT NULL,
+    PRIMARY KEY (secao, id)
+) WITHOUT ROWID;
+"""
+
+# Efeito de uma linha nos agregados: {r} é NEW ou OLD e {s} é + (entra) ou - (sai)
+_AJUSTE_CONTAGEM = """
+INSERT INTO contagens (grupo, chave, quantidade) VALUES ({grupo}, json_quote({r}.{campo}), {s}1)
+    ON CONFLICT(grupo, chave) DO UPDATE SET quantidade = quantidade + excluded.quantidade;
+DELETE FROM contagens WHERE grupo = {grupo} AND chave = json_quote({r}.{campo}) AND quantidade <= 0;
+"""
+_AJUSTE_RECEITA = """
+UPDATE agregados SET valor = valor {s} 1 WHERE chave = 'receitas';
+UPDATE agregados SET valor = valor {s} {r}.abv WHERE chave = 'receitas_abv_soma' AND {r}.abv != 0;
+UPDATE agregados SET valor = valor {s} 1 WHERE chave = 'receitas_abv_qtd' AND {r}.abv != 0;
+""" + _AJUSTE_CONTAGEM.replace("{grupo}", "'receitas_tipo'").replace("{campo}", "tipo")
+_AJUSTE_PRODUCAO = """
+UPDATE agregados SET valor = valor {s} 1 WHERE chave = 'historico' AND {r}.historico = 1;
+UPDATE agregados SET valor = valor {s} {r}.abv WHERE chave = 'historico_abv_soma' AND {r}.historico = 1 AND {r}.abv != 0;
+UPDATE agregados SET valor = valor {s} 1 WHERE chave = 'historico_abv_qtd' AND {r}.historico = 1 AND {r}.abv != 0;
+UPDATE agregados SET valor = valor {s} {r}.avaliacao
+    WHERE chave = 'historico_avaliacao_soma' AND {r}.historico = 1 AND {r}.avaliacao != 0;
+UPDATE agregados SET valor = valor {s} 1
+    WHERE chave = 'historico_avaliacao_qtd' AND {r}.historico = 1 AND {r}.avaliacao != 0;
+""" + _AJUSTE_CONTAGEM.replace(
+    "{grupo}", "CASE {r}.historico WHEN 1 THEN 'historico_status' ELSE 'producoes_status' END"
+).replace("{campo}", "status")
+
+
+def _gatilhos(tabela: str, ajuste: str) -> str:
+    entra, sai = ajuste.format(r="NEW", s="+"), ajuste.format(r="OLD", s="-")
+    return f"""
+CREATE TRIGGER IF NOT EXISTS {tabela}_agregados_insert AFTER INSERT ON {tabela} BEGIN {entra} END;
+CREATE TRIGGER IF NOT EXISTS {tabela}_agregados_delete AFTER DELETE ON {tabela} BEGIN {sai} END;
+CREATE TRIGGER IF NOT EXISTS {tabela}_agregados_update AFTER UPDATE ON {tabela} BEGIN {sai} {entra} END;
+"""
+
+
+_GATILHOS = _gatilhos("receitas", _AJUSTE_RECEITA) + _gatilhos("producoes", _AJUSTE_PRODUCAO)
+
+# Recalcula os agregados varrendo as tabelas (só em bancos criados antes deles)
+_SQL_RECONSTRUIR_AGREGADOS = """
+DELETE FROM agregados;
+DELETE FROM contagens;
+INSERT INTO agregados (chave, valor)
+SELECT 'receitas', COUNT(*) FROM receitas
+UNION ALL SELECT 'receitas_abv_soma', COALESCE(SUM(abv), 0) FROM receitas WHERE abv != 0
+UNION ALL SELECT 'receitas_abv_qtd', COUNT(*) FROM receitas WHERE abv != 0
+UNION ALL SELECT 'historico', COUNT(*) FROM producoes WHERE historico = 1
+UNION ALL SELECT 'historico_abv_soma', COALESCE(SUM(abv), 0) FROM producoes WHERE historico = 1 AND abv != 0
+UNION ALL SELECT 'historico_abv_qtd', COUNT(*) FROM producoes WHERE historico = 1 AND abv != 0
+UNION ALL SELECT 'historico_avaliacao_soma', COALESCE(SUM(avaliacao), 0) FROM producoes
+    WHERE historico = 1 AND avaliacao != 0
+UNION ALL SELECT 'historico_avaliacao_qtd', COUNT(*) FROM producoes WHERE historico = 1 AND avaliacao != 0;
+INSERT INTO contagens (grupo, chave, quantidade)
+SELECT 'receitas_tipo', json_quote(tipo), COUNT(*) FROM receitas GROUP BY tipo
+UNION ALL
+SELECT CASE historico WHEN 1 THEN 'historico_status' ELSE 'producoes_status' END, json_quote(status), COUNT(*)
+FROM producoes GROUP BY historico, status;
+"""
+
+SECOES_ORIGEM = ("receitas", "producoes", "historico", "configuracoes")
+
+# Consultas
+_SQL_RECEITAS = "SELECT id, dados FROM receitas ORDER BY rowid LIMIT ? OFFSET ?"
+_SQL_RECEITA = "SELECT id, dados FROM receitas WHERE id = ?"
+_SQL_INGREDIENTES = "SELECT receita_id, dados FROM ingredientes ORDER BY receita_id, ordem"
+_SQL_INGREDIENTES_RECEITAS = (
+    "SELECT receita_id, dados FROM ingredientes WHERE receita_id IN ({}) ORDER BY receita_id, ordem"
+)
+_SQL_ETAPAS = "SELECT receita_id, dados FROM etapas ORDER BY receita_id, ordem"
+_SQL_ETAPAS_RECEITAS = "SELECT receita_id, dados FROM etapas WHERE receita_id IN ({}) ORDER BY receita_id, ordem"
+_SQL_PRODUCOES_ATIVAS = (
+    "SELECT id, dados FROM producoes WHERE historico = 0 AND status IN (?, ?) ORDER BY rowid"
+)
+_SQL_PRODUCAO = "SELECT id, dados FROM producoes WHERE id = ?"
+_SQL_TELEMETRIA_PRODUCOES = (
+    "SELECT producao_id, timestamp, valor FROM telemetria WHERE producao_id IN ({}) "
+    "ORDER BY producao_id, timestamp"
+)
+# Produções por consulta de telemetria, abaixo do limite de parâmetros do SQLite
+_PRODUCOES_POR_CONSULTA = 500
+_SQL_TIPOS = "SELECT DISTINCT tipo FROM receitas WHERE tipo IS NOT NULL AND tipo != '' ORDER BY tipo"
+_SQL_INGREDIENTES_UNICOS = (
+    "SELECT DISTINCT COALESCE(tipo, 'outro'), nome FROM ingredientes "
+    "WHERE nome IS NOT NULL AND nome != '' ORDER BY 1, 2"
+)
+_SQL_CONFIGURACOES = "SELECT chave, valor FROM configuracoes"
+_SQL_AGREGADOS = "SELECT chave, valor FROM agregados"
+_SQL_CONTAGENS = "SELECT chave, quantidade FROM contagens WHERE grupo = ?"
+_SQL_CONTAGEM = "SELECT quantidade FROM contagens WHERE grupo = ? AND chave = json_quote(?)"
+# Extremos por busca nos índices de abv; zero é "sem ABV" (negativos, se houver, vêm antes)
+_SQL_EXTREMOS_ABV = """
+SELECT
+    COALESCE((SELECT abv FROM receitas WHERE abv < 0 ORDER BY abv LIMIT 1),
+             (SELECT abv FROM receitas WHERE abv > 0 ORDER BY abv LIMIT 1)),
+    COALESCE((SELECT abv FROM receitas WHERE abv > 0 ORDER BY abv DESC LIMIT 1),
+             (SELECT abv FROM receitas WHERE abv < 0 ORDER BY abv DESC LIMIT 1)),
+    COALESCE((SELECT abv FROM producoes WHERE historico = 1 AND abv < 0 ORDER BY abv LIMIT 1),
+             (SELECT abv FROM producoes WHERE historico = 1 AND abv > 0 ORDER BY abv LIMIT 1)),
+    COALESCE((SELECT abv FROM producoes WHERE historico = 1 AND abv > 0 ORDER BY abv DESC LIMIT 1),
+             (SELECT abv FROM producoes WHERE historico = 1 AND abv < 0 ORDER BY abv DESC LIMIT 1))
+"""
+_SQL_ULTIMO_LOTE = "SELECT lote FROM producoes WHERE historico = 0 ORDER BY rowid DESC LIMIT 1"
+
+# Escrita
+_SQL_SALVAR_RECEITA = """
+INSERT INTO receitas (id, nome, tipo, abv, data_criacao, dados) VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT(id) DO UPDATE SET
+    nome = excluded.nome, tipo = excluded.tipo, abv = excluded.abv,
+    data_criacao = excluded.data_criacao, dados = excluded.dados
+"""
+_SQL_SALVAR_PRODUCAO = """
+INSERT INTO producoes (id, historico, receita_id, receita_nome, lote, tipo, status, data_inicio, data_fim,
+                       abv, avaliacao, dados)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(id) DO UPDATE SET
+    historico = excluded.historico, receita_id = excluded.receita_id, receita_nome = excluded.receita_nome,
+    lote = excluded.lote, tipo = excluded.tipo, status = excluded.status, data_inicio = excluded.data_inicio,
+    data_fim = excluded.data_fim, abv = excluded.abv, avaliacao = excluded.avaliacao, dados = excluded.dados
+"""
+
+
+def _texto(valor: Any) -> Optional[str]:
+    """Datas são gravadas em ISO 8601, que ordena como texto"""
+    if isinstance(valor, datetime):
+        return valor.isoformat()
+    return valor
+
+
+def _resumo(valor: Any) -> str:
+    return hashlib.sha1(json.dumps(valor, sort_keys=True, ensure_ascii=False, default=str).encode()).hexdigest()
+
+
+def _resumos_secao(secao: str, conteudo: Any) -> Dict[str, str]:
+    """{id em JSON: resumo do registro} de uma seção; registros sem id não têm como ser pareados"""
+    if secao == "configuracoes":
+        pares = conteudo.items() if isinstance(conteudo, dict) else ()
+    else:
+        pares = ((r.get("id"), r) for r in conteudo or () if isinstance(r, dict) and r.get("id") is not None)
+    return {json.dumps(chave): _resumo(valor) for chave, valor in pares}
+
+
+def _resumos(dados: Dict[str, Any]) -> Dict[str, Dict[str, str]]:
+    """Seção -> {id em JSON: resumo do registro}"""
+    return {secao: _resumos_secao(secao, dados.get(secao)) for secao in SECOES_ORIGEM}
+
+
+def _numero(valor: Any) -> Optional[float]:
+    try:
+        return float(valor) if valor is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+class BancoLocal:
+    """Armazenamento local das receitas, produções e configurações em SQLite"""
+
+    def __init__(self, caminho: Optional[str] = None, importar_json: bool = True):
+        """
+        Args:
+            caminho: Arquivo do banco (':memory:' para um banco temporário)
+            importar_json: Importa o database/mock_data.json se o banco estiver vazio
+                e passa a observá-lo (ver recarregar_se_alterado). Com o banco já
+                preenchido o arquivo não é lido na abertura.
+        """
+        self.caminho = caminho or CAMINHO_PADRAO
+        if self.caminho != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(self.caminho)), exist_ok=True)
+
+        self._lock = threading.RLock()
+        self.conexao = sqlite3.connect(self.caminho, check_same_thread=False, cached_statements=64)
+        self.conexao.execute("PRAGMA foreign_keys = ON")
+        if self.caminho != ':memory:':
+            self.conexao.execute("PRAGMA journal_mode = WAL")
+            self.conexao.execute("PRAGMA synchronous = NORMAL")
+        self.conexao.executescript(_ESQUEMA + _GATILHOS)
+        if not self.conexao.execute("SELECT 1 FROM agregados LIMIT 1").fetchone():
+            with self.conexao:
+                self.conexao.executescript(_SQL_RECONSTRUIR_AGREGADOS)
+
+        self.arquivo_json: Optional[str] = None
+        if importar_json:
+            from util.mock_data_loader import caminho_padrao
+            self.arquivo_json = os.path.abspath(caminho_padrao())
+            if self._vazio():
+                self._importar_origem(importar=True)
+            elif self._assinatura_registrada() is None:
+                # Banco criado antes da observação do arquivo: o conteúdo atual vira a referência
+                self._importar_origem(importar=False)
+
+    def _importar_origem(self, importar: bool):
+        """
+        Percorre o arquivo de origem seção a seção, registrando os resumos
+
+        Com o ijson instalado só uma seção fica em memória por vez; cada uma
+        é gravada (com `importar`) e descartada antes da leitura da seguinte.
+        """
+        from util.mock_data_loader import MockDataLoader
+        assinatura = self._assinatura_arquivo()
+        resumos: Dict[str, Dict[str, str]] = {secao: {} for secao in SECOES_ORIGEM}
+        with self._lock, self.conexao:
+            for secao, conteudo in MockDataLoader(self.arquivo_json).ler_secoes():
+                if secao not in SECOES_ORIGEM:
+                    continue
+                if importar:
+                    self._importar_secao(secao, conteudo)
+                resumos[secao] = _resumos_secao(secao, conteudo)
+            self._registrar_origem(assinatura, resumos)
+
+    def _vazio(self) -> bool:
+        for tabela in ("receitas", "producoes", "configuracoes"):
+            if self.conexao.execute(f"SELECT 1 FROM {tabela} LIMIT 1").fetchone():
+                return False
+        return True
+
+    def _consultar(self, sql: str, parametros: Iterable = ()) -> List[tuple]:
+        with self._lock:
+            return self.conexao.execute(sql, tuple(parametros)).fetchall()
+
+    def fechar(self):
+        with self._lock:
+            self.conexao.close()
+
+    # Escrita
+    def importar(self, dados: Dict[str, Any]):
+        """Importa um conjunto de dados no formato do mock_data.json, em uma transação"""
+        with self._lock, self.conexao:
+            for secao in SECOES_ORIGEM:
+                if secao in dados:
+                    self._importar_secao(secao, dados[secao])
+
+    def _importar_secao(self, secao: str, conteudo: Any):
+        if secao == "configuracoes":
+            self._salvar_configuracoes(conteudo or {})
+            return
+        for registro in conteudo or []:
+            if secao == "receitas":
+                self._salvar_receita(registro)
+            else:
+                self._salvar_producao(registro, historico=secao == "historico")
+
+    def salvar_receita(self, receita: Dict[str, Any]):
+        """Insere ou atualiza uma receita com seus ingredientes e etapas"""
+        with self._lock, self.conexao:
+            self._salvar_receita(receita)
+
+    def _salvar_receita(self, receita: Dict[str, Any]):
+        ingredientes = receita.get("ingredientes") or []
+        etapas = receita.get("etapas") or []
+        dados = {chave: valor for chave, valor in receita.items() if chave not in ("ingredientes", "etapas")}
+        receita_id = receita["id"]
+
+        self.conexao.execute(_SQL_SALVAR_RECEITA, (
+            receita_id, receita.get("nome"), receita.get("tipo"), _numero(receita.get("abv")),
+            _texto(receita.get("data_criacao")), json.dumps(dados, ensure_ascii=False, default=str)
+        ))
+        self.conexao.execute("DELETE FROM ingredientes WHERE receita_id = ?", (receita_id,))
+        self.conexao.executemany(
+            "INSERT INTO ingredientes (receita_id, ordem, nome, tipo, dados) VALUES (?, ?, ?, ?, ?)",
+            [(receita_id, ordem, ing.get("nome"), ing.get("tipo", "outro"), json.dumps(ing, ensure_ascii=False))
+             for ordem, ing in enumerate(ingredientes)]
+        )
+        self.conexao.execute("DELETE FROM etapas WHERE receita_id = ?", (receita_id,))
+        self.conexao.executemany(
+            "INSERT INTO etapas (receita_id, ordem, dados) VALUES (?, ?, ?)",
+            [(receita_id, ordem, json.dumps(etapa, ensure_ascii=False, default=str))
+             for ordem, etapa in enumerate(etapas)]
+        )
+
+    def remover_receita(self, receita_id: str) -> bool:
+        with self._lock, self.conexao:
+            return self.conexao.execute("DELETE FROM receitas WHERE id = ?", (receita_id,)).rowcount > 0
+
+    def salvar_producao(self, producao: Dict[str, Any], historico: bool = False):
+        """Insere ou atualiza uma produção (historico=True para produções encerradas)"""
+        with self._lock, self.conexao:
+            self._salvar_producao(producao, historico)
+
+    def _salvar_producao(self, producao: Dict[str, Any], historico: bool):
+        temperaturas = producao.get("temperaturas")
+        dados = {chave: valor for chave, valor in producao.items() if chave != "temperaturas"}
+        producao_id = producao["id"]
+
+        self.conexao.execute(_SQL_SALVAR_PRODUCAO, (
+            producao_id, int(historico), producao.get("receita_id"), producao.get("receita_nome"),
+            producao.get("lote"), producao.get("tipo"), producao.get("status"),
+            _texto(producao.get("data_inicio")), _texto(producao.get("data_fim")),
+            _numero(producao.get("abv")), _numero(producao.get("avaliacao")),
+            json.dumps(dados, ensure_ascii=False, default=str)
+        ))
+        if temperaturas is not None:
+            self.conexao.execute("DELETE FROM telemetria WHERE producao_id = ?", (producao_id,))
+            self._inserir_telemetria(producao_id, temperaturas)
+
+    def _inserir_telemetria(self, producao_id: str, temperaturas: List[Dict[str, Any]]):
+        self.conexao.executemany(
+            "INSERT INTO telemetria (producao_id, timestamp, valor) VALUES (?, ?, ?)",
+            [(producao_id, _texto(t["timestamp"]), float(t["valor"])) for t in temperaturas]
+        )
+
+    def adicionar_temperaturas(self, producao_id: str, temperaturas: List[Dict[str, Any]]):
+        """Acrescenta leituras {'timestamp', 'valor'} à telemetria de uma produção"""
+        with self._lock, self.conexao:
+            self._inserir_telemetria(producao_id, temperaturas)
+
+    def salvar_configuracoes(self, configuracoes: Dict[str, Any]):
+        with self._lock, self.conexao:
+            self._salvar_configuracoes(configuracoes)
+
+    def _salvar_configuracoes(self, configuracoes: Dict[str, Any]):
+        self.conexao.executemany(
+            "INSERT INTO configuracoes (chave, valor) VALUES (?, ?) "
+            "ON CONFLICT(chave) DO UPDATE SET valor = excluded.valor",
+            [(chave, json.dumps(valor, ensure_ascii=False)) for chave, valor in configuracoes.items()]
+        )
+
+    # Observação do arquivo JSON de origem
+    def _assinatura_arquivo(self) -> Optional[tuple]:
+        """(mtime em ns, tamanho) do arquivo de origem, ou None se ele não existir"""
+        try:
+            estado = os.stat(self.arquivo_json)
+        except (OSError, TypeError):
+            return None
+        return estado.st_mtime_ns, estado.st_size
+
+    def _assinatura_registrada(self) -> Optional[tuple]:
+        linhas = self._consultar("SELECT mtime_ns, tamanho FROM origem_assinatura WHERE arquivo = ?",
+                                 (self.arquivo_json,))
+        return tuple(linhas[0]) if linhas else None
+
+    def _ler_origem(self) -> Optional[Dict[str, Any]]:
+        """Conteúdo do arquivo de origem, ou None se ele não puder ser lido agora"""
+        try:
+            with open(self.arquivo_json, 'r', encoding='utf-8') as f:
+                dados = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return dados if isinstance(dados, dict) else None
+
+    def _registrar_origem(self, assinatura: Optional[tuple], resumos: Dict[str, Dict[str, str]]):
+        """Guarda a assinatura e os resumos do arquivo importado (dentro da transação de quem chama)"""
+        self.conexao.execute("DELETE FROM origem_registros")
+        self.conexao.executemany(
+            "INSERT INTO origem_registros (secao, id, resumo) VALUES (?, ?, ?)",
+            [(secao, chave, resumo) for secao, da_secao in resumos.items() for chave, resumo in da_secao.items()]
+        )
+        self.conexao.execute("DELETE FROM origem_assinatura WHERE arquivo = ?", (self.arquivo_json,))
+        if assinatura is not None:
+            self.conexao.execute(
+                "INSERT INTO origem_assinatura (arquivo, mtime_ns, tamanho) VALUES (?, ?, ?)",
+                (self.arquivo_json, *assinatura)
+            )
+
+    def recarregar_se_alterado(self) -> Dict[str, Dict[str, List[Any]]]:
+        """
+        Reimporta os registros que mudaram no arquivo JSON de origem desde a última importação
+
+        A mudança no arquivo é detectada por mtime/tamanho, sem abri-lo. Cada
+        registro é comparado pelo id com o resumo guardado na última
+        importação, de modo que edições feitas pelo aplicativo em registros
+        que não mudaram no arquivo são preservadas.
+
+        Returns:
+            Seção -> {'adicionados', 'alterados', 'removidos'} com os ids (as
+            chaves, nas configurações), só das seções que mudaram. Vazio se
+            nada mudou, se o banco não observa um arquivo ou se ele não pôde
+            ser lido (ex.: gravação em andamento); nesse caso a próxima
+            chamada tenta de novo.
+        """
+        if self.arquivo_json is None:
+            return {}
+        assinatura = self._assinatura_arquivo()
+        if assinatura is None or assinatura == self._assinatura_registrada():
+            return {}
+        dados = self._ler_origem()
+        if dados is None:
+            return {}
+
+        novos = _resumos(dados)
+        antigos: Dict[str, Dict[str, str]] = {secao: {} for secao in SECOES_ORIGEM}
+        for secao, chave, resumo in self._consultar("SELECT secao, id, resumo FROM origem_registros"):
+            antigos.setdefault(secao, {})[chave] = resumo
+
+        alteracoes = {}
+        for secao in SECOES_ORIGEM:
+            mudancas = {
+                "adicionados": [json.loads(c) for c in novos[secao] if c not in antigos[secao]],
+                "alterados": [json.loads(c) for c, r in novos[secao].items()
+                              if c in antigos[secao] and antigos[secao][c] != r],
+                "removidos": [json.loads(c) for c in antigos[secao] if c not in novos[secao]]
+            }
+            if any(mudancas.values()):
+                alteracoes[secao] = mudancas
+
+        with self._lock, self.conexao:
+            # Remoções antes das gravações: uma produção que passou para o histórico troca de seção
+            for secao, mudancas in alteracoes.items():
+                for chave in mudancas["removidos"]:
+                    if secao == "receitas":
+                        self.conexao.execute("DELETE FROM receitas WHERE id = ?", (chave,))
+                    elif secao == "configuracoes":
+                        self.conexao.execute("DELETE FROM configuracoes WHERE chave = ?", (chave,))
+                    else:
+                        self.conexao.execute("DELETE FROM producoes WHERE id = ? AND historico = ?",
+                                             (chave, int(secao == "historico")))
+            for secao, mudancas in alteracoes.items():
+                gravar = set(map(json.dumps, mudancas["adicionados"] + mudancas["alterados"]))
+                if secao == "configuracoes":
+                    self._salvar_configuracoes({chave: valor for chave, valor in (dados.get(secao) or {}).items()
+                                                if json.dumps(chave) in gravar})
+                    continue
+                for registro in dados.get(secao) or []:
+                    if isinstance(registro, dict) and json.dumps(registro.get("id")) in gravar:
+                        if secao == "receitas":
+                            self._salvar_receita(registro)
+                        else:
+                            self._salvar_producao(registro, historico=secao == "historico")
+            self._registrar_origem(assinatura, novos)
+        return alteracoes
+
+    # Leitura (interface do MockDataLoader)
+    def _montar_receitas(self, linhas: List[tuple], todas: bool = False) -> List[Dict[str, Any]]:
+        """Junta ingredientes e etapas às receitas; `todas` lê as tabelas inteiras de uma vez"""
+        receitas = {rid: dict(json.loads(dados), ingredientes=[], etapas=[]) for rid, dados in linhas}
+        if not receitas:
+            return []
+        if not todas:
+            marcadores = ", ".join("?" * len(receitas))
+            ingredientes = self._consultar(_SQL_INGREDIENTES_RECEITAS.format(marcadores), receitas)
+            etapas = self._consultar(_SQL_ETAPAS_RECEITAS.format(marcadores), receitas)
+        else:
+            ingredientes = self._consultar(_SQL_INGREDIENTES)
+            etapas = self._consultar(_SQL_ETAPAS)
+        for rid, dados in ingredientes:
+            if rid in receitas:
+                receitas[rid]["ingredientes"].append(json.loads(dados))
+        for rid, dados in etapas:
+            if rid in receitas:
+                receitas[rid]["etapas"].append(json.loads(dados))
+        return list(receitas.values())
+
+    def get_receitas(self, limite: Optional[int] = None, offset: int = 0) -> List[Dict[str, Any]]:
+        """Retorna as receitas (opcionalmente uma página)"""
+        linhas = self._consultar(_SQL_RECEITAS, (-1 if limite is None else limite, offset))
+        return self._montar_receitas(linhas, todas=limite is None or limite > 500)
+
+    def get_receita_by_id(self, receita_id: str) -> Optional[Dict[str, Any]]:
+        """Retorna uma receita específica pelo ID"""
+        receitas = self._montar_receitas(self._consultar(_SQL_RECEITA, (receita_id,)))
+        return receitas[0] if receitas else None
+
+    def _montar_producoes(self, linhas: List[tuple]) -> List[Dict[str, Any]]:
+        """Junta às produções a telemetria de todas elas, em uma consulta por lote"""
+        producoes = {pid: json.loads(dados) for pid, dados in linhas}
+        temperaturas: Dict[str, List[Dict[str, Any]]] = {}
+        ids = list(producoes)
+        for inicio in range(0, len(ids), _PRODUCOES_POR_CONSULTA):
+            lote = ids[inicio:inicio + _PRODUCOES_POR_CONSULTA]
+            sql = _SQL_TELEMETRIA_PRODUCOES.format(", ".join("?" * len(lote)))
+            for pid, ts, valor in self._consultar(sql, lote):
+                temperaturas.setdefault(pid, []).append({"timestamp": ts, "valor": valor})
+        for pid, producao in producoes.items():
+            if pid in temperaturas or "temperaturas" not in producao:
+                producao["temperaturas"] = temperaturas.get(pid, [])
+        return list(producoes.values())
+
+    def get_producoes_ativas(self) -> List[Dict[str, Any]]:
+        """Retorna produções em andamento ou fermentando, com a telemetria"""
+        return self._montar_producoes(self._consultar(_SQL_PRODUCOES_ATIVAS, STATUS_ATIVOS))
+
+    def get_producao_by_id(self, producao_id: str) -> Optional[Dict[str, Any]]:
+        """Retorna uma produção específica pelo ID"""
+        producoes = self._montar_producoes(self._consultar(_SQL_PRODUCAO, (producao_id,)))
+        return producoes[0] if producoes else None
+
+    def get_historico(self, tipo: Optional[str] = None, termo: Optional[str] = None,
+                      desde: Optional[datetime] = None, limite: Optional[int] = None,
+                      offset: int = 0) -> List[Dict[str, Any]]:
+        """
+        Retorna o histórico de produções concluídas, das mais recentes às mais antigas
+
+        Args:
+            tipo: Filtra pelo tipo de bebida
+            termo: Trecho do nome da receita ou do lote
+            desde: Somente produções encerradas a partir desta data
+            limite: Número máximo de registros
+            offset: Registros a pular (paginação)
+        """
+        condicoes, parametros = ["historico = 1"], []
+        if tipo:
+            condicoes.append("tipo = ?")
+            parametros.append(tipo)
+        if desde:
+            condicoes.append("data_fim >= ?")
+            parametros.append(desde.isoformat())
+        if termo:
+            condicoes.append("(receita_nome LIKE ? ESCAPE '\\' OR lote LIKE ? ESCAPE '\\')")
+            padrao = "%" + termo.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+            parametros.extend([padrao, padrao])
+        parametros.extend([-1 if limite is None else limite, offset])
+
+        sql = (f"SELECT dados FROM producoes WHERE {' AND '.join(condicoes)} "
+               "ORDER BY data_fim DESC, rowid DESC LIMIT ? OFFSET ?")
+        return [json.loads(dados) for (dados,) in self._consultar(sql, parametros)]
+
+    def _agregados(self) -> Dict[str, float]:
+        return dict(self._consultar(_SQL_AGREGADOS))
+
+    def _contagens(self, grupo: str) -> Dict[Any, int]:
+        return {json.loads(chave): quantidade for chave, quantidade in self._consultar(_SQL_CONTAGENS, (grupo,))}
+
+    def _contagem(self, grupo: str, chave: Any) -> int:
+        linhas = self._consultar(_SQL_CONTAGEM, (grupo, chave))
+        return linhas[0][0] if linhas else 0
+
+    def get_resumo_historico(self) -> Dict[str, Any]:
+        """Totais do histórico, lidos dos agregados mantidos pelos gatilhos"""
+        agregados = self._agregados()
+        total = int(agregados["historico"])
+        qtd_abv, qtd_avaliacao = agregados["historico_abv_qtd"], agregados["historico_avaliacao_qtd"]
+        return {
+            "total": total,
+            "abv_medio": agregados["historico_abv_soma"] / qtd_abv if qtd_abv else 0,
+            "taxa_sucesso": (self._contagem("historico_status", "Concluída") / total * 100) if total else 0,
+            "avaliacao_media": agregados["historico_avaliacao_soma"] / qtd_avaliacao if qtd_avaliacao else 0
+        }
+
+    def get_configuracoes(self) -> Dict[str, Any]:
+        """Retorna as configurações do sistema"""
+        return {chave: json.loads(valor) for chave, valor in self._consultar(_SQL_CONFIGURACOES)}
+
+    def get_estatisticas(self) -> Dict[str, Any]:
+        """Estatísticas gerais: agregados e contagens mantidos na escrita, extremos pelos índices"""
+        agregados = self._agregados()
+        por_status = self._contagens("producoes_status")
+        qtd_abv = agregados["receitas_abv_qtd"] + agregados["historico_abv_qtd"]
+        extremos = self._consultar(_SQL_EXTREMOS_ABV)[0]
+        minimos = [valor for valor in extremos[0::2] if valor is not None]
+        maximos = [valor for valor in extremos[1::2] if valor is not None]
+        ultimo_lote = self._consultar(_SQL_ULTIMO_LOTE)
+
+        return {
+            "total_receitas": int(agregados["receitas"]),
+            "producoes_ativas": sum(por_status.get(status, 0) for status in STATUS_ATIVOS),
+            "abv_medio": (agregados["receitas_abv_soma"] + agregados["historico_abv_soma"]) / qtd_abv if qtd_abv else 0,
+            "abv_minimo": min(minimos) if minimos else 0,
+            "abv_maximo": max(maximos) if maximos else 0,
+            "ultima_producao": (ultimo_lote[0][0] if ultimo_lote else None) or "Nenhuma",
+            "total_historico": int(agregados["historico"]),
+            "producoes_por_status": por_status,
+            "receitas_por_tipo": self._contagens("receitas_tipo")
+        }
+
+    def get_tipos_bebida(self) -> List[str]:
+        """Retorna os tipos únicos de bebida"""
+        return [tipo for (tipo,) in self._consultar(_SQL_TIPOS)]
+
+    def get_ingredientes_unicos(self) -> Dict[str, List[str]]:
+        """Retorna ingredientes únicos por tipo"""
+        ingredientes_por_tipo: Dict[str, List[str]] = {}
+        for tipo, nome in self._consultar(_SQL_INGREDIENTES_UNICOS):
+            ingredientes_por_tipo.setdefault(tipo, []).append(nome)
+        return ingredientes_por_tipo
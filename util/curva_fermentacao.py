@@ -0,0 +1,277 @@
+"""
+Ajuste de curvas de atenuação e previsão do fim da fermentação
+
+Ajusta os modelos exponencial e logístico às leituras de densidade de uma
+produção e prevê o FG, o tempo até a densidade terminal e o ABV, com
+intervalos de confiança de 95%. Só usa NumPy: para cada FG candidato o
+modelo é linearizado e resolvido por mínimos quadrados ponderados, todos
+os candidatos de uma vez; o melhor FG sai de uma grade e o intervalo do
+perfil de verossimilhança sobre a mesma grade.
+
+As temperaturas entram pelo "tempo térmico": cada intervalo de tempo vale
+Q10 ** ((T - 20) / 10) dias a 20 °C, de modo que uma fermentação mais fria
+avança mais devagar no relógio com a mesma curva.
+"""
+import math
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from util.abv_calculator import calcular_abv_simples, estimar_fg_por_atenuacao
+
+# Densidade considerada terminal: a menos de 1 ponto do FG
+TOLERANCIA_TERMINAL = 0.001
+
+# Modelo de temperatura
+Q10_FERMENTACAO = 2.0
+TEMPERATURA_REFERENCIA = 20.0
+
+# Grade de FG candidatos
+PONTOS_GRADE = 301
+FG_MINIMO = 0.980
+
+# Leituras mínimas para ajustar uma curva (3 parâmetros + 1 grau de liberdade)
+MIN_LEITURAS = 4
+
+# Queda mínima abaixo do OG para ajustar: leituras planas (fase lag) não
+# definem a curva e levam a FGs e tempos absurdos
+QUEDA_MINIMA = 0.005
+
+# Previsão usada sem o LLM: intervalo do FG estreito o bastante
+LARGURA_CONFIAVEL = 0.004
+
+# Estimativa sem leituras suficientes
+ATENUACAO_PADRAO = 75.0
+ATENUACAO_FAIXA = (65.0, 85.0)
+DIAS_PADRAO = 14.0
+
+# Ajustes com tempo até a densidade terminal (ou o fim do intervalo) acima
+# disto são descartados em favor da estimativa
+DIAS_TERMINAL_MAXIMO = 10 * DIAS_PADRAO
+
+# Quantis t de Student (0,975) por graus de liberdade; acima de 30 usa 1,96
+_T_975 = (12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+          2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+          2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042)
+
+_SEGUNDOS_POR_DIA = 86400.0
+
+
+def fator_temperatura(temperatura) -> Any:
+    """Velocidade relativa da fermentação a `temperatura` em relação a 20 °C"""
+    return Q10_FERMENTACAO ** ((np.asarray(temperatura, dtype=np.float64) - TEMPERATURA_REFERENCIA) / 10)
+
+
+def tempo_termico(tempos: np.ndarray, tempos_temperatura: np.ndarray,
+                  temperaturas: np.ndarray) -> np.ndarray:
+    """
+    Converte instantes (segundos) em tempo térmico acumulado (segundos a 20 °C)
+
+    Integra o fator de temperatura pela regra do trapézio; antes da primeira e
+    depois da última leitura de temperatura vale a temperatura da ponta.
+    """
+    fator = fator_temperatura(temperaturas)
+    acumulado = np.concatenate(([0.0], np.cumsum(np.diff(tempos_temperatura) * (fator[1:] + fator[:-1]) / 2)))
+    termico = np.interp(tempos, tempos_temperatura, acumulado)
+    antes = tempos < tempos_temperatura[0]
+    termico[antes] = (tempos[antes] - tempos_temperatura[0]) * fator[0]
+    depois = tempos > tempos_temperatura[-1]
+    termico[depois] = acumulado[-1] + (tempos[depois] - tempos_temperatura[-1]) * fator[-1]
+    return termico
+
+
+def _regressao_ponderada(t: np.ndarray, y: np.ndarray, w: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Reta y = a + b·t por mínimos quadrados ponderados, uma por linha de y/w"""
+    soma_w = w.sum(axis=1)
+    soma_t = w @ t
+    soma_y = (w * y).sum(axis=1)
+    soma_tt = w @ (t * t)
+    soma_ty = (w * y) @ t
+    denominador = soma_w * soma_tt - soma_t ** 2
+    b = (soma_w * soma_ty - soma_t * soma_y) / denominador
+    a = (soma_y - b * soma_t) / soma_w
+    return a, b
+
+
+def _ajustar_exponencial(t: np.ndarray, g: np.ndarray, og: float, fg: np.ndarray) -> Dict[str, np.ndarray]:
+    """G = FG + A·exp(-k·t), linearizado em ln(G - FG)"""
+    distancia = g[None, :] - fg[:, None]
+    validos = distancia > 1e-5
+    y = np.log(np.where(validos, distancia, 1.0))
+    w = np.where(validos, distancia ** 2, 0.0)  # variância de ln(D) ~ σ²/D²
+    a, b = _regressao_ponderada(t, y, w)
+    k, amplitude = -b, np.exp(a)
+    previsto = fg[:, None] + amplitude[:, None] * np.exp(-k[:, None] * t[None, :])
+    sse = ((g[None, :] - previsto) ** 2).sum(axis=1)
+    sse[~((k > 0) & (validos.sum(axis=1) >= 2) & np.isfinite(sse))] = np.inf
+    # Tempo até G - FG <= tolerância
+    terminal = np.maximum(np.log(np.maximum(amplitude, TOLERANCIA_TERMINAL) / TOLERANCIA_TERMINAL), 0) / k
+    return {'sse': sse, 'terminal': terminal}
+
+
+def _ajustar_logistico(t: np.ndarray, g: np.ndarray, og: float, fg: np.ndarray) -> Dict[str, np.ndarray]:
+    """G = FG + (OG - FG) / (1 + exp(k·(t - tm))), linearizado em ln((OG - G) / (G - FG))"""
+    acima = og - g
+    distancia = g[None, :] - fg[:, None]
+    validos = (acima[None, :] > 1e-5) & (distancia > 1e-5)
+    y = np.log(np.where(validos, acima[None, :] / np.where(validos, distancia, 1.0), 1.0))
+    w = np.where(validos, (acima[None, :] * distancia / (og - fg[:, None])) ** 2, 0.0)
+    a, k = _regressao_ponderada(t, y, w)
+    previsto = fg[:, None] + (og - fg[:, None]) / (1 + np.exp(k[:, None] * t[None, :] + a[:, None]))
+    sse = ((g[None, :] - previsto) ** 2).sum(axis=1)
+    sse[~((k > 0) & (validos.sum(axis=1) >= 2) & np.isfinite(sse))] = np.inf
+    razao = np.maximum((og - fg) / TOLERANCIA_TERMINAL - 1, 1.0)
+    terminal = np.maximum((np.log(razao) - a) / k, 0)
+    return {'sse': sse, 'terminal': terminal}
+
+
+_MODELOS = {'logistico': _ajustar_logistico, 'exponencial': _ajustar_exponencial}
+
+
+def ajustar_curva(dias: Sequence[float], densidades: Sequence[float], og: float) -> Optional[Dict[str, Any]]:
+    """
+    Ajusta os dois modelos às leituras e escolhe o de menor erro
+
+    Args:
+        dias: Tempo de cada leitura (dias, ou dias térmicos), em ordem
+        densidades: Densidade de cada leitura
+        og: Densidade original
+
+    Returns:
+        Dict com 'modelo', 'fg' e 'dias_terminal' (ponto e intervalo de 95%),
+        'erro_padrao' e 'leituras'; None se não houver leituras suficientes,
+        se a densidade ainda não caiu QUEDA_MINIMA abaixo do OG ou se nenhum
+        modelo der um tempo terminal finito e até DIAS_TERMINAL_MAXIMO
+    """
+    t = np.asarray(dias, dtype=np.float64)
+    g = np.asarray(densidades, dtype=np.float64)
+    n = len(g)
+    if n < MIN_LEITURAS or og - g.min() < QUEDA_MINIMA:
+        return None
+    grade = np.linspace(max(FG_MINIMO, g.min() - 0.06), min(g.min() + 0.001, og - 0.001), PONTOS_GRADE)
+    passo = grade[1] - grade[0]
+
+    melhor, menor_erro = None, np.inf
+    with np.errstate(all='ignore'):
+        for nome, ajustar in _MODELOS.items():
+            ajuste = ajustar(t, g, og, grade)
+            indice = int(np.argmin(ajuste['sse']))
+            if ajuste['sse'][indice] < menor_erro:
+                melhor, menor_erro = (nome, indice, ajuste), ajuste['sse'][indice]
+    if melhor is None:
+        return None
+
+    nome, indice, ajuste = melhor
+    sse = ajuste['sse']
+    graus = n - 3
+    quantil = _T_975[graus - 1] if graus <= len(_T_975) else 1.96
+    # Perfil de verossimilhança: FGs cujo erro não é significativamente maior que o mínimo
+    aceitos = sse <= sse[indice] * (1 + quantil ** 2 / graus)
+    terminal = ajuste['terminal'][aceitos]
+    if not (np.all(np.isfinite(terminal)) and terminal.max() <= DIAS_TERMINAL_MAXIMO):
+        return None
+    return {
+        'modelo': nome,
+        'fg': float(grade[indice]),
+        'fg_intervalo': (float(grade[aceitos].min() - passo / 2), float(grade[aceitos].max() + passo / 2)),
+        'dias_terminal': float(ajuste['terminal'][indice]),
+        'dias_terminal_intervalo': (float(terminal.min()), float(terminal.max())),
+        'erro_padrao': math.sqrt(sse[indice] / graus),
+        'leituras': n
+    }
+
+
+def prever_fermentacao(tempos: Sequence[float], densidades: Sequence[float], og: Optional[float] = None,
+                       tempos_temperatura: Optional[Sequence[float]] = None,
+                       temperaturas: Optional[Sequence[float]] = None,
+                       temperatura_futura: Optional[float] = None,
+                       fg_esperado: Optional[float] = None,
+                       dias_esperados: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Prevê FG, tempo até a densidade terminal e ABV de uma fermentação
+
+    Com leituras suficientes ajusta a curva (ajustar_curva); senão, estima
+    pela atenuação típica (ou pelo FG/tempo esperados da receita).
+
+    Args:
+        tempos: Instante de cada leitura de densidade (segundos)
+        densidades: Leituras de densidade
+        og: Densidade original (padrão: primeira leitura)
+        tempos_temperatura: Instantes das leituras de temperatura (segundos)
+        temperaturas: Leituras de temperatura (°C)
+        temperatura_futura: Temperatura daqui em diante (padrão: a última lida)
+        fg_esperado: FG da receita, usado na estimativa sem leituras
+        dias_esperados: Tempo de fermentação da receita, idem
+
+    Returns:
+        Dict com 'metodo' ('logistico', 'exponencial' ou 'estimativa'), 'og',
+        'fg', 'dias_ate_terminal' (desde a primeira leitura), 'dias_restantes'
+        e 'abv', cada um com '<campo>_intervalo' (95%), e 'confiavel'
+    """
+    tempos = np.asarray(tempos, dtype=np.float64)
+    densidades = np.asarray(densidades, dtype=np.float64)
+    if og is None:
+        if not len(densidades):
+            raise ValueError("Informe o OG ou ao menos uma leitura de densidade")
+        og = float(densidades[0])
+
+    com_temperatura = tempos_temperatura is not None and temperaturas is not None and len(temperaturas) > 0
+    if temperatura_futura is None:
+        temperatura_futura = float(temperaturas[-1]) if com_temperatura else TEMPERATURA_REFERENCIA
+    fator_futuro = float(fator_temperatura(temperatura_futura))
+
+    decorridos = float(tempos[-1] - tempos[0]) / _SEGUNDOS_POR_DIA if len(tempos) else 0.0
+    ajuste = None
+    if len(densidades) >= MIN_LEITURAS:
+        if com_temperatura:
+            termico = tempo_termico(tempos, np.asarray(tempos_temperatura, dtype=np.float64),
+                                    np.asarray(temperaturas, dtype=np.float64))
+        else:
+            termico = tempos.copy()
+        dias_termicos = (termico - termico[0]) / _SEGUNDOS_POR_DIA
+        ajuste = ajustar_curva(dias_termicos, densidades, og)
+
+    if ajuste is not None:
+        # Tempo térmico que falta, convertido em dias na temperatura futura
+        agora = dias_termicos[-1]
+        restantes = [max(dias - float(agora), 0.0) / fator_futuro
+                     for dias in (ajuste['dias_terminal'], *ajuste['dias_terminal_intervalo'])]
+        resultado = {
+            'metodo': ajuste['modelo'],
+            'fg': ajuste['fg'],
+            'fg_intervalo': ajuste['fg_intervalo'],
+            'dias_restantes': restantes[0],
+            'dias_restantes_intervalo': (restantes[1], restantes[2]),
+            'erro_padrao': ajuste['erro_padrao'],
+            'leituras': ajuste['leituras']
+        }
+        largura = ajuste['fg_intervalo'][1] - ajuste['fg_intervalo'][0]
+        resultado['confiavel'] = largura <= LARGURA_CONFIAVEL
+    else:
+        if fg_esperado:
+            fg = fg_esperado
+            fg_intervalo = (fg_esperado - LARGURA_CONFIAVEL, fg_esperado + LARGURA_CONFIAVEL)
+        else:
+            fg = estimar_fg_por_atenuacao(og, ATENUACAO_PADRAO)
+            fg_intervalo = (estimar_fg_por_atenuacao(og, ATENUACAO_FAIXA[1]),
+                            estimar_fg_por_atenuacao(og, ATENUACAO_FAIXA[0]))
+        total = (dias_esperados or DIAS_PADRAO) / fator_futuro
+        resultado = {
+            'metodo': 'estimativa',
+            'fg': fg,
+            'fg_intervalo': fg_intervalo,
+            'dias_restantes': max(total - decorridos, 0.0),
+            'dias_restantes_intervalo': (max(total * 0.6 - decorridos, 0.0), max(total * 1.5 - decorridos, 0.0)),
+            'erro_padrao': None,
+            'leituras': len(densidades),
+            'confiavel': False
+        }
+
+    resultado['og'] = og
+    resultado['dias_ate_terminal'] = decorridos + resultado['dias_restantes']
+    resultado['dias_ate_terminal_intervalo'] = tuple(decorridos + dias for dias in resultado['dias_restantes_intervalo'])
+    resultado['abv'] = calcular_abv_simples(og, resultado['fg'])
+    # FG mais alto, menos álcool
+    resultado['abv_intervalo'] = (calcular_abv_simples(og, resultado['fg_intervalo'][1]),
+                                  calcular_abv_simples(og, resultado['fg_intervalo'][0]))
+    return resultado
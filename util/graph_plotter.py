@@ -3,8 +3,9 @@ import matplotlib.dates as mdates
 from matplotlib.backends.backend_tkagg import FigureCanvasTk
 from datetime import datetime, timedelta
 import numpy as np
-from typing import List, Tuple, Optional
+from typing import List, Tuple, Optional, Union
 import tkinter as tk
+from models.serie_temporal import SerieTemporal, Telemetria
 
 class BebrewPlotter:
     """Classe para criar gráficos do Bebrew usando matplotlib"""
@@ -26,7 +27,7 @@ class BebrewPlotter:
             self.text_color = 'black'
             self.grid_color = '#cccccc'
     
-    def criar_grafico_temperatura(self, temperaturas: List[Tuple[datetime, float]], 
+    def criar_grafico_temperatura(self, temperaturas: Union[SerieTemporal, List[Tuple[datetime, float]]], 
                                 temperatura_alvo: Optional[float] = None,
                                 titulo: str = "Monitoramento de Temperatura") -> plt.Figure:
         """
@@ -36,8 +37,8 @@ class BebrewPlotter:
         fig.patch.set_facecolor(self.bg_color)
         ax.set_facecolor(self.bg_color)
         
-        if temperaturas:
-            tempos, temps = zip(*temperaturas)
+        if len(temperaturas):
+            tempos, temps = self._colunas(temperaturas)
             ax.plot(tempos, temps, 'o-', color='#00ff88', linewidth=2, markersize=4, label='Temperatura Medida')
             
             # Linha de temperatura alvo
@@ -59,6 +60,13 @@ class BebrewPlotter:
         plt.tight_layout()
         return fig
     
+    @staticmethod
+    def _colunas(temperaturas):
+        """Separa tempos e valores, usando as views NumPy das séries colunares"""
+        if isinstance(temperaturas, (SerieTemporal, Telemetria)):
+            return temperaturas.tempos_datetime64(), temperaturas.valores
+        return zip(*temperaturas)
+    
     def criar_grafico_progresso_etapas(self, etapas_nomes: List[str], 
                                      etapas_concluidas: int,
                                      titulo: str = "Progresso da Produção") -> plt.Figure:
@@ -182,8 +190,8 @@ class BebrewPlotter:
         
         # Gráfico 1: Temperatura (canto superior esquerdo)
         ax1 = plt.subplot(2, 2, 1)
-        if dados.get('temperaturas'):
-            tempos, temps = zip(*dados['temperaturas'])
+        if len(dados.get('temperaturas', [])):
+            tempos, temps = self._colunas(dados['temperaturas'])
             ax1.plot(tempos, temps, 'o-', color='#00ff88', linewidth=2)
         ax1.set_title('Temperatura Atual', color=self.text_color)
         ax1.set_facecolor(self.bg_color)
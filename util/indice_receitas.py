@@ -0,0 +1,256 @@
+"""
+Índice invertido para a busca de receitas
+
+Mantém em memória, por token normalizado (minúsculo e sem acentos), as
+receitas em cujo nome ou descrição ele aparece, além do vocabulário ordenado
+(busca por prefixo com bisect) e dos trigramas de cada token (busca por
+trecho e por aproximação). Assim a busca a cada tecla só toca os tokens que
+casam com o termo digitado, em vez de varrer todas as receitas.
+"""
+import heapq
+import re
+import unicodedata
+from bisect import bisect_left, insort
+from functools import lru_cache
+from itertools import groupby, islice
+from operator import itemgetter
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+# Peso do campo onde o token aparece
+PESO_NOME = 2.0
+PESO_DESCRICAO = 1.0
+
+# Peso do tipo de casamento entre o token digitado e o indexado
+PESO_EXATO = 1.0
+PESO_PREFIXO = 0.8
+PESO_TRECHO = 0.6
+PESO_APROXIMADO = 0.5
+
+# Similaridade mínima (Jaccard dos trigramas) para aceitar um token aproximado
+SIMILARIDADE_MINIMA = 0.4
+
+_PADRAO_TOKEN = re.compile(r"\w+")
+
+
+def normalizar(texto: Optional[str]) -> str:
+    """Minúsculas e sem acentos: "Lúpulo" -> "lupulo" """
+    if not texto:
+        return ""
+    texto = texto.lower()
+    if texto.isascii():
+        return texto
+    decomposto = unicodedata.normalize('NFKD', texto)
+    return "".join(c for c in decomposto if not unicodedata.combining(c))
+
+
+@lru_cache(maxsize=65536)
+def _sem_acentos(palavra: str) -> str:
+    return normalizar(palavra)
+
+
+def tokenizar(texto: Optional[str]) -> List[str]:
+    """Palavras normalizadas do texto (a remoção de acentos é memorizada por palavra)"""
+    if not texto:
+        return []
+    texto = texto.lower()
+    if not texto.isascii():
+        texto = unicodedata.normalize('NFC', texto)
+    return [_sem_acentos(palavra) for palavra in _PADRAO_TOKEN.findall(texto)]
+
+
+def trigramas(token: str) -> Set[str]:
+    """Trigramas do token com bordas, para casar também o início e o fim"""
+    marcado = f"  {token} "
+    return {marcado[i:i + 3] for i in range(len(marcado) - 2)}
+
+
+class IndiceReceitas:
+    """Índice de tokens, prefixos, trigramas e tipos das receitas"""
+
+    def __init__(self):
+        # Cada indexação recebe um número de documento crescente; as listas de
+        # ocorrências guardam esses números em dicts, que ficam assim sempre
+        # em ordem de indexação.
+        # token -> (docs com o token no nome, docs com o token só na descrição)
+        self._postings: Dict[str, Tuple[Dict[int, None], Dict[int, None]]] = {}
+        # Vocabulário ordenado para busca por prefixo
+        self._vocabulario: List[str] = []
+        # trigrama -> tokens do vocabulário que o contêm
+        self._trigramas: Dict[str, Set[str]] = {}
+        # tipo normalizado -> ids na ordem de indexação
+        self._tipos: Dict[str, Dict[str, None]] = {}
+        # O que foi indexado para cada receita, para remover mesmo após edições
+        self._indexado: Dict[str, Tuple[int, Tuple[str, ...], Tuple[str, ...], str]] = {}
+        self._documentos: Dict[int, str] = {}
+        self._proximo_documento = 0
+
+    def __len__(self):
+        return len(self._indexado)
+
+    def __contains__(self, receita_id: str) -> bool:
+        return receita_id in self._indexado
+
+    def adicionar(self, receita_id: str, nome: str, descricao: Optional[str], tipo: str):
+        """Indexa (ou reindexa) uma receita"""
+        # Tokeniza antes de remover a entrada antiga: um erro aqui não tira a receita do índice
+        tokens_nome = tuple(dict.fromkeys(tokenizar(nome)))
+        tokens_descricao = tuple(t for t in dict.fromkeys(tokenizar(descricao)) if t not in tokens_nome)
+        tipo_normalizado = normalizar(tipo)
+
+        self.remover(receita_id)
+        documento = self._proximo_documento
+        self._proximo_documento += 1
+
+        for campo, tokens in ((0, tokens_nome), (1, tokens_descricao)):
+            for token in tokens:
+                postings = self._postings.get(token)
+                if postings is None:
+                    postings = self._postings[token] = ({}, {})
+                    insort(self._vocabulario, token)
+                    for trigrama in trigramas(token):
+                        self._trigramas.setdefault(trigrama, set()).add(token)
+                postings[campo][documento] = None
+
+        self._tipos.setdefault(tipo_normalizado, {})[receita_id] = None
+        self._documentos[documento] = receita_id
+        self._indexado[receita_id] = (documento, tokens_nome, tokens_descricao, tipo_normalizado)
+
+    def remover(self, receita_id: str):
+        indexado = self._indexado.pop(receita_id, None)
+        if indexado is None:
+            return
+        documento, tokens_nome, tokens_descricao, tipo = indexado
+        del self._documentos[documento]
+
+        for campo, tokens in ((0, tokens_nome), (1, tokens_descricao)):
+            for token in tokens:
+                postings = self._postings[token]
+                del postings[campo][documento]
+                if postings[0] or postings[1]:
+                    continue
+                del self._postings[token]
+                del self._vocabulario[bisect_left(self._vocabulario, token)]
+                for trigrama in trigramas(token):
+                    do_trigrama = self._trigramas[trigrama]
+                    do_trigrama.discard(token)
+                    if not do_trigrama:
+                        del self._trigramas[trigrama]
+
+        ids_tipo = self._tipos[tipo]
+        del ids_tipo[receita_id]
+        if not ids_tipo:
+            del self._tipos[tipo]
+
+    def por_tipo(self, tipo: str) -> List[str]:
+        """Ids das receitas do tipo, na ordem em que foram indexadas"""
+        return list(self._tipos.get(normalizar(tipo), ()))
+
+    def _com_prefixo(self, prefixo: str) -> Iterable[str]:
+        i = bisect_left(self._vocabulario, prefixo)
+        while i < len(self._vocabulario) and self._vocabulario[i].startswith(prefixo):
+            yield self._vocabulario[i]
+            i += 1
+
+    def _casamentos(self, termo: str) -> Dict[str, float]:
+        """Tokens do vocabulário que casam com `termo` e o peso de cada casamento
+
+        Exato e prefixo vêm do vocabulário ordenado; trecho no meio do token
+        vem da interseção dos trigramas. Só quando nada disso casa é que se
+        tenta a aproximação (erros de digitação) pela similaridade dos
+        trigramas.
+        """
+        casamentos: Dict[str, float] = {}
+        for token in self._com_prefixo(termo):
+            casamentos[token] = PESO_EXATO if token == termo else PESO_PREFIXO
+
+        if len(termo) < 3:
+            return casamentos
+
+        internos = [termo[i:i + 3] for i in range(len(termo) - 2)]
+        candidatos: Optional[Set[str]] = None
+        for trigrama in sorted(internos, key=lambda t: len(self._trigramas.get(t, ()))):
+            tokens = self._trigramas.get(trigrama)
+            if not tokens:
+                candidatos = set()
+                break
+            candidatos = set(tokens) if candidatos is None else candidatos & tokens
+            if not candidatos:
+                break
+        for token in candidatos or ():
+            if token not in casamentos and termo in token:
+                casamentos[token] = PESO_TRECHO
+
+        if casamentos:
+            return casamentos
+
+        do_termo = trigramas(termo)
+        compartilhados: Dict[str, int] = {}
+        for trigrama in do_termo:
+            for token in self._trigramas.get(trigrama, ()):
+                compartilhados[token] = compartilhados.get(token, 0) + 1
+        for token, comuns in compartilhados.items():
+            similaridade = comuns / (len(do_termo) + len(trigramas(token)) - comuns)
+            if similaridade >= SIMILARIDADE_MINIMA:
+                casamentos[token] = PESO_APROXIMADO * similaridade
+        return casamentos
+
+    def _grupos(self, palavra: str) -> List[Tuple[float, Dict[int, None]]]:
+        """(peso, docs) de cada token e campo que casam com a palavra"""
+        grupos = []
+        for token, peso_casamento in self._casamentos(palavra).items():
+            nome, descricao = self._postings[token]
+            if nome:
+                grupos.append((PESO_NOME * peso_casamento, nome))
+            if descricao:
+                grupos.append((PESO_DESCRICAO * peso_casamento, descricao))
+        return grupos
+
+    @staticmethod
+    def _combinar(grupos: list, outros: list) -> list:
+        """Interseção de cada par de grupos de duas palavras, somando os pesos
+
+        As interseções são feitas em C sobre as chaves dos dicts; a receita
+        que aparece em mais de um par fica, na ordenação, com a maior soma,
+        que é a soma dos melhores casamentos de cada palavra.
+        """
+        combinados = []
+        for peso, docs in grupos:
+            for outro_peso, outros_docs in outros:
+                comuns = docs.keys() & outros_docs.keys() if isinstance(docs, dict) else docs & outros_docs.keys()
+                if comuns:
+                    combinados.append((round(peso + outro_peso, 6), comuns))
+        return combinados
+
+    def buscar(self, termo: str, limite: Optional[int] = None) -> List[str]:
+        """Ids das receitas que casam com todas as palavras de `termo`, da mais relevante para a menos
+
+        Cada palavra vale o melhor casamento dela na receita (peso do campo x
+        peso do casamento); a pontuação da receita é a soma das palavras e os
+        empates ficam na ordem de indexação. Os grupos são percorridos do
+        maior peso para o menor e só até completar `limite` resultados.
+        """
+        palavras = list(dict.fromkeys(tokenizar(termo)))
+        if not palavras:
+            return []
+
+        grupos = None
+        for palavra in palavras:
+            da_palavra = self._grupos(palavra)
+            grupos = da_palavra if grupos is None else self._combinar(grupos, da_palavra)
+            if not grupos:
+                return []
+
+        grupos.sort(key=itemgetter(0), reverse=True)
+        return [self._documentos[documento] for documento in islice(self._em_ordem(grupos), limite)]
+
+    @staticmethod
+    def _em_ordem(grupos: list) -> Iterator[int]:
+        """Documentos dos grupos por peso decrescente e, no mesmo peso, por ordem de indexação"""
+        vistos: Set[int] = set()
+        for _, mesmo_peso in groupby(grupos, key=itemgetter(0)):
+            # Dicts de ocorrências já estão em ordem de indexação; interseções são sets
+            ordenados = [docs if isinstance(docs, dict) else sorted(docs) for _, docs in mesmo_peso]
+            for documento in (ordenados[0] if len(ordenados) == 1 else heapq.merge(*ordenados)):
+                if documento not in vistos:
+                    vistos.add(documento)
+                    yield documento
@@ -0,0 +1,110 @@
+"""
+Lista ordenada em blocos, sobre bisect
+
+A lista é dividida em blocos ordenados de até 2 * CARGA itens, com o maior
+item de cada bloco guardado à parte. Inserir e remover fazem uma busca
+binária nos máximos e outra dentro do bloco; o deslocamento de memória fica
+limitado ao tamanho do bloco em vez da lista inteira. É a mesma ideia do
+SortedList do pacote sortedcontainers, reduzida ao que as listagens usam.
+"""
+from bisect import bisect_left, bisect_right, insort
+from itertools import chain, islice
+from typing import Any, Iterable, Iterator, List, Optional
+
+# Tamanho de referência dos blocos: acima do dobro, o bloco é dividido
+CARGA = 512
+
+
+class ListaOrdenada:
+    """Sequência sempre ordenada com inserção e remoção em O(log n)"""
+
+    def __init__(self, valores: Iterable[Any] = ()):
+        ordenados = sorted(valores)
+        self._blocos: List[List[Any]] = [ordenados[i:i + CARGA] for i in range(0, len(ordenados), CARGA)]
+        self._maximos: List[Any] = [bloco[-1] for bloco in self._blocos]
+        self._tamanho = len(ordenados)
+
+    def __len__(self):
+        return self._tamanho
+
+    def __iter__(self) -> Iterator[Any]:
+        return chain.from_iterable(self._blocos)
+
+    def __contains__(self, valor: Any) -> bool:
+        i = bisect_left(self._maximos, valor)
+        if i == len(self._maximos):
+            return False
+        bloco = self._blocos[i]
+        j = bisect_left(bloco, valor)
+        return bloco[j] == valor
+
+    def adicionar(self, valor: Any):
+        """Insere `valor`; se ele não for comparável, nada é alterado"""
+        if not self._blocos:
+            self._blocos.append([valor])
+            self._maximos.append(valor)
+            self._tamanho = 1
+            return
+
+        i = bisect_left(self._maximos, valor)
+        if i == len(self._maximos):
+            # Maior que tudo: entra no fim do último bloco
+            i -= 1
+            self._blocos[i].append(valor)
+            self._maximos[i] = valor
+        else:
+            insort(self._blocos[i], valor)
+        self._tamanho += 1
+
+        bloco = self._blocos[i]
+        if len(bloco) > 2 * CARGA:
+            self._blocos[i:i + 1] = [bloco[:CARGA], bloco[CARGA:]]
+            self._maximos[i:i + 1] = [bloco[CARGA - 1], bloco[-1]]
+
+    def remover(self, valor: Any):
+        """Remove uma ocorrência de `valor` (ValueError se não houver)"""
+        i = bisect_left(self._maximos, valor)
+        if i == len(self._maximos):
+            raise ValueError(f"{valor!r} não está na lista")
+        bloco = self._blocos[i]
+        j = bisect_left(bloco, valor)
+        if bloco[j] != valor:
+            raise ValueError(f"{valor!r} não está na lista")
+
+        del bloco[j]
+        self._tamanho -= 1
+        if bloco:
+            self._maximos[i] = bloco[-1]
+        else:
+            del self._blocos[i]
+            del self._maximos[i]
+
+    def primeiro(self) -> Any:
+        """Menor item (IndexError se a lista estiver vazia)"""
+        return self._blocos[0][0]
+
+    def ultimo(self) -> Any:
+        """Maior item (IndexError se a lista estiver vazia)"""
+        return self._maximos[-1]
+
+    def posicao(self, valor: Any, depois: bool = False) -> int:
+        """Índice onde `valor` seria inserido (antes dos iguais, ou depois com `depois`)"""
+        busca = bisect_right if depois else bisect_left
+        i = busca(self._maximos, valor)
+        if i == len(self._maximos):
+            return self._tamanho
+        return sum(len(bloco) for bloco in self._blocos[:i]) + busca(self._blocos[i], valor)
+
+    def fatia(self, inicio: int = 0, fim: Optional[int] = None) -> List[Any]:
+        """Itens de `inicio` até `fim` (exclusivo) sem percorrer os blocos anteriores item a item"""
+        if fim is None or fim > self._tamanho:
+            fim = self._tamanho
+        if inicio >= fim:
+            return []
+
+        i = 0
+        while inicio >= len(self._blocos[i]):
+            inicio -= len(self._blocos[i])
+            fim -= len(self._blocos[i])
+            i += 1
+        return list(islice(chain.from_iterable(self._blocos[i:]), inicio, fim))
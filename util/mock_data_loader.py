@@ -1,20 +1,363 @@
 import json
 import os
-from typing import Dict, List, Any
+import threading
+from collections import Counter
+from functools import partial
+from typing import Dict, Iterator, List, Any, Optional, Tuple
 from datetime import datetime
+from util.lista_ordenada import ListaOrdenada
+
+STATUS_ATIVOS = ("Em Andamento", "Fermentando")
+
+# Seções do arquivo de dados e o valor padrão de cada uma
+SECOES = {"receitas": list, "producoes": list, "historico": list, "configuracoes": dict}
+
+
+def caminho_padrao() -> str:
+    """Arquivo de dados: BEBREW_MOCK_DATA ou database/mock_data.json"""
+    return os.environ.get("BEBREW_MOCK_DATA") or os.path.join(
+        os.path.dirname(os.path.dirname(__file__)), 'database', 'mock_data.json'
+    )
+
+
+def _ijson():
+    """Parser JSON incremental (opcional), importado só quando um arquivo é lido"""
+    try:
+        import ijson
+    except ImportError:
+        return None
+    return ijson
+
+
+class _Acumulador:
+    """Contagem, soma, mínimo e máximo de uma série de valores
+
+    Contagem e soma são atualizadas em O(1); os valores ficam em uma
+    ListaOrdenada, com inserção e remoção em O(log n) e extremos lidos em
+    O(1), inclusive depois de remover o mínimo ou o máximo atual.
+    """
+    
+    __slots__ = ('contagem', 'soma', '_valores')
+    
+    def __init__(self):
+        self.contagem = 0
+        self.soma = 0.0
+        self._valores = ListaOrdenada()
+    
+    def adicionar(self, valor: float):
+        self._valores.adicionar(valor)
+        self.contagem += 1
+        self.soma += valor
+    
+    def remover(self, valor: float):
+        self._valores.remover(valor)
+        self.contagem -= 1
+        self.soma -= valor
+        if not self.contagem:
+            self.soma = 0.0
+    
+    @property
+    def minimo(self) -> Optional[float]:
+        return self._valores.primeiro() if self.contagem else None
+    
+    @property
+    def maximo(self) -> Optional[float]:
+        return self._valores.ultimo() if self.contagem else None
+
 
 class MockDataLoader:
     """Carregador de dados mock para desenvolvimento"""
     
-    def __init__(self):
-        self.data_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'database', 'mock_data.json')
-        self.data = self._load_data()
+    def __init__(self, data_path: Optional[str] = None):
+        self.data_path = data_path or caminho_padrao()
+        # Seções são lidas do arquivo (e indexadas) só no primeiro acesso
+        self._data: Dict[str, Any] = {}
+        self._carregadas = set()
+        self._lidas: Dict[str, Any] = {}  # seções já lidas, ainda não usadas
+        self._leitor: Optional[Iterator[Tuple[str, Any]]] = None
+        # (mtime, tamanho) do arquivo na última leitura; ver recarregar_se_alterado
+        self._assinatura: Optional[Tuple[int, int]] = None
+        self._iniciar_indices()
+    
+    @property
+    def data(self) -> Dict[str, Any]:
+        """Todos os dados, carregando as seções que ainda não foram lidas"""
+        for nome in SECOES:
+            self._secao(nome)
+        return self._data
+    
+    @data.setter
+    def data(self, data: Dict[str, Any]):
+        """Substituir os dados reconstrói os índices"""
+        self._fechar_leitor()
+        self._data = data
+        self._carregadas = set(SECOES)
+        self._iniciar_indices()
+        for nome in SECOES:
+            self._indexar_secao(nome)
+    
+    # Carregamento
+    def _secao(self, nome: str) -> Any:
+        """Retorna uma seção do arquivo, lendo e indexando no primeiro acesso"""
+        if nome not in self._carregadas:
+            if nome not in self._lidas:
+                self._ler_ate(nome)
+            self._data[nome] = self._lidas.pop(nome, SECOES[nome]())
+            self._carregadas.add(nome)
+            self._indexar_secao(nome)
+        return self._data.setdefault(nome, SECOES[nome]())
+    
+    def _ler_ate(self, nome: str):
+        """Avança a leitura do arquivo até a seção `nome` (ou até o fim)"""
+        if self._leitor is None:
+            self._leitor = self._secoes_do_arquivo()
+        for chave, valor in self._leitor:
+            if chave not in self._carregadas:
+                self._lidas[chave] = valor
+            if chave == nome:
+                return
+        self._leitor = iter(())
+    
+    def _secoes_do_arquivo(self) -> Iterator[Tuple[str, Any]]:
+        """
+        Seções do arquivo na ordem em que aparecem
+        
+        Com o ijson o arquivo é percorrido uma única vez, montando cada seção
+        só quando a leitura chega nela; sem ele, é lido inteiro de uma vez.
+        """
+        self._assinatura = self._assinatura_arquivo()
+        ijson = _ijson()
+        if ijson is None:
+            yield from self._load_data().items()
+            return
+        try:
+            with open(self.data_path, 'rb') as f:
+                yield from ijson.kvitems(f, '', use_float=True)
+        except FileNotFoundError:
+            print(f"Arquivo de dados mock não encontrado: {self.data_path}")
+        except ijson.JSONError as e:
+            print(f"Erro ao decodificar JSON: {e}")
+    
+    def ler_secoes(self) -> Iterator[Tuple[str, Any]]:
+        """Seções do arquivo na ordem em que aparecem, sem guardá-las nem indexá-las (importação)"""
+        return self._secoes_do_arquivo()
+    
+    def _fechar_leitor(self):
+        leitor = getattr(self, '_leitor', None)
+        if hasattr(leitor, 'close'):
+            leitor.close()
+        self._leitor = iter(())
+        self._lidas = {}
+    
+    # Índices
+    def _iniciar_indices(self):
+        """Estruturas dos índices id -> registro e status -> registros e dos agregados"""
+        self._receitas_por_id: Dict[str, Dict[str, Any]] = {}
+        self._producoes_por_id: Dict[str, Dict[str, Any]] = {}
+        self._producoes_por_status: Dict[Any, Dict[int, Dict[str, Any]]] = {}
+        # Posição de inserção de cada produção, para manter a ordem da lista nos índices
+        self._ordem_producoes: Dict[int, int] = {}
+        self._proxima_ordem = 0
+        # Resultados de get_producoes_por_status, descartados a cada alteração
+        self._cache_status: Dict[tuple, List[Dict[str, Any]]] = {}
+        self._historico_por_id: Dict[str, Dict[str, Any]] = {}
+        # Valores usados na indexação de cada registro (por seção e id() do dicionário)
+        self._indexados: Dict[str, Dict[int, Dict[str, Any]]] = {"receitas": {}, "producoes": {}, "historico": {}}
+        
+        # Agregados mantidos a cada inserção/remoção (get_estatisticas em O(1))
+        self._abv_receitas = _Acumulador()
+        self._abv_historico = _Acumulador()
+        self._avaliacao_historico = _Acumulador()
+        self._receitas_por_tipo = Counter()
+        self._producoes_por_status_contagem = Counter()
+        self._historico_por_status = Counter()
+        self._historico_por_tipo = Counter()
+    
+    def _indexar_secao(self, nome: str):
+        indexar = {
+            "receitas": self._indexar_receita,
+            "producoes": self._indexar_producao,
+            "historico": self._indexar_historico
+        }.get(nome)
+        if indexar is not None:
+            for registro in self._data.get(nome, []):
+                indexar(registro)
+    
+    def _indexar_receita(self, receita: Dict[str, Any]):
+        # Guarda os valores indexados: a remoção usa esta cópia, não o
+        # dicionário, que pode ter sido alterado antes de ser salvo de novo
+        valores = self._indexados["receitas"][id(receita)] = {
+            campo: receita.get(campo) for campo in ("id", "abv", "tipo")
+        }
+        if valores["id"] is not None:
+            # Com ids repetidos vale o primeiro, como na busca linear
+            self._receitas_por_id.setdefault(valores["id"], receita)
+        if valores["abv"]:
+            self._abv_receitas.adicionar(valores["abv"])
+        self._receitas_por_tipo[valores["tipo"]] += 1
+    
+    def _desindexar_receita(self, receita: Dict[str, Any]):
+        valores = self._indexados["receitas"].pop(id(receita), None)
+        if valores is None:
+            return
+        if self._receitas_por_id.get(valores["id"]) is receita:
+            del self._receitas_por_id[valores["id"]]
+        if valores["abv"]:
+            self._abv_receitas.remover(valores["abv"])
+        self._descontar(self._receitas_por_tipo, valores["tipo"])
+    
+    def _indexar_historico(self, producao: Dict[str, Any]):
+        valores = self._indexados["historico"][id(producao)] = {
+            campo: producao.get(campo) for campo in ("id", "abv", "avaliacao", "status", "tipo")
+        }
+        if valores["id"] is not None:
+            self._historico_por_id.setdefault(valores["id"], producao)
+        if valores["abv"]:
+            self._abv_historico.adicionar(valores["abv"])
+        if valores["avaliacao"]:
+            self._avaliacao_historico.adicionar(valores["avaliacao"])
+        self._historico_por_status[valores["status"]] += 1
+        self._historico_por_tipo[valores["tipo"]] += 1
+    
+    def _desindexar_historico(self, producao: Dict[str, Any]):
+        valores = self._indexados["historico"].pop(id(producao), None)
+        if valores is None:
+            return
+        if self._historico_por_id.get(valores["id"]) is producao:
+            del self._historico_por_id[valores["id"]]
+        if valores["abv"]:
+            self._abv_historico.remover(valores["abv"])
+        if valores["avaliacao"]:
+            self._avaliacao_historico.remover(valores["avaliacao"])
+        self._descontar(self._historico_por_status, valores["status"])
+        self._descontar(self._historico_por_tipo, valores["tipo"])
+    
+    @staticmethod
+    def _descontar(contagem: Counter, chave: Any):
+        contagem[chave] -= 1
+        if contagem[chave] <= 0:
+            del contagem[chave]
+    
+    def _indexar_producao(self, producao: Dict[str, Any]):
+        self._cache_status.clear()
+        chave = id(producao)
+        valores = self._indexados["producoes"][chave] = {
+            campo: producao.get(campo) for campo in ("id", "status")
+        }
+        if chave not in self._ordem_producoes:
+            self._ordem_producoes[chave] = self._proxima_ordem
+            self._proxima_ordem += 1
+        if valores["id"] is not None:
+            self._producoes_por_id.setdefault(valores["id"], producao)
+        self._producoes_por_status.setdefault(valores["status"], {})[chave] = producao
+        self._producoes_por_status_contagem[valores["status"]] += 1
+    
+    def _desindexar_producao(self, producao: Dict[str, Any], manter_ordem: bool = False):
+        self._cache_status.clear()
+        chave = id(producao)
+        if not manter_ordem:
+            self._ordem_producoes.pop(chave, None)
+        valores = self._indexados["producoes"].pop(chave, None)
+        if valores is None:
+            return
+        if self._producoes_por_id.get(valores["id"]) is producao:
+            del self._producoes_por_id[valores["id"]]
+        por_status = self._producoes_por_status.get(valores["status"], {})
+        por_status.pop(chave, None)
+        if not por_status:
+            self._producoes_por_status.pop(valores["status"], None)
+        self._descontar(self._producoes_por_status_contagem, valores["status"])
+    
+    @staticmethod
+    def _substituir(existente: Dict[str, Any], novo: Dict[str, Any]):
+        """Copia `novo` para `existente` no lugar (nada a copiar se for o mesmo dicionário)"""
+        if novo is not existente:
+            existente.clear()
+            existente.update(novo)
+    
+    # Escrita
+    def salvar_receita(self, receita: Dict[str, Any]):
+        """Insere ou atualiza (pelo id) uma receita, mantendo os índices
+        
+        Aceita também o próprio dicionário devolvido por get_receita_by_id,
+        alterado e salvo de novo.
+        """
+        self._secao("receitas")
+        existente = self._receitas_por_id.get(receita.get("id"))
+        if existente is not None:
+            # Atualiza no lugar: a receita mantém a posição na lista
+            self._desindexar_receita(existente)
+            self._substituir(existente, receita)
+            self._indexar_receita(existente)
+        else:
+            self._secao("receitas").append(receita)
+            self._indexar_receita(receita)
+    
+    def remover_receita(self, receita_id: str) -> bool:
+        receitas = self._secao("receitas")
+        receita = self._receitas_por_id.get(receita_id)
+        if receita is None:
+            return False
+        self._desindexar_receita(receita)
+        receitas.remove(receita)
+        # Uma receita com o mesmo id, se houver, passa a responder pelo índice
+        duplicada = next((r for r in receitas if r.get("id") == receita_id), None)
+        if duplicada is not None:
+            self._receitas_por_id[receita_id] = duplicada
+        return True
+    
+    def salvar_producao(self, producao: Dict[str, Any], historico: bool = False):
+        """
+        Insere ou atualiza (pelo id) uma produção, mantendo índices e agregados
+        
+        Com historico=True a produção vai para o histórico. Alterações devem
+        passar por aqui (ou pela atribuição de `data`); mudar o dicionário
+        diretamente só atualiza os índices quando ele é salvo de novo.
+        """
+        self._secao("historico" if historico else "producoes")
+        if historico:
+            existente = self._historico_por_id.get(producao.get("id"))
+            if existente is not None:
+                self._desindexar_historico(existente)
+                self._substituir(existente, producao)
+                self._indexar_historico(existente)
+            else:
+                self._secao("historico").append(producao)
+                self._indexar_historico(producao)
+            return
+        existente = self._producoes_por_id.get(producao.get("id"))
+        if existente is not None:
+            self._desindexar_producao(existente, manter_ordem=True)
+            self._substituir(existente, producao)
+            self._indexar_producao(existente)
+        else:
+            self._secao("producoes").append(producao)
+            self._indexar_producao(producao)
+    
+    def remover_producao(self, producao_id: str, historico: bool = False) -> bool:
+        secao, por_id = ("historico", self._historico_por_id) if historico else ("producoes", self._producoes_por_id)
+        registros = self._secao(secao)
+        producao = por_id.get(producao_id)
+        if producao is None:
+            return False
+        if historico:
+            self._desindexar_historico(producao)
+        else:
+            self._desindexar_producao(producao)
+        registros.remove(producao)
+        duplicada = next((p for p in registros if p.get("id") == producao_id), None)
+        if duplicada is not None:
+            por_id[producao_id] = duplicada
+        return True
+    
+    def _ler_arquivo(self) -> Dict[str, Any]:
+        with open(self.data_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
     
     def _load_data(self) -> Dict[str, Any]:
         """Carrega os dados do arquivo JSON"""
         try:
-            with open(self.data_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return self._ler_arquivo()
         except FileNotFoundError:
             print(f"Arquivo de dados mock não encontrado: {self.data_path}")
             return {
@@ -32,55 +375,214 @@ class MockDataLoader:
                 "configuracoes": {}
             }
     
-    def get_receitas(self) -> List[Dict[str, Any]]:
-        """Retorna todas as receitas"""
-        return self.data.get("receitas", [])
+    # Observação do arquivo
+    def _assinatura_arquivo(self) -> Optional[Tuple[int, int]]:
+        """(mtime em ns, tamanho) do arquivo de dados, ou None se ele não existir"""
+        try:
+            estado = os.stat(self.data_path)
+        except OSError:
+            return None
+        return estado.st_mtime_ns, estado.st_size
+    
+    def recarregar_se_alterado(self) -> Dict[str, Dict[str, List[Any]]]:
+        """
+        Relê o arquivo se ele mudou desde a última leitura e aplica só as diferenças
+        
+        A mudança é detectada por mtime/tamanho, sem abrir o arquivo. As seções
+        já carregadas são comparadas registro a registro pelo id e as diferenças
+        passam pelos métodos de escrita, que atualizam índices e agregados só
+        dos registros alterados. As seções ainda não usadas ficam guardadas
+        para o primeiro acesso.
+        
+        Returns:
+            Seção -> {'adicionados', 'alterados', 'removidos'} com os ids (as
+            chaves, nas configurações), só das seções carregadas que mudaram.
+            Vazio se nada mudou ou se o arquivo não pôde ser lido (ex.: gravação
+            em andamento); nesse caso a próxima chamada tenta de novo.
+        """
+        assinatura = self._assinatura_arquivo()
+        if assinatura is None or assinatura == getattr(self, '_assinatura', None):
+            return {}
+        if not self._carregadas:
+            # Nenhuma seção em uso: basta recomeçar a leitura do arquivo novo no primeiro acesso
+            self._fechar_leitor()
+            self._leitor = None
+            self._assinatura = assinatura
+            return {}
+        try:
+            novos = self._ler_arquivo()
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(novos, dict):
+            return {}
+        
+        self._fechar_leitor()
+        self._assinatura = assinatura
+        self._lidas = {nome: valor for nome, valor in novos.items() if nome not in self._carregadas}
+        alteracoes = {}
+        for nome in SECOES:
+            if nome not in self._carregadas:
+                continue
+            if nome == "configuracoes":
+                mudancas = self._aplicar_configuracoes(novos.get(nome) or {})
+            else:
+                mudancas = self._aplicar_registros(nome, novos.get(nome) or [])
+            if any(mudancas.values()):
+                alteracoes[nome] = mudancas
+        return alteracoes
+    
+    @staticmethod
+    def _por_id_unico(registros: List[Any]) -> Optional[Dict[Any, Dict[str, Any]]]:
+        """id -> registro, ou None se algum registro não tiver id ou repetir um"""
+        por_id = {}
+        for registro in registros:
+            registro_id = registro.get("id") if isinstance(registro, dict) else None
+            if registro_id is None or registro_id in por_id:
+                return None
+            por_id[registro_id] = registro
+        return por_id
+    
+    def _aplicar_registros(self, nome: str, novos: List[Dict[str, Any]]) -> Dict[str, List[Any]]:
+        """Leva uma seção de registros ao conteúdo de `novos`, mexendo só no que mudou"""
+        atuais = self._data[nome]
+        antigos_por_id = self._por_id_unico(atuais)
+        novos_por_id = self._por_id_unico(novos)
+        desindexar = {
+            "receitas": self._desindexar_receita,
+            "producoes": self._desindexar_producao,
+            "historico": self._desindexar_historico
+        }[nome]
+        if antigos_por_id is None or novos_por_id is None:
+            # Sem um id único por registro não há como parear: a seção é trocada inteira
+            for registro in atuais:
+                desindexar(registro)
+            self._data[nome] = novos
+            self._indexar_secao(nome)
+            return {
+                "adicionados": [r.get("id") for r in novos if isinstance(r, dict)],
+                "alterados": [],
+                "removidos": [r.get("id") for r in atuais if isinstance(r, dict)]
+            }
+        
+        mudancas = {
+            "adicionados": [i for i in novos_por_id if i not in antigos_por_id],
+            "alterados": [i for i, registro in novos_por_id.items()
+                          if i in antigos_por_id and antigos_por_id[i] != registro],
+            "removidos": [i for i in antigos_por_id if i not in novos_por_id]
+        }
+        if mudancas["removidos"]:
+            for registro_id in mudancas["removidos"]:
+                desindexar(antigos_por_id[registro_id])
+            removidos = set(mudancas["removidos"])
+            atuais[:] = [r for r in atuais if r["id"] not in removidos]
+        
+        salvar = {
+            "receitas": self.salvar_receita,
+            "producoes": self.salvar_producao,
+            "historico": partial(self.salvar_producao, historico=True)
+        }[nome]
+        for registro_id in mudancas["alterados"] + mudancas["adicionados"]:
+            salvar(novos_por_id[registro_id])
+        
+        # Mantém a ordem do arquivo (inserções no meio, reordenações)
+        if [r["id"] for r in atuais] != list(novos_por_id):
+            por_id = {r["id"]: r for r in atuais}
+            atuais[:] = [por_id[i] for i in novos_por_id]
+            if nome == "producoes":
+                self._cache_status.clear()
+                self._ordem_producoes = {id(producao): ordem for ordem, producao in enumerate(atuais)}
+                self._proxima_ordem = len(atuais)
+        return mudancas
+    
+    def _aplicar_configuracoes(self, novas: Dict[str, Any]) -> Dict[str, List[Any]]:
+        atuais = self._data["configuracoes"]
+        mudancas = {
+            "adicionados": [chave for chave in novas if chave not in atuais],
+            "alterados": [chave for chave in novas if chave in atuais and atuais[chave] != novas[chave]],
+            "removidos": [chave for chave in atuais if chave not in novas]
+        }
+        if any(mudancas.values()):
+            # Mesmo dicionário: quem guardou a referência vê os valores novos
+            atuais.clear()
+            atuais.update(novas)
+        return mudancas
+    
+    def get_receitas(self, limite: Optional[int] = None, offset: int = 0) -> List[Dict[str, Any]]:
+        """Retorna todas as receitas (opcionalmente uma página)"""
+        receitas = self._secao("receitas")
+        if limite is None and not offset:
+            return receitas
+        return receitas[offset:None if limite is None else offset + limite]
     
     def get_receita_by_id(self, receita_id: str) -> Dict[str, Any]:
         """Retorna uma receita específica pelo ID"""
-        receitas = self.get_receitas()
-        for receita in receitas:
-            if receita.get("id") == receita_id:
-                return receita
-        return None
+        self._secao("receitas")
+        return self._receitas_por_id.get(receita_id)
+    
+    def get_producoes_por_status(self, *status: str) -> List[Dict[str, Any]]:
+        """Retorna as produções com algum dos status, na ordem da lista"""
+        self._secao("producoes")
+        if status not in self._cache_status:
+            encontradas = {}
+            for valor in status:
+                encontradas.update(self._producoes_por_status.get(valor, {}))
+            self._cache_status[status] = [
+                encontradas[chave] for chave in sorted(encontradas, key=self._ordem_producoes.__getitem__)
+            ]
+        return list(self._cache_status[status])
     
     def get_producoes_ativas(self) -> List[Dict[str, Any]]:
         """Retorna produções em andamento ou fermentando"""
-        producoes = self.data.get("producoes", [])
-        return [p for p in producoes if p.get("status") in ["Em Andamento", "Fermentando"]]
+        return self.get_producoes_por_status(*STATUS_ATIVOS)
     
     def get_producao_by_id(self, producao_id: str) -> Dict[str, Any]:
         """Retorna uma produção específica pelo ID"""
-        producoes = self.data.get("producoes", [])
-        for producao in producoes:
-            if producao.get("id") == producao_id:
-                return producao
-        return None
+        self._secao("producoes")
+        return self._producoes_por_id.get(producao_id)
     
-    def get_historico(self) -> List[Dict[str, Any]]:
-        """Retorna o histórico de produções concluídas"""
-        return self.data.get("historico", [])
+    def get_historico(self, tipo: Optional[str] = None, termo: Optional[str] = None,
+                      desde: Optional[datetime] = None, limite: Optional[int] = None,
+                      offset: int = 0) -> List[Dict[str, Any]]:
+        """Retorna o histórico de produções concluídas (mesmos filtros do BancoLocal)"""
+        historico = self._secao("historico")
+        if tipo:
+            historico = [h for h in historico if h.get("tipo") == tipo]
+        if termo:
+            termo = termo.lower()
+            historico = [h for h in historico if
+                         termo in (h.get("receita_nome") or "").lower() or
+                         termo in (h.get("lote") or "").lower()]
+        if desde:
+            historico = [h for h in historico if (h.get("data_fim") or "") >= desde.isoformat()]
+        if limite is not None or offset:
+            historico = historico[offset:None if limite is None else offset + limite]
+        return historico
+    
+    def get_resumo_historico(self) -> Dict[str, Any]:
+        """Totais do histórico: quantidade, ABV médio, taxa de sucesso e avaliação média"""
+        total = len(self._secao("historico"))
+        abv, avaliacao = self._abv_historico, self._avaliacao_historico
+        return {
+            "total": total,
+            "abv_medio": abv.soma / abv.contagem if abv.contagem else 0,
+            "taxa_sucesso": (self._historico_por_status["Concluída"] / total * 100) if total > 0 else 0,
+            "avaliacao_media": avaliacao.soma / avaliacao.contagem if avaliacao.contagem else 0
+        }
     
     def get_configuracoes(self) -> Dict[str, Any]:
         """Retorna as configurações do sistema"""
-        return self.data.get("configuracoes", {})
+        return self._secao("configuracoes")
     
     def get_estatisticas(self) -> Dict[str, Any]:
-        """Calcula estatísticas gerais"""
-        receitas = self.get_receitas()
-        producoes = self.data.get("producoes", [])
-        historico = self.get_historico()
-        
-        # Calcular ABV médio
-        abvs = []
-        for receita in receitas:
-            if receita.get("abv"):
-                abvs.append(receita["abv"])
-        for hist in historico:
-            if hist.get("abv"):
-                abvs.append(hist["abv"])
-        
-        abv_medio = sum(abvs) / len(abvs) if abvs else 0
+        """Estatísticas gerais, a partir dos agregados mantidos (tempo constante)"""
+        total_receitas = len(self._secao("receitas"))
+        total_historico = len(self._secao("historico"))
+        producoes = self._secao("producoes")
+        receitas, historico = self._abv_receitas, self._abv_historico
+        contagem_abv = receitas.contagem + historico.contagem
+        abv_medio = (receitas.soma + historico.soma) / contagem_abv if contagem_abv else 0
+        minimos = [valor for valor in (receitas.minimo, historico.minimo) if valor is not None]
+        maximos = [valor for valor in (receitas.maximo, historico.maximo) if valor is not None]
         
         # Última produção
         ultima_producao = "Nenhuma"
@@ -88,21 +590,21 @@ class MockDataLoader:
             ultima_producao = producoes[-1].get("lote", "Nenhuma")
         
         return {
-            "total_receitas": len(receitas),
-            "producoes_ativas": len(self.get_producoes_ativas()),
+            "total_receitas": total_receitas,
+            "producoes_ativas": sum(self._producoes_por_status_contagem[status] for status in STATUS_ATIVOS),
             "abv_medio": abv_medio,
+            "abv_minimo": min(minimos) if minimos else 0,
+            "abv_maximo": max(maximos) if maximos else 0,
             "ultima_producao": ultima_producao,
-            "total_historico": len(historico)
+            "total_historico": total_historico,
+            "producoes_por_status": dict(self._producoes_por_status_contagem),
+            "receitas_por_tipo": dict(self._receitas_por_tipo)
         }
     
     def get_tipos_bebida(self) -> List[str]:
         """Retorna os tipos únicos de bebida"""
-        tipos = set()
-        for receita in self.get_receitas():
-            tipo = receita.get("tipo")
-            if tipo:
-                tipos.add(tipo)
-        return sorted(list(tipos))
+        self._secao("receitas")
+        return sorted(tipo for tipo in self._receitas_por_tipo if tipo)
     
     def get_ingredientes_unicos(self) -> Dict[str, List[str]]:
         """Retorna ingredientes únicos por tipo"""
@@ -125,5 +627,30 @@ class MockDataLoader:
         
         return ingredientes_por_tipo
 
+def criar_armazenamento():
+    """
+    Escolhe o armazenamento local pela variável BEBREW_ARMAZENAMENTO:
+    'sqlite' (padrão, database/bebrew.sqlite3) ou 'json' (mock_data.json em memória)
+    """
+    if os.environ.get("BEBREW_ARMAZENAMENTO", "sqlite").lower() == "json":
+        return MockDataLoader()
+    from util.banco_local import BancoLocal
+    return BancoLocal()
+
+class _ArmazenamentoSobDemanda:
+    """Cria o armazenamento no primeiro uso, e não ao importar o módulo"""
+    
+    def __init__(self, fabrica):
+        self._fabrica = fabrica
+        self._instancia = None
+        self._lock = threading.Lock()
+    
+    def __getattr__(self, nome: str):
+        if self._instancia is None:
+            with self._lock:
+                if self._instancia is None:
+                    self._instancia = self._fabrica()
+        return getattr(self._instancia, nome)
+
 # Instância global para uso em toda a aplicação
-mock_loader = MockDataLoader() 
\ No newline at end of file
+mock_loader = _ArmazenamentoSobDemanda(criar_armazenamento) 
\ No newline at end of file
@@ -0,0 +1,59 @@
+"""
+Observador do arquivo de dados local
+
+Verifica periodicamente, no loop de eventos do Tkinter, se o arquivo de
+dados local mudou e avisa os inscritos só com as seções e os registros
+alterados. O MockDataLoader relê o próprio arquivo; o BancoLocal reimporta
+os registros que mudaram no mock_data.json de origem.
+"""
+from typing import Any, Callable, Dict, List, Optional
+
+Alteracoes = Dict[str, Dict[str, List[Any]]]
+
+
+class ObservadorDados:
+    """Dispara callbacks quando o arquivo de dados muda em disco"""
+
+    def __init__(self, armazenamento: Any, intervalo_ms: int = 1000):
+        self.armazenamento = armazenamento
+        self.intervalo_ms = intervalo_ms
+        self._inscritos: List[Callable[[Alteracoes], None]] = []
+        self._agendamento: Optional[str] = None
+
+    def inscrever(self, callback: Callable[[Alteracoes], None]):
+        """Registra uma função chamada com as alterações de cada recarga"""
+        self._inscritos.append(callback)
+
+    def cancelar_inscricao(self, callback: Callable[[Alteracoes], None]):
+        if callback in self._inscritos:
+            self._inscritos.remove(callback)
+
+    def verificar(self) -> Alteracoes:
+        """Relê o arquivo se ele mudou (mtime/tamanho) e notifica os inscritos"""
+        recarregar = getattr(self.armazenamento, 'recarregar_se_alterado', None)
+        if recarregar is None:
+            return {}
+        alteracoes = recarregar()
+        if alteracoes:
+            for callback in list(self._inscritos):
+                try:
+                    callback(alteracoes)
+                except Exception as e:
+                    print(f"Erro ao notificar alteração nos dados: {e}")
+        return alteracoes
+
+    def iniciar(self, root):
+        """Agenda verificações periódicas no loop de eventos de `root`"""
+        def ciclo():
+            try:
+                self.verificar()
+            finally:
+                self._agendamento = root.after(self.intervalo_ms, ciclo)
+
+        self.parar(root)
+        self._agendamento = root.after(self.intervalo_ms, ciclo)
+
+    def parar(self, root):
+        if self._agendamento is not None:
+            root.after_cancel(self._agendamento)
+            self._agendamento = None
@@ -0,0 +1,280 @@
+"""
+Registro de eventos (write-ahead log) das produções em andamento
+
+Cada produção tem um diretório com:
+- snapshot.bin: estado completo (util.serializacao) e o último evento incluído
+- eventos-<seq>.log: eventos gravados após o snapshot, só com acréscimos
+
+Os eventos são gravados com group commit: um único fsync confirma todos os
+eventos pendentes, e leituras de sensor (duravel=False) são confirmadas em
+lote por uma thread a cada `intervalo_commit` segundos. Na inicialização o
+estado é reconstruído carregando o snapshot e reaplicando os eventos.
+"""
+import os
+import struct
+import threading
+import zlib
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+import msgpack
+from models import Producao
+from models.serie_temporal import para_datetime, para_segundos
+from util.serializacao import para_binario, de_binario
+
+_CABECALHO = struct.Struct('<II')  # tamanho e CRC32 do registro
+_MAGICO_SNAPSHOT = b'BBSN'
+_SEQ_SNAPSHOT = struct.Struct('<Q')
+ARQUIVO_SNAPSHOT = 'snapshot.bin'
+
+# (seq, timestamp, tipo, dados)
+Evento = Tuple[int, datetime, str, Dict[str, Any]]
+
+
+def _nome_segmento(seq_inicial: int) -> str:
+    return f"eventos-{seq_inicial:012d}.log"
+
+
+def _sincronizar_diretorio(diretorio: str):
+    """Garante que renomeações e criações de arquivos sobrevivam a uma queda"""
+    if not hasattr(os, 'O_DIRECTORY'):
+        return
+    fd = os.open(diretorio, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _ler_segmento(caminho: str) -> Tuple[List[Evento], int]:
+    """Lê os eventos válidos de um segmento; retorna também o tamanho válido"""
+    eventos = []
+    with open(caminho, 'rb') as arquivo:
+        conteudo = arquivo.read()
+
+    posicao = 0
+    while posicao + _CABECALHO.size <= len(conteudo):
+        tamanho, crc = _CABECALHO.unpack_from(conteudo, posicao)
+        inicio = posicao + _CABECALHO.size
+        payload = conteudo[inicio:inicio + tamanho]
+        if len(payload) < tamanho or zlib.crc32(payload) != crc:
+            break  # registro incompleto: a queda ocorreu durante a escrita
+        seq, segundos, tipo, dados = msgpack.unpackb(payload, raw=False)
+        eventos.append((seq, para_datetime(segundos), tipo, dados))
+        posicao = inicio + tamanho
+
+    if posicao < len(conteudo):
+        print(f"Registro {caminho}: {len(conteudo) - posicao} bytes finais descartados")
+    return eventos, posicao
+
+
+class RegistroEventos:
+    """Log de eventos de uma produção com group commit e snapshots"""
+
+    def __init__(self, diretorio: str, intervalo_commit: float = 0.05):
+        self.diretorio = diretorio
+        self.intervalo_commit = intervalo_commit
+        os.makedirs(diretorio, exist_ok=True)
+
+        self._cond = threading.Condition()
+        self._arquivo = None
+        self._seq = 0  # último evento gravado
+        self._sincronizado = 0  # último evento confirmado em disco
+        self._sincronizando = False
+        self._seq_snapshot = 0
+        self._fechado = False
+
+        # Métricas
+        self.eventos = 0
+        self.fsyncs = 0
+
+        self._parar = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def eventos_desde_snapshot(self) -> int:
+        return self._seq - self._seq_snapshot
+
+    def _segmentos(self) -> List[Tuple[int, str]]:
+        segmentos = []
+        for nome in os.listdir(self.diretorio):
+            if nome.startswith('eventos-') and nome.endswith('.log'):
+                segmentos.append((int(nome[8:-4]), os.path.join(self.diretorio, nome)))
+        return sorted(segmentos)
+
+    def carregar(self) -> Tuple[Optional[Producao], List[Evento]]:
+        """
+        Lê o snapshot e os eventos posteriores a ele
+
+        Deve ser chamado antes de registrar novos eventos; também descarta
+        registros incompletos no fim do último segmento.
+
+        Returns:
+            Produção do snapshot (None se não houver) e eventos a reaplicar
+        """
+        producao = None
+        caminho = os.path.join(self.diretorio, ARQUIVO_SNAPSHOT)
+        if os.path.exists(caminho):
+            with open(caminho, 'rb') as arquivo:
+                conteudo = arquivo.read()
+            if conteudo[:4] != _MAGICO_SNAPSHOT:
+                raise ValueError(f"Snapshot inválido: {caminho}")
+            (self._seq_snapshot,) = _SEQ_SNAPSHOT.unpack_from(conteudo, 4)
+            producao = de_binario(conteudo[4 + _SEQ_SNAPSHOT.size:])
+
+        eventos: List[Evento] = []
+        self._seq = self._seq_snapshot
+        for _, caminho_segmento in self._segmentos():
+            lidos, tamanho_valido = _ler_segmento(caminho_segmento)
+            if tamanho_valido < os.path.getsize(caminho_segmento):
+                with open(caminho_segmento, 'r+b') as arquivo:
+                    arquivo.truncate(tamanho_valido)
+            for evento in lidos:
+                if evento[0] > self._seq_snapshot:
+                    eventos.append(evento)
+                self._seq = max(self._seq, evento[0])
+
+        self._sincronizado = self._seq
+        return producao, eventos
+
+    def _abrir_segmento(self):
+        """Abre (ou continua) o segmento que recebe os próximos eventos"""
+        segmentos = self._segmentos()
+        if segmentos and segmentos[-1][0] > self._seq_snapshot:
+            caminho = segmentos[-1][1]
+        else:
+            caminho = os.path.join(self.diretorio, _nome_segmento(self._seq + 1))
+        self._arquivo = open(caminho, 'ab')
+        _sincronizar_diretorio(self.diretorio)
+
+        if self.intervalo_commit and self._thread is None:
+            self._thread = threading.Thread(
+                target=self._confirmar_periodicamente, name=f"registro-{os.path.basename(self.diretorio)}",
+                daemon=True
+            )
+            self._thread.start()
+
+    def registrar(self, tipo: str, dados: Dict[str, Any], timestamp: Optional[datetime] = None,
+                  duravel: bool = False) -> int:
+        """
+        Acrescenta um evento ao log
+
+        Args:
+            tipo: Tipo do evento (temperatura, anotacao, densidade, ...)
+            dados: Dados do evento
+            timestamp: Momento do evento (padrão: agora)
+            duravel: Aguarda o fsync antes de retornar
+
+        Returns:
+            Número de sequência do evento
+        """
+        segundos = para_segundos(timestamp or datetime.now())
+        with self._cond:
+            if self._fechado:
+                raise ValueError("Registro de eventos fechado")
+            if self._arquivo is None:
+                self._abrir_segmento()
+            seq = self._seq + 1
+            payload = msgpack.packb([seq, segundos, tipo, dados], use_bin_type=True)
+            self._arquivo.write(_CABECALHO.pack(len(payload), zlib.crc32(payload)) + payload)
+            self._seq = seq
+            self.eventos += 1
+
+        if duravel:
+            self.sincronizar(seq)
+        return seq
+
+    def sincronizar(self, ate: Optional[int] = None):
+        """
+        Garante que os eventos até `ate` (padrão: todos) estão em disco
+
+        Quem chega enquanto outro fsync está em andamento espera por ele e,
+        se ainda precisar, faz o próximo cobrindo tudo o que foi gravado.
+        """
+        with self._cond:
+            alvo = self._seq if ate is None else ate
+            while self._sincronizado < alvo:
+                if self._sincronizando:
+                    self._cond.wait()
+                    continue
+
+                arquivo = self._arquivo
+                if arquivo is None:
+                    # Sem segmento aberto não há o que confirmar: o snapshot já cobre os eventos
+                    self._sincronizado = self._seq
+                    break
+
+                self._sincronizando = True
+                lote = self._seq
+                arquivo.flush()
+                self._cond.release()
+                try:
+                    os.fsync(arquivo.fileno())
+                finally:
+                    self._cond.acquire()
+                    self._sincronizando = False
+                    self._sincronizado = max(self._sincronizado, lote)
+                    self.fsyncs += 1
+                    self._cond.notify_all()
+
+    def _confirmar_periodicamente(self):
+        while not self._parar.wait(self.intervalo_commit):
+            if self._sincronizado < self._seq:
+                try:
+                    self.sincronizar()
+                except (OSError, ValueError) as e:
+                    print(f"Erro ao confirmar eventos em {self.diretorio}: {e}")
+
+    def gravar_snapshot(self, producao: Producao):
+        """
+        Grava o estado completo da produção e inicia um novo segmento
+
+        O snapshot é escrito em um arquivo temporário e renomeado, então uma
+        queda no meio mantém o snapshot anterior e os eventos ainda válidos.
+        """
+        self.sincronizar()
+        with self._cond:
+            while self._sincronizando:
+                self._cond.wait()
+
+            conteudo = _MAGICO_SNAPSHOT + _SEQ_SNAPSHOT.pack(self._seq) + para_binario(producao)
+            caminho = os.path.join(self.diretorio, ARQUIVO_SNAPSHOT)
+            temporario = caminho + '.tmp'
+            with open(temporario, 'wb') as arquivo:
+                arquivo.write(conteudo)
+                arquivo.flush()
+                os.fsync(arquivo.fileno())
+            os.replace(temporario, caminho)
+            _sincronizar_diretorio(self.diretorio)
+            self._seq_snapshot = self._seq
+            # Eventos gravados depois do sincronizar() inicial estão no snapshot já confirmado
+            self._sincronizado = self._seq
+            self._cond.notify_all()
+
+            # Segmentos anteriores já estão contidos no snapshot
+            if self._arquivo is not None:
+                self._arquivo.close()
+                self._arquivo = None
+            for _, caminho_segmento in self._segmentos():
+                os.remove(caminho_segmento)
+
+    def fechar(self):
+        """Confirma os eventos pendentes e libera o arquivo"""
+        self._parar.set()
+        if self._arquivo is not None:
+            self.sincronizar()
+        with self._cond:
+            self._fechado = True
+            if self._arquivo is not None:
+                self._arquivo.close()
+                self._arquivo = None
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def metricas(self) -> Dict[str, Any]:
+        return {
+            'eventos': self.eventos,
+            'fsyncs': self.fsyncs,
+            'eventos_por_fsync': self.eventos / self.fsyncs if self.fsyncs else 0.0,
+            'eventos_desde_snapshot': self.eventos_desde_snapshot
+        }
@@ -0,0 +1,273 @@
+"""
+Serialização versionada de Receita, Producao e EtapaExecucao
+
+Dois codecs sobre a mesma representação intermediária:
+- JSON: legível, para exportação e depuração
+- Binário (MessagePack): compacto, com as colunas de telemetria gravadas
+  como arrays float empacotados, sem conversão ponto a ponto
+
+Todo documento é um envelope {'formato', 'versao', 'tipo', 'dados'}.
+Documentos de versões anteriores passam pelas migrações em _MIGRACOES.
+"""
+import json
+import struct
+from datetime import datetime
+from typing import Any, Callable, Dict, Tuple, Union
+import msgpack
+import numpy as np
+from models import Ingrediente, Etapa, EtapaExecucao, Receita, Producao, SerieTemporal, Telemetria
+
+FORMATO = "bebrew"
+VERSAO = 1
+
+# versão -> função que converte (tipo, dados) para a versão seguinte
+_MIGRACOES: Dict[int, Callable[[str, Dict[str, Any]], Dict[str, Any]]] = {}
+
+# Tipos de extensão do MessagePack
+_EXT_DATETIME = 1
+_EXT_ARRAY = 2
+
+Modelo = Union[Receita, Producao, EtapaExecucao]
+
+
+# Modelos <-> representação intermediária
+def ingrediente_para_dict(ingrediente: Ingrediente) -> Dict[str, Any]:
+    return {
+        'id': ingrediente.id,
+        'nome': ingrediente.nome,
+        'tipo': ingrediente.tipo,
+        'unidade': ingrediente.unidade,
+        'quantidade': ingrediente.quantidade,
+        'observacoes': ingrediente.observacoes
+    }
+
+
+def ingrediente_de_dict(dados: Dict[str, Any]) -> Ingrediente:
+    return Ingrediente(
+        dados['nome'], dados['tipo'], dados['unidade'], dados['quantidade'], dados.get('observacoes'),
+        id=dados.get('id')
+    )
+
+
+def etapa_para_dict(etapa: Etapa) -> Dict[str, Any]:
+    return {
+        'id': etapa.id,
+        'nome': etapa.nome,
+        'descricao': etapa.descricao,
+        'duracao_estimada': etapa.duracao_estimada,
+        'temperatura_alvo': etapa.temperatura_alvo,
+        'observacoes': etapa.observacoes,
+        'parametros': etapa.parametros
+    }
+
+
+def etapa_de_dict(dados: Dict[str, Any]) -> Etapa:
+    etapa = Etapa(
+        dados['nome'], dados['descricao'], dados['duracao_estimada'], dados.get('temperatura_alvo'),
+        dados.get('observacoes'), id=dados.get('id')
+    )
+    etapa.parametros = dict(dados.get('parametros') or {})
+    return etapa
+
+
+def receita_para_dict(receita: Receita) -> Dict[str, Any]:
+    return {
+        'id': receita.id,
+        'nome': receita.nome,
+        'tipo': receita.tipo,
+        'volume': receita.volume,
+        'descricao': receita.descricao,
+        'data_criacao': receita.data_criacao,
+        'og': receita.og,
+        'fg': receita.fg,
+        'abv': receita.abv,
+        'ibu': receita.ibu,
+        'srm': receita.srm,
+        'ph': receita.ph,
+        'temperatura_fermentacao': receita.temperatura_fermentacao,
+        'tempo_fermentacao': receita.tempo_fermentacao,
+        'dificuldade': receita.dificuldade,
+        'rendimento_esperado': receita.rendimento_esperado,
+        'tempo_total_estimado': receita.tempo_total_estimado,
+        'ingredientes': [ingrediente_para_dict(ing) for ing in receita.ingredientes],
+        'etapas': [etapa_para_dict(etapa) for etapa in receita.etapas]
+    }
+
+
+def receita_de_dict(dados: Dict[str, Any]) -> Receita:
+    receita = Receita(
+        dados['nome'], dados['tipo'], dados['volume'], dados.get('descricao'),
+        id=dados.get('id'), data_criacao=dados.get('data_criacao')
+    )
+    for campo in ('og', 'fg', 'abv', 'ibu', 'srm', 'ph', 'temperatura_fermentacao',
+                  'tempo_fermentacao', 'dificuldade', 'rendimento_esperado'):
+        if campo in dados:
+            setattr(receita, campo, dados[campo])
+    receita.ingredientes = [ingrediente_de_dict(ing) for ing in dados.get('ingredientes', [])]
+    receita.etapas = [etapa_de_dict(etapa) for etapa in dados.get('etapas', [])]
+    receita.tempo_total_estimado = dados.get(
+        'tempo_total_estimado', sum(etapa.duracao_estimada for etapa in receita.etapas)
+    )
+    return receita
+
+
+def etapa_execucao_para_dict(etapa: EtapaExecucao) -> Dict[str, Any]:
+    return {
+        'id': etapa.id,
+        'etapa_id': etapa.etapa_id,
+        'inicio': etapa.inicio,
+        'fim': etapa.fim,
+        'concluida': etapa.concluida,
+        'anotacoes': [[timestamp, texto] for timestamp, texto in etapa.anotacoes],
+        'parametros_medidos': etapa.parametros_medidos,
+        'temperaturas': etapa.temperaturas.para_estado() if etapa.possui_temperaturas else None
+    }
+
+
+def etapa_execucao_de_dict(dados: Dict[str, Any]) -> EtapaExecucao:
+    etapa = EtapaExecucao(dados['etapa_id'], dados.get('inicio'), id=dados.get('id'))
+    etapa.fim = dados.get('fim')
+    etapa.concluida = dados.get('concluida', False)
+    etapa.anotacoes = [(timestamp, texto) for timestamp, texto in dados.get('anotacoes', [])]
+    etapa.parametros_medidos = dict(dados.get('parametros_medidos') or {})
+    if dados.get('temperaturas') is not None:
+        etapa.temperaturas = Telemetria.de_estado(dados['temperaturas'])
+    return etapa
+
+
+_CAMPOS_PRODUCAO = (
+    'lote', 'data_inicio', 'data_fim', 'status', 'etapa_atual_index', 'og_medido', 'fg_medido',
+    'abv_final', 'volume_final', 'rendimento_real', 'notas_gerais', 'avaliacao_visual',
+    'avaliacao_aroma', 'avaliacao_sabor', 'nota_final'
+)
+
+
+def producao_para_dict(producao: Producao) -> Dict[str, Any]:
+    dados = {campo: getattr(producao, campo) for campo in _CAMPOS_PRODUCAO}
+    dados.update({
+        'id': producao.id,
+        # A receita vai junto: o histórico não depende de edições posteriores
+        'receita': receita_para_dict(producao.receita),
+        'etapas_execucao': [etapa_execucao_para_dict(etapa) for etapa in producao.etapas_execucao],
+        'densidades': producao.densidades.para_estado(),
+        'problemas_encontrados': list(producao.problemas_encontrados),
+        'modificacoes_receita': list(producao.modificacoes_receita)
+    })
+    return dados
+
+
+def producao_de_dict(dados: Dict[str, Any]) -> Producao:
+    producao = Producao(receita_de_dict(dados['receita']), dados.get('lote'), id=dados.get('id'))
+    for campo in _CAMPOS_PRODUCAO:
+        if campo in dados:
+            setattr(producao, campo, dados[campo])
+    producao.etapas_execucao = [etapa_execucao_de_dict(etapa) for etapa in dados.get('etapas_execucao', [])]
+    if dados.get('densidades') is not None:
+        producao.densidades = SerieTemporal.de_estado(dados['densidades'])
+    producao.problemas_encontrados = list(dados.get('problemas_encontrados', []))
+    producao.modificacoes_receita = list(dados.get('modificacoes_receita', []))
+    return producao
+
+
+_CODIFICADORES: Dict[type, Tuple[str, Callable[[Any], Dict[str, Any]]]] = {
+    Receita: ('Receita', receita_para_dict),
+    Producao: ('Producao', producao_para_dict),
+    EtapaExecucao: ('EtapaExecucao', etapa_execucao_para_dict),
+}
+
+_DECODIFICADORES: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+    'Receita': receita_de_dict,
+    'Producao': producao_de_dict,
+    'EtapaExecucao': etapa_execucao_de_dict,
+}
+
+
+def _envelope(obj: Modelo) -> Dict[str, Any]:
+    if type(obj) not in _CODIFICADORES:
+        raise TypeError(f"Tipo não serializável: {type(obj).__name__}")
+    tipo, codificar = _CODIFICADORES[type(obj)]
+    return {'formato': FORMATO, 'versao': VERSAO, 'tipo': tipo, 'dados': codificar(obj)}
+
+
+def _abrir_envelope(envelope: Dict[str, Any]) -> Modelo:
+    if not isinstance(envelope, dict) or envelope.get('formato') != FORMATO:
+        raise ValueError("Documento não está no formato do Bebrew")
+
+    versao, tipo, dados = envelope.get('versao'), envelope.get('tipo'), envelope.get('dados')
+    if not isinstance(versao, int) or versao > VERSAO:
+        raise ValueError(f"Versão do documento não suportada: {versao}")
+    if tipo not in _DECODIFICADORES:
+        raise ValueError(f"Tipo de documento desconhecido: {tipo}")
+
+    while versao < VERSAO:
+        dados = _MIGRACOES[versao](tipo, dados)
+        versao += 1
+    return _DECODIFICADORES[tipo](dados)
+
+
+# Codec JSON
+def _json_default(valor: Any) -> Any:
+    if isinstance(valor, datetime):
+        return {'$dt': valor.isoformat()}
+    if isinstance(valor, np.ndarray):
+        return {'$arr': valor.dtype.str, 'valores': valor.tolist()}
+    if isinstance(valor, np.generic):
+        return valor.item()
+    raise TypeError(f"Valor não serializável: {type(valor).__name__}")
+
+
+def _json_hook(obj: Dict[str, Any]) -> Any:
+    if len(obj) == 1 and '$dt' in obj:
+        return datetime.fromisoformat(obj['$dt'])
+    if '$arr' in obj and len(obj) == 2:
+        return np.array(obj['valores'], dtype=np.dtype(obj['$arr']))
+    return obj
+
+
+def para_json(obj: Modelo, indent: int = None) -> str:
+    """Serializa um modelo em JSON"""
+    return json.dumps(_envelope(obj), default=_json_default, ensure_ascii=False, indent=indent)
+
+
+def de_json(texto: Union[str, bytes]) -> Modelo:
+    """Reconstrói um modelo a partir de para_json()"""
+    return _abrir_envelope(json.loads(texto, object_hook=_json_hook))
+
+
+def para_documento(obj: Modelo) -> Dict[str, Any]:
+    """Envelope de um modelo como dict de tipos JSON, o mesmo conteúdo de para_json()"""
+    return json.loads(para_json(obj))
+
+
+# Codec binário
+def _msgpack_default(valor: Any) -> Any:
+    if isinstance(valor, datetime):
+        return msgpack.ExtType(_EXT_DATETIME, valor.isoformat().encode('ascii'))
+    if isinstance(valor, np.ndarray):
+        # dtype little-endian + bytes crus da coluna
+        dtype = valor.dtype.newbyteorder('<')
+        tipo = dtype.str.encode('ascii')
+        return msgpack.ExtType(_EXT_ARRAY, struct.pack('<B', len(tipo)) + tipo + valor.astype(dtype, copy=False).tobytes())
+    if isinstance(valor, np.generic):
+        return valor.item()
+    raise TypeError(f"Valor não serializável: {type(valor).__name__}")
+
+
+def _msgpack_ext(codigo: int, dados: bytes) -> Any:
+    if codigo == _EXT_DATETIME:
+        return datetime.fromisoformat(dados.decode('ascii'))
+    if codigo == _EXT_ARRAY:
+        tamanho = dados[0]
+        dtype = np.dtype(dados[1:1 + tamanho].decode('ascii'))
+        return np.frombuffer(dados, dtype=dtype, offset=1 + tamanho)
+    return msgpack.ExtType(codigo, dados)
+
+
+def para_binario(obj: Modelo) -> bytes:
+    """Serializa um modelo no formato binário compacto"""
+    return msgpack.packb(_envelope(obj), default=_msgpack_default, use_bin_type=True)
+
+
+def de_binario(dados: bytes) -> Modelo:
+    """Reconstrói um modelo a partir de para_binario()"""
+    return _abrir_envelope(msgpack.unpackb(dados, ext_hook=_msgpack_ext, raw=False, strict_map_key=False))
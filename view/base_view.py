@@ -1,6 +1,6 @@
 import customtkinter as ctk
 import tkinter as tk
-from typing import Protocol, Optional, Callable, Any, Union
+from typing import Protocol, Optional, Callable, Any, Dict, List, Union
 from abc import ABC, abstractmethod
 
 class NavigationProtocol(Protocol):
@@ -348,4 +348,60 @@ class BaseView(ABC):
         
     def refresh(self):
         """Atualiza os dados da view (para ser sobrescrito)"""
-        pass 
\ No newline at end of file
+        pass
+        
+    def on_dados_alterados(self, alteracoes: Dict[str, Dict[str, List[Any]]]):
+        """
+        Callback do observador de dados quando o arquivo local muda (para ser sobrescrito)
+        
+        `alteracoes` traz, por seção, os ids adicionados, alterados e removidos.
+        """
+        pass
+        
+    def atualizar_linhas(self, container: Union[ctk.CTkFrame, tk.Widget], linhas: Dict[Any, Any],
+                         registros: List[Dict[str, Any]], alterados: List[Any],
+                         criar_linha: Callable[[Any, Dict[str, Any]], Any]) -> bool:
+        """
+        Sincroniza uma lista já exibida com `registros`, recriando só as linhas que mudaram
+        
+        Args:
+            container: Frame onde as linhas são empacotadas
+            linhas: id -> widget de cada linha exibida, na ordem (atualizado no lugar)
+            registros: Registros que a lista deve exibir, na ordem
+            alterados: Ids cujo conteúdo mudou
+            criar_linha: Função (container, registro) -> widget que cria e empacota uma linha
+            
+        Returns:
+            False se a lista precisa ser redesenhada inteira (lista vazia, ids
+            ausentes ou repetidos, ou linhas existentes que trocaram de ordem)
+        """
+        ids = [registro.get('id') for registro in registros]
+        if not linhas or not ids or None in ids or len(set(ids)) != len(ids):
+            return False
+        exibir = set(ids)
+        if [i for i in linhas if i in exibir] != [i for i in ids if i in linhas]:
+            return False
+        
+        for registro_id in [i for i in linhas if i not in exibir]:
+            linhas.pop(registro_id).destroy()
+        
+        alterados = set(alterados)
+        novas = {}
+        anterior = None
+        for registro_id, registro in zip(ids, registros):
+            linha = linhas.get(registro_id)
+            if linha is None or registro_id in alterados:
+                nova = criar_linha(container, registro)
+                if linha is not None:
+                    nova.pack_configure(before=linha)
+                    linha.destroy()
+                elif anterior is not None:
+                    nova.pack_configure(after=anterior)
+                elif linhas:
+                    nova.pack_configure(before=next(iter(linhas.values())))
+                linha = nova
+            novas[registro_id] = linha
+            anterior = linha
+        linhas.clear()
+        linhas.update(novas)
+        return True
@@ -18,6 +18,9 @@ class DashboardView(BaseView):
         self.stats_cards = {}
         self.production_list = None
         self.recipe_list = None
+        # id -> linha exibida em cada lista
+        self.production_rows: Dict[str, ctk.CTkFrame] = {}
+        self.recipe_rows: Dict[str, ctk.CTkFrame] = {}
         
     def create_widgets(self):
         """Cria os widgets do dashboard"""
@@ -229,6 +232,8 @@ class DashboardView(BaseView):
         )
         monitor_btn.pack()
         
+        return item_frame
+        
     def create_recipe_item(self, parent, recipe_data: Dict):
         """Cria um item de receita na lista"""
         # Container do item
@@ -309,6 +314,8 @@ class DashboardView(BaseView):
         )
         brew_btn.pack(side='left')
         
+        return item_frame
+        
     def update_stats(self):
         """Atualiza as estatísticas do dashboard"""
         # Obter estatísticas dos dados mock
@@ -344,6 +351,7 @@ class DashboardView(BaseView):
         # Limpar lista atual
         for widget in self.production_list.winfo_children():
             widget.destroy()
+        self.production_rows = {}
             
         # Obter produções ativas dos dados mock
         productions = mock_loader.get_producoes_ativas()
@@ -357,16 +365,19 @@ class DashboardView(BaseView):
             no_productions_label.pack(pady=40)
         else:
             for production in productions:
-                self.create_production_item(self.production_list, production)
+                self.production_rows[production.get('id')] = self.create_production_item(
+                    self.production_list, production
+                )
                 
     def update_recent_recipes(self):
         """Atualiza a lista de receitas recentes"""
         # Limpar lista atual
         for widget in self.recipe_list.winfo_children():
             widget.destroy()
+        self.recipe_rows = {}
             
         # Obter receitas dos dados mock (últimas 5)
-        recipes = mock_loader.get_receitas()[:5]
+        recipes = mock_loader.get_receitas(limite=5)
         
         if not recipes:
             no_recipes_label = self.create_label(
@@ -377,7 +388,7 @@ class DashboardView(BaseView):
             no_recipes_label.pack(pady=40)
         else:
             for recipe in recipes:
-                self.create_recipe_item(self.recipe_list, recipe)
+                self.recipe_rows[recipe.get('id')] = self.create_recipe_item(self.recipe_list, recipe)
                 
     def on_show(self, **kwargs):
         """Callback chamado quando a view é exibida"""
@@ -388,3 +399,18 @@ class DashboardView(BaseView):
         self.update_stats()
         self.update_active_productions()
         self.update_recent_recipes()
+        
+    def on_dados_alterados(self, alteracoes):
+        """Atualiza as estatísticas e recria só as linhas que mudaram no arquivo de dados"""
+        if not self.is_created:
+            return
+        self.update_stats()
+        if 'producoes' in alteracoes:
+            if not self.atualizar_linhas(self.production_list, self.production_rows,
+                                         mock_loader.get_producoes_ativas(),
+                                         alteracoes['producoes']['alterados'], self.create_production_item):
+                self.update_active_productions()
+        if 'receitas' in alteracoes:
+            if not self.atualizar_linhas(self.recipe_list, self.recipe_rows, mock_loader.get_receitas(limite=5),
+                                         alteracoes['receitas']['alterados'], self.create_recipe_item):
+                self.update_recent_recipes()
@@ -2,7 +2,17 @@ import customtkinter as ctk
 from .base_view import BaseView
 from typing import Optional, Dict, List
 from util.mock_data_loader import mock_loader
-from datetime import datetime
+from datetime import datetime, timedelta
+
+# Itens exibidos por vez; o histórico completo fica no banco local
+LIMITE_HISTORICO = 200
+
+PERIODOS = {
+    "Última Semana": timedelta(days=7),
+    "Último Mês": timedelta(days=30),
+    "Últimos 3 Meses": timedelta(days=90),
+    "Último Ano": timedelta(days=365),
+}
 
 class HistoryView(BaseView):
     """View para histórico de produções concluídas"""
@@ -17,6 +27,8 @@ class HistoryView(BaseView):
         self.type_filter = None
         self.history_list_frame = None
         self.history_data = []
+        self.history_rows: Dict[str, ctk.CTkFrame] = {}  # id -> linha exibida
+        self.stats_container = None
         
     def create_widgets(self):
         """Cria os widgets da view de histórico"""
@@ -50,30 +62,27 @@ class HistoryView(BaseView):
     def create_stats_section(self):
         """Cria a seção de estatísticas gerais"""
         # Container de estatísticas
-        stats_container = ctk.CTkFrame(self.main_scroll, fg_color='transparent')
-        stats_container.grid(row=0, column=0, columnspan=2, sticky='ew', pady=(0, 20))
+        self.stats_container = ctk.CTkFrame(self.main_scroll, fg_color='transparent')
+        self.stats_container.grid(row=0, column=0, columnspan=2, sticky='ew', pady=(0, 20))
         
         # Grid de cards
-        stats_container.grid_columnconfigure(0, weight=1, uniform="stats")
-        stats_container.grid_columnconfigure(1, weight=1, uniform="stats")
-        stats_container.grid_columnconfigure(2, weight=1, uniform="stats")
-        stats_container.grid_columnconfigure(3, weight=1, uniform="stats")
-        
+        self.stats_container.grid_columnconfigure(0, weight=1, uniform="stats")
+        self.stats_container.grid_columnconfigure(1, weight=1, uniform="stats")
+        self.stats_container.grid_columnconfigure(2, weight=1, uniform="stats")
+        self.stats_container.grid_columnconfigure(3, weight=1, uniform="stats")
+        self.update_stats()
+        
+    def update_stats(self):
+        """(Re)cria os cards de estatísticas a partir do resumo do histórico"""
+        for widget in self.stats_container.winfo_children():
+            widget.destroy()
+            
         # Calcular estatísticas
-        historico = mock_loader.get_historico()
-        total_producoes = len(historico)
-        
-        # ABV médio
-        abvs = [h.get('abv', 0) for h in historico if h.get('abv')]
-        abv_medio = sum(abvs) / len(abvs) if abvs else 0
-        
-        # Taxa de sucesso
-        concluidas = len([h for h in historico if h.get('status') == 'Concluída'])
-        taxa_sucesso = (concluidas / total_producoes * 100) if total_producoes > 0 else 0
-        
-        # Avaliação média
-        avaliacoes = [h.get('avaliacao', 0) for h in historico if h.get('avaliacao')]
-        avaliacao_media = sum(avaliacoes) / len(avaliacoes) if avaliacoes else 0
+        resumo = mock_loader.get_resumo_historico()
+        total_producoes = resumo['total']
+        abv_medio = resumo['abv_medio']
+        taxa_sucesso = resumo['taxa_sucesso']
+        avaliacao_media = resumo['avaliacao_media']
         
         # Cards de estatísticas
         stats_data = [
@@ -84,7 +93,7 @@ class HistoryView(BaseView):
         ]
         
         for idx, (label, value, icon, color) in enumerate(stats_data):
-            card = self.create_stat_card(stats_container, label, value, icon, color)
+            card = self.create_stat_card(self.stats_container, label, value, icon, color)
             card.grid(row=0, column=idx, padx=10, sticky='ew')
             
     def create_filter_section(self):
@@ -298,9 +307,11 @@ class HistoryView(BaseView):
             stars_label = self.create_label(metrics_inner, stars, 'body')
             stars_label.pack()
             
+        return item_frame
+            
     def load_history(self):
         """Carrega o histórico do mock data"""
-        self.history_data = mock_loader.get_historico()
+        self.history_data = mock_loader.get_historico(limite=LIMITE_HISTORICO)
         self.display_history(self.history_data)
         
     def display_history(self, history: List[Dict]):
@@ -308,6 +319,7 @@ class HistoryView(BaseView):
         # Limpar lista atual
         for widget in self.history_list_frame.winfo_children():
             widget.destroy()
+        self.history_rows = {}
             
         if not history:
             no_history_label = self.create_label(
@@ -318,34 +330,31 @@ class HistoryView(BaseView):
             no_history_label.pack(pady=40)
         else:
             for item in history:
-                self.create_history_item(self.history_list_frame, item)
+                self.history_rows[item.get('id')] = self.create_history_item(self.history_list_frame, item)
                 
     def filter_history(self):
         """Filtra o histórico baseado nos critérios"""
+        self.display_history(self.get_filtered_history())
+        
+    def get_filtered_history(self) -> List[Dict]:
+        """Histórico que passa pelos filtros atuais"""
         search_term = self.search_entry.get().lower()
         type_filter = self.type_filter.get()
         period_filter = self.period_filter.get()
         
-        filtered = self.history_data
-        
-        # Filtro por busca
-        if search_term:
-            filtered = [h for h in filtered if 
-                       search_term in h.get('receita_nome', '').lower() or
-                       search_term in h.get('lote', '').lower()]
-        
-        # Filtro por tipo
-        if type_filter != "Todos":
-            filtered = [h for h in filtered if h.get('tipo') == type_filter]
-        
-        # Filtro por período (simplificado para o mock)
-        # Em produção, seria feito com datas reais
-        if period_filter == "Última Semana":
-            filtered = filtered[:2]
-        elif period_filter == "Último Mês":
-            filtered = filtered[:5]
+        # Filtro por período
+        desde = None
+        if period_filter in PERIODOS:
+            desde = datetime.now() - PERIODOS[period_filter]
+        
+        filtered = mock_loader.get_historico(
+            tipo=type_filter if type_filter != "Todos" else None,
+            termo=search_term or None,
+            desde=desde,
+            limite=LIMITE_HISTORICO
+        )
         
-        self.display_history(filtered)
+        return filtered
         
     def on_filter_change(self, value):
         """Callback para mudança nos filtros"""
@@ -378,3 +387,14 @@ class HistoryView(BaseView):
     def refresh(self):
         """Atualiza o histórico"""
         self.load_history()
+        
+    def on_dados_alterados(self, alteracoes):
+        """Atualiza o resumo e recria só as linhas do histórico que mudaram"""
+        mudancas = alteracoes.get('historico')
+        if not mudancas or not self.is_created:
+            return
+        self.update_stats()
+        filtered = self.get_filtered_history()
+        if not self.atualizar_linhas(self.history_list_frame, self.history_rows, filtered,
+                                     mudancas['alterados'], self.create_history_item):
+            self.display_history(filtered)
@@ -16,6 +16,7 @@ class RecipeView(BaseView):
         self.type_filter = None
         self.recipe_list_frame = None
         self.recipes_data = []
+        self.recipe_rows: Dict[str, ctk.CTkFrame] = {}  # id -> linha exibida
         
     def create_widgets(self):
         """Cria os widgets da view de receitas"""
@@ -266,6 +267,8 @@ class RecipeView(BaseView):
         )
         brew_btn.pack()
         
+        return item_frame
+        
     def load_recipes(self):
         """Carrega as receitas do mock data"""
         self.recipes_data = mock_loader.get_receitas()
@@ -276,6 +279,7 @@ class RecipeView(BaseView):
         # Limpar lista atual
         for widget in self.recipe_list_frame.winfo_children():
             widget.destroy()
+        self.recipe_rows = {}
             
         if not recipes:
             no_recipes_label = self.create_label(
@@ -286,10 +290,14 @@ class RecipeView(BaseView):
             no_recipes_label.pack(pady=40)
         else:
             for recipe in recipes:
-                self.create_recipe_item(self.recipe_list_frame, recipe)
+                self.recipe_rows[recipe.get('id')] = self.create_recipe_item(self.recipe_list_frame, recipe)
                 
     def filter_recipes(self):
         """Filtra as receitas baseado nos critérios"""
+        self.display_recipes(self.get_filtered_recipes())
+        
+    def get_filtered_recipes(self) -> List[Dict]:
+        """Receitas que passam pelos filtros atuais"""
         search_term = self.search_entry.get().lower()
         type_filter = self.type_filter.get()
         diff_filter = self.diff_filter.get()
@@ -308,7 +316,7 @@ class RecipeView(BaseView):
         if diff_filter != "Todas":
             filtered = [r for r in filtered if r.get('dificuldade') == diff_filter]
         
-        self.display_recipes(filtered)
+        return filtered
         
     def on_filter_change(self, value):
         """Callback para mudança nos filtros"""
@@ -344,3 +352,14 @@ class RecipeView(BaseView):
     def refresh(self):
         """Atualiza a lista de receitas"""
         self.load_recipes()
+        
+    def on_dados_alterados(self, alteracoes):
+        """Recria só as linhas das receitas que mudaram no arquivo de dados"""
+        mudancas = alteracoes.get('receitas')
+        if not mudancas or not self.is_created:
+            return
+        self.recipes_data = mock_loader.get_receitas()
+        filtered = self.get_filtered_recipes()
+        if not self.atualizar_linhas(self.recipe_list_frame, self.recipe_rows, filtered,
+                                     mudancas['alterados'], self.create_recipe_item):
+            self.display_recipes(filtered)